@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmarks de los núcleos de cálculo de ambas aplicaciones.
+
+Uso: ``python -m benchmarks bench`` desde la raíz del repositorio.
+"""
+
+import os
+import sys
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# La aplicación de escritorio importa sus módulos como ``models.*``/``utils.*``
+# desde src/; utils.shared añade metabolic_app (el paquete ``src``).
+_SRC = os.path.join(_ROOT, 'src')
+if _SRC not in sys.path:
+    sys.path.insert(0, _SRC)
+
+import utils.shared  # noqa: E402,F401
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+
+"""
+Línea de comandos de los benchmarks.
+
+    python -m benchmarks bench                      # suite completa
+    python -m benchmarks bench --quick              # hasta N=4096 y 1000 personas
+    python -m benchmarks bench --output out.json    # guarda el JSON
+    python -m benchmarks bench --update-baseline    # actualiza la línea base
+    python -m benchmarks bench --only statistics --update-baseline  # solo esos casos
+    python -m benchmarks accuracy                   # motores rápidos frente a las referencias
+    python -m benchmarks accuracy --full            # también N=65537 y 1e6 y magnitudes extremas
+    python -m benchmarks load --requests 2000       # prueba de carga de src/service.py
+
+La salida es un JSON con latencias (min, media, p50, p90, p99), rendimiento
+en elementos por segundo y pico de memoria de cada caso, y la aceleración de
+cada motor de cálculo frente a numpy en los casos core.* (``speedups``). Si hay línea base,
+las regresiones se listan en el JSON y el proceso termina con código 1.
+``--update-baseline`` reemplaza en la línea base los casos medidos y conserva
+los demás (los omitidos por ``--quick`` u ``--only``).
+``accuracy`` termina con código 1 si algún motor supera su tolerancia.
+``load`` imprime peticiones por segundo y latencias p50/p90/p99 del servicio.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+
+from benchmarks import accuracy, loadtest
+from benchmarks.harness import compare, run_cases
+from benchmarks.suite import build_cases, speedups
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+QUICK_MAX_SIZE = 4096
+
+
+def _merge_baseline(path: str, report: dict) -> dict:
+    """Línea base con los casos de ``report`` y, del archivo anterior, los que no se midieron."""
+    if not os.path.exists(path):
+        return report
+    with open(path, encoding='utf-8') as f:
+        previous = json.load(f)
+    measured = {(r['name'], r['size']): r for r in report['results']}
+    results = [measured.pop((r['name'], r['size']), r) for r in previous['results']] + list(measured.values())
+    # Tamaño máximo cubierto entre las dos mediciones (None: sin límite)
+    sizes = (report['meta']['max_size'], previous['meta'].get('max_size'))
+    meta = dict(report['meta'], max_size=None if None in sizes else max(sizes))
+    return dict(report, meta=meta, results=results, speedups=speedups(results))
+
+
+def _bench(args: argparse.Namespace) -> int:
+    log = None if args.quiet else (lambda line: print(line, file=sys.stderr))
+    max_size = QUICK_MAX_SIZE if args.quick else args.max_size
+    results = run_cases(build_cases(), max_size=max_size, only=args.only,
+                        min_time=args.min_time, log=log)
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'max_size': max_size,
+        },
+        'results': results,
+        'speedups': speedups(results),
+    }
+
+    if args.update_baseline:
+        updated = _merge_baseline(args.baseline, report)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(updated, f, indent=1)
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+        report['regressions'] = compare(results, baseline, time_tolerance=args.tolerance,
+                                        memory_tolerance=args.tolerance)
+
+    text = json.dumps(report, indent=1)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        print(text)
+
+    if log:
+        for row in report['speedups']:
+            log(f"{row['name']:<40} {row['size']:>9} {row['backend']:<8} x{row['speedup']:.2f} frente a numpy")
+    for regression in report.get('regressions', []):
+        print(f"REGRESIÓN {regression['name']} [{regression['size']}]: "
+              f"tiempo x{regression['time_ratio']:.2f}, memoria x{regression['memory_ratio']:.2f}",
+              file=sys.stderr)
+    return 1 if report.get('regressions') else 0
+
+
+def _accuracy(args: argparse.Namespace) -> int:
+    results = accuracy.run(full=args.full, seed=args.seed, engines=args.only)
+    worst = {}
+    for result in results:
+        key = (result.engine, result.quantity)
+        if key not in worst or result.worst > worst[key].worst:
+            worst[key] = result
+    for (engine, quantity), result in worst.items():
+        print(f"{engine:<90} {quantity:<14} {result.worst:>9.3g}  ({result.series}, N={result.size})")
+    failures = [r for r in results if not r.passed]
+    for failure in failures:
+        print(f"FUERA DE TOLERANCIA {failure.engine} {failure.quantity} "
+              f"[{failure.series}, N={failure.size}]: x{failure.worst:.3g}", file=sys.stderr)
+    print(f"{len(results)} comparaciones, {len(failures)} fuera de tolerancia", file=sys.stderr)
+    return 1 if failures else 0
+
+
+def _load(args: argparse.Namespace) -> int:
+    result = loadtest.run(url=args.url, requests=args.requests, concurrency=args.concurrency,
+                          days=args.days, batch=args.batch, distinct=args.distinct,
+                          workers=args.workers, seed=args.seed)
+    print(json.dumps(result, indent=1))
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    bench = commands.add_parser('bench', help='mide los núcleos de cálculo')
+    bench.add_argument('--quick', action='store_true', help=f'limita N a {QUICK_MAX_SIZE}')
+    bench.add_argument('--max-size', type=int, default=None, help='omite tamaños mayores')
+    bench.add_argument('--only', default=None, help='solo casos cuyo nombre contenga este texto')
+    bench.add_argument('--min-time', type=float, default=0.2, help='segundos mínimos por caso')
+    bench.add_argument('--output', default=None, help='archivo JSON de salida (por defecto stdout)')
+    bench.add_argument('--baseline', default=DEFAULT_BASELINE, help='JSON de referencia')
+    bench.add_argument('--update-baseline', action='store_true', help='guarda el resultado como referencia')
+    bench.add_argument('--tolerance', type=float, default=0.25,
+                       help='fracción de empeoramiento tolerada (tiempo y memoria)')
+    bench.add_argument('--quiet', action='store_true', help='no muestra el progreso')
+    bench.set_defaults(handler=_bench)
+
+    check = commands.add_parser('accuracy', help='compara los motores rápidos con las referencias')
+    check.add_argument('--full', action='store_true',
+                       help='añade N=1000, 65537 y 1e6 y las series de magnitudes extremas')
+    check.add_argument('--seed', type=int, default=0, help='semilla de las series aleatorias')
+    check.add_argument('--only', action='append', default=None,
+                       help='solo motores cuyo nombre contenga este texto (repetible)')
+    check.set_defaults(handler=_accuracy)
+
+    load = commands.add_parser('load', help='prueba de carga del servicio HTTP local')
+    load.add_argument('--url', default=None, help='servicio ya arrancado (por defecto se arranca uno)')
+    load.add_argument('--requests', type=int, default=1000, help='peticiones en total')
+    load.add_argument('--concurrency', type=int, default=16, help='conexiones simultáneas')
+    load.add_argument('--days', type=int, default=365, help='días de ejercicio por persona')
+    load.add_argument('--batch', type=int, default=0, help='personas por petición (0 = /person)')
+    load.add_argument('--distinct', type=int, default=1000,
+                      help='cuerpos distintos; el resto son repeticiones servidas por la caché')
+    load.add_argument('--workers', type=int, default=None, help='procesos del servicio arrancado')
+    load.add_argument('--seed', type=int, default=0, help='semilla de los cuerpos')
+    load.set_defaults(handler=_load)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
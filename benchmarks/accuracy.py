@@ -0,0 +1,556 @@
+# -*- coding: utf-8 -*-
+
+"""
+Comparación diferencial de los motores rápidos con las implementaciones de referencia.
+
+Los motores rápidos usan el motor de cálculo activo (src.core, por defecto
+``auto``). Las referencias de metabolic_app se evalúan siempre con el motor
+``python``, que sigue las fórmulas término a término.
+
+Referencias:
+    - math_tools.calculate_fourier_coefficients (suma directa, un k por llamada)
+    - fourier.calculate_specific_fourier_coefficients (Python puro)
+    - fourier.calculate_fourier_coefficients (Python puro, fase con n = 0..N-1)
+      (también para fourier.calculate_amplitude_spectrum, que usa la FFT)
+    - statistics.calculate_mean/std_dev/regression_*/correlation_coefficient
+      (también sobre las medias por intervalo geométrico de log10(k) y log10(A_k))
+    - los núcleos de src.core con el motor ``python`` para cada otro motor
+      disponible (espectro con n = 1..N y n = 0..N-1, sumas directas, DFT
+      deslizante, GB diario, regresión, mediana y MAD por ventana, momentos)
+    - run_cohort con precisión 'double' para run_cohort con 'single' (minutos
+      en uint16 o float32 y espectro en float32); los minutos son la serie
+      llevada a 0..1440, enteros y sin redondear
+
+Tolerancias (ε = épsilon de float64, S = (2/N)·Σ|x_n|, cota de cualquier
+coeficiente):
+    - a_k, b_k, A_k: |rápido − referencia| ≤ 8·N·ε·S. La referencia evalúa
+      cos(2πkn/N) con argumentos de hasta 2πN, cuyo error crece con N; la FFT
+      observada queda por debajo de 3.2·N·ε·S.
+    - log10(A_k): solo donde A_k de referencia supera 16 veces la tolerancia
+      de A_k (por debajo ambos son ruido de redondeo); |Δ| ≤ tol(A_k)/(A_k·ln 10)
+      + 4ε·|log10(A_k)|.
+    - Regresión log-log y estadística: |Δ| ≤ 64·N·ε·κ·max(1, |referencia|), con
+      κ = max|v|/std(v) de las series (en alpha y C la escala es además
+      max|log10(A_k)|, por las sumas sin centrar de la referencia). Si la
+      referencia lanza ZeroDivisionError, el motor rápido debe devolver nan;
+      si la tolerancia llega a 1 el valor es ruido de redondeo y no se compara.
+      Tampoco se compara r del ajuste por intervalos si el espectro es plano
+      (las medias por intervalo varían menos que el error de la FFT).
+    - La fórmula de referencia de A_k (sqrt(a² + b²)) se desborda fuera de
+      |x| ≈ 1e±154, así que las series extremas se limitan a 1e-100..1e150.
+    - Precisión 'single' frente a 'double' (ε₃₂ = épsilon de float32,
+      D = (2/N)·Σ|GB_n − media|): A_k con |Δ| ≤ ε₃₂·log2(N)·D, más ε₃₂/2·S del
+      GB si los minutos no son enteros (se guardan en float32), más la
+      tolerancia de A_k en float64; lo observado queda por debajo de
+      0.2·ε₃₂·log2(N)·D. alpha, C y r del ajuste por intervalos se comparan
+      con la cota lineal de un desplazamiento δ = max tol(A_k)/(A_k·ln 10) de
+      cada media (por 2), y solo si ninguna A_k está por debajo de 16 veces
+      su tolerancia: una A_k nula (p. ej. A_{N/2} con minutos enteros) es
+      ruido de redondeo en ambas precisiones y mueve alpha hasta ~0.01. Con
+      minutos enteros el TMB, el GB medio y la correlación son idénticos;
+      con minutos en float32 difieren en ε₃₂/2 relativo.
+
+Por defecto se comparan series de hasta N = 4097 días sin las magnitudes
+extremas, en unos segundos; ``--full`` añade N = 1000, 65537 y 1e6 y las
+series ``offset``, ``tiny`` y ``huge``.
+
+Uso: ``python -m benchmarks accuracy [--full] [--seed S]``; termina con
+código 1 si algún caso supera su tolerancia.
+"""
+
+import math
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional
+import numpy as np
+
+from models.batch import PersonBatch
+from utils import math_tools
+from utils.cohort_runner import run_cohort
+from src import core
+from src.models import fourier, statistics
+
+EPS = np.finfo(np.float64).eps
+EPS32 = np.finfo(np.float32).eps
+SPECTRUM_ULPS = 8
+LOG_ULPS = 4
+REGRESSION_ULPS = 64
+
+SIZES = [1, 2, 3, 7, 30, 365, 4097]
+# Tamaños que solo se comparan con --full (las referencias O(N) por k dominan el tiempo)
+FULL_SIZES = [1000, 65537, 1_000_000]
+# Tamaño máximo para comparar todos los k contra las referencias O(N) por k
+FULL_K_LIMIT = 1000
+# Tamaño máximo para las referencias en Python puro O(N²)
+PURE_PYTHON_LIMIT = 365
+SAMPLED_K = 64
+
+
+def _random(rng, n):
+    return rng.uniform(1400.0, 3200.0, n)
+
+
+def _constant(rng, n):
+    return np.full(n, 2345.678)
+
+
+def _spike(rng, n):
+    x = np.full(n, 1500.0)
+    x[rng.integers(n)] = 1e6
+    return x
+
+
+def _zeros_spike(rng, n):
+    x = np.zeros(n)
+    x[rng.integers(n)] = 1.0
+    return x
+
+
+def _nyquist(rng, n):
+    return 2000.0 + 500.0 * (-1.0) ** np.arange(n)
+
+
+def _tone(rng, n):
+    return 2000.0 + 300.0 * np.cos(2 * np.pi * 3 * np.arange(1, n + 1) / n)
+
+
+def _weekly(rng, n):
+    return 2000.0 + 400.0 * (np.arange(n) % 7 < 2) + rng.normal(0, 5, n)
+
+
+def _offset(rng, n):
+    return 1e9 + rng.uniform(0.0, 1.0, n)
+
+
+def _tiny(rng, n):
+    return rng.uniform(0.0, 1e-100, n)
+
+
+def _huge(rng, n):
+    return rng.uniform(0.0, 1e150, n)
+
+
+def _walk(rng, n):
+    return 2000.0 + np.cumsum(rng.normal(0, 10, n))
+
+
+# Series aleatorias y adversariales (todas finitas, sin NaN)
+SERIES: Dict[str, Callable[[np.random.Generator, int], np.ndarray]] = {
+    'random': _random,
+    'constant': _constant,
+    'spike': _spike,
+    'zeros+spike': _zeros_spike,
+    'nyquist': _nyquist,
+    'tone': _tone,
+    'weekly': _weekly,
+    'offset': _offset,
+    'tiny': _tiny,
+    'huge': _huge,
+    'walk': _walk,
+}
+# Series de magnitudes extremas, solo con --full
+EXTREME_SERIES = ('offset', 'tiny', 'huge')
+
+
+@dataclass
+class CheckResult:
+    """Peor error de un motor en un caso, en unidades de su tolerancia."""
+
+    engine: str
+    series: str
+    size: int
+    worst: float  # max |Δ| / tolerancia; <= 1 es aceptable
+    quantity: str = ''
+
+    @property
+    def passed(self) -> bool:
+        return self.worst <= 1.0
+
+
+def spectrum_tolerance(x: np.ndarray) -> float:
+    """Tolerancia absoluta de a_k, b_k y A_k para la serie x."""
+    n = max(x.size, 1)
+    scale = 2.0 / n * float(np.abs(x).sum())
+    return SPECTRUM_ULPS * n * EPS * scale if scale > 0 else 0.0
+
+
+def _ratio(delta: np.ndarray, tolerance) -> float:
+    # |Δ| antes de pasar a float64: en las sumas complejas cuenta también la parte imaginaria
+    delta = np.abs(np.asarray(delta)).astype(np.float64)
+    tolerance = np.broadcast_to(np.asarray(tolerance, dtype=np.float64), delta.shape)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.where(delta == 0, 0.0, delta / tolerance)
+    return float(np.max(ratio)) if ratio.size else 0.0
+
+
+def _k_values(n: int, rng: np.random.Generator) -> np.ndarray:
+    """Todos los k para series cortas; una muestra con los extremos para las largas."""
+    if n <= FULL_K_LIMIT:
+        return np.arange(1, n + 1)
+    fixed = np.array([1, 2, n // 2, n // 2 + 1, n - 1, n])
+    return np.unique(np.concatenate([fixed, rng.integers(1, n + 1, SAMPLED_K)]))
+
+
+def _pure(fn, *args):
+    """Evalúa una referencia de metabolic_app con el motor Python puro."""
+    with core.use_backend('python'):
+        return fn(*args)
+
+
+def check_spectrum_vs_coefficients(x, rng):
+    """calculate_fourier_spectrum (FFT) frente a calculate_fourier_coefficients."""
+    n = x.size
+    spectrum = math_tools.calculate_fourier_spectrum(x)
+    ks = _k_values(n, rng)
+    reference = np.array([math_tools.calculate_fourier_coefficients(x, int(k)) for k in ks]).T
+    tol = spectrum_tolerance(x)
+    results = [('a_k,b_k,A_k', _ratio(spectrum[:3, ks - 1] - reference[:3], tol))]
+    # log10(A_k) solo por encima del ruido de redondeo
+    meaningful = reference[2] > 16 * tol
+    if meaningful.any():
+        ref_A = reference[2][meaningful]
+        ref_log = reference[3][meaningful]
+        log_tol = tol / (ref_A * math.log(10)) + LOG_ULPS * EPS * np.abs(ref_log)
+        results.append(('log10(A_k)', _ratio(spectrum[3, ks - 1][meaningful] - ref_log, log_tol)))
+    return results
+
+
+def check_spectrum_vs_pure_python(x, rng):
+    """calculate_fourier_spectrum frente a fourier.calculate_specific_fourier_coefficients."""
+    n = x.size
+    if n > FULL_K_LIMIT:
+        return []
+    spectrum = math_tools.calculate_fourier_spectrum(x)
+    _, a_k, b_k, A_k = _pure(fourier.calculate_specific_fourier_coefficients, x.tolist(), n, n)
+    return [('a_k,b_k,A_k', _ratio(spectrum[:3] - np.array([a_k, b_k, A_k]), spectrum_tolerance(x)))]
+
+
+def check_amplitudes_vs_zero_based(x, rng):
+    """A_k del espectro frente a fourier.calculate_fourier_coefficients (fase n = 0..N-1).
+
+    Las dos convenciones de fase difieren en a_k y b_k, pero no en A_k.
+    """
+    n = x.size
+    if n > PURE_PYTHON_LIMIT:
+        return []
+    spectrum = math_tools.calculate_fourier_spectrum(x)
+    _, _, A_k = _pure(fourier.calculate_fourier_coefficients, x.tolist(), n)
+    # k = 0 del módulo de referencia equivale a k = N del espectro
+    fast = np.concatenate([spectrum[2, n - 1:n], spectrum[2, :n // 2]])
+    return [('A_k', _ratio(fast - np.array(A_k), spectrum_tolerance(x)))]
+
+
+def check_amplitude_spectrum(x, rng):
+    """fourier.calculate_amplitude_spectrum (FFT) frente a calculate_fourier_coefficients."""
+    n = x.size
+    ks = _k_values(n, rng)
+    fast = fourier.calculate_amplitude_spectrum(x, n)[ks - 1]
+    reference = np.array([math_tools.calculate_fourier_coefficients(x, int(k))[2] for k in ks])
+    return [('A_k', _ratio(fast - reference, spectrum_tolerance(x)))]
+
+
+def check_batch_spectrum(x, rng):
+    """PersonBatch.calculate_fourier_spectrum frente al espectro de cada persona."""
+    minutes = np.vstack([x, x[::-1]]) / 100.0
+    batch = PersonBatch(['M', 'F'], [70.0, 60.0], [175.0, 165.0], [30, 40], minutes)
+    spectra = batch.calculate_fourier_spectrum()
+    worst = 0.0
+    for i in range(len(batch)):
+        person = batch.person(i)
+        gb = person.calculate_daily_expenditure()
+        worst = max(worst, _ratio(spectra[:3, i] - person.calculate_fourier_spectrum()[:3],
+                                  spectrum_tolerance(gb)))
+    return [('a_k,b_k,A_k', worst)]
+
+
+def check_cross_spectrum(x, rng):
+    """calculate_cross_spectrum (un segmento, sin ventana): sqrt(Sxx) frente a A_k de referencia."""
+    n = x.size
+    ks = _k_values(n, rng)
+    ks = ks[ks <= n // 2]
+    if not ks.size:
+        return []
+    cross = math_tools.calculate_cross_spectrum(x, x[::-1], window=None)
+    fast = np.sqrt(cross.sxx[ks - 1])
+    reference = np.array([math_tools.calculate_fourier_coefficients(x, int(k))[2] for k in ks])
+    return [('sqrt(Sxx)', _ratio(fast - reference, spectrum_tolerance(x)))]
+
+
+def _condition(values) -> float:
+    """max|v| / desviación típica: cuánto amplifica el redondeo una serie casi constante."""
+    v = np.asarray(values, dtype=np.float64)
+    std = float(v.std()) if v.size else 0.0
+    return math.inf if std == 0 else float(np.abs(v).max()) / std
+
+
+def _regression_tolerance(reference: float, n: int, kappa: float = 1.0) -> float:
+    return REGRESSION_ULPS * max(n, 1) * EPS * kappa * max(1.0, abs(reference))
+
+
+def _compare(fast: float, reference: Optional[float], tolerance: float) -> float:
+    """
+    Razón de error de un valor escalar.
+
+    ``reference`` es None si la referencia lanzó ZeroDivisionError. Con una
+    tolerancia >= 1 el valor es ruido de redondeo (serie constante a la
+    precisión de trabajo) y se acepta cualquier resultado, incluido nan.
+    """
+    if tolerance >= 1:
+        return 0.0
+    if reference is None or math.isnan(reference):
+        return 0.0 if math.isnan(fast) else math.inf
+    if math.isnan(fast):
+        return math.inf
+    return _ratio(fast - reference, tolerance)
+
+
+def _reference(fn, *args) -> Optional[float]:
+    try:
+        return _pure(fn, *args)
+    except ZeroDivisionError:
+        return None
+
+
+def check_loglog_fit(x, rng):
+    """calculate_loglog_fit frente a la regresión de statistics.py sobre log10."""
+    n = x.size
+    if n < 4:
+        return []
+    A_k = math_tools.calculate_fourier_spectrum(x, n // 2)[2]
+    log_k, log_A = _pure(fourier.calculate_log_transformations, list(range(1, n // 2 + 1)), A_k.tolist())
+    m = len(log_k)
+    if m < 2:
+        return []
+    alpha, intercept, r = math_tools.calculate_loglog_fit(A_k, bins=None)
+    kappa = _condition(log_k) + _condition(log_A)
+    # Las sumas sin centrar de la referencia pierden precisión en proporción a |log10(A_k)|
+    scale = max(abs(v) for v in log_A)
+    ref_alpha = _reference(statistics.calculate_regression_slope, log_k, log_A, m)
+    results = [('alpha', _compare(alpha, ref_alpha,
+                                  _regression_tolerance(max(scale, abs(ref_alpha or 0.0)), m, _condition(log_k))))]
+    if ref_alpha is not None:
+        ref_c = _pure(statistics.calculate_regression_intercept, log_k, log_A, ref_alpha, m)
+        results.append(('C', _compare(intercept, ref_c,
+                                      _regression_tolerance(max(scale, abs(ref_c)), m, _condition(log_k)))))
+    ref_r = _reference(statistics.calculate_correlation_coefficient, log_k, log_A, m)
+    results.append(('r', _compare(r, ref_r, _regression_tolerance(0.0, m, kappa))))
+    return results
+
+
+def check_log_binned_fit(x, rng):
+    """calculate_loglog_fit por intervalos frente a medias por intervalo y la regresión de statistics.py."""
+    n = x.size
+    if n < 4:
+        return []
+    A_k = math_tools.calculate_fourier_spectrum(x, n // 2)[2]
+    edges = math_tools.log_bin_edges(A_k.size).tolist()
+    points_k, points_A = [], []
+    for start, stop in zip(edges[:-1], edges[1:]):
+        log_k, log_A = _pure(fourier.calculate_log_transformations, list(range(start, stop)),
+                             A_k[start - 1:stop - 1].tolist())
+        if log_k:
+            points_k.append(_pure(statistics.calculate_mean, log_k))
+            points_A.append(_pure(statistics.calculate_mean, log_A))
+    m = len(points_k)
+    if m < 2:
+        return []
+    alpha, intercept, r = math_tools.calculate_loglog_fit(A_k)
+    # Las medias por intervalo heredan el redondeo de todos los puntos del intervalo
+    kappa = _condition(points_k) * (n // 2)
+    scale = max(abs(v) for v in points_A)
+    ref_alpha = _reference(statistics.calculate_regression_slope, points_k, points_A, m)
+    results = [('alpha', _compare(alpha, ref_alpha,
+                                  _regression_tolerance(max(scale, abs(ref_alpha or 0.0)), m, kappa)))]
+    if ref_alpha is not None:
+        ref_c = _pure(statistics.calculate_regression_intercept, points_k, points_A, ref_alpha, m)
+        results.append(('C', _compare(intercept, ref_c, _regression_tolerance(max(scale, abs(ref_c)), m, kappa))))
+    ref_r = _reference(statistics.calculate_correlation_coefficient, points_k, points_A, m)
+    r_tolerance = _regression_tolerance(0.0, m, kappa + _condition(points_A))
+    # Espectro plano (un pico aislado): las medias solo difieren por el
+    # redondeo de la FFT, así que r es ruido aunque su tolerancia no llegue a 1
+    positive = A_k[A_k > 0]
+    if positive.size and float(np.std(points_A)) <= spectrum_tolerance(x) / (positive.min() * math.log(10)):
+        r_tolerance = 1.0
+    results.append(('r', _compare(r, ref_r, r_tolerance)))
+    return results
+
+
+def check_statistics(x, rng):
+    """calculate_statistics frente a calculate_mean/std_dev/correlation_coefficient."""
+    n = x.size
+    y = 1.5 * x + rng.normal(0, 1, n) * np.abs(x).max()
+    stats = math_tools.calculate_statistics(x, y)
+    xs, ys = x.tolist(), y.tolist()
+    mean_x = _pure(statistics.calculate_mean, xs)
+    mean_y = _pure(statistics.calculate_mean, ys)
+    results = [
+        ('mean', max(_compare(float(stats.mean_x), mean_x, _regression_tolerance(mean_x, n)),
+                     _compare(float(stats.mean_y), mean_y, _regression_tolerance(mean_y, n)))),
+    ]
+    # La desviación típica hereda el error absoluto de la media (ε·max|x|)
+    std_x = _pure(statistics.calculate_std_dev, xs, mean_x)
+    std_tol = REGRESSION_ULPS * n * EPS * float(np.abs(x).max())
+    results.append(('std', _ratio(math.sqrt(stats.variance_x) - std_x, std_tol)))
+    if n >= 2:
+        ref_r = _reference(statistics.calculate_correlation_coefficient, xs, ys, n)
+        kappa = _condition(x) + _condition(y)
+        results.append(('r', _compare(float(stats.correlation), ref_r, _regression_tolerance(0.0, n, kappa))))
+    return results
+
+
+def check_backends(x, rng):
+    """Núcleos de src.core con cada motor disponible frente al motor Python puro."""
+    n = x.size
+    if n > PURE_PYTHON_LIMIT:
+        return []
+    minutes = np.abs(x) / 100.0
+    y = 1.5 * x + rng.normal(0, 1, n) * np.abs(x).max()
+
+    ks = _k_values(n, rng)
+    window = max(n - 1, 1)
+
+    def kernels():
+        k = np.arange(1, window // 2 + 1)
+        spectrum = core.fourier_spectrum(x[:window], window // 2)
+        sums = (spectrum[0] + 1j * spectrum[1]) * (window / 2)
+        buffer = x[:window].copy()
+        # El último día entra en la ventana deslizante y sale el primero
+        core.sliding_dft_update(sums, np.exp(-2j * np.pi * k / window), buffer, 0, x[window:])
+        return (core.fourier_spectrum(x), core.fourier_spectrum(x, n // 2, k_min=0, origin=0),
+                core.daily_expenditure(1650.0, minutes), core.linear_fit(x, y),
+                core.fourier_coefficients(x, ks), sums * (2 / window), core.window_median_mad(x, 7),
+                core.column_moments(np.vstack([x, y])))
+
+    reference = _pure(kernels)
+    tol = spectrum_tolerance(x)
+    results = []
+    for backend in core.available_backends():
+        if backend == 'python':
+            continue
+        with core.use_backend(backend):
+            spectrum, zero_based, gb, fit, sums, sliding, median_mad, moments = kernels()
+        results += [
+            (f'{backend}: a_k,b_k,A_k', _ratio(spectrum[:3] - reference[0][:3], tol)),
+            (f'{backend}: a_k,b_k,A_k (n = 0..N-1)', _ratio(zero_based[:3] - reference[1][:3], tol)),
+            (f'{backend}: GB', _ratio(gb - reference[2], 4 * EPS * np.abs(reference[2]))),
+            (f'{backend}: r', _compare(fit[2], reference[3][2],
+                                       _regression_tolerance(0.0, n, _condition(x) + _condition(y)))),
+            (f'{backend}: sumas directas', _ratio(sums[:3] - reference[4][:3], tol)),
+            (f'{backend}: DFT deslizante', _ratio(sliding - reference[5], tol)),
+            # Mediana y MAD: mismas operaciones en el mismo orden, sin redondeo propio
+            (f'{backend}: mediana,MAD', 0.0 if np.array_equal(median_mad, reference[6], equal_nan=True) else math.inf),
+            (f'{backend}: momentos', max(
+                _ratio(moments[1] - reference[7][1], _regression_tolerance(0.0, n) * np.abs(reference[7][1])),
+                _ratio(moments[2] - reference[7][2], _regression_tolerance(0.0, n, _condition(x) + _condition(y))
+                       * np.abs(reference[7][2])))),
+        ]
+    return results
+
+
+def _minutes_like(x: np.ndarray, whole: bool) -> np.ndarray:
+    """Minutos con la forma de la serie x llevada a 0..1440 (30 si es constante)."""
+    span = float(x.max() - x.min())
+    minutes = 1440.0 * (x - x.min()) / span if span > 0 else np.full(x.size, 30.0)
+    return np.round(minutes) if whole else minutes
+
+
+def _single_fit_tolerances(A_k: np.ndarray, tol: np.ndarray, r: float):
+    """Cotas de |Δ| de alpha, C y r si cada media por intervalo de log10(A_k) se desplaza δ."""
+    binned = math_tools.calculate_log_binned_spectrum(A_k)
+    valid = binned.count > 0
+    x, y = binned.log_k[valid], binned.mean[valid]
+    if x.size < 2:
+        return None
+    delta = 2 * float(np.max(tol / (A_k * math.log(10))))
+    dx, dy = x - x.mean(), y - y.mean()
+    sxx, syy = float(dx @ dx), float(dy @ dy)
+    spread = float(np.abs(dx).sum())
+    alpha_tol = delta * spread / sxx
+    r_tol = (delta * (spread / math.sqrt(sxx * syy) + abs(r) * float(np.abs(dy).sum()) / syy)
+             if syy > 0 else 1.0)
+    return alpha_tol, delta + abs(float(x.mean())) * alpha_tol, r_tol
+
+
+def check_single_precision(x, rng):
+    """run_cohort con precisión 'single' frente a 'double' (minutos enteros y no enteros)."""
+    n = x.size
+    if n < 4:
+        return []
+    results = []
+    for whole in (True, False):
+        minutes = _minutes_like(x, whole)
+        members = dict(sex=['M', 'F'], weight=[70.0, 60.0], height=[175.0, 165.0], age=[30, 40],
+                       exercise_minutes=np.vstack([minutes, minutes[::-1]]))
+        double_batch = PersonBatch(**members)
+        single_batch = PersonBatch(**members, precision='single')
+        double = run_cohort(double_batch, workers=1, with_amplitudes=True)
+        single = run_cohort(single_batch, workers=1, with_amplitudes=True)
+        stored = 'uint16' if single_batch.exercise_minutes.dtype == np.uint16 else 'float32'
+        gb = double_batch.calculate_daily_expenditure()
+        storage = 0.0 if stored == 'uint16' else EPS32 / 2
+        spectrum_worst, fit_worst, stats_worst = 0.0, [0.0, 0.0, 0.0], 0.0
+        for i in range(len(double_batch)):
+            deviation = 2.0 / n * float(np.abs(gb[i] - gb[i].mean()).sum())
+            tol = (EPS32 * math.log2(n) * deviation + storage * 2.0 / n * float(np.abs(gb[i]).sum())
+                   + spectrum_tolerance(gb[i]))
+            A_k = double.amplitudes[i]
+            spectrum_worst = max(spectrum_worst, _ratio(single.amplitudes[i] - A_k, tol))
+            # Con alguna A_k al nivel del redondeo el ajuste es ruido en ambas precisiones
+            bounds = _single_fit_tolerances(A_k, tol, double.r[i]) if (A_k > 16 * tol).all() else None
+            if bounds is not None:
+                for j, (fast, reference, bound) in enumerate(zip(
+                        (single.alpha[i], single.intercept[i], single.r[i]),
+                        (double.alpha[i], double.intercept[i], double.r[i]), bounds)):
+                    fit_worst[j] = max(fit_worst[j], _compare(float(fast), float(reference), bound))
+            # Con minutos enteros el GB es el mismo: TMB, media y correlación deben coincidir
+            scale = 0.0 if stored == 'uint16' else EPS32 / 2 + _regression_tolerance(0.0, n)
+            kappa = _condition(minutes) + _condition(gb[i])
+            stats_worst = max(
+                stats_worst,
+                _ratio(single.bmr[i] - double.bmr[i], 0.0),
+                _compare(float(single.mean_gb[i]), float(double.mean_gb[i]), scale * float(np.abs(gb[i]).mean())),
+                _compare(float(single.correlation[i]), float(double.correlation[i]), scale * kappa))
+        results += [
+            (f'{stored}: A_k', spectrum_worst),
+            (f'{stored}: alpha', fit_worst[0]),
+            (f'{stored}: C', fit_worst[1]),
+            (f'{stored}: r', fit_worst[2]),
+            (f'{stored}: TMB,GB medio,correlación', stats_worst),
+        ]
+    return results
+
+
+# Motores comparados: nombre -> función (serie, rng) -> [(magnitud, peor razón)]
+ENGINES: Dict[str, Callable] = {
+    'math_tools.calculate_fourier_spectrum~calculate_fourier_coefficients': check_spectrum_vs_coefficients,
+    'math_tools.calculate_fourier_spectrum~fourier.calculate_specific_fourier_coefficients': check_spectrum_vs_pure_python,
+    'math_tools.calculate_fourier_spectrum~fourier.calculate_fourier_coefficients': check_amplitudes_vs_zero_based,
+    'fourier.calculate_amplitude_spectrum~calculate_fourier_coefficients': check_amplitude_spectrum,
+    'batch.PersonBatch.calculate_fourier_spectrum~Person': check_batch_spectrum,
+    'math_tools.calculate_cross_spectrum~calculate_fourier_coefficients': check_cross_spectrum,
+    'math_tools.calculate_loglog_fit~statistics.calculate_regression_*': check_loglog_fit,
+    'math_tools.calculate_loglog_fit[bins]~statistics.calculate_regression_*': check_log_binned_fit,
+    'math_tools.calculate_statistics~statistics.calculate_*': check_statistics,
+    'src.core[motores]~src.core[python]': check_backends,
+    'cohort_runner.run_cohort[single]~run_cohort[double]': check_single_precision,
+}
+
+
+def run(full: bool = False, seed: int = 0, engines: Optional[Iterable[str]] = None) -> List[CheckResult]:
+    """
+    Ejecuta las comparaciones y devuelve el peor error de cada caso.
+
+    Con ``full`` se añaden los tamaños de FULL_SIZES y las series de EXTREME_SERIES.
+    """
+    sizes = sorted(SIZES + FULL_SIZES) if full else SIZES
+    series = {name: make for name, make in SERIES.items() if full or name not in EXTREME_SERIES}
+    selected = {name: check for name, check in ENGINES.items()
+                if engines is None or any(e in name for e in engines)}
+    results = []
+    for series_name, make in series.items():
+        for n in sizes:
+            rng = np.random.default_rng([seed, n, len(series_name)])
+            x = make(rng, n)
+            for engine, check in selected.items():
+                for quantity, worst in check(x, rng):
+                    results.append(CheckResult(engine, series_name, n, worst, quantity))
+    return results
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+
+"""
+Medición de tiempos y memoria, y comparación con una línea base guardada.
+"""
+
+import gc
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+import numpy as np
+
+
+@dataclass
+class BenchCase:
+    """Función a medir para una lista de tamaños de entrada."""
+
+    name: str
+    sizes: List[int]
+    # setup(size) prepara los datos fuera de la medición y devuelve la llamada
+    setup: Callable[[int], Callable[[], object]]
+    # Unidad de los elementos procesados por llamada (días, personas, ...)
+    unit: str = 'items'
+
+
+def measure(fn: Callable[[], object], items: int, min_time: float = 0.2,
+            max_repeats: int = 200, min_repeats: int = 3) -> Dict[str, object]:
+    """
+    Mide la latencia de ``fn`` y su pico de memoria.
+
+    Repite la llamada hasta acumular ``min_time`` segundos (con un mínimo de
+    ``min_repeats`` repeticiones si cada una es rápida). El pico de memoria se
+    mide en una ejecución aparte con tracemalloc para no distorsionar los
+    tiempos.
+    """
+    fn()  # calentamiento: importaciones perezosas, cachés de numpy
+    samples = []
+    total = 0.0
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        while len(samples) < max_repeats:
+            start = time.perf_counter()
+            fn()
+            elapsed = time.perf_counter() - start
+            samples.append(elapsed)
+            total += elapsed
+            if total >= min_time and (len(samples) >= min_repeats or total >= 10 * min_time):
+                break
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    latencies = np.array(samples)
+    p50 = float(np.percentile(latencies, 50))
+    return {
+        'repeats': len(samples),
+        'latency_s': {
+            'min': float(latencies.min()),
+            'mean': float(latencies.mean()),
+            'p50': p50,
+            'p90': float(np.percentile(latencies, 90)),
+            'p99': float(np.percentile(latencies, 99)),
+        },
+        'throughput_per_s': items / p50 if p50 > 0 else None,
+        'peak_bytes': int(peak),
+    }
+
+
+def run_cases(cases: List[BenchCase], max_size: Optional[int] = None,
+              only: Optional[str] = None, min_time: float = 0.2,
+              log: Optional[Callable[[str], None]] = None) -> List[Dict[str, object]]:
+    """Ejecuta los casos (filtrados por nombre y tamaño) y devuelve sus resultados."""
+    results = []
+    for case in cases:
+        if only and only not in case.name:
+            continue
+        for size in case.sizes:
+            if max_size is not None and size > max_size:
+                continue
+            fn = case.setup(size)
+            result = {'name': case.name, 'size': size, 'unit': case.unit}
+            result.update(measure(fn, size, min_time=min_time))
+            del fn
+            results.append(result)
+            if log:
+                log(f"{case.name:<55} {size:>9} {result['latency_s']['p50'] * 1e3:>11.3f} ms"
+                    f" {result['peak_bytes'] / 1024:>11.1f} KiB")
+    return results
+
+
+def compare(results: List[Dict[str, object]], baseline: List[Dict[str, object]],
+            time_tolerance: float = 0.25, memory_tolerance: float = 0.25,
+            memory_slack: int = 64 * 1024) -> List[Dict[str, object]]:
+    """
+    Compara resultados con una línea base y devuelve las regresiones.
+
+    Un caso regresa si su latencia p50 supera la de la línea base en más de
+    ``time_tolerance`` (fracción), o si su pico de memoria la supera en más de
+    ``memory_tolerance`` y además en más de ``memory_slack`` bytes. Los casos
+    ausentes en la línea base no se comparan.
+    """
+    reference = {(r['name'], r['size']): r for r in baseline}
+    regressions = []
+    for result in results:
+        base = reference.get((result['name'], result['size']))
+        if base is None:
+            continue
+        time_ratio = result['latency_s']['p50'] / base['latency_s']['p50'] if base['latency_s']['p50'] else 1.0
+        memory_growth = result['peak_bytes'] - base['peak_bytes']
+        memory_ratio = result['peak_bytes'] / base['peak_bytes'] if base['peak_bytes'] else 1.0
+        slow = time_ratio > 1 + time_tolerance
+        heavy = memory_ratio > 1 + memory_tolerance and memory_growth > memory_slack
+        if slow or heavy:
+            regressions.append({
+                'name': result['name'],
+                'size': result['size'],
+                'time_ratio': time_ratio,
+                'memory_ratio': memory_ratio,
+                'kind': [kind for kind, flag in (('time', slow), ('memory', heavy)) if flag],
+            })
+    return regressions
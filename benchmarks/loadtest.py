@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+
+"""
+Prueba de carga del servicio HTTP local (src/service.py).
+
+Abre ``concurrency`` conexiones persistentes y reparte entre ellas
+``requests`` peticiones. Sin ``url`` arranca el servicio en un subproceso en un
+puerto libre y lo detiene al terminar. Con ``distinct`` cuerpos distintos las
+repeticiones prueban también la caché de respuestas.
+"""
+
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+import numpy as np
+
+_SERVICE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src', 'service.py')
+# Segundos que se espera a que el servicio cierre tras SIGTERM
+STOP_TIMEOUT = 30
+
+
+def make_bodies(distinct: int, days: int, batch: int = 0, seed: int = 0) -> List[bytes]:
+    """
+    Genera cuerpos de petición aleatorios.
+
+    Args:
+        distinct (int): Número de cuerpos distintos
+        days (int): Días de ejercicio por persona
+        batch (int): Personas por petición (0 = /person)
+        seed (int): Semilla
+
+    Returns:
+        List[bytes]: Cuerpos JSON
+    """
+    rng = np.random.default_rng(seed)
+    bodies = []
+    for _ in range(distinct):
+        members = max(batch, 1)
+        data = {
+            'sex': rng.choice(['M', 'F'], members).tolist(),
+            'weight': rng.uniform(50, 110, members).round(1).tolist(),
+            'height': rng.uniform(150, 200, members).round(1).tolist(),
+            'age': rng.integers(18, 80, members).tolist(),
+            'exercise_minutes': rng.integers(0, 120, (members, days)).tolist(),
+        }
+        if not batch:
+            data = {key: value[0] for key, value in data.items()}
+        bodies.append(json.dumps(data).encode('utf-8'))
+    return bodies
+
+
+async def _client(host: str, port: int, path: str, bodies: List[bytes], queue: asyncio.Queue,
+                  latencies: List[float], statuses: Counter) -> None:
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while True:
+            try:
+                i = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            body = bodies[i % len(bodies)]
+            head = (f'POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n'
+                    f'Content-Length: {len(body)}\r\n\r\n').encode('latin-1')
+            start = time.perf_counter()
+            writer.write(head + body)
+            await writer.drain()
+            status = int((await reader.readline()).split()[1])
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                if name.strip().lower() == 'content-length':
+                    length = int(value)
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+            statuses[status] += 1
+    finally:
+        writer.close()
+
+
+async def _run(host: str, port: int, path: str, bodies: List[bytes], requests: int, concurrency: int) -> dict:
+    queue = asyncio.Queue()
+    for i in range(requests):
+        queue.put_nowait(i)
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    start = time.perf_counter()
+    await asyncio.gather(*(_client(host, port, path, bodies, queue, latencies, statuses)
+                           for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    times = np.array(latencies)
+    return {
+        'requests': len(latencies),
+        'seconds': elapsed,
+        'rps': len(latencies) / elapsed,
+        'p50_ms': float(np.percentile(times, 50)) * 1e3,
+        'p90_ms': float(np.percentile(times, 90)) * 1e3,
+        'p99_ms': float(np.percentile(times, 99)) * 1e3,
+        'max_ms': float(times.max()) * 1e3,
+        'status': {str(code): count for code, count in sorted(statuses.items())},
+    }
+
+
+def _stop(process: subprocess.Popen) -> None:
+    """
+    Termina el servicio arrancado por run() y espera a que cierre su pool.
+
+    Raises:
+        RuntimeError: Si no termina limpiamente (se mata tras STOP_TIMEOUT segundos)
+    """
+    process.terminate()
+    try:
+        code = process.wait(timeout=STOP_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+        raise RuntimeError(f'El servicio no terminó en {STOP_TIMEOUT} s tras SIGTERM.')
+    process.stdout.close()
+    if code != 0:
+        raise RuntimeError(f'El servicio terminó con código {code}.')
+
+
+def run(url: Optional[str] = None, requests: int = 1000, concurrency: int = 16, days: int = 365,
+        batch: int = 0, distinct: int = 1000, workers: Optional[int] = None, seed: int = 0) -> Dict[str, object]:
+    """
+    Lanza la prueba de carga y devuelve sus estadísticas.
+
+    Args:
+        url (str, opcional): Servicio ya arrancado (por defecto se arranca uno)
+        requests (int): Peticiones en total
+        concurrency (int): Conexiones simultáneas
+        days (int): Días de ejercicio por persona
+        batch (int): Personas por petición (0 = /person, si no /batch)
+        distinct (int): Cuerpos distintos; el resto son repeticiones
+        workers (int, opcional): Procesos del servicio que se arranca
+        seed (int): Semilla de los cuerpos
+
+    Returns:
+        Dict[str, object]: Peticiones, segundos, peticiones por segundo,
+        latencias p50/p90/p99/máxima en ms y recuento por código HTTP
+    """
+    path = '/batch' if batch else '/person'
+    bodies = make_bodies(min(distinct, requests), days, batch, seed)
+    process = None
+    if url is None:
+        command = [sys.executable, _SERVICE, '--port', '0']
+        if workers:
+            command += ['--workers', str(workers)]
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+        # Primera línea: "Escuchando en http://host:puerto"
+        url = process.stdout.readline().split()[-1]
+    try:
+        parts = urlsplit(url)
+        result = asyncio.run(_run(parts.hostname, parts.port, path, bodies, requests, concurrency))
+    finally:
+        if process is not None:
+            _stop(process)
+    result.update({'path': path, 'concurrency': concurrency, 'days': days, 'distinct': len(bodies)})
+    return result
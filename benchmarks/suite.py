@@ -0,0 +1,350 @@
+# -*- coding: utf-8 -*-
+
+"""
+Casos de benchmark para Person, math_tools y los modelos de metabolic_app.
+
+Los tamaños van de una semana (N=7) a 1e6 días y las cohortes hasta 1e5
+personas. Las implementaciones en Python puro O(N²) y las que construyen una
+estructura por fila se limitan a los tamaños que terminan en segundos.
+"""
+
+import re
+import tempfile
+from dataclasses import replace
+from typing import Dict, List
+import numpy as np
+
+from models.batch import PersonBatch
+from models.person import Person, CompactPerson
+from utils import math_tools
+from utils.cohort_runner import run_cohort
+from utils.live_monitor import SlidingSpectrum
+from utils.population import PopulationSpectrum
+from utils.reports import generate_reports
+from utils.prefilter import filter_minutes
+from utils.session import Session, load_session, save_session
+from utils.sweep import sweep_parameters
+from utils.fourier_html import build_fourier_html, build_log_table_rows, spectrum_rows
+from src import core
+from src.models import fourier, metabolic, statistics
+
+from benchmarks.harness import BenchCase
+
+SERIES_SIZES = [7, 30, 365, 4096, 65536, 1_000_000]
+ROW_SIZES = [s for s in SERIES_SIZES if s <= 65536]  # una estructura Python por día
+QUADRATIC_SIZES = [7, 30, 365, 1024]  # bucles O(N²) en Python puro
+COHORT_SIZES = [10, 1000, 10_000, 100_000]
+COHORT_DAYS = 30
+REPORT_SIZES = [10, 100]  # cada informe dibuja y codifica una figura
+# Casos del núcleo: core.<núcleo>[<motor>] o core.<núcleo>[<motor>,<variante>]
+_CORE_CASE = re.compile(r'^(core\.\w+)\[(\w+)(?:,([^\]]*))?\]$')
+
+
+def _minutes(n: int) -> np.ndarray:
+    return np.random.default_rng(n).uniform(0, 90, n)
+
+
+def _person(n: int) -> Person:
+    return Person('F', 62.0, 165.0, 34, _minutes(n).tolist())
+
+
+def _batch(members: int) -> PersonBatch:
+    rng = np.random.default_rng(members)
+    return PersonBatch(
+        sex=rng.choice(['M', 'F'], members),
+        weight=rng.uniform(50, 100, members),
+        height=rng.uniform(150, 195, members),
+        age=rng.integers(18, 80, members),
+        exercise_minutes=rng.uniform(0, 90, (members, COHORT_DAYS))
+    )
+
+
+def _single_batch(members: int) -> PersonBatch:
+    """La cohorte de _batch con minutos enteros (uint16) y espectro en float32."""
+    batch = _batch(members)
+    return replace(batch, exercise_minutes=np.round(batch.exercise_minutes), precision='single')
+
+
+def _report_inputs(members: int):
+    """Cohorte, carpeta temporal (se borra al liberarse) y resultados con amplitudes."""
+    batch = _batch(members)
+    directory = tempfile.TemporaryDirectory(prefix='bench_reports_')
+    return batch, directory, run_cohort(batch, workers=1, with_amplitudes=True)
+
+
+def _session_inputs(n: int):
+    """Sesión con todas las secciones, carpeta temporal y archivo ya guardado."""
+    person = _person(n)
+    spectrum = math_tools.calculate_fourier_spectrum(person.calculate_daily_expenditure())
+    binned = math_tools.calculate_log_binned_spectrum(spectrum[2, :n // 2])
+    session = Session(person, 1, False, {
+        'expenditure': person.calculate_daily_expenditure(),
+        'spectrum': spectrum,
+        'log_bins': binned,
+        'regression': math_tools.calculate_binned_loglog_fit(binned),
+    })
+    directory = tempfile.TemporaryDirectory(prefix='bench_session_')
+    path = f'{directory.name}/sesion.npz'
+    save_session(path, session)
+    return session, directory, path
+
+
+def _gb(n: int) -> np.ndarray:
+    return _person(n).calculate_daily_expenditure()
+
+
+def _sliding(n: int) -> SlidingSpectrum:
+    spectrum = SlidingSpectrum(n)
+    spectrum.extend(_gb(n))
+    return spectrum
+
+
+def _population_bands(batch: PersonBatch):
+    population = PopulationSpectrum(batch.n_days)
+    population.add_batch(batch)
+    return population.bands()
+
+
+def _fourier_view(n: int):
+    """Partes de update_fourier_table que no dependen de Qt."""
+    person = _person(n)
+    k = 1
+
+    def run():
+        gb = person.calculate_daily_expenditure()
+        spectrum = math_tools.calculate_fourier_spectrum(gb)
+        math_tools.calculate_fourier_table(gb, k)
+        spectrum[:, k - 1].tolist()
+        rows = spectrum_rows(spectrum)
+        build_fourier_html(rows)
+        build_log_table_rows(rows)
+    return run
+
+
+def _fourier_k_change(n: int):
+    """Trabajo de un cambio de K con el espectro ya en caché."""
+    gb = _gb(n)
+    spectrum = math_tools.calculate_fourier_spectrum(gb)
+    k = max(1, n // 3)
+
+    def run():
+        math_tools.calculate_fourier_table(gb, k)
+        spectrum[:, (k - 1) % n].tolist()
+    return run
+
+
+def _log_inputs(n: int):
+    k = list(range(1, n + 1))
+    return k, (np.abs(_gb(n) - 1500.0) + 1.0).tolist()
+
+
+def _regression_inputs(n: int):
+    k, A = _log_inputs(n)
+    return fourier.calculate_log_transformations(k, A)
+
+
+def _sliding_state(n: int):
+    """Ventana llena de n días con sus sumas para añadir un día con sliding_dft_update."""
+    k = np.arange(1, n // 2 + 1)
+    window = _gb(n)
+    spectrum = math_tools.calculate_fourier_spectrum(window, n // 2)
+    return (spectrum[0] + 1j * spectrum[1]) * (n / 2), np.exp(-2j * np.pi * k / n), window
+
+
+def _log_amplitude_block(members: int):
+    """log10(A_k) de un bloque de personas, como en PopulationSpectrum.add."""
+    amplitudes = _batch(members).calculate_fourier_spectrum()[2]
+    return np.log10(np.where(amplitudes > 0, amplitudes, 1.0)), amplitudes > 0
+
+
+def _core_cases(case, bind) -> List[BenchCase]:
+    """
+    Núcleos de src.core con cada motor disponible (el Python puro, solo hasta
+    QUADRATIC_SIZES y cohortes de 1000 personas). ``speedups`` compara sus
+    tiempos con los del motor numpy.
+    """
+    def on(backend, call):
+        def run(data, n):
+            with core.use_backend(backend):
+                return call(data, n)
+        return run
+
+    cases = []
+    for backend in core.available_backends():
+        sizes = QUADRATIC_SIZES if backend == 'python' else SERIES_SIZES
+        members = COHORT_SIZES[:2] if backend == 'python' else COHORT_SIZES
+        cases += [
+            case(f'core.daily_expenditure[{backend}]', sizes,
+                 bind(_minutes, on(backend, lambda m, n: core.daily_expenditure(1650.0, m)))),
+            case(f'core.fourier_spectrum[{backend}]', sizes,
+                 bind(_gb, on(backend, lambda x, n: core.fourier_spectrum(x)))),
+            # Sumas directas (Goertzel con numba)
+            case(f'core.fourier_coefficients[{backend},k=1..5]', sizes,
+                 bind(_gb, on(backend, lambda x, n: core.fourier_coefficients(x, range(1, 6))))),
+            case(f'core.linear_fit[{backend}]', sizes,
+                 bind(_regression_inputs, on(backend, lambda xy, n: core.linear_fit(*xy)))),
+            # Un día nuevo en una ventana llena de n días (K = n/2)
+            case(f'core.sliding_dft_update[{backend}]', sizes,
+                 bind(_sliding_state, on(backend, lambda s, n: core.sliding_dft_update(s[0], s[1], s[2], 0, [1800.0])))),
+            # Mediana y MAD de la ventana de 7 días del filtro de valores atípicos
+            case(f'core.window_median_mad[{backend},window=7]', sizes,
+                 bind(_minutes, on(backend, lambda m, n: core.window_median_mad(m, 7)))),
+            # Acumulados por frecuencia de PopulationSpectrum.add
+            case(f'core.column_moments[{backend}]', members,
+                 bind(_log_amplitude_block, on(backend, lambda b, n: core.column_moments(*b))), unit='members'),
+        ]
+    return cases
+
+
+def speedups(results: List[Dict[str, object]], reference: str = 'numpy') -> List[Dict[str, object]]:
+    """
+    Aceleración de cada motor frente a ``reference`` en los casos core.*.
+
+    Returns:
+        List[dict]: name (núcleo), size, backend y speedup (p50 de la
+        referencia / p50 del motor; > 1 es más rápido)
+    """
+    latency = {}
+    for result in results:
+        match = _CORE_CASE.match(result['name'])
+        if match:
+            kernel, backend, extra = match.groups()
+            name = f'{kernel}[{extra}]' if extra else kernel
+            latency[(name, result['size'], backend)] = result['latency_s']['p50']
+    rows = []
+    for (name, size, backend), p50 in latency.items():
+        base = latency.get((name, size, reference))
+        if backend != reference and base and p50:
+            rows.append({'name': name, 'size': size, 'backend': backend, 'speedup': base / p50})
+    return rows
+
+
+def build_cases() -> List[BenchCase]:
+    """Devuelve la lista completa de casos."""
+    def case(name, sizes, setup, unit='days'):
+        return BenchCase(name=name, sizes=sizes, setup=setup, unit=unit)
+
+    def bind(make_input, call):
+        """Prepara la entrada fuera de la medición y devuelve la llamada."""
+        def setup(n):
+            data = make_input(n)
+            return lambda: call(data, n)
+        return setup
+
+    cases = [
+        # Person (src/models/person.py)
+        case('person.Person.calculate_bmr', [1], bind(_person, lambda p, n: p.calculate_bmr()), unit='calls'),
+        case('person.Person.calculate_activity_factors', SERIES_SIZES,
+             bind(_person, lambda p, n: p.calculate_activity_factors())),
+        case('person.Person.calculate_daily_expenditure', SERIES_SIZES,
+             bind(_person, lambda p, n: p.calculate_daily_expenditure())),
+        case('person.Person.calculate_fourier_coefficients', SERIES_SIZES,
+             bind(_person, lambda p, n: p.calculate_fourier_coefficients(1))),
+        case('person.Person.calculate_fourier_spectrum', SERIES_SIZES,
+             bind(_person, lambda p, n: p.calculate_fourier_spectrum())),
+        case('person.Person.get_daily_data', ROW_SIZES, bind(_person, lambda p, n: p.get_daily_data())),
+        case('person.Person.get_fourier_table', ROW_SIZES, bind(_person, lambda p, n: p.get_fourier_table(1))),
+        case('person.Person.get_statistical_analysis', SERIES_SIZES,
+             bind(_person, lambda p, n: p.get_statistical_analysis())),
+        case('person.CompactPerson.from_person', SERIES_SIZES,
+             bind(_person, lambda p, n: CompactPerson.from_person(p))),
+        # math_tools (src/utils/math_tools.py)
+        case('math_tools.calculate_bmr', [1], bind(lambda n: None, lambda _, n: math_tools.calculate_bmr('M', 70.0, 175.0, 30)),
+             unit='calls'),
+        case('math_tools.calculate_activity_factor', SERIES_SIZES,
+             bind(_minutes, lambda m, n: math_tools.calculate_activity_factor(m))),
+        case('math_tools.calculate_daily_expenditure', SERIES_SIZES,
+             bind(_minutes, lambda m, n: math_tools.calculate_daily_expenditure(1650.0, m))),
+        case('math_tools.calculate_fourier_coefficients', SERIES_SIZES,
+             bind(_gb, lambda x, n: math_tools.calculate_fourier_coefficients(x, 1))),
+        case('math_tools.calculate_fourier_spectrum', SERIES_SIZES,
+             bind(_gb, lambda x, n: math_tools.calculate_fourier_spectrum(x))),
+        case('math_tools.calculate_loglog_fit', SERIES_SIZES,
+             bind(_gb, lambda x, n: math_tools.calculate_loglog_fit(x))),
+        case('math_tools.calculate_loglog_fit[all k]', SERIES_SIZES,
+             bind(_gb, lambda x, n: math_tools.calculate_loglog_fit(x, bins=None))),
+        case('math_tools.calculate_log_binned_spectrum', SERIES_SIZES,
+             bind(_gb, lambda x, n: math_tools.calculate_log_binned_spectrum(x))),
+        case('math_tools.calculate_statistics', SERIES_SIZES,
+             bind(lambda n: (_minutes(n), _gb(n)), lambda xy, n: math_tools.calculate_statistics(*xy))),
+        case('math_tools.calculate_periodicity', SERIES_SIZES,
+             bind(_gb, lambda x, n: math_tools.calculate_periodicity(x))),
+        case('math_tools.calculate_cross_spectrum[segment=28]', SERIES_SIZES,
+             bind(lambda n: (_minutes(n), _gb(n)),
+                  lambda xy, n: math_tools.calculate_cross_spectrum(*xy, segment_length=min(28, n)))),
+        case('math_tools.calculate_cross_spectrum[whole]', SERIES_SIZES,
+             bind(lambda n: (_minutes(n), _gb(n)), lambda xy, n: math_tools.calculate_cross_spectrum(*xy))),
+        # src/utils/live_monitor.py: un día nuevo con la ventana llena
+        case('live_monitor.SlidingSpectrum.append', SERIES_SIZES,
+             bind(_sliding, lambda s, n: s.append(1800.0))),
+        case('math_tools.calculate_fourier_table', ROW_SIZES,
+             bind(_gb, lambda x, n: math_tools.calculate_fourier_table(x, 1))),
+        # Partes de MetabolicApp.update_fourier_table sin Qt
+        case('app.update_fourier_table[no-gui]', ROW_SIZES, _fourier_view),
+        case('app.fourier_k_change[no-gui]', ROW_SIZES, _fourier_k_change),
+        # metabolic_app/src/models/metabolic.py (por día, como en la vista)
+        case('metabolic.calculate_tmb+af+gb', ROW_SIZES,
+             bind(lambda n: _minutes(n).tolist(), lambda m, n: [
+                 metabolic.calculate_gb(metabolic.calculate_tmb('Femenino', 62.0, 165.0, 34),
+                                        metabolic.calculate_af(x)) for x in m])),
+        # metabolic_app/src/models/fourier.py
+        case('fourier.calculate_fourier_coefficients', QUADRATIC_SIZES,
+             bind(lambda n: _gb(n).tolist(), lambda x, n: fourier.calculate_fourier_coefficients(x, n))),
+        case('fourier.calculate_specific_fourier_coefficients', ROW_SIZES,
+             bind(lambda n: _gb(n).tolist(), lambda x, n: fourier.calculate_specific_fourier_coefficients(x, n, min(n, 5)))),
+        case('fourier.calculate_log_transformations', SERIES_SIZES,
+             bind(_log_inputs, lambda kA, n: fourier.calculate_log_transformations(*kA))),
+        # metabolic_app/src/models/statistics.py
+        case('statistics.calculate_mean', SERIES_SIZES,
+             bind(_regression_inputs, lambda xy, n: statistics.calculate_mean(xy[1]))),
+        case('statistics.calculate_std_dev', SERIES_SIZES,
+             bind(_regression_inputs, lambda xy, n: statistics.calculate_std_dev(xy[1], 0.0))),
+        case('statistics.calculate_regression_slope', SERIES_SIZES,
+             bind(_regression_inputs, lambda xy, n: statistics.calculate_regression_slope(xy[0], xy[1], len(xy[0])))),
+        case('statistics.calculate_regression_intercept', SERIES_SIZES,
+             bind(_regression_inputs, lambda xy, n: statistics.calculate_regression_intercept(xy[0], xy[1], -0.5, len(xy[0])))),
+        case('statistics.calculate_correlation_coefficient', SERIES_SIZES,
+             bind(_regression_inputs, lambda xy, n: statistics.calculate_correlation_coefficient(xy[0], xy[1], len(xy[0])))),
+        case('statistics.calculate_theil_sen_slope', ROW_SIZES,
+             bind(_regression_inputs, lambda xy, n: statistics.calculate_theil_sen_slope(xy[0], xy[1]))),
+        case('statistics.calculate_siegel_slope', ROW_SIZES,
+             bind(_regression_inputs, lambda xy, n: statistics.calculate_siegel_slope(xy[0], xy[1]))),
+        # Cohortes (src/models/batch.py, src/utils/cohort_runner.py)
+        case('batch.PersonBatch.calculate_daily_expenditure', COHORT_SIZES,
+             bind(_batch, lambda b, n: b.calculate_daily_expenditure()), unit='members'),
+        case('batch.PersonBatch.calculate_fourier_spectrum', COHORT_SIZES,
+             bind(_batch, lambda b, n: b.calculate_fourier_spectrum()), unit='members'),
+        case('batch.PersonBatch.get_statistical_analysis', COHORT_SIZES,
+             bind(_batch, lambda b, n: b.get_statistical_analysis()), unit='members'),
+        case('batch.PersonBatch.get_periodicity_analysis', COHORT_SIZES,
+             bind(_batch, lambda b, n: b.get_periodicity_analysis()), unit='members'),
+        case('batch.PersonBatch.get_cross_spectrum[across_members]', COHORT_SIZES,
+             bind(_batch, lambda b, n: b.get_cross_spectrum(14, across_members=True)), unit='members'),
+        case('cohort_runner.run_cohort[workers=1]', COHORT_SIZES,
+             bind(_batch, lambda b, n: run_cohort(b, workers=1)), unit='members'),
+        case('cohort_runner.run_cohort[pool]', COHORT_SIZES,
+             bind(_batch, lambda b, n: run_cohort(b)), unit='members'),
+        case('cohort_runner.run_cohort[workers=1,single]', COHORT_SIZES,
+             bind(_single_batch, lambda b, n: run_cohort(b, workers=1)), unit='members'),
+        case('population.PopulationSpectrum.add_batch+bands', COHORT_SIZES,
+             bind(_batch, lambda b, n: _population_bands(b)), unit='members'),
+        case('prefilter.filter_minutes', COHORT_SIZES,
+             bind(_batch, lambda b, n: filter_minutes(b.exercise_minutes)), unit='members'),
+        case('sweep.sweep_parameters[3x10x10]', COHORT_SIZES,
+             bind(_batch, lambda b, n: sweep_parameters(b, np.linspace(1.1, 1.5, 10), np.linspace(0.005, 0.02, 10))),
+             unit='members'),
+    ]
+    # metabolic_app/src/core: el mismo núcleo con cada motor
+    cases += _core_cases(case, bind)
+    cases += [
+        # src/utils/session.py: la carga proyecta los arreglos, [read] los copia a memoria
+        case('session.save_session', SERIES_SIZES, bind(_session_inputs, lambda s, n: save_session(s[2], s[0]))),
+        case('session.load_session', SERIES_SIZES, bind(_session_inputs, lambda s, n: load_session(s[2]))),
+        case('session.load_session[read]', SERIES_SIZES,
+             bind(_session_inputs, lambda s, n: load_session(s[2], mmap=False))),
+        # src/utils/reports.py (los análisis ya calculados no se miden)
+        case('reports.generate_reports[html,workers=1]', REPORT_SIZES,
+             bind(_report_inputs, lambda r, n: generate_reports(r[0], r[1].name, r[2], workers=1)),
+             unit='members'),
+    ]
+    return cases
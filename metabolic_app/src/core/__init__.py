@@ -0,0 +1,41 @@
+"""Calculation core shared by both front-ends.
+
+The metabolic model, the Fourier sums and the regression are written once
+here. ``Person`` and the desktop application's ``math_tools`` call them with
+arrays, and ``MainWindow`` calls them through ``src.models``. Each formula runs
+on the active backend (pure Python reference, NumPy or, if installed, Numba);
+see ``src.core.backends`` for how it is chosen and ``python -m src.core`` for
+a report of the active one.
+"""
+
+from src.core.backends import (
+    KERNELS,
+    Backend,
+    available_backends,
+    backend_report,
+    backend_rows,
+    get_backend,
+    register_backend,
+    requested_backend,
+    set_backend,
+    use_backend,
+)
+from src.core.formulas import (
+    AF_BASE,
+    AF_SLOPE,
+    HARRIS_BENEDICT,
+    SHORT_SEQUENCE,
+    activity_factor,
+    bmr,
+    column_moments,
+    daily_expenditure,
+    fourier_coefficients,
+    fourier_spectrum,
+    is_male,
+    linear_fit,
+    log_transform,
+    mean,
+    sliding_dft_update,
+    std_dev,
+    window_median_mad,
+)
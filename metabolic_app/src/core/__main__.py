@@ -0,0 +1,5 @@
+"""Prints the backend report: ``python -m src.core``."""
+
+from src.core import backend_report
+
+print(backend_report())
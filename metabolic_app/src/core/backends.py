@@ -0,0 +1,223 @@
+"""Registry and runtime selection of the calculation backends.
+
+A backend is a named set of kernels (plain functions with a fixed signature,
+listed in ``KERNELS``). Kernels a backend does not implement are taken from
+its fallback, so an accelerated backend only needs the kernels it speeds up.
+
+The active backend is process-wide. It is chosen from ``METABOLIC_BACKEND``
+(``auto``, ``python``, ``numpy`` or ``numba``) on first use. ``auto`` takes the
+first available backend in ``AUTO_ORDER``, and so does a variable naming a
+backend that cannot be used here (the report says why). ``set_backend``
+changes it at runtime and ``use_backend`` changes it for a block.
+"""
+
+import contextlib
+import importlib
+import os
+import threading
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+# Kernels every complete backend provides (see src.core.formulas for their meaning)
+KERNELS = (
+    'bmr',
+    'activity_factor',
+    'daily_expenditure',
+    'fourier_spectrum',
+    'fourier_sums',
+    'log_transform',
+    'mean',
+    'variance',
+    'linear_fit',
+    'sliding_dft',
+    'window_median_mad',
+    'column_moments',
+)
+
+# Preference of ``auto``: the first available backend is used
+AUTO_ORDER = ('numba', 'numpy', 'python')
+
+# Modules that register the built-in backends when imported
+_BUILTIN_MODULES = ('src.core.reference', 'src.core.vectorized', 'src.core.compiled')
+
+
+class Backend:
+    """A named set of kernels.
+
+    Args:
+        name: Name used to select the backend.
+        description: One line shown in the backend report.
+        kernels: Kernel name -> function.
+        fallback: Backend that supplies the missing kernels.
+        unavailable: Why the backend cannot be used (None if it can).
+    """
+
+    def __init__(self, name: str, description: str, kernels: Dict[str, Callable],
+                 fallback: Optional[str] = None, unavailable: Optional[str] = None):
+        unknown = sorted(set(kernels) - set(KERNELS))
+        if unknown:
+            raise ValueError(f"Unknown kernels for backend '{name}': {', '.join(unknown)}")
+        self.name = name
+        self.description = description
+        self.kernels = dict(kernels)
+        self.fallback = fallback
+        self.unavailable = unavailable
+
+    @property
+    def available(self) -> bool:
+        return self.unavailable is None
+
+    def provider(self, kernel: str) -> 'Backend':
+        """Returns the backend whose implementation of ``kernel`` is used."""
+        backend = self
+        while kernel not in backend.kernels:
+            if backend.fallback is None:
+                raise KeyError(f"Backend '{self.name}' has no kernel '{kernel}'")
+            backend = _registry()[backend.fallback]
+        return backend
+
+    def __getattr__(self, kernel: str) -> Callable:
+        if kernel not in KERNELS:
+            raise AttributeError(kernel)
+        function = self.provider(kernel).kernels[kernel]
+        # Kept as an attribute: later calls skip the walk through the fallbacks
+        self.__dict__[kernel] = function
+        return function
+
+    def _forget_kernels(self) -> None:
+        """Drops the kernels resolved so far (a fallback may have been replaced)."""
+        for kernel in KERNELS:
+            self.__dict__.pop(kernel, None)
+
+    def __repr__(self) -> str:
+        return f'Backend({self.name!r})'
+
+
+_lock = threading.RLock()
+_backends: Dict[str, Backend] = {}
+_loaded = False
+_active: Optional[Backend] = None
+_requested = 'auto'
+# Why the backend named in METABOLIC_BACKEND was not used
+_note = ''
+
+
+def register_backend(backend: Backend) -> None:
+    """Adds a backend to the registry (replacing one with the same name)."""
+    with _lock:
+        _backends[backend.name] = backend
+        for other in _backends.values():
+            other._forget_kernels()
+
+
+def _registry() -> Dict[str, Backend]:
+    global _loaded
+    if not _loaded:
+        with _lock:
+            if not _loaded:
+                for module in _BUILTIN_MODULES:
+                    importlib.import_module(module)
+                _loaded = True
+    return _backends
+
+
+def available_backends() -> List[str]:
+    """Names of the backends that can be selected, in registration order."""
+    return [name for name, backend in _registry().items() if backend.available]
+
+
+def get_backend(name: Optional[str] = None) -> Backend:
+    """Returns the named backend, or the active one if ``name`` is None.
+
+    Raises:
+        ValueError: If the backend is unknown or cannot be used here.
+    """
+    if name is None:
+        if _active is None:
+            _select_from_environment()
+        return _active
+    backends = _registry()
+    if name == 'auto':
+        return next(backends[candidate] for candidate in AUTO_ORDER
+                    if candidate in backends and backends[candidate].available)
+    if name not in backends:
+        raise ValueError(f"Unknown backend '{name}' (choose from auto, {', '.join(backends)})")
+    backend = backends[name]
+    if not backend.available:
+        raise ValueError(f"Backend '{name}' is not available: {backend.unavailable}")
+    return backend
+
+
+def set_backend(name: str) -> Backend:
+    """Makes ``name`` (or ``'auto'``) the active backend for the whole process.
+
+    Returns:
+        The backend now active.
+    """
+    global _active, _requested, _note
+    backend = get_backend(name)
+    with _lock:
+        _active, _requested, _note = backend, name, ''
+    return backend
+
+
+def _select_from_environment() -> None:
+    global _note
+    requested = os.environ.get('METABOLIC_BACKEND', '').strip() or 'auto'
+    try:
+        set_backend(requested)
+    except ValueError as e:
+        set_backend('auto')
+        _note = f'METABOLIC_BACKEND={requested}: {e}'
+
+
+def requested_backend() -> str:
+    """Name the active backend was selected with (``'auto'`` or a backend name)."""
+    get_backend()
+    return _requested
+
+
+@contextlib.contextmanager
+def use_backend(name: str) -> Iterator[Backend]:
+    """Activates a backend inside a ``with`` block and restores the previous one.
+
+    The selection is process-wide, so other threads see it too.
+    """
+    global _active, _requested, _note
+    with _lock:
+        previous = (get_backend(), _requested, _note)
+        backend = set_backend(name)
+    try:
+        yield backend
+    finally:
+        with _lock:
+            _active, _requested, _note = previous
+
+
+def backend_rows() -> Tuple[List[Tuple[str, str, str]], List[Tuple[str, str]]]:
+    """Describes the registered backends and where each kernel comes from.
+
+    Returns:
+        ``(backends, kernels)``: rows ``(name, status, description)`` for every
+        registered backend, and rows ``(kernel, backend)`` for the active one.
+    """
+    active = get_backend()
+    backends = []
+    for name, backend in _registry().items():
+        if not backend.available:
+            backends.append((name, 'unavailable', f'{backend.description} ({backend.unavailable})'))
+        else:
+            backends.append((name, 'active' if name == active.name else 'available', backend.description))
+    return backends, [(kernel, active.provider(kernel).name) for kernel in KERNELS]
+
+
+def backend_report() -> str:
+    """Plain-text report of the active backend, the alternatives and the kernel providers."""
+    backends, kernels = backend_rows()
+    lines = [f'Active backend: {get_backend().name} (requested: {_requested})']
+    if _note:
+        lines.append(_note)
+    lines += ['', 'Backends:']
+    lines += [f'  {name:<8} {status:<12} {description}' for name, status, description in backends]
+    lines += ['', 'Kernels:']
+    lines += [f'  {kernel:<18} {provider}' for kernel, provider in kernels]
+    return '\n'.join(lines)
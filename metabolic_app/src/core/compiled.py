@@ -0,0 +1,229 @@
+"""Numba backend: compiled loops for the kernels that are loops by nature.
+
+Only registered as available when numba can be imported. It compiles the
+kernels NumPy can only evaluate with large temporaries or a Python loop:
+
+- direct Fourier sums, with Goertzel's recurrence in Reinsch's form (no sin or
+  cos per sample, and error O(N·ε) also for k near 0 and N/2);
+- the sliding DFT update, fused over the new samples;
+- the moving-window median and MAD, with an insertion sort per window;
+- the column moments of a population block, in one pass over the rows;
+- the regression.
+
+Every other kernel comes from the NumPy backend. The loops are compiled on
+first use with ``cache=True``, so the machine code is stored next to this
+module (or in ``NUMBA_CACHE_DIR``) and later processes load it instead of
+compiling again. Without numba the loops are plain Python functions, so they
+can still be checked (slowly) against the other backends.
+"""
+
+import math
+
+import numpy as np
+
+from src.core import vectorized
+from src.core.backends import Backend, register_backend
+
+try:
+    from numba import njit
+except ImportError:  # optional dependency
+    njit = None
+
+
+def _jit(function):
+    """Compiles a loop with numba, caching the machine code on disk."""
+    return njit(cache=True)(function) if njit is not None else function
+
+
+def _rows(values: np.ndarray) -> np.ndarray:
+    """Contiguous (rows, N) view or copy of an (..., N) array."""
+    return np.ascontiguousarray(values.reshape(int(np.prod(values.shape[:-1])), values.shape[-1]))
+
+
+@_jit
+def _goertzel_rows(rows, k, origin, out):
+    N = rows.shape[1]
+    for j in range(k.shape[0]):
+        angle = 2 * math.pi * (k[j] % N) / N
+        # Reinsch: the recurrence factor is -4·sin²(w/2) or 4·cos²(w/2), which
+        # keeps the frequency accurate where cos(w) is close to ±1
+        near_zero = math.cos(angle) > 0
+        if near_zero:
+            factor = -4 * math.sin(angle / 2) ** 2
+        else:
+            factor = 4 * math.cos(angle / 2) ** 2
+        turn_cos = math.cos(angle * origin)
+        turn_sin = math.sin(angle * origin)
+        for i in range(rows.shape[0]):
+            u = 0.0
+            du = 0.0
+            if near_zero:
+                for n in range(N - 1, -1, -1):
+                    du += rows[i, n] + factor * u
+                    u += du
+                u_1 = u - du
+            else:
+                for n in range(N - 1, -1, -1):
+                    du = rows[i, n] + factor * u - du
+                    u = du - u
+                u_1 = du - u
+            # Sums over n = 0..N-1, then turned to start at n = origin
+            sum_cos = du - factor / 2 * u_1
+            sum_sin = u_1 * math.sin(angle)
+            out[0, i, j] = (2 / N) * (sum_cos * turn_cos - sum_sin * turn_sin)
+            out[1, i, j] = (2 / N) * (sum_cos * turn_sin + sum_sin * turn_cos)
+
+
+@_jit
+def _sliding_dft_loop(sums, rotation, window, start, values):
+    size = window.shape[0]
+    changes = np.empty(values.shape[0])
+    for i in range(values.shape[0]):
+        changes[i] = values[i] - window[start]
+        window[start] = values[i]
+        start = (start + 1) % size
+    for j in range(sums.shape[0]):
+        total = sums[j]
+        factor = rotation[j]
+        for change in changes:
+            total = total * factor + change
+        sums[j] = total
+    return start
+
+
+@_jit
+def _window_median_mad_rows(rows, window, median, mad):
+    half = window // 2
+    N = rows.shape[1]
+    inside = np.empty(window)
+    spread = np.empty(window)
+    for i in range(rows.shape[0]):
+        for j in range(N):
+            count = 0
+            for n in range(max(0, j - half), min(N, j + half + 1)):
+                value = rows[i, n]
+                if math.isnan(value):
+                    continue
+                p = count
+                while p > 0 and inside[p - 1] > value:
+                    inside[p] = inside[p - 1]
+                    p -= 1
+                inside[p] = value
+                count += 1
+            if count == 0:
+                median[i, j] = math.nan
+                mad[i, j] = math.nan
+                continue
+            center = (inside[(count - 1) // 2] + inside[count // 2]) / 2
+            median[i, j] = center
+            for q in range(count):
+                value = abs(inside[q] - center)
+                p = q
+                while p > 0 and spread[p - 1] > value:
+                    spread[p] = spread[p - 1]
+                    p -= 1
+                spread[p] = value
+            mad[i, j] = (spread[(count - 1) // 2] + spread[count // 2]) / 2
+
+
+@_jit
+def _column_moments_loop(x, valid, n, mean, m2, minimum, maximum):
+    rows, columns = x.shape
+    for r in range(rows):
+        for c in range(columns):
+            if valid[r, c]:
+                value = x[r, c]
+                n[c] += 1
+                mean[c] += value
+                minimum[c] = min(minimum[c], value)
+                maximum[c] = max(maximum[c], value)
+    for c in range(columns):
+        mean[c] = mean[c] / n[c] if n[c] else 0.0
+    for r in range(rows):
+        for c in range(columns):
+            if valid[r, c]:
+                deviation = x[r, c] - mean[c]
+                m2[c] += deviation * deviation
+
+
+@_jit
+def _linear_fit_rows(x, y, valid, alpha, intercept, r):
+    for i in range(y.shape[0]):
+        n = 0
+        sum_x = 0.0
+        sum_y = 0.0
+        for j in range(y.shape[1]):
+            if valid[i, j]:
+                n += 1
+                sum_x += x[i, j]
+                sum_y += y[i, j]
+        mean_x = sum_x / n if n else math.nan
+        mean_y = sum_y / n if n else math.nan
+        sxx = 0.0
+        syy = 0.0
+        sxy = 0.0
+        for j in range(y.shape[1]):
+            if valid[i, j]:
+                dx = x[i, j] - mean_x
+                dy = y[i, j] - mean_y
+                sxx += dx * dx
+                syy += dy * dy
+                sxy += dx * dy
+        alpha[i] = sxy / sxx if n >= 2 and sxx > 0 else math.nan
+        intercept[i] = mean_y - alpha[i] * mean_x
+        r[i] = sxy / (math.sqrt(sxx) * math.sqrt(syy)) if n >= 2 and sxx > 0 and syy > 0 else math.nan
+
+
+def fourier_sums(x, k, origin, out):
+    rows = _rows(x)
+    target = np.empty((2, rows.shape[0], k.size))
+    _goertzel_rows(rows, k, origin, target)
+    out[:2] = target.reshape(out[:2].shape)
+    return vectorized._finish(out)
+
+
+def sliding_dft(sums, rotation, window, start, values):
+    return int(_sliding_dft_loop(sums, rotation, window, start, values))
+
+
+def window_median_mad(x, window, median, mad):
+    rows = _rows(x)
+    median_rows, mad_rows = np.empty(rows.shape), np.empty(rows.shape)
+    _window_median_mad_rows(rows, window, median_rows, mad_rows)
+    median[...] = median_rows.reshape(median.shape)
+    mad[...] = mad_rows.reshape(mad.shape)
+    return median, mad
+
+
+def column_moments(x, valid):
+    columns = x.shape[1]
+    n = np.zeros(columns, dtype=np.int64)
+    mean, m2 = np.zeros(columns), np.zeros(columns)
+    minimum, maximum = np.full(columns, np.inf), np.full(columns, -np.inf)
+    _column_moments_loop(np.ascontiguousarray(x), np.ascontiguousarray(valid), n, mean, m2, minimum, maximum)
+    return n, mean, m2, minimum, maximum
+
+
+def linear_fit(x, y, valid):
+    shape = y.shape[:-1]
+    alpha, intercept, r = np.empty(shape), np.empty(shape), np.empty(shape)
+    _linear_fit_rows(_rows(x), _rows(y), _rows(valid), alpha.reshape(-1), intercept.reshape(-1), r.reshape(-1))
+    if y.ndim == 1:
+        return float(alpha), float(intercept), float(r)
+    return alpha, intercept, r
+
+
+register_backend(Backend(
+    'numba',
+    'Numba-compiled loops (cached on disk) for direct sums, sliding DFT, window medians, '
+    'moments and regression; NumPy for the rest',
+    {
+        'fourier_sums': fourier_sums,
+        'sliding_dft': sliding_dft,
+        'window_median_mad': window_median_mad,
+        'column_moments': column_moments,
+        'linear_fit': linear_fit,
+    },
+    fallback='numpy',
+    unavailable=None if njit is not None else 'numba is not installed',
+))
@@ -0,0 +1,301 @@
+"""Formulas shared by both front-ends, dispatched to the active backend.
+
+Every function prepares its inputs (float64 arrays, output buffers, empty
+series) and calls the kernel of the same name in the active backend, so all
+backends see the same arguments and return the same shapes. The spectrum can
+also be computed in float32 (see ``fourier_spectrum``); sums, means and fits
+always run in float64.
+
+Fourier sums use an explicit phase origin. With ``origin=1`` the samples are
+n = 1..N, the convention of the desktop application and of
+``calculate_specific_fourier_coefficients``. With ``origin=0`` they are
+n = 0..N-1, the convention of ``calculate_fourier_coefficients``. Both give the
+same A_k; a_k and b_k differ by a rotation of 2πk/N.
+"""
+
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from src.core.backends import get_backend
+
+ArrayLike = Union[Sequence[float], np.ndarray]
+
+# Harris-Benedict coefficients (Roza and Shizgal, 1984): (base, weight, height, age) by sex
+HARRIS_BENEDICT = {
+    'M': (88.362, 13.397, 4.799, 5.677),
+    'F': (447.593, 9.247, 3.098, 4.333),
+}
+# Activity factor: AF = AF_BASE + AF_SLOPE * minutes
+AF_BASE = 1.2
+AF_SLOPE = 0.01
+
+# Sex labels read as male; any other label is female
+_MALE_LABELS = ('M', 'MASCULINO')
+
+# Python lists up to this length are cheaper to reduce in plain Python than to
+# convert to arrays and hand to a backend (src.models uses it for list inputs)
+SHORT_SEQUENCE = 128
+
+
+def is_male(sex):
+    """Reads 'M'/'Masculino' (any case) as male and anything else as female.
+
+    Args:
+        sex: One label or an array of labels.
+
+    Returns:
+        A bool, or a bool array with the shape of ``sex``.
+    """
+    if isinstance(sex, str):
+        return sex.strip().upper() in _MALE_LABELS
+    return np.isin(np.char.upper(np.char.strip(np.asarray(sex, dtype=str))), _MALE_LABELS)
+
+
+def bmr(sex, weight, height, age, coefficients: Dict[str, Tuple[float, float, float, float]] = HARRIS_BENEDICT):
+    """Basal metabolic rate: base + a·weight + b·height - c·age.
+
+    Args:
+        sex: 'M'/'F' or 'Masculino'/'Femenino', or an array of them.
+        weight: Weight in kg (scalar or array).
+        height: Height in cm (scalar or array).
+        age: Age in years (scalar or array).
+        coefficients: (base, weight, height, age) coefficients by sex.
+
+    Returns:
+        The BMR in kcal/day: a float for one person, an array for arrays.
+    """
+    if isinstance(sex, str):
+        # One person: the same arithmetic on every backend, without the dispatch
+        base, c_weight, c_height, c_age = coefficients['M' if sex.strip().upper() in _MALE_LABELS else 'F']
+        return base + (c_weight * weight) + (c_height * height) - (c_age * age)
+    male = is_male(sex)
+    return get_backend().bmr(male, np.asarray(weight, dtype=np.float64), np.asarray(height, dtype=np.float64),
+                             np.asarray(age, dtype=np.float64), coefficients)
+
+
+def activity_factor(minutes, out: Optional[np.ndarray] = None, base: float = AF_BASE, slope: float = AF_SLOPE):
+    """Physical activity factor of each day: base + slope·minutes.
+
+    Args:
+        minutes: Exercise minutes of one day or a series.
+        out: Buffer for the result of a series.
+        base: AF without exercise.
+        slope: AF increase per minute of exercise.
+
+    Returns:
+        A float for one day, otherwise an array.
+    """
+    if out is None and np.isscalar(minutes):
+        return base + slope * minutes
+    values = np.asarray(minutes, dtype=np.float64)
+    if out is None:
+        out = np.empty(values.shape)
+    return get_backend().activity_factor(values, base, slope, out)
+
+
+def daily_expenditure(bmr_value, minutes: ArrayLike, out: Optional[np.ndarray] = None,
+                      base: float = AF_BASE, slope: float = AF_SLOPE) -> np.ndarray:
+    """Gross daily expenditure GB = BMR·AF of every day.
+
+    Args:
+        bmr_value: BMR in kcal/day, or one per row of a (members, days) matrix.
+        minutes: Exercise minutes per day (a series or one series per row).
+        out: Buffer for the result.
+        base: AF without exercise.
+        slope: AF increase per minute of exercise.
+
+    Returns:
+        GB per day, with the shape of ``minutes``.
+    """
+    values = np.asarray(minutes, dtype=np.float64)
+    if out is None:
+        out = np.empty(values.shape)
+    return get_backend().daily_expenditure(np.asarray(bmr_value, dtype=np.float64), values, base, slope, out)
+
+
+def _frequencies(x: np.ndarray, k, out: Optional[np.ndarray],
+                 dtype=np.float64) -> Tuple[np.ndarray, np.ndarray]:
+    k = np.atleast_1d(np.asarray(k, dtype=np.int64))
+    shape = (4,) + x.shape[:-1] + (k.size,)
+    if out is None:
+        out = np.empty(shape, dtype=dtype)
+    elif out.shape != shape:
+        raise ValueError(f'out must have shape {shape}, not {out.shape}')
+    return k, out
+
+
+def fourier_spectrum(x: ArrayLike, k_max: Optional[int] = None, out: Optional[np.ndarray] = None,
+                     k_min: int = 1, origin: int = 1, dtype=None) -> np.ndarray:
+    """Fourier coefficients for k = k_min..k_max at once.
+
+    a_k = (2/N)·Σ x_n·cos(2πkn/N) and b_k = (2/N)·Σ x_n·sin(2πkn/N), with n
+    starting at ``origin``. A (members, days) matrix gives one spectrum per
+    row.
+
+    With ``dtype=np.float32`` the mean of each series is removed in float64,
+    the deviations go through the kernel in float32 and the mean comes back
+    in float64 at the k that are multiples of N (the only ones it reaches).
+    The rounding is then relative to the deviations, not to the level of the
+    series: about N·ε₃₂ at worst, and far less with the FFT (see
+    ``benchmarks/accuracy.py``).
+
+    Args:
+        x: Series (or one series per row).
+        k_max: Last frequency (defaults to N).
+        out: Buffer of shape (4, ..., K) to reuse.
+        k_min: First frequency.
+        origin: Index of the first sample (1 or 0).
+        dtype: np.float64 or np.float32 (defaults to that of ``out``, or float64).
+
+    Returns:
+        Array (4, ..., K) with a_k, b_k, A_k and log10(A_k) (0 where A_k = 0).
+    """
+    values = np.asarray(x, dtype=np.float64)
+    N = values.shape[-1]
+    dtype = np.dtype(dtype or (np.float64 if out is None else out.dtype))
+    if dtype not in (np.float64, np.float32):
+        raise ValueError(f'dtype must be float64 or float32, not {dtype}')
+    k, out = _frequencies(values, np.arange(k_min, (N if k_max is None else k_max) + 1), out, dtype)
+    if N == 0:
+        out.fill(0.0)
+        return out
+    if dtype == np.float64:
+        return get_backend().fourier_spectrum(values, k, origin, out)
+    level = values.mean(axis=-1, keepdims=True)
+    get_backend().fourier_spectrum((values - level).astype(np.float32), k, origin, out)
+    constant = k % N == 0
+    if constant.any():
+        # e^{2πi·k·n/N} = 1 for these k: the mean adds 2·mean to a_k and nothing to b_k
+        a_k = out[0][..., constant] + 2 * level
+        b_k = out[1][..., constant]
+        out[0][..., constant] = a_k
+        out[2][..., constant] = np.hypot(a_k, b_k)
+        out[3][..., constant] = np.log10(np.where(out[2][..., constant] > 0, out[2][..., constant], 1.0))
+    return out
+
+
+def fourier_coefficients(x: ArrayLike, k, origin: int = 1, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Fourier coefficients at a few frequencies by direct summation (O(N) per k).
+
+    Args:
+        x: Series (or one series per row).
+        k: One frequency or a list of them.
+        origin: Index of the first sample (1 or 0).
+        out: Buffer of shape (4, ..., K) to reuse.
+
+    Returns:
+        Array (4, ..., K) with a_k, b_k, A_k and log10(A_k), like fourier_spectrum.
+    """
+    values = np.asarray(x, dtype=np.float64)
+    k, out = _frequencies(values, k, out)
+    if values.shape[-1] == 0:
+        out.fill(0.0)
+        return out
+    return get_backend().fourier_sums(values, k, origin, out)
+
+
+def log_transform(k: ArrayLike, amplitudes: ArrayLike) -> Tuple[np.ndarray, np.ndarray]:
+    """log10(k) and log10(A_k) of the points with k > 0 and A_k > 0.
+
+    Returns:
+        Two arrays with the points kept, in order.
+    """
+    return get_backend().log_transform(np.asarray(k, dtype=np.float64), np.asarray(amplitudes, dtype=np.float64))
+
+
+def mean(x: ArrayLike) -> float:
+    """Arithmetic mean of a non-empty series."""
+    return get_backend().mean(np.asarray(x, dtype=np.float64))
+
+
+def std_dev(x: ArrayLike, mean_value: Optional[float] = None) -> float:
+    """Population standard deviation of a non-empty series.
+
+    Args:
+        x: Series.
+        mean_value: Its mean, if already known.
+    """
+    values = np.asarray(x, dtype=np.float64)
+    if mean_value is None:
+        mean_value = get_backend().mean(values)
+    return float(np.sqrt(get_backend().variance(values, mean_value)))
+
+
+def linear_fit(x: ArrayLike, y: ArrayLike, valid: Optional[ArrayLike] = None):
+    """Least-squares line y = alpha·x + C and Pearson's r.
+
+    Args:
+        x: Abscissas (a series, or one per row).
+        y: Ordinates with the shape of ``x``.
+        valid: Points to use in each row (all if None).
+
+    Returns:
+        ``(alpha, C, r)``: floats for a series, arrays for rows. They are nan
+        with fewer than two points or constant x (r also with constant y).
+    """
+    y = np.asarray(y, dtype=np.float64)
+    x = np.broadcast_to(np.asarray(x, dtype=np.float64), y.shape)
+    valid = np.ones(y.shape, dtype=bool) if valid is None else np.broadcast_to(np.asarray(valid, dtype=bool), y.shape)
+    return get_backend().linear_fit(x, y, valid)
+
+
+def sliding_dft_update(sums: np.ndarray, rotation: np.ndarray, window: np.ndarray, start: int,
+                       values: ArrayLike) -> int:
+    """Slides a circular window forward and updates its Fourier sums in place.
+
+    Each new sample replaces the oldest one, and every sum becomes
+    S_k·rotation_k + (x_new - x_old), so a sample costs O(K) without a new FFT.
+
+    Args:
+        sums: Complex sums S_k of the window (K,), updated in place.
+        rotation: e^{-2πik/N} for each k (K,).
+        window: Circular buffer with the N samples, updated in place.
+        start: Position of the oldest sample in ``window``.
+        values: New samples, oldest first.
+
+    Returns:
+        The position of the oldest sample after the update.
+    """
+    values = np.asarray(values, dtype=np.float64).ravel()
+    return get_backend().sliding_dft(sums, rotation, window, int(start), values)
+
+
+def window_median_mad(x: ArrayLike, window: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Median and median absolute deviation of a centred moving window.
+
+    The window of day n spans n - window//2..n + window//2 and is cut at the
+    ends of the series. nan values are ignored (nan if the whole window is).
+
+    Args:
+        x: Series (or one series per row).
+        window: Odd window length in samples.
+
+    Returns:
+        ``(median, mad)``, both with the shape of ``x``.
+    """
+    values = np.asarray(x, dtype=np.float64)
+    median, mad = np.empty(values.shape), np.empty(values.shape)
+    if values.size:
+        get_backend().window_median_mad(values, int(window), median, mad)
+    return median, mad
+
+
+def column_moments(x: ArrayLike, valid: Optional[ArrayLike] = None):
+    """Count, mean, centred sum of squares, minimum and maximum of each column.
+
+    These are the running accumulators of a population: blocks of rows are
+    reduced here and then merged.
+
+    Args:
+        x: Matrix (rows, K).
+        valid: Entries to use (all if None).
+
+    Returns:
+        ``(n, mean, m2, minimum, maximum)``, one value per column. Columns
+        without valid entries have mean 0, m2 0, minimum inf and maximum -inf.
+    """
+    values = np.atleast_2d(np.asarray(x, dtype=np.float64))
+    valid = (np.ones(values.shape, dtype=bool) if valid is None
+             else np.broadcast_to(np.atleast_2d(np.asarray(valid, dtype=bool)), values.shape))
+    return get_backend().column_moments(values, valid)
@@ -0,0 +1,190 @@
+"""Reference backend: the formulas written as plain Python loops.
+
+It follows the definitions term by term (O(N) per Fourier coefficient, raw
+sums for the regression slope) and is the baseline the other backends are
+checked against. Arrays are converted to Python floats and the results are
+written back into the output arrays prepared by ``src.core.formulas``.
+"""
+
+import math
+
+import numpy as np
+
+from src.core.backends import Backend, register_backend
+
+
+def _rows(values: np.ndarray) -> np.ndarray:
+    """Views an (..., N) array as (rows, N)."""
+    if not values.ndim:
+        return values.reshape(1, 1)
+    return values.reshape(int(np.prod(values.shape[:-1])), values.shape[-1])
+
+
+def bmr(male, weight, height, age, coefficients):
+    if isinstance(male, bool):
+        base, c_weight, c_height, c_age = coefficients['M' if male else 'F']
+        return base + (c_weight * weight) + (c_height * height) - (c_age * age)
+    male, weight, height, age = np.broadcast_arrays(male, weight, height, age)
+    result = []
+    for is_male, w, h, a in zip(male.ravel().tolist(), weight.ravel().tolist(),
+                                height.ravel().tolist(), age.ravel().tolist()):
+        base, c_weight, c_height, c_age = coefficients['M' if is_male else 'F']
+        result.append(base + (c_weight * w) + (c_height * h) - (c_age * a))
+    return np.array(result).reshape(male.shape)
+
+
+def activity_factor(minutes, base, slope, out):
+    out.reshape(-1)[:] = [base + slope * m for m in minutes.ravel().tolist()]
+    return out
+
+
+def daily_expenditure(bmr_value, minutes, base, slope, out):
+    rows = _rows(minutes)
+    bmr_rows = np.broadcast_to(bmr_value, minutes.shape[:-1]).reshape(-1).tolist()
+    target = out.reshape(rows.shape)
+    for i, (row, tmb) in enumerate(zip(rows.tolist(), bmr_rows)):
+        target[i] = [tmb * (base + slope * m) for m in row]
+    return out
+
+
+def fourier_spectrum(x, k, origin, out):
+    rows = _rows(x)
+    N = rows.shape[1]
+    target = out.reshape(4, rows.shape[0], k.size)
+    for i, data in enumerate(rows.tolist()):
+        for j, frequency in enumerate(k.tolist()):
+            sum_ak = 0.0
+            sum_bk = 0.0
+            for n in range(N):
+                angle = 2 * math.pi * frequency * (n + origin) / N
+                sum_ak += data[n] * math.cos(angle)
+                sum_bk += data[n] * math.sin(angle)
+            ak = (2 / N) * sum_ak
+            bk = (2 / N) * sum_bk
+            Ak = math.sqrt(ak ** 2 + bk ** 2)
+            target[:, i, j] = (ak, bk, Ak, math.log10(Ak) if Ak > 0 else 0.0)
+    return out
+
+
+def log_transform(k, amplitudes):
+    log10_k = []
+    log10_A_k = []
+    for k_value, A_k in zip(k.tolist(), amplitudes.tolist()):
+        # Skip k <= 0 and A_k <= 0
+        if k_value <= 0 or A_k <= 0:
+            continue
+        log10_k.append(math.log10(k_value))
+        log10_A_k.append(math.log10(A_k))
+    return np.array(log10_k), np.array(log10_A_k)
+
+
+def mean(x):
+    data = x.tolist()
+    return sum(data) / len(data)
+
+
+def variance(x, mean_value):
+    return sum([(value - mean_value) ** 2 for value in x.tolist()]) / x.size
+
+
+def _fit(x_values, y_values):
+    """Slope from raw sums and r from centred sums, as written in the README."""
+    N = len(x_values)
+    if N < 2:
+        return math.nan, math.nan, math.nan
+    sum_x = sum(x_values)
+    sum_y = sum(y_values)
+    sum_xy = sum([x * y for x, y in zip(x_values, y_values)])
+    sum_x_squared = sum([x * x for x in x_values])
+    # Products instead of ** 2: huge sums give inf (and a nan slope), not OverflowError
+    denominator = N * sum_x_squared - sum_x * sum_x
+    alpha = (N * sum_xy - sum_x * sum_y) / denominator if denominator != 0 and math.isfinite(denominator) else math.nan
+    x_mean = sum_x / N
+    y_mean = sum_y / N
+    intercept = y_mean - alpha * x_mean
+    x_std_sum = sum((x - x_mean) ** 2 for x in x_values)
+    y_std_sum = sum((y - y_mean) ** 2 for y in y_values)
+    if x_std_sum == 0 or y_std_sum == 0:
+        return alpha, intercept, math.nan
+    covariance = sum((x - x_mean) * (y - y_mean) for x, y in zip(x_values, y_values)) / N
+    return alpha, intercept, covariance / (math.sqrt(x_std_sum / N) * math.sqrt(y_std_sum / N))
+
+
+def linear_fit(x, y, valid):
+    fits = [_fit([value for value, keep in zip(x_row, mask) if keep],
+                 [value for value, keep in zip(y_row, mask) if keep])
+            for x_row, y_row, mask in zip(_rows(x).tolist(), _rows(y).tolist(), _rows(valid).tolist())]
+    if y.ndim <= 1:
+        return fits[0]
+    if not fits:
+        return tuple(np.empty(y.shape[:-1]) for _ in range(3))
+    alpha, intercept, r = (np.array(values).reshape(y.shape[:-1]) for values in zip(*fits))
+    return alpha, intercept, r
+
+
+def sliding_dft(sums, rotation, window, start, values):
+    state = sums.tolist()
+    factors = rotation.tolist()
+    for value in values.tolist():
+        change = value - float(window[start])
+        window[start] = value
+        start = (start + 1) % window.size
+        state = [total * factor + change for total, factor in zip(state, factors)]
+    sums[:] = state
+    return start
+
+
+def _median(values):
+    """Median of a list (nan if empty)."""
+    ordered = sorted(values)
+    count = len(ordered)
+    if not count:
+        return math.nan
+    return (ordered[(count - 1) // 2] + ordered[count // 2]) / 2
+
+
+def window_median_mad(x, window, median, mad):
+    half = window // 2
+    median_rows, mad_rows = median.reshape(_rows(x).shape), mad.reshape(_rows(x).shape)
+    for i, row in enumerate(_rows(x).tolist()):
+        for j in range(len(row)):
+            inside = [value for value in row[max(0, j - half):j + half + 1] if not math.isnan(value)]
+            center = _median(inside)
+            median_rows[i, j] = center
+            mad_rows[i, j] = _median([abs(value - center) for value in inside])
+    return median, mad
+
+
+def column_moments(x, valid):
+    n, means, m2, minimum, maximum = [], [], [], [], []
+    for column, keep in zip(x.T.tolist(), valid.T.tolist()):
+        kept = [value for value, use in zip(column, keep) if use]
+        center = sum(kept) / len(kept) if kept else 0.0
+        n.append(len(kept))
+        means.append(center)
+        m2.append(sum([(value - center) ** 2 for value in kept]))
+        minimum.append(min(kept, default=math.inf))
+        maximum.append(max(kept, default=-math.inf))
+    return (np.array(n, dtype=np.int64), np.array(means), np.array(m2),
+            np.array(minimum), np.array(maximum))
+
+
+register_backend(Backend(
+    'python',
+    'Pure Python loops (reference; O(N) per Fourier coefficient)',
+    {
+        'bmr': bmr,
+        'activity_factor': activity_factor,
+        'daily_expenditure': daily_expenditure,
+        'fourier_spectrum': fourier_spectrum,
+        # The definition is already a direct sum
+        'fourier_sums': fourier_spectrum,
+        'log_transform': log_transform,
+        'mean': mean,
+        'variance': variance,
+        'linear_fit': linear_fit,
+        'sliding_dft': sliding_dft,
+        'window_median_mad': window_median_mad,
+        'column_moments': column_moments,
+    },
+))
@@ -0,0 +1,159 @@
+"""NumPy backend: whole-array operations and the FFT.
+
+The spectrum comes from one FFT per series (O(N log N) for every k at once)
+and the regression uses centred sums, which avoid the cancellation of
+N·Σx² - (Σx)² when the points are nearly constant. Every kernel accepts a
+matrix with one series per row.
+"""
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from src.core.backends import Backend, register_backend
+
+
+def bmr(male, weight, height, age, coefficients):
+    if isinstance(male, bool):
+        base, c_weight, c_height, c_age = coefficients['M' if male else 'F']
+        return base + (c_weight * weight) + (c_height * height) - (c_age * age)
+    coeffs = np.array([coefficients['F'], coefficients['M']])[np.asarray(male).astype(np.intp)]
+    return coeffs[..., 0] + (coeffs[..., 1] * weight) + (coeffs[..., 2] * height) - (coeffs[..., 3] * age)
+
+
+def activity_factor(minutes, base, slope, out):
+    np.multiply(minutes, slope, out=out)
+    out += base
+    return out
+
+
+def daily_expenditure(bmr_value, minutes, base, slope, out):
+    activity_factor(minutes, base, slope, out)
+    out *= bmr_value[..., np.newaxis]
+    return out
+
+
+def _finish(out: np.ndarray) -> np.ndarray:
+    """Fills A_k and log10(A_k) from a_k and b_k."""
+    np.hypot(out[0], out[1], out=out[2])
+    out[3].fill(0.0)
+    np.log10(out[2], out=out[3], where=out[2] > 0)
+    return out
+
+
+def fourier_spectrum(x, k, origin, out):
+    N = x.shape[-1]
+    # sum_{n=origin}^{N-1+origin} x_n e^{i 2 pi k n / N} = e^{i 2 pi k origin / N} * conj(X[k mod N])
+    terms = np.conj(np.fft.fft(x, axis=-1)[..., k % N])
+    if origin:
+        terms *= np.exp(2j * np.pi * (k * origin) / N)
+    np.multiply(terms.real, 2 / N, out=out[0])
+    np.multiply(terms.imag, 2 / N, out=out[1])
+    return _finish(out)
+
+
+def fourier_sums(x, k, origin, out):
+    N = x.shape[-1]
+    n = np.arange(origin, N + origin)
+    for j, frequency in enumerate(k.tolist()):
+        angle = 2 * np.pi * frequency * n / N
+        out[0, ..., j] = (2 / N) * np.sum(x * np.cos(angle), axis=-1)
+        out[1, ..., j] = (2 / N) * np.sum(x * np.sin(angle), axis=-1)
+    return _finish(out)
+
+
+def log_transform(k, amplitudes):
+    keep = (k > 0) & (amplitudes > 0)
+    return np.log10(k[keep]), np.log10(amplitudes[keep])
+
+
+def mean(x):
+    return float(np.mean(x))
+
+
+def variance(x, mean_value):
+    deviation = x - mean_value
+    return float(np.dot(deviation, deviation)) / x.size
+
+
+def linear_fit(x, y, valid):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        y = np.where(valid, y, 0.0)
+        n = valid.sum(axis=-1)
+        xv = np.where(valid, x, 0.0)
+        mean_x = xv.sum(axis=-1) / n
+        mean_y = y.sum(axis=-1) / n
+        dx = np.subtract(xv, mean_x[..., np.newaxis], out=xv)
+        dy = np.subtract(y, mean_y[..., np.newaxis], out=y)
+        dx *= valid
+        dy *= valid
+        sxx = np.einsum('...i,...i->...', dx, dx)
+        syy = np.einsum('...i,...i->...', dy, dy)
+        sxy = np.einsum('...i,...i->...', dx, dy)
+        alpha = np.where((n >= 2) & (sxx > 0), sxy / sxx, np.nan)
+        intercept = mean_y - alpha * mean_x
+        r = np.where((n >= 2) & (sxx > 0) & (syy > 0), sxy / (np.sqrt(sxx) * np.sqrt(syy)), np.nan)
+    if y.ndim == 1:
+        return float(alpha), float(intercept), float(r)
+    return alpha, intercept, r
+
+
+def sliding_dft(sums, rotation, window, start, values):
+    # One pass over all K sums per sample: the loop over samples stays in Python
+    for value in values.tolist():
+        old = window[start]
+        window[start] = value
+        start = (start + 1) % window.size
+        sums *= rotation
+        sums += value - old
+    return start
+
+
+def _median(windows: np.ndarray) -> np.ndarray:
+    """Median of the last axis ignoring nan (nan if the whole window is nan)."""
+    ordered = np.sort(windows, axis=-1)  # nan sorts last
+    count = (~np.isnan(windows)).sum(axis=-1)
+    low = np.take_along_axis(ordered, np.maximum(count - 1, 0)[..., np.newaxis] // 2, axis=-1)[..., 0]
+    high = np.take_along_axis(ordered, (count // 2)[..., np.newaxis], axis=-1)[..., 0]
+    return np.where(count > 0, (low + high) / 2, np.nan)
+
+
+def window_median_mad(x, window, median, mad):
+    half = window // 2
+    padded = np.pad(x, [(0, 0)] * (x.ndim - 1) + [(half, half)], constant_values=np.nan)
+    # (..., N, window) view: the sorts below copy it once per statistic
+    windows = sliding_window_view(padded, window, axis=-1)
+    median[...] = _median(windows)
+    with np.errstate(invalid='ignore'):
+        mad[...] = _median(np.abs(windows - median[..., np.newaxis]))
+    return median, mad
+
+
+def column_moments(x, valid):
+    n = valid.sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.where(valid, x, 0.0).sum(axis=0) / n
+        m2 = np.where(valid, (x - mean) ** 2, 0.0).sum(axis=0)
+    return (n, np.nan_to_num(mean), m2,
+            np.where(valid, x, np.inf).min(axis=0, initial=np.inf),
+            np.where(valid, x, -np.inf).max(axis=0, initial=-np.inf))
+
+
+register_backend(Backend(
+    'numpy',
+    'NumPy arrays and FFT (O(N log N) spectrum)',
+    {
+        'bmr': bmr,
+        'activity_factor': activity_factor,
+        'daily_expenditure': daily_expenditure,
+        'fourier_spectrum': fourier_spectrum,
+        'fourier_sums': fourier_sums,
+        'log_transform': log_transform,
+        'mean': mean,
+        'variance': variance,
+        'linear_fit': linear_fit,
+        'sliding_dft': sliding_dft,
+        'window_median_mad': window_median_mad,
+        'column_moments': column_moments,
+    },
+    fallback='python',
+))
@@ -1,5 +1,6 @@
 import math
 import numpy as np
+from src.core import SHORT_SEQUENCE, fourier_spectrum, log_transform
 
 def calculate_angular_frequency(k: int, n: int, N: int) -> float:
     """
@@ -15,6 +16,13 @@ def calculate_angular_frequency(k: int, n: int, N: int) -> float:
     """
     return 2 * math.pi * k * n / N
 
+def _first_samples(data: list[float], N: int) -> np.ndarray:
+    """Returns the first N samples as float64, refusing a series shorter than N."""
+    series = np.asarray(data, dtype=np.float64)
+    if len(series) < N:
+        raise ValueError(f"Invalid input: data has {len(series)} points, N is {N}")
+    return series[:N]
+
 def calculate_fourier_coefficients(data: list[float], N: int) -> tuple[list[float], list[float], list[float]]:
     """
     Calcula los coeficientes de Fourier para una serie de datos.
@@ -28,28 +36,13 @@ def calculate_fourier_coefficients(data: list[float], N: int) -> tuple[list[floa
             - a_k: Coeficientes coseno
             - b_k: Coeficientes seno
             - A_k: Amplitudes
+
+    Raises:
+        ValueError: Si data tiene menos de N puntos
     """
-    a_k = []
-    b_k = []
-    A_k = []
-    
-    # Para cada k desde 0 hasta N//2
-    for k in range(N // 2 + 1):
-        sum_ak = 0.0
-        sum_bk = 0.0
-        
-        # Calcular sumas para a_k y b_k
-        for n in range(N):
-            f = calculate_angular_frequency(k, n, N)
-            sum_ak += data[n] * math.cos(f)
-            sum_bk += data[n] * math.sin(f)
-        
-        # Calcular coeficientes finales
-        a_k.append((2.0 / N) * sum_ak)
-        b_k.append((2.0 / N) * sum_bk)
-        A_k.append(math.sqrt(a_k[-1]**2 + b_k[-1]**2))
-    
-    return a_k, b_k, A_k
+    # k = 0..N//2 with the samples numbered from n = 0
+    a_k, b_k, A_k, _ = fourier_spectrum(_first_samples(data, N), N // 2, k_min=0, origin=0)
+    return a_k.tolist(), b_k.tolist(), A_k.tolist()
 
 def calculate_specific_fourier_coefficients(data: list[float], N: int, max_k: int) -> tuple[list[int], list[float], list[float], list[float]]:
     """Calculates Fourier coefficients (a_k, b_k, A_k) for k from 1 up to max_k.
@@ -61,32 +54,31 @@ def calculate_specific_fourier_coefficients(data: list[float], N: int, max_k: in
 
     Returns:
         A tuple containing four lists: k values, a_k coefficients, b_k coefficients, and A_k coefficients.
+        They are computed by src.core.fourier_spectrum on the active backend.
+
+    Raises:
+        ValueError: If data has fewer than N points.
     """
-    k_values = []
-    a_k_values = []
-    b_k_values = []
-    A_k_values = []
+    # Samples numbered from n = 1, as in the README formula
+    a_k, b_k, A_k, _ = fourier_spectrum(_first_samples(data, N), max_k)
+    return list(range(1, max_k + 1)), a_k.tolist(), b_k.tolist(), A_k.tolist()
 
-    # Calculate coefficients for k from 1 up to max_k
-    for k in range(1, max_k + 1):
-        sum_ak = 0.0
-        sum_bk = 0.0
-        for n in range(N):
-            # Use 0-indexed n for data access, (n+1) for angle calculation to match README formula sum from 1 to N
-            angle = 2 * math.pi * k * (n + 1) / N
-            sum_ak += data[n] * math.cos(angle)
-            sum_bk += data[n] * math.sin(angle)
+def calculate_amplitude_spectrum(data: list[float], max_k: int = None) -> np.ndarray:
+    """Calculates the amplitudes A_k for k from 1 up to max_k.
 
-        ak = (2 / N) * sum_ak
-        bk = (2 / N) * sum_bk
-        Ak = math.sqrt(ak**2 + bk**2)
+    Gives the same A_k as calculate_specific_fourier_coefficients (the phase of
+    the sum does not change its magnitude). With the NumPy backend it takes
+    O(N log N), so the whole spectrum of a long series can be plotted.
 
-        k_values.append(k)
-        a_k_values.append(ak)
-        b_k_values.append(bk)
-        A_k_values.append(Ak)
+    Args:
+        data: A list (or array) of numerical data points.
+        max_k: The maximum frequency index k (defaults to N // 2).
 
-    return k_values, a_k_values, b_k_values, A_k_values
+    Returns:
+        An array with A_k for k = 1..max_k.
+    """
+    values = np.asarray(data, dtype=np.float64)
+    return fourier_spectrum(values, values.shape[0] // 2 if max_k is None else max_k)[2]
 
 def calculate_log_transformations(k_values: list[int], A_k_values: list[float]) -> tuple[list[float], list[float]]:
     """
@@ -101,14 +93,15 @@ def calculate_log_transformations(k_values: list[int], A_k_values: list[float])
             - log10_k: Logaritmo base 10 de k
             - log10_A_k: Logaritmo base 10 de A_k
     """
-    log10_k = []
-    log10_A_k = []
-    
-    for k, A_k in zip(k_values, A_k_values):
-        # Skip k=0 and A_k=0
-        if k == 0 or A_k == 0:
-            continue
-        log10_k.append(math.log10(k))
-        log10_A_k.append(math.log10(A_k))
-    
-    return log10_k, log10_A_k 
\ No newline at end of file
+    # Skips k = 0 and A_k = 0
+    if len(A_k_values) <= SHORT_SEQUENCE and not isinstance(A_k_values, np.ndarray):
+        log10_k = []
+        log10_A_k = []
+        for k, A_k in zip(k_values, A_k_values):
+            if k <= 0 or A_k <= 0:
+                continue
+            log10_k.append(math.log10(k))
+            log10_A_k.append(math.log10(A_k))
+        return log10_k, log10_A_k
+    log10_k, log10_A_k = log_transform(k_values, A_k_values)
+    return log10_k.tolist(), log10_A_k.tolist()
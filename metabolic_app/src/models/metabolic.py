@@ -1,4 +1,9 @@
-import math
+from src.core import AF_BASE, AF_SLOPE, HARRIS_BENEDICT
+
+# The view calls these once per day with plain floats: the coefficients come
+# from the core, but the arithmetic is done here without dispatching
+_MALE = HARRIS_BENEDICT['M']
+_FEMALE = HARRIS_BENEDICT['F']
 
 def calculate_tmb(sex: str, weight_kg: float, height_cm: float, age_years: int) -> float:
     """Calculates the Basal Metabolic Rate (TMB) based on sex, weight, height, and age.
@@ -16,12 +21,12 @@ def calculate_tmb(sex: str, weight_kg: float, height_cm: float, age_years: int)
         ValueError: If the sex is not 'Masculino' or 'Femenino'.
     """
     if sex == 'Masculino':
-        tmb = 88.362 + (13.397 * weight_kg) + (4.799 * height_cm) - (5.677 * age_years)
+        base, c_weight, c_height, c_age = _MALE
     elif sex == 'Femenino':
-        tmb = 447.593 + (9.247 * weight_kg) + (3.098 * height_cm) - (4.333 * age_years)
+        base, c_weight, c_height, c_age = _FEMALE
     else:
         raise ValueError("Sex must be 'Masculino' or 'Femenino'")
-    return tmb
+    return base + (c_weight * weight_kg) + (c_height * height_cm) - (c_age * age_years)
 
 def calculate_af(exercise_minutes: float) -> float:
     """Calculates the Physical Activity Factor (AF) based on daily exercise minutes.
@@ -32,8 +37,7 @@ def calculate_af(exercise_minutes: float) -> float:
     Returns:
         The calculated AF.
     """
-    af = 1.2 + 0.01 * exercise_minutes
-    return af
+    return AF_BASE + AF_SLOPE * exercise_minutes
 
 def calculate_gb(tmb: float, af: float) -> float:
     """Calculates the Gross Daily Expenditure (GB) based on TMB and AF.
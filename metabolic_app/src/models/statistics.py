@@ -1,4 +1,10 @@
 import math
+import numpy as np
+from src.core import SHORT_SEQUENCE, linear_fit, mean, std_dev
+
+def _short_list(values) -> bool:
+    """Whether the input is a Python sequence short enough to reduce in plain Python."""
+    return len(values) <= SHORT_SEQUENCE and not isinstance(values, np.ndarray)
 
 def calculate_mean(data: list[float]) -> float:
     """Calculates the arithmetic mean of a list of numbers.
@@ -14,7 +20,10 @@ def calculate_mean(data: list[float]) -> float:
     """
     if not data:
         raise ValueError("Input list cannot be empty")
-    return sum(data) / len(data)
+    if not isinstance(data, np.ndarray):
+        # sum() of a list is cheaper than converting it for the core at any length
+        return sum(data) / len(data)
+    return mean(data)
 
 def calculate_std_dev(data: list[float], mean: float) -> float:
     """Calculates the standard deviation of a list of numbers.
@@ -31,8 +40,9 @@ def calculate_std_dev(data: list[float], mean: float) -> float:
     """
     if not data:
         raise ValueError("Input list cannot be empty")
-    variance = sum([(x - mean) ** 2 for x in data]) / len(data)
-    return math.sqrt(variance)
+    if _short_list(data):
+        return math.sqrt(sum([(x - mean) ** 2 for x in data]) / len(data))
+    return std_dev(data, mean)
 
 def calculate_regression_slope(x_values: list[float], y_values: list[float], N: int) -> float:
     """Calculates the slope (alpha) of the linear regression line.
@@ -52,16 +62,19 @@ def calculate_regression_slope(x_values: list[float], y_values: list[float], N:
     if N == 0 or len(x_values) != N or len(y_values) != N:
         raise ValueError("Invalid input: N must be greater than 0, and list lengths must match N")
 
-    sum_x = sum(x_values)
-    sum_y = sum(y_values)
-    sum_xy = sum([x * y for x, y in zip(x_values, y_values)])
-    sum_x_squared = sum([x ** 2 for x in x_values])
-
-    denominator = N * sum_x_squared - sum_x ** 2
-    if denominator == 0:
+    if _short_list(x_values) and _short_list(y_values):
+        sum_x = sum(x_values)
+        sum_y = sum(y_values)
+        sum_xy = sum([x * y for x, y in zip(x_values, y_values)])
+        sum_x_squared = sum([x * x for x in x_values])
+        denominator = N * sum_x_squared - sum_x * sum_x
+        # Products instead of ** 2: huge sums give inf (and a nan slope), not OverflowError
+        finite = denominator != 0 and math.isfinite(denominator)
+        alpha = (N * sum_xy - sum_x * sum_y) / denominator if finite else math.nan
+    else:
+        alpha, _, _ = linear_fit(x_values, y_values)
+    if math.isnan(alpha):
         raise ZeroDivisionError("Denominator is zero, cannot calculate slope (vertical line).")
-
-    alpha = (N * sum_xy - sum_x * sum_y) / denominator
     return alpha
 
 def calculate_regression_intercept(x_values: list[float], y_values: list[float], alpha: float, N: int) -> float:
@@ -105,19 +118,319 @@ def calculate_correlation_coefficient(x_values: list[float], y_values: list[floa
     if N < 2 or len(x_values) != N or len(y_values) != N:
         raise ValueError("Invalid input: N must be at least 2, and list lengths must match N")
 
-    x_mean = calculate_mean(x_values)
-    y_mean = calculate_mean(y_values)
-    
-    # Calculate standard deviations
-    x_std_sum = sum((x - x_mean) ** 2 for x in x_values)
-    y_std_sum = sum((y - y_mean) ** 2 for y in y_values)
-    
-    # Check for zero standard deviation
-    if x_std_sum == 0 or y_std_sum == 0:
+    if _short_list(x_values) and _short_list(y_values):
+        x_mean = sum(x_values) / N
+        y_mean = sum(y_values) / N
+        x_std_sum = sum((x - x_mean) ** 2 for x in x_values)
+        y_std_sum = sum((y - y_mean) ** 2 for y in y_values)
+        if x_std_sum == 0 or y_std_sum == 0:
+            r = math.nan
+        else:
+            covariance = sum((x - x_mean) * (y - y_mean) for x, y in zip(x_values, y_values)) / N
+            r = covariance / (math.sqrt(x_std_sum / N) * math.sqrt(y_std_sum / N))
+    else:
+        _, _, r = linear_fit(x_values, y_values)
+    if math.isnan(r):
         raise ZeroDivisionError("Standard deviation of x or y is zero, cannot calculate correlation coefficient.")
-    
-    # Calculate covariance (divide by N)
-    covariance = sum((x - x_mean) * (y - y_mean) for x, y in zip(x_values, y_values)) / N
-    
-    # Calculate correlation coefficient
-    return covariance / (math.sqrt(x_std_sum / N) * math.sqrt(y_std_sum / N)) 
\ No newline at end of file
+    return r
+
+
+# Pair slopes listed at once when selecting a robust slope; above this the
+# candidate interval is narrowed by sampling and counting first
+_ROBUST_ENUMERATION_FACTOR = 4
+# Inner medians computed directly per round by the Siegel estimator
+_SIEGEL_SAMPLE = 64
+# Slopes held at once when computing the median slope of some points directly
+_POINT_MEDIAN_CELLS = 1 << 20
+
+
+def _merge_inversions(values: np.ndarray, per_element: bool = False, pairs: bool = False):
+    """Counts the pairs p < q with values[p] > values[q] by bottom-up merging.
+
+    Each level merges sorted blocks with a stable sort, which finds the two
+    sorted runs of every block and merges them in linear time, so a pass costs
+    O(n log n). Equal values are not inversions.
+
+    Args:
+        values: Sequence to inspect (finite values).
+        per_element: Also return, for each position, the inversions it is part of.
+        pairs: Also return the inverted pairs (positions p, q); only for small counts.
+
+    Returns:
+        A tuple (count, per-element counts or None, (p, q) arrays or None).
+    """
+    n = values.shape[0]
+    size = 1 << max(0, (n - 1).bit_length())
+    vals = np.full(size, np.inf)
+    vals[:n] = values
+    idx = np.arange(size)
+    counts = np.zeros(size, dtype=np.int64) if per_element else None
+    left_parts, right_parts = [], []
+    total = 0
+    width = 1
+    while width < size:
+        vals = vals.reshape(-1, 2 * width)
+        idx = idx.reshape(-1, 2 * width)
+        order = np.argsort(vals, axis=1, kind='stable')
+        position = np.arange(2 * width)
+        is_right = order >= width
+        # A right element at merged position p preceded by (order - width) right
+        # elements has p - (order - width) left elements <= it before it
+        right_greater = np.where(is_right, width - (position - (order - width)), 0)
+        total += int(right_greater.sum())
+        merged_idx = np.take_along_axis(idx, order, axis=1)
+        if per_element:
+            # A left element at merged position p is preceded by p - order smaller right elements
+            left_smaller = np.where(is_right, 0, position - order)
+            counts[merged_idx.ravel()] += (right_greater + left_smaller).ravel()
+        if pairs:
+            rows, cols = np.nonzero(right_greater)
+            greater = right_greater[rows, cols]
+            # The left elements greater than a right element are the tail of the sorted left run
+            starts = np.repeat(width - greater, greater)
+            offsets = np.arange(greater.sum()) - np.repeat(np.cumsum(greater) - greater, greater)
+            left_parts.append(idx[np.repeat(rows, greater), starts + offsets])
+            right_parts.append(np.repeat(merged_idx[rows, cols], greater))
+        vals = np.take_along_axis(vals, order, axis=1)
+        idx = merged_idx
+        width *= 2
+    found = None
+    if pairs:
+        found = (np.concatenate(left_parts) if left_parts else np.empty(0, dtype=np.intp),
+                 np.concatenate(right_parts) if right_parts else np.empty(0, dtype=np.intp))
+    return total, (counts[:n] if per_element else None), found
+
+
+class _PairSlopes:
+    """Pairwise slopes (y_j - y_i) / (x_j - x_i) of a point set, with x_i != x_j.
+
+    The points are kept sorted by x (ties by y). For a slope t, the pairs with a
+    slope below t are exactly the inversions of y - t·x in that order, so they
+    can be counted without listing the n² slopes.
+    """
+
+    def __init__(self, x_values, y_values):
+        x = np.asarray(x_values, dtype=np.float64)
+        y = np.asarray(y_values, dtype=np.float64)
+        if x.ndim != 1 or x.shape != y.shape:
+            raise ValueError("Invalid input: x_values and y_values must be lists of the same length")
+        if not (np.isfinite(x).all() and np.isfinite(y).all()):
+            raise ValueError("Invalid input: x_values and y_values must be finite numbers")
+        order = np.lexsort((y, x))
+        self.x, self.y = x[order], y[order]
+        self.n = x.shape[0]
+        # Points sharing an x value have no slope between them
+        group_start = np.flatnonzero(np.r_[True, np.diff(self.x) != 0])
+        group_size = np.diff(np.r_[group_start, self.n])
+        self.group_size = np.repeat(group_size, group_size)
+        self.pair_count = self.n * (self.n - 1) // 2 - int((group_size * (group_size - 1) // 2).sum())
+        if self.pair_count == 0:
+            raise ZeroDivisionError("All x values are equal, cannot calculate slope (vertical line).")
+        # The extreme slopes join consecutive x groups
+        group_min = np.minimum.reduceat(self.y, group_start)
+        group_max = np.maximum.reduceat(self.y, group_start)
+        dx = np.diff(self.x[group_start])
+        lowest = float(np.min((group_min[1:] - group_max[:-1]) / dx))
+        highest = float(np.max((group_max[1:] - group_min[:-1]) / dx))
+        # Bounds well away from every slope, so rounding in y - t·x cannot misplace any pair
+        margin = highest - lowest + 1.0
+        self.low_bound = lowest - margin - abs(lowest)
+        self.high_bound = highest + margin + abs(highest)
+
+    def count_below(self, t: float, per_element: bool = False):
+        """Counts the slopes below t (in total, and optionally per point)."""
+        total, counts, _ = _merge_inversions(self.y - t * self.x, per_element=per_element)
+        return (total, counts) if per_element else total
+
+    def between(self, low: float, high: float) -> np.ndarray:
+        """Lists the slopes in [low, high): pairs in order at ``low`` and inverted at ``high``."""
+        order = np.lexsort((self.x, self.y - low * self.x))
+        _, _, (p, q) = _merge_inversions((self.y - high * self.x)[order], pairs=True)
+        i, j = order[p], order[q]
+        return (self.y[j] - self.y[i]) / (self.x[j] - self.x[i])
+
+    def sample(self, size: int, rng: np.random.Generator) -> np.ndarray:
+        """Returns the slopes of about ``size`` random pairs."""
+        i = rng.integers(0, self.n, size)
+        j = rng.integers(0, self.n, size)
+        keep = self.x[i] != self.x[j]
+        i, j = i[keep], j[keep]
+        return (self.y[j] - self.y[i]) / (self.x[j] - self.x[i])
+
+    def point_median(self, i: np.ndarray) -> np.ndarray:
+        """Median slope from each point in ``i`` to the points with a different x."""
+        out = np.empty(len(i))
+        rows = max(1, _POINT_MEDIAN_CELLS // self.n)
+        for start in range(0, len(i), rows):
+            block = i[start:start + rows]
+            dx = self.x[np.newaxis, :] - self.x[block, np.newaxis]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                slopes = np.where(dx != 0, (self.y[np.newaxis, :] - self.y[block, np.newaxis]) / dx, np.nan)
+            out[start:start + rows] = np.nanmedian(slopes, axis=1)
+        return out
+
+
+def _pivots(sample: np.ndarray, low_rank: float, high_rank: float) -> list:
+    """Picks sample quantiles that should bracket the target ranks (as fractions)."""
+    margin = 2.0 / np.sqrt(sample.size)
+    return np.quantile(sample, np.clip([low_rank - margin, high_rank + margin], 0.0, 1.0)).tolist()
+
+
+def _select_slopes(slopes: _PairSlopes, ranks: list, low: float, high: float, below_low: int, below_high: int,
+                   rng: np.random.Generator) -> list:
+    """Selects the pair slopes of the given ranks, all known to lie in [low, high)."""
+    limit = _ROBUST_ENUMERATION_FACTOR * slopes.n + 1024
+    while below_high - below_low > limit:
+        candidates = slopes.sample(limit, rng)
+        candidates = candidates[(candidates >= low) & (candidates < high)]
+        span = below_high - below_low
+        pivots = []
+        if candidates.size >= 8:
+            pivots = _pivots(candidates, (ranks[0] - below_low) / span, (ranks[-1] - below_low + 1) / span)
+        pivots = [t for t in pivots if low < t < high] or [low + (high - low) / 2]
+        if not low < pivots[0] < high:
+            # No float between the bounds: every remaining slope equals low
+            return [low] * len(ranks)
+        for t in pivots:
+            below = slopes.count_below(t)
+            if below <= ranks[0]:
+                low, below_low = t, below
+            elif below > ranks[-1]:
+                high, below_high = t, below
+            else:
+                # t separates the target ranks: select each on its own side
+                return (_select_slopes(slopes, [k for k in ranks if k < below], low, t, below_low, below, rng)
+                        + _select_slopes(slopes, [k for k in ranks if k >= below], t, high, below, below_high, rng))
+    values = slopes.between(low, high)
+    picked = np.clip(np.asarray(ranks) - below_low, 0, max(values.size - 1, 0))
+    return np.partition(values, picked)[picked].tolist() if values.size else [low] * len(ranks)
+
+
+def _median_ranks(count: int) -> list:
+    return sorted({(count - 1) // 2, count // 2})
+
+
+def calculate_theil_sen_slope(x_values: list[float], y_values: list[float], seed: int = 0) -> float:
+    """Calculates the Theil-Sen slope: the median of the slopes between all pairs of points.
+
+    Unlike the least-squares slope, up to ~29% of the points can be arbitrary
+    (for example a near-zero A_k in a log-log fit) without moving it much. The
+    median is selected without listing the n² pair slopes. The pairs below a
+    candidate slope are counted in O(n log n), random pairs pick the candidates,
+    and the few slopes left in the final interval are listed and partitioned.
+    Pairs with equal x are skipped; with an even number of pairs the two
+    middle slopes are averaged.
+
+    Args:
+        x_values: A list of x-values.
+        y_values: A list of y-values.
+        seed: Seed of the random pair sampling (the result does not depend on it).
+
+    Returns:
+        The Theil-Sen slope.
+
+    Raises:
+        ValueError: If the lists differ in length or contain non-finite values.
+        ZeroDivisionError: If all x-values are equal (vertical line).
+    """
+    slopes = _PairSlopes(x_values, y_values)
+    middle = _select_slopes(slopes, _median_ranks(slopes.pair_count), slopes.low_bound, slopes.high_bound, 0,
+                            slopes.pair_count, np.random.default_rng(seed))
+    return float(np.mean(middle))
+
+
+def calculate_siegel_slope(x_values: list[float], y_values: list[float], seed: int = 0) -> float:
+    """Calculates Siegel's repeated-median slope: the median over points of their median slope.
+
+    Its breakdown point is 50%: almost half of the points can be outliers. The
+    slopes below a candidate t are counted for every point at once in
+    O(n log n), which tells which points have their median slope below t.
+    Each round computes the median slope of a random sample of the points still
+    in play to choose the candidates, so the points still in play shrink
+    geometrically. The last few are computed directly. Inner and outer medians
+    average the two middle values when their counts are even.
+
+    Args:
+        x_values: A list of x-values.
+        y_values: A list of y-values.
+        seed: Seed of the random point sampling (the result does not depend on it).
+
+    Returns:
+        The repeated-median slope.
+
+    Raises:
+        ValueError: If the lists differ in length or contain non-finite values.
+        ZeroDivisionError: If all x-values are equal (vertical line).
+    """
+    slopes = _PairSlopes(x_values, y_values)
+    rng = np.random.default_rng(seed)
+    n = slopes.n
+    # Inner median of point i: mean of its slopes of ranks a_i and b_i
+    others = n - slopes.group_size
+    if (others == 0).any():
+        raise ZeroDivisionError("Some point shares its x value with all others, cannot calculate its slopes.")
+    inner_low, inner_high = (others - 1) // 2, others // 2
+    ranks = _median_ranks(n)
+    medians = np.full(n, np.nan)  # inner medians computed so far
+
+    def classify(t: float, active: np.ndarray) -> np.ndarray:
+        """Returns which active points have their inner median below t."""
+        _, below = slopes.count_below(t, per_element=True)
+        under = below >= inner_high + 1
+        # Only the two middle slopes straddle t: the median is their mean, computed directly
+        unsure = active & (below == inner_high) & (inner_low < inner_high) & np.isnan(medians)
+        if unsure.any():
+            medians[unsure] = slopes.point_median(np.flatnonzero(unsure))
+        known = active & ~np.isnan(medians)
+        under[known] = medians[known] < t
+        return under & active
+
+    def select(ranks: list, low: float, high: float, below_low: int, active: np.ndarray) -> list:
+        while active.sum() > _SIEGEL_SAMPLE:
+            pool = np.flatnonzero(active)
+            sample = rng.choice(pool, _SIEGEL_SAMPLE, replace=False)
+            missing = sample[np.isnan(medians[sample])]
+            medians[missing] = slopes.point_median(missing)
+            in_play = pool.size
+            pivots = _pivots(medians[sample], (ranks[0] - below_low) / in_play,
+                             (ranks[-1] - below_low + 1) / in_play)
+            pivots = [t for t in pivots if low < t < high] or [low + (high - low) / 2]
+            if not low < pivots[0] < high:
+                return [low] * len(ranks)
+            for t in pivots:
+                under = classify(t, active)
+                below = below_low + int(under.sum())
+                if below <= ranks[0]:
+                    low, below_low, active = t, below, active & ~under
+                elif below > ranks[-1]:
+                    high, active = t, under
+                else:
+                    return (select([k for k in ranks if k < below], low, t, below_low, under)
+                            + select([k for k in ranks if k >= below], t, high, below, active & ~under))
+        pool = np.flatnonzero(active)
+        missing = pool[np.isnan(medians[pool])]
+        medians[missing] = slopes.point_median(missing)
+        values = np.sort(medians[pool])
+        picked = np.clip(np.asarray(ranks) - below_low, 0, max(values.size - 1, 0))
+        return values[picked].tolist()
+
+    return float(np.mean(select(ranks, slopes.low_bound, slopes.high_bound, 0, np.ones(n, dtype=bool))))
+
+
+def calculate_robust_intercept(x_values: list[float], y_values: list[float], alpha: float) -> float:
+    """Calculates the intercept that goes with a robust slope: the median of y - alpha·x.
+
+    Args:
+        x_values: A list of x-values.
+        y_values: A list of y-values.
+        alpha: The slope (Theil-Sen or Siegel).
+
+    Returns:
+        The intercept C.
+
+    Raises:
+        ValueError: If the lists are empty or differ in length.
+    """
+    if len(x_values) == 0 or len(x_values) != len(y_values):
+        raise ValueError("Invalid input: x_values and y_values must be non-empty lists of the same length")
+    return float(np.median(np.asarray(y_values, dtype=np.float64) - alpha * np.asarray(x_values, dtype=np.float64)))
@@ -0,0 +1,112 @@
+"""Point selection for plotting long series on a fixed pixel budget.
+
+All functions return sorted indices into the input, so the caller can pick
+the matching x and y values (or any other per-point data). Series that already
+fit in the budget are returned whole.
+"""
+
+import numpy as np
+
+
+def lttb_indices(x, y, n_out: int) -> np.ndarray:
+    """Selects points with the Largest-Triangle-Three-Buckets algorithm.
+
+    The first and last points are always kept. The points in between are split
+    into ``n_out - 2`` buckets, and from each bucket the point that forms the
+    largest triangle with the previously selected point and the mean of the
+    next bucket is kept. Each bucket is processed with vector operations, so
+    the Python loop runs ``n_out`` times regardless of the series length.
+
+    Args:
+        x: Monotonic x-values.
+        y: y-values, same length as ``x``.
+        n_out: Number of points to keep (at least 3 to downsample).
+
+    Returns:
+        Sorted indices of the selected points.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = x.shape[0]
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.intp)
+    # Mean of every bucket up front; the last point stands in after the last bucket
+    counts = np.diff(edges)
+    mean_x = np.append(np.add.reduceat(x[:-1], edges[:-1]) / counts, x[-1])
+    mean_y = np.append(np.add.reduceat(y[:-1], edges[:-1]) / counts, y[-1])
+    selected = np.empty(n_out, dtype=np.intp)
+    selected[0] = 0
+    selected[-1] = n - 1
+    previous = 0
+    for b in range(n_out - 2):
+        start, stop = edges[b], edges[b + 1]
+        px, py = x[previous], y[previous]
+        next_x, next_y = mean_x[b + 1], mean_y[b + 1]
+        # Twice the triangle area; the constant factor does not change the argmax
+        areas = np.abs((px - next_x) * (y[start:stop] - py) - (px - x[start:stop]) * (next_y - py))
+        previous = start + int(np.argmax(areas))
+        selected[b + 1] = previous
+    return selected
+
+
+def minmax_indices(y, n_bins: int) -> np.ndarray:
+    """Keeps the minimum and maximum of each of ``n_bins`` equal-width bins.
+
+    The envelope keeps every peak and trough of the series, which matters for
+    spectra where a single large amplitude must stay visible.
+
+    Args:
+        y: Values to reduce.
+        n_bins: Number of bins (the result has at most ``2 * n_bins`` points).
+
+    Returns:
+        Sorted indices of the selected points.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    n = y.shape[0]
+    if n_bins < 1 or 2 * n_bins >= n:
+        return np.arange(n)
+
+    width = -(-n // n_bins)
+    # The last bin is padded with its final value so that every bin has the same width
+    padded = np.pad(y, (0, n_bins * width - n), mode='edge').reshape(n_bins, width)
+    offsets = np.arange(n_bins) * width
+    low = offsets + np.argmin(padded, axis=1)
+    high = offsets + np.argmax(padded, axis=1)
+    indices = np.unique(np.concatenate([low, high]))
+    return indices[indices < n]
+
+
+def log_minmax_indices(x, y, n_bins: int) -> np.ndarray:
+    """Keeps the minimum and maximum of each of ``n_bins`` bins of equal width in log x.
+
+    For spectra drawn on log-log axes: equal-width bins in k would merge the
+    first decades into one or two bins, while bins spaced like the axis keep
+    every low-k point (a bin narrower than one point holds at most one) and
+    reduce only the crowded high-k end.
+
+    Args:
+        x: Increasing, strictly positive x-values (for example k).
+        y: Values to reduce, same length as ``x``.
+        n_bins: Number of bins (the result has at most ``2 * n_bins`` points).
+
+    Returns:
+        Sorted indices of the selected points.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = y.shape[0]
+    if n_bins < 1 or 2 * n_bins >= n:
+        return np.arange(n)
+
+    edges = np.geomspace(x[0], x[-1], n_bins + 1)
+    bins = np.clip(np.searchsorted(edges, x, side='right') - 1, 0, n_bins - 1)
+    # x is increasing, so every bin is a contiguous run; sorting by (bin, y)
+    # puts the minimum of each run first and its maximum last
+    order = np.lexsort((y, bins))
+    starts = np.flatnonzero(np.diff(bins)) + 1
+    low = order[np.concatenate(([0], starts))]
+    high = order[np.concatenate((starts - 1, [n - 1]))]
+    return np.unique(np.concatenate([low, high]))
@@ -1,3 +1,9 @@
+import numpy as np
+import pandas as pd
+
+# Upper bound for the exercise minutes of a single day
+MINUTES_PER_DAY = 1440
+
 def validate_numeric_input(value: str, field_name: str) -> float:
     """Validates if a string value can be converted to a positive float.
 
@@ -54,4 +60,94 @@ def validate_sex_input(value: str) -> str:
     """
     if value not in ['Masculino', 'Femenino']:
         raise ValueError("Sex must be 'Masculino' or 'Femenino'.")
-    return value 
\ No newline at end of file
+    return value
+
+def _format_rows(rows: np.ndarray, limit: int = 20) -> str:
+    """Formats row numbers as a short comma-separated list."""
+    shown = ", ".join(str(row) for row in rows[:limit].tolist())
+    if len(rows) > limit:
+        shown += f" (and {len(rows) - limit} more)"
+    return shown
+
+def parse_numeric_column(values, field_name: str, maximum: float = None, first_row: int = 1) -> np.ndarray:
+    """Converts and validates a whole column of cell texts in one vectorized pass.
+
+    Both '.' and ',' are accepted as the decimal separator, as spreadsheets in
+    Spanish locales copy numbers with a decimal comma. Instead of stopping at
+    the first bad cell, every empty, non-numeric or out-of-range cell is
+    collected and reported in a single error.
+
+    Args:
+        values: Cell texts (None is treated as an empty cell).
+        field_name: The name of the column being validated (for error messages).
+        maximum: Optional upper bound for the values.
+        first_row: Row number reported for the first value.
+
+    Returns:
+        The validated values as a float64 array.
+
+    Raises:
+        ValueError: If any cell is empty, not a number, negative or above ``maximum``.
+    """
+    texts = pd.Series(values, dtype=object).fillna("").astype(str).str.strip()
+    numbers = pd.to_numeric(texts.str.replace(",", ".", regex=False), errors="coerce").to_numpy(dtype=np.float64)
+    empty = (texts == "").to_numpy()
+    not_number = ~np.isfinite(numbers) & ~empty
+    out_of_range = np.isfinite(numbers) & (numbers < 0)
+    if maximum is not None:
+        out_of_range |= numbers > maximum
+    if empty.any() or not_number.any() or out_of_range.any():
+        problems = []
+        for label, mask in (("empty", empty), ("not a number", not_number),
+                            ("out of range" if maximum is None else f"out of range [0, {maximum:g}]", out_of_range)):
+            if mask.any():
+                rows = np.flatnonzero(mask) + first_row
+                problems.append(f"{label}: {'rows' if len(rows) > 1 else 'row'} {_format_rows(rows)}")
+        raise ValueError(f"Invalid input for {field_name} ({'; '.join(problems)}).")
+    return numbers
+
+def split_pasted_column(text: str) -> list:
+    """Splits clipboard text copied from a spreadsheet into one value per row.
+
+    When several columns are copied (e.g. day and minutes), the last one is used.
+
+    Args:
+        text: Clipboard contents, rows separated by newlines and columns by tabs.
+
+    Returns:
+        The cell text of each row.
+    """
+    lines = text.splitlines()
+    # Spreadsheets end the copied block with a newline
+    while lines and not lines[-1].strip():
+        lines.pop()
+    return [line.rsplit("\t", 1)[-1].strip() for line in lines]
+
+
+def read_spectrum_bands(path: str, lower: str = None, upper: str = None):
+    """Reads population spectrum bands exported as CSV (one row per frequency k).
+
+    The file has a ``k`` column and one ``P<level>`` column per percentile with
+    amplitudes A_k, as written by the cohort tools (``SpectrumBands.to_csv``).
+
+    Args:
+        path: CSV file to read.
+        lower: Column of the lower edge (defaults to the lowest percentile).
+        upper: Column of the upper edge (defaults to the highest percentile).
+
+    Returns:
+        A tuple (k, lower, upper, median) of arrays; median is None without a P50 column.
+
+    Raises:
+        ValueError: If the file has no k column or fewer than two percentile columns.
+    """
+    table = pd.read_csv(path)
+    levels = sorted((float(name[1:]), name) for name in table.columns
+                    if name.startswith('P') and name[1:].replace('.', '', 1).isdigit())
+    if 'k' not in table.columns or len(levels) < 2:
+        raise ValueError("The bands file needs a 'k' column and at least two percentile columns (P5, P95...).")
+    lower = lower or levels[0][1]
+    upper = upper or levels[-1][1]
+    median = table['P50'].to_numpy(dtype=np.float64) if 'P50' in table.columns else None
+    return (table['k'].to_numpy(dtype=np.float64), table[lower].to_numpy(dtype=np.float64),
+            table[upper].to_numpy(dtype=np.float64), median)
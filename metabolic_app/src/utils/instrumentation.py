@@ -0,0 +1,239 @@
+"""Opt-in instrumentation of the calculation pipeline stages.
+
+Stages are wrapped with ``PROFILER.stage(name)`` (or the ``instrument``
+decorator). While the profiler is disabled the wrappers cost a single attribute
+check. When enabled, each stage records its wall time and call count, and, with
+``trace_memory``, the net and peak memory allocated by tracemalloc. The data
+can be shown in a GUI panel or dumped as JSON or as a Chrome trace file
+(chrome://tracing, Perfetto).
+
+Set ``METABOLIC_PROFILE=1`` (or ``=memory`` to also trace allocations) to
+enable the shared profiler at startup.
+"""
+
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List, Optional
+
+_NULL_CONTEXT = contextlib.nullcontext()
+
+
+@dataclass
+class StageStats:
+    """Accumulated measurements for one pipeline stage."""
+    calls: int = 0
+    total_s: float = 0.0
+    min_s: float = float('inf')
+    max_s: float = 0.0
+    allocated_bytes: int = 0  # net bytes still allocated when the stage returns
+    peak_bytes: int = 0  # highest peak above the memory in use at stage entry
+
+    @property
+    def mean_s(self) -> float:
+        return self.total_s / self.calls if self.calls else 0.0
+
+
+class _Frame:
+    __slots__ = ('name', 'start_ns', 'mem_start', 'peak_abs')
+
+    def __init__(self, name: str, start_ns: int, mem_start: int):
+        self.name = name
+        self.start_ns = start_ns
+        self.mem_start = mem_start
+        self.peak_abs = mem_start
+
+
+class Instrumentation:
+    """Collects per-stage wall time, call counts and tracemalloc allocations.
+
+    Args:
+        enabled: Whether stages are measured.
+        trace_memory: Whether tracemalloc is used to measure allocations.
+        max_events: Number of most recent stage executions kept for traces.
+    """
+
+    def __init__(self, enabled: bool = False, trace_memory: bool = False, max_events: int = 100_000):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._origin_ns = time.perf_counter_ns()
+        self._stats: Dict[str, StageStats] = {}
+        self._events = deque(maxlen=max_events)
+        self._enabled = False
+        self._trace_memory = False
+        self._started_tracemalloc = False
+        self.configure(enabled, trace_memory)
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    @property
+    def trace_memory(self) -> bool:
+        return self._trace_memory
+
+    def configure(self, enabled: bool, trace_memory: Optional[bool] = None) -> None:
+        """Turns measurement (and optionally memory tracing) on or off."""
+        if trace_memory is None:
+            trace_memory = self._trace_memory
+        trace_memory = enabled and trace_memory
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        elif not trace_memory and self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        self._trace_memory = trace_memory
+        self._enabled = enabled
+
+    def reset(self) -> None:
+        """Discards all recorded measurements."""
+        with self._lock:
+            self._stats.clear()
+            self._events.clear()
+            self._origin_ns = time.perf_counter_ns()
+
+    def stage(self, name: str):
+        """Returns a context manager that measures the enclosed block as ``name``."""
+        if not self._enabled:
+            return _NULL_CONTEXT
+        return self._measure(name)
+
+    def instrument(self, name: Optional[str] = None) -> Callable:
+        """Decorator form of :meth:`stage`; defaults to the function's qualified name."""
+        def decorator(fn: Callable) -> Callable:
+            stage_name = name or fn.__qualname__
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self._enabled:
+                    return fn(*args, **kwargs)
+                with self._measure(stage_name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    @contextlib.contextmanager
+    def _measure(self, name: str):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        tracing = self._trace_memory and tracemalloc.is_tracing()
+        mem_start = 0
+        if tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1].peak_abs = max(stack[-1].peak_abs, peak)
+            tracemalloc.reset_peak()
+            mem_start = current
+        frame = _Frame(name, time.perf_counter_ns(), mem_start)
+        stack.append(frame)
+        try:
+            yield
+        finally:
+            end_ns = time.perf_counter_ns()
+            stack.pop()
+            allocated = peak_bytes = 0
+            if tracing and tracemalloc.is_tracing():
+                current, peak = tracemalloc.get_traced_memory()
+                frame.peak_abs = max(frame.peak_abs, peak)
+                allocated = current - frame.mem_start
+                peak_bytes = frame.peak_abs - frame.mem_start
+                if stack:
+                    stack[-1].peak_abs = max(stack[-1].peak_abs, frame.peak_abs)
+            self._record(frame, end_ns, len(stack), allocated, peak_bytes)
+
+    def _record(self, frame: _Frame, end_ns: int, depth: int, allocated: int, peak_bytes: int) -> None:
+        elapsed = (end_ns - frame.start_ns) / 1e9
+        with self._lock:
+            stats = self._stats.get(frame.name)
+            if stats is None:
+                stats = self._stats[frame.name] = StageStats()
+            stats.calls += 1
+            stats.total_s += elapsed
+            stats.min_s = min(stats.min_s, elapsed)
+            stats.max_s = max(stats.max_s, elapsed)
+            stats.allocated_bytes += allocated
+            stats.peak_bytes = max(stats.peak_bytes, peak_bytes)
+            self._events.append((frame.name, frame.start_ns, end_ns, threading.get_ident(),
+                                 depth, allocated, peak_bytes))
+
+    def stats(self) -> Dict[str, StageStats]:
+        """Returns a copy of the per-stage statistics, in first-seen order."""
+        with self._lock:
+            return {name: StageStats(**asdict(s)) for name, s in self._stats.items()}
+
+    def summary_rows(self) -> List[List[str]]:
+        """Formats the statistics as text rows for a table widget.
+
+        Columns: stage, calls, total ms, mean ms, max ms, net KiB, peak KiB.
+        """
+        rows = []
+        for name, s in self.stats().items():
+            rows.append([
+                name,
+                str(s.calls),
+                f"{s.total_s * 1e3:.3f}",
+                f"{s.mean_s * 1e3:.3f}",
+                f"{s.max_s * 1e3:.3f}",
+                f"{s.allocated_bytes / 1024:.1f}",
+                f"{s.peak_bytes / 1024:.1f}",
+            ])
+        return rows
+
+    def to_dict(self) -> dict:
+        """Returns the statistics as a JSON-serialisable dictionary."""
+        stages = {}
+        for name, s in self.stats().items():
+            data = asdict(s)
+            data['mean_s'] = s.mean_s
+            if not s.calls:
+                data['min_s'] = 0.0
+            stages[name] = data
+        return {'enabled': self._enabled, 'trace_memory': self._trace_memory, 'stages': stages}
+
+    def dump_json(self, path: str) -> None:
+        """Writes the per-stage statistics to ``path`` as JSON."""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def chrome_trace(self) -> dict:
+        """Returns the recorded stage executions in Chrome trace event format."""
+        pid = os.getpid()
+        with self._lock:
+            events = list(self._events)
+            origin = self._origin_ns
+        trace = []
+        for name, start_ns, end_ns, tid, depth, allocated, peak_bytes in events:
+            trace.append({
+                'name': name,
+                'cat': name.split('.', 1)[0],
+                'ph': 'X',
+                'ts': (start_ns - origin) / 1e3,
+                'dur': (end_ns - start_ns) / 1e3,
+                'pid': pid,
+                'tid': tid,
+                'args': {'depth': depth, 'allocated_bytes': allocated, 'peak_bytes': peak_bytes},
+            })
+        return {'traceEvents': trace, 'displayTimeUnit': 'ms'}
+
+    def dump_chrome_trace(self, path: str) -> None:
+        """Writes the recorded stage executions to ``path`` as a Chrome trace file."""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.chrome_trace(), f)
+
+
+def _from_environment() -> Instrumentation:
+    setting = os.environ.get('METABOLIC_PROFILE', '').strip().lower()
+    return Instrumentation(enabled=setting not in ('', '0', 'false', 'no'),
+                           trace_memory=setting == 'memory')
+
+
+# Shared profiler used by both front-ends
+PROFILER = _from_environment()
@@ -0,0 +1,244 @@
+"""Process-wide store of computed results shared by both front-ends.
+
+Results are keyed by a fingerprint of the inputs they were computed from
+(``person_fingerprint``), so two analysis windows, or ``MainWindow`` next to
+``MetabolicApp``, showing the same person compute each result once. Each
+window holds leases on the entries it displays. Entries with leases are
+never evicted. Entries without leases are kept as a cache and evicted least
+recently used first once the store exceeds its memory budget.
+
+Lookups are thread-safe. When several threads ask for the same missing key,
+one computes it and the others wait for its result. Stored arrays are made
+read-only because every holder shares them.
+
+Set ``METABOLIC_CACHE_MB`` to change the budget of the shared store at startup.
+"""
+
+import dataclasses
+import hashlib
+import os
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict
+
+import numpy as np
+
+DEFAULT_BUDGET_BYTES = 256 << 20
+
+# Sex labels used by the two front-ends, normalised for fingerprints
+_SEX_CODES = {'M': 'M', 'F': 'F', 'MASCULINO': 'M', 'FEMENINO': 'F'}
+
+
+def person_fingerprint(kind: str, sex: str, weight: float, height: float, age: float, minutes) -> str:
+    """Builds the store key of a result derived from one person's inputs.
+
+    Args:
+        kind: Name of the result (for example ``'gb'`` or ``'amplitudes'``).
+        sex: 'M'/'F' or 'Masculino'/'Femenino'.
+        weight: Weight in kg.
+        height: Height in cm.
+        age: Age in years.
+        minutes: Exercise minutes per day.
+
+    Returns:
+        A hex digest that is equal for equal inputs in either front-end.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    sex_code = _SEX_CODES.get(str(sex).strip().upper(), str(sex))
+    digest.update(f'{kind}|{sex_code}|{float(weight)!r}|{float(height)!r}|{float(age)!r}|'.encode('utf-8'))
+    digest.update(np.ascontiguousarray(minutes, dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+
+def estimate_size(value: Any) -> int:
+    """Estimates the memory held by a result (arrays, containers and dataclasses)."""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value.values())
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return sum(estimate_size(getattr(value, field.name)) for field in dataclasses.fields(value))
+    return sys.getsizeof(value)
+
+
+def _freeze(value: Any) -> Any:
+    """Makes the arrays of a result read-only."""
+    if isinstance(value, np.ndarray):
+        value.setflags(write=False)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            _freeze(item)
+    elif dataclasses.is_dataclass(value) and not isinstance(value, type):
+        for field in dataclasses.fields(value):
+            _freeze(getattr(value, field.name))
+    return value
+
+
+class _Entry:
+    __slots__ = ('value', 'size', 'refs')
+
+    def __init__(self, value: Any, size: int):
+        self.value = value
+        self.size = size
+        self.refs = 0
+
+
+class ResultStore:
+    """Thread-safe, reference-counted result cache with a memory budget.
+
+    Args:
+        budget_bytes: Memory the entries without leases may fill before they
+            are evicted. Leased entries count towards it but are never evicted.
+    """
+
+    def __init__(self, budget_bytes: int = DEFAULT_BUDGET_BYTES):
+        self.budget_bytes = budget_bytes
+        self._entries: 'OrderedDict[str, _Entry]' = OrderedDict()
+        self._pending: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def acquire(self, key: str, compute: Callable[[], Any]) -> Any:
+        """Returns the result for ``key`` and takes a lease on it.
+
+        The result is computed with ``compute()`` if it is not stored. Every
+        call must be matched by a ``release(key)``.
+
+        Args:
+            key: Fingerprint of the inputs.
+            compute: Builds the result when it is missing.
+
+        Returns:
+            The stored result (its arrays are read-only).
+        """
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry.refs += 1
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry.value
+                pending = self._pending.get(key)
+                if pending is None:
+                    pending = self._pending[key] = threading.Event()
+                    self.misses += 1
+                    break
+            # Another thread is computing it: wait and look again (it may have failed)
+            pending.wait()
+        try:
+            value = _freeze(compute())
+        except BaseException:
+            with self._lock:
+                del self._pending[key]
+            pending.set()
+            raise
+        with self._lock:
+            entry = _Entry(value, estimate_size(value))
+            entry.refs = 1
+            self._entries[key] = entry
+            self.bytes += entry.size
+            del self._pending[key]
+            self._evict()
+        pending.set()
+        return value
+
+    def release(self, key: str) -> None:
+        """Drops a lease taken with ``acquire``; the entry stays cached until evicted."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.refs == 0:
+                raise KeyError(f'No lease held on {key}')
+            entry.refs -= 1
+            self._evict()
+
+    def set_budget(self, budget_bytes: int) -> None:
+        """Changes the memory budget and evicts entries without leases if needed."""
+        with self._lock:
+            self.budget_bytes = budget_bytes
+            self._evict()
+
+    def clear(self) -> None:
+        """Evicts every entry without leases."""
+        with self._lock:
+            for key in [key for key, entry in self._entries.items() if entry.refs == 0]:
+                self._remove(key)
+
+    def stats(self) -> dict:
+        """Returns entry counts, memory use and hit/miss counters."""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'leased': sum(1 for entry in self._entries.values() if entry.refs),
+                'bytes': self.bytes,
+                'budget_bytes': self.budget_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self.bytes -= entry.size
+        self.evictions += 1
+
+    def _evict(self) -> None:
+        """Evicts least recently used entries without leases until within budget (lock held)."""
+        if self.bytes <= self.budget_bytes:
+            return
+        for key in [key for key, entry in self._entries.items() if entry.refs == 0]:
+            if self.bytes <= self.budget_bytes:
+                break
+            self._remove(key)
+
+
+class Leases:
+    """Leases held by one window, one per named slot.
+
+    Taking a new lease for a slot releases the previous one, so a window that
+    recalculates only keeps its current results pinned.
+
+    Args:
+        store: Store the leases are taken from.
+    """
+
+    def __init__(self, store: ResultStore):
+        self.store = store
+        self._keys: Dict[str, str] = {}
+
+    def get(self, slot: str, key: str, compute: Callable[[], Any]) -> Any:
+        """Returns the result for ``key`` and moves the lease of ``slot`` to it."""
+        value = self.store.acquire(key, compute)
+        previous = self._keys.get(slot)
+        self._keys[slot] = key
+        if previous is not None:
+            self.store.release(previous)
+        return value
+
+    def release_all(self) -> None:
+        """Drops every lease (when the window closes)."""
+        keys, self._keys = list(self._keys.values()), {}
+        for key in keys:
+            self.store.release(key)
+
+
+def _from_environment() -> ResultStore:
+    setting = os.environ.get('METABOLIC_CACHE_MB', '').strip()
+    return ResultStore(int(float(setting) * (1 << 20)) if setting else DEFAULT_BUDGET_BYTES)
+
+
+# Shared result store used by both front-ends
+RESULT_STORE = _from_environment()
@@ -0,0 +1,78 @@
+"""Table model for the daily exercise minutes.
+
+The minutes are kept as the text the user typed or pasted and are only parsed
+when the analysis runs, so that a whole column is converted and validated in
+one vectorized pass. Bulk changes (setting the number of days, pasting a block
+of rows) replace the data inside a single model reset instead of emitting one
+change signal per cell.
+"""
+
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt
+
+
+class ExerciseTableModel(QAbstractTableModel):
+    """Read-only day number and editable exercise minutes, one row per day."""
+
+    HEADERS = ("Día (n)", "Minutos de ejercicio")
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._texts = []
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._texts)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.EditRole):
+            return None
+        if index.column() == 0:
+            return str(index.row() + 1)
+        return self._texts[index.row()]
+
+    def setData(self, index, value, role=Qt.EditRole) -> bool:
+        if not index.isValid() or index.column() != 1 or role != Qt.EditRole:
+            return False
+        self._texts[index.row()] = str(value).strip()
+        self.dataChanged.emit(index, index, [Qt.DisplayRole, Qt.EditRole])
+        return True
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        flags = Qt.ItemIsEnabled | Qt.ItemIsSelectable
+        if index.column() == 1:
+            flags |= Qt.ItemIsEditable
+        return flags
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def set_row_count(self, num_days: int) -> None:
+        """Sets the number of days, keeping the minutes of the days that remain."""
+        self.beginResetModel()
+        del self._texts[num_days:]
+        self._texts.extend([""] * (num_days - len(self._texts)))
+        self.endResetModel()
+
+    def set_minutes(self, texts, start: int = 0) -> None:
+        """Replaces the minutes from row ``start`` on, adding rows if needed.
+
+        Args:
+            texts: Cell texts, one per day.
+            start: First row to replace.
+        """
+        texts = [str(text).strip() for text in texts]
+        self.beginResetModel()
+        stop = start + len(texts)
+        self._texts.extend([""] * (stop - len(self._texts)))
+        self._texts[start:stop] = texts
+        self.endResetModel()
+
+    def minutes_texts(self) -> list:
+        """Returns a copy of the minutes column as entered."""
+        return list(self._texts)
@@ -1,23 +1,38 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 import sys
-from PyQt5.QtWidgets import (QApplication, QMainWindow, QTabWidget, QVBoxLayout, QWidget, QLabel, QLineEdit, QPushButton, QFormLayout, QComboBox, QTableWidget, QTableWidgetItem, QHBoxLayout, QHeaderView, QMessageBox, QFileDialog, QGridLayout, QSpacerItem, QSizePolicy)
+from PyQt5.QtWidgets import (QApplication, QMainWindow, QTabWidget, QVBoxLayout, QWidget, QLabel, QLineEdit, QPushButton, QFormLayout, QComboBox, QTableWidget, QTableWidgetItem, QTableView, QHBoxLayout, QHeaderView, QMessageBox, QFileDialog, QGridLayout, QSpacerItem, QSizePolicy, QCheckBox, QShortcut)
 from PyQt5.QtCore import Qt # Import Qt for text alignment
+from PyQt5.QtGui import QKeySequence
 
 # Import helper functions for validation
-from src.utils.helpers import validate_integer_input, validate_numeric_input, validate_sex_input
+from src.utils.helpers import (MINUTES_PER_DAY, parse_numeric_column, read_spectrum_bands, split_pasted_column,
+                               validate_integer_input, validate_numeric_input, validate_sex_input)
 
 # Import metabolic calculation functions
-from src.models.metabolic import calculate_tmb, calculate_af, calculate_gb
+from src.models.metabolic import calculate_tmb
+
+# Import the calculation core shared with the desktop app and its backend selection
+from src.core import (activity_factor, available_backends, backend_report, backend_rows, daily_expenditure,
+                      requested_backend, set_backend)
 
 # Import Fourier analysis functions
-from src.models.fourier import calculate_specific_fourier_coefficients, calculate_log_transformations
+from src.models.fourier import calculate_specific_fourier_coefficients, calculate_log_transformations, calculate_amplitude_spectrum
 
 # Import statistical analysis functions
-from src.models.statistics import calculate_mean, calculate_std_dev, calculate_regression_slope, calculate_regression_intercept, calculate_correlation_coefficient
+from src.models.statistics import calculate_mean, calculate_std_dev, calculate_regression_slope, calculate_regression_intercept, calculate_correlation_coefficient, calculate_theil_sen_slope, calculate_siegel_slope
+
+# Import the opt-in stage profiler shared with the desktop app
+from src.utils.instrumentation import PROFILER
+
+# Import the result store shared with the desktop app and other windows
+from src.utils.result_store import RESULT_STORE, Leases, person_fingerprint
+
+# Import the embedded plot canvas (matplotlib Qt backend)
+from src.views.plot_canvas import AnalysisCanvas
 
-# Import matplotlib for plotting
-import matplotlib.pyplot as plt
+# Import the model behind the exercise minutes table
+from src.views.exercise_table import ExerciseTableModel
 
 # Import pandas for data handling and export
 import pandas as pd
@@ -48,6 +63,7 @@ class MainWindow(QMainWindow):
         self.daily_results_tab = QWidget()
         self.fourier_analysis_tab = QWidget()
         self.statistical_analysis_tab = QWidget()
+        self.performance_tab = QWidget()
 
         # Add tabs to the tab widget
         self.tab_widget.addTab(self.personal_data_tab, "Datos Personales")
@@ -55,18 +71,26 @@ class MainWindow(QMainWindow):
         self.tab_widget.addTab(self.daily_results_tab, "Resultados Diarios")
         self.tab_widget.addTab(self.fourier_analysis_tab, "Análisis de Fourier")
         self.tab_widget.addTab(self.statistical_analysis_tab, "Análisis Estadístico")
+        self.tab_widget.addTab(self.performance_tab, "Rendimiento")
 
         self._setup_personal_data_tab()
         self._setup_exercise_data_tab()
         self._setup_daily_results_tab()
         self._setup_fourier_analysis_tab()
         self._setup_statistical_analysis_tab()
+        self._setup_performance_tab()
 
         # Connect signals
         self.next_button.clicked.connect(self._process_personal_data)
         self.calculate_button.clicked.connect(self._calculate_metabolic_data)
+        self.paste_button.clicked.connect(self._paste_exercise_minutes)
+        paste_shortcut = QShortcut(QKeySequence.Paste, self.exercise_table)
+        paste_shortcut.setContext(Qt.WidgetWithChildrenShortcut)
+        paste_shortcut.activated.connect(self._paste_exercise_minutes)
 
         # Store calculated data for analysis
+        self._leases = Leases(RESULT_STORE)  # results shared with other windows showing the same person
+        self._person_inputs = None
         self._daily_gb_values = []
         self._num_days = 0
         self._k_values = []
@@ -78,6 +102,12 @@ class MainWindow(QMainWindow):
         self._regression_alpha = 0.0
         self._regression_c = 0.0
         self._correlation_r = 0.0
+        self._has_regression = False
+
+    def closeEvent(self, event):
+        """Releases the shared results held by this window."""
+        self._leases.release_all()
+        super().closeEvent(event)
 
     def _get_modern_stylesheet(self) -> str:
         """Returns a modern stylesheet string for the application."""
@@ -180,7 +210,7 @@ QPushButton:pressed {
 }
 
 /* Tables */
-QTableWidget {
+QTableView {
     gridline-color: #e2e8f0;
     background-color: #ffffff;
     alternate-background-color: #f8fafc;
@@ -189,7 +219,7 @@ QTableWidget {
     font-size: 10pt;
 }
 
-QTableWidget::item {
+QTableView::item {
     padding: 6px 8px;
 }
 
@@ -281,10 +311,10 @@ QPushButton#exportButton:pressed {
         main_layout = QVBoxLayout()
         self.exercise_data_tab.setLayout(main_layout)
 
-        # Top: Exercise Table
-        self.exercise_table = QTableWidget()
-        self.exercise_table.setColumnCount(2)
-        self.exercise_table.setHorizontalHeaderLabels(["Día (n)", "Minutos de ejercicio"])
+        # Top: Exercise Table (a view over ExerciseTableModel, so pasted blocks are applied in one reset)
+        self.exercise_model = ExerciseTableModel(self)
+        self.exercise_table = QTableView()
+        self.exercise_table.setModel(self.exercise_model)
         # Set header stretch to fill the available space
         header = self.exercise_table.horizontalHeader()
         header.setSectionResizeMode(QHeaderView.Stretch)
@@ -294,6 +324,9 @@ QPushButton#exportButton:pressed {
 
         # Bottom: Calculate button, aligned to the right
         button_layout = QHBoxLayout()
+        # Pastes one value per row from the clipboard, starting at the selected day (also Ctrl+V)
+        self.paste_button = QPushButton("Pegar minutos")
+        button_layout.addWidget(self.paste_button)
         button_layout.addItem(QSpacerItem(40, 20, QSizePolicy.Expanding, QSizePolicy.Minimum))
         self.calculate_button = QPushButton("Calcular TMB, AF y GB")
         button_layout.addWidget(self.calculate_button)
@@ -356,6 +389,15 @@ QPushButton#exportButton:pressed {
         self.r_value = QLabel("")
         layout.addRow(self.r_label, self.r_value)
 
+        # Robust slopes: a near-zero A_k barely moves them, unlike the least-squares slope
+        self.theil_sen_label = QLabel("\u03B1 Theil-Sen (Robust slope):")
+        self.theil_sen_value = QLabel("")
+        layout.addRow(self.theil_sen_label, self.theil_sen_value)
+
+        self.siegel_label = QLabel("\u03B1 Siegel (Repeated median):")
+        self.siegel_value = QLabel("")
+        layout.addRow(self.siegel_label, self.siegel_value)
+
         self.mean_x_label = QLabel("\u00AFx (Mean of x):") # Unicode for x-bar
         self.mean_x_value = QLabel("")
         layout.addRow(self.mean_x_label, self.mean_x_value)
@@ -372,9 +414,114 @@ QPushButton#exportButton:pressed {
         self.std_dev_y_value = QLabel("")
         layout.addRow(self.std_dev_y_label, self.std_dev_y_value)
 
-        self.generate_plot_button = QPushButton("Generar Gráfico x vs y")
-        layout.addRow(self.generate_plot_button)
-        self.generate_plot_button.clicked.connect(self._generate_plot)
+        # Embedded plots, updated in place after each calculation
+        self.analysis_canvas = AnalysisCanvas(self.statistical_analysis_tab)
+        layout.addRow(self.analysis_canvas)
+
+        # Percentile bands of a population spectrum, drawn under the member's spectrum
+        self.load_bands_button = QPushButton("Cargar bandas de población")
+        self.load_bands_button.clicked.connect(self._load_population_bands)
+        layout.addRow(self.load_bands_button)
+
+    def _setup_performance_tab(self):
+        """Sets up the profiling status panel for the calculation stages."""
+        layout = QVBoxLayout()
+        self.performance_tab.setLayout(layout)
+
+        options_layout = QHBoxLayout()
+        self.profiling_checkbox = QCheckBox("Medir etapas")
+        self.profiling_checkbox.setChecked(PROFILER.enabled)
+        self.profiling_checkbox.toggled.connect(self._toggle_profiling)
+        options_layout.addWidget(self.profiling_checkbox)
+        self.memory_checkbox = QCheckBox("Medir memoria (tracemalloc)")
+        self.memory_checkbox.setChecked(PROFILER.trace_memory)
+        self.memory_checkbox.toggled.connect(self._toggle_profiling)
+        options_layout.addWidget(self.memory_checkbox)
+        options_layout.addItem(QSpacerItem(40, 20, QSizePolicy.Expanding, QSizePolicy.Minimum))
+        options_layout.addWidget(QLabel("Motor de cálculo:"))
+        self.backend_combo = QComboBox()
+        self.backend_combo.addItems(['auto'] + available_backends())
+        self.backend_combo.setCurrentText(requested_backend())
+        self.backend_combo.currentTextChanged.connect(self._select_backend)
+        options_layout.addWidget(self.backend_combo)
+        layout.addLayout(options_layout)
+
+        # Which backend runs each kernel of the calculation core
+        self.backend_label = QLabel()
+        layout.addWidget(self.backend_label)
+        self.backend_table = QTableWidget()
+        self.backend_table.setColumnCount(2)
+        self.backend_table.setHorizontalHeaderLabels(["Núcleo", "Motor"])
+        self.backend_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.backend_table.setMaximumHeight(160)
+        layout.addWidget(self.backend_table)
+        self._refresh_backend_panel()
+
+        self.performance_table = QTableWidget()
+        self.performance_table.setColumnCount(7)
+        self.performance_table.setHorizontalHeaderLabels(["Etapa", "Llamadas", "Total (ms)", "Media (ms)", "Máx (ms)", "Neto (KiB)", "Pico (KiB)"])
+        header = self.performance_table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.Stretch)
+        self.performance_table.setAlternatingRowColors(True)
+        layout.addWidget(self.performance_table)
+
+        button_layout = QHBoxLayout()
+        reset_button = QPushButton("Reiniciar")
+        reset_button.clicked.connect(self._reset_profiling)
+        button_layout.addWidget(reset_button)
+        export_json_button = QPushButton("Exportar JSON")
+        export_json_button.clicked.connect(lambda: self._export_profile("perfil_etapas.json", PROFILER.dump_json))
+        button_layout.addWidget(export_json_button)
+        export_trace_button = QPushButton("Exportar Chrome Trace")
+        export_trace_button.clicked.connect(lambda: self._export_profile("perfil_trace.json", PROFILER.dump_chrome_trace))
+        button_layout.addWidget(export_trace_button)
+        layout.addLayout(button_layout)
+
+    def _select_backend(self, name: str):
+        """Makes the chosen backend the active one for every window."""
+        try:
+            set_backend(name)
+        except ValueError as e:
+            QMessageBox.warning(self, "Motor de cálculo", str(e))
+        self._refresh_backend_panel()
+
+    def _refresh_backend_panel(self):
+        """Shows the backend status and the backend that runs each kernel."""
+        backends, kernels = backend_rows()
+        self.backend_label.setText(" · ".join(f"{name}: {status}" for name, status, _ in backends))
+        self.backend_label.setToolTip(backend_report())
+        self.backend_table.setRowCount(len(kernels))
+        for i, (kernel, backend) in enumerate(kernels):
+            self.backend_table.setItem(i, 0, QTableWidgetItem(kernel))
+            self.backend_table.setItem(i, 1, QTableWidgetItem(backend))
+
+    def _toggle_profiling(self):
+        """Applies the profiling checkboxes to the shared profiler."""
+        PROFILER.configure(self.profiling_checkbox.isChecked(), self.memory_checkbox.isChecked())
+
+    def _reset_profiling(self):
+        """Clears the recorded stage measurements."""
+        PROFILER.reset()
+        self._refresh_performance_panel()
+
+    def _refresh_performance_panel(self):
+        """Shows the current per-stage measurements in the performance table."""
+        rows = PROFILER.summary_rows()
+        self.performance_table.setRowCount(len(rows))
+        for i, row in enumerate(rows):
+            for j, text in enumerate(row):
+                self.performance_table.setItem(i, j, QTableWidgetItem(text))
+        self._refresh_backend_panel()
+
+    def _export_profile(self, default_name: str, dump):
+        """Writes the profiling data with the given dump function."""
+        fileName, _ = QFileDialog.getSaveFileName(self, "Save File", default_name, "JSON Files (*.json)")
+        if fileName:
+            try:
+                dump(fileName)
+                QMessageBox.information(self, "Export Successful", f"Data exported to {fileName}")
+            except OSError as e:
+                QMessageBox.critical(self, "Error", f"An unexpected error occurred during export: {e}")
 
     def _process_personal_data(self):
         """Reads and validates personal data and updates the exercise table."""
@@ -387,14 +534,8 @@ QPushButton#exportButton:pressed {
                  QMessageBox.warning(self, "Invalid Input", "Número de días de análisis (N) must be a positive integer.")
                  return
 
-            # Clear existing rows and set row count for exercise table
-            self.exercise_table.setRowCount(num_days)
-
-            # Populate the 'Día (n)' column
-            for i in range(num_days):
-                item = QTableWidgetItem(str(i + 1))
-                item.setFlags(item.flags() & ~Qt.ItemIsEditable) # Make day column read-only
-                self.exercise_table.setItem(i, 0, item)
+            # Set the number of days; the model numbers the read-only 'Día (n)' column
+            self.exercise_model.set_row_count(num_days)
 
             # Switch to the Exercise Data tab
             self.tab_widget.setCurrentIndex(1) # Index 1 is Exercise Diario
@@ -404,64 +545,90 @@ QPushButton#exportButton:pressed {
         except Exception as e:
             QMessageBox.critical(self, "Error", f"An unexpected error occurred: {e}")
 
+    def _paste_exercise_minutes(self):
+        """Pastes exercise minutes from the clipboard, starting at the selected day.
+
+        The pasted block is validated as a whole before the table changes; rows
+        beyond the current number of days are added.
+        """
+        texts = split_pasted_column(QApplication.clipboard().text())
+        if not texts:
+            return
+        start = max(self.exercise_table.currentIndex().row(), 0)
+        try:
+            with PROFILER.stage('input.paste'):
+                parse_numeric_column(texts, "Minutos de ejercicio", maximum=MINUTES_PER_DAY, first_row=start + 1)
+                self.exercise_model.set_minutes(texts, start)
+        except ValueError as e:
+            QMessageBox.warning(self, "Invalid Input", str(e))
+            return
+        self.days_input.setText(str(self.exercise_model.rowCount()))
+
     def _calculate_metabolic_data(self):
         """Reads data, performs metabolic calculations, and displays results."""
         try:
+            with PROFILER.stage('calculate'):
+                if not self._calculate_and_display():
+                    return
+
+            # Switch to the Daily Results tab
+            self.tab_widget.setCurrentIndex(2) # Index 2 is Resultados Diarios
+
+        except ValueError as e:
+            QMessageBox.warning(self, "Invalid Input", str(e))
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"An unexpected error occurred: {e}")
+        finally:
+            if PROFILER.enabled:
+                self._refresh_performance_panel()
+
+    def _calculate_and_display(self) -> bool:
+        """Runs every calculation stage; returns False if input data is missing."""
+        with PROFILER.stage('input.parse'):
             # 1. Read and validate personal data
             sex = validate_sex_input(self.sex_combo.currentText())
             weight = validate_numeric_input(self.weight_input.text(), "Peso")
             height = validate_numeric_input(self.height_input.text(), "Altura")
             age = validate_integer_input(self.age_input.text(), "Edad")
-            self._num_days = self.exercise_table.rowCount() # Get N from the exercise table row count
+            self._num_days = self.exercise_model.rowCount() # Get N from the exercise table row count
 
             if self._num_days == 0:
                  QMessageBox.warning(self, "Missing Data", "Please enter the number of days and exercise minutes.")
-                 return
-
-            # 2. Read and validate exercise minutes data
-            exercise_minutes_list = []
-            for i in range(self._num_days):
-                item = self.exercise_table.item(i, 1)
-                if item is None or item.text() == "":
-                     QMessageBox.warning(self, "Missing Data", f"Please enter exercise minutes for Day {i+1}.")
-                     return
-                exercise_minutes = validate_numeric_input(item.text(), f"Minutos de ejercicio for Day {i+1}")
-                exercise_minutes_list.append(exercise_minutes)
-
-            # 3. Perform metabolic calculations and populate results table
+                 return False
+
+            # 2. Read and validate exercise minutes data (all days at once; every invalid day is reported)
+            exercise_minutes_list = parse_numeric_column(self.exercise_model.minutes_texts(), "Minutos de ejercicio",
+                                                         maximum=MINUTES_PER_DAY).tolist()
+
+        # 3. Perform metabolic calculations
+        with PROFILER.stage('metabolic.compute'):
+            tmb = calculate_tmb(sex, weight, height, age)
+            af_values = activity_factor(exercise_minutes_list)
+            # Shared with other windows (and the main app) showing the same person
+            key = person_fingerprint('gb', sex, weight, height, age, exercise_minutes_list)
+            self._daily_gb_values = self._leases.get(
+                'gb', key, lambda: daily_expenditure(tmb, exercise_minutes_list))
+            self._person_inputs = (sex, weight, height, age, exercise_minutes_list)
+
+        # 4. Populate results table
+        with PROFILER.stage('daily.populate'):
             self.results_table.setRowCount(self._num_days)
-            self._daily_gb_values = []
-
             for i in range(self._num_days):
-                day = i + 1
-                exercise_minutes = exercise_minutes_list[i]
-
-                tmb = calculate_tmb(sex, weight, height, age)
-                af = calculate_af(exercise_minutes)
-                gb = calculate_gb(tmb, af)
-                self._daily_gb_values.append(gb)
-
-                self.results_table.setItem(i, 0, QTableWidgetItem(str(day)))
-                self.results_table.setItem(i, 1, QTableWidgetItem(str(exercise_minutes)))
+                self.results_table.setItem(i, 0, QTableWidgetItem(str(i + 1)))
+                self.results_table.setItem(i, 1, QTableWidgetItem(str(exercise_minutes_list[i])))
                 self.results_table.setItem(i, 2, QTableWidgetItem(f"{tmb:.2f}")) # Format to 2 decimal places
-                self.results_table.setItem(i, 3, QTableWidgetItem(f"{af:.2f}"))
-                self.results_table.setItem(i, 4, QTableWidgetItem(f"{gb:.2f}"))
-
-            # Perform Fourier and Statistical analysis
-            self._perform_fourier_analysis()
-            self._perform_statistical_analysis()
-
-            # Switch to the Daily Results tab
-            self.tab_widget.setCurrentIndex(2) # Index 2 is Resultados Diarios
+                self.results_table.setItem(i, 3, QTableWidgetItem(f"{af_values[i]:.2f}"))
+                self.results_table.setItem(i, 4, QTableWidgetItem(f"{self._daily_gb_values[i]:.2f}"))
 
-        except ValueError as e:
-            QMessageBox.warning(self, "Invalid Input", str(e))
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"An unexpected error occurred: {e}")
+        # Perform Fourier and Statistical analysis
+        self._perform_fourier_analysis()
+        self._perform_statistical_analysis()
+        self._update_plots()
+        return True
 
     def _perform_fourier_analysis(self):
         """Performs Fourier analysis and populates the Fourier analysis table."""
-        if not self._daily_gb_values or self._num_days == 0:
+        if len(self._daily_gb_values) == 0 or self._num_days == 0:
             # No data to analyze, clear the table and return
             self.fourier_table.setRowCount(0)
             self._k_values = []
@@ -480,66 +647,73 @@ QPushButton#exportButton:pressed {
             max_k_to_display = min(N, 5)
 
             # Calculate Fourier coefficients for the desired k values (1 to max_k_to_display)
-            self._k_values, self._a_k_values, self._b_k_values, self._A_k_values = calculate_specific_fourier_coefficients(daily_gb_values, N, max_k_to_display)
+            with PROFILER.stage('fourier.spectrum'):
+                self._k_values, self._a_k_values, self._b_k_values, self._A_k_values = calculate_specific_fourier_coefficients(daily_gb_values, N, max_k_to_display)
 
             # Calculate log transformations for the displayed k values
             # These are already for k > 0 since calculate_specific_fourier_coefficients starts k from 1
-            self._log10_k_values, self._log10_A_k_values = calculate_log_transformations(self._k_values, self._A_k_values)
+            with PROFILER.stage('fourier.log_transform'):
+                self._log10_k_values, self._log10_A_k_values = calculate_log_transformations(self._k_values, self._A_k_values)
 
             # Populate the Fourier table
-            self.fourier_table.setRowCount(len(self._k_values))
-            for i in range(len(self._k_values)):
-                k = self._k_values[i]
-                ak = self._a_k_values[i]
-                bk = self._b_k_values[i]
-                Ak = self._A_k_values[i]
-
-                self.fourier_table.setItem(i, 0, QTableWidgetItem(str(k)))
-                self.fourier_table.setItem(i, 1, QTableWidgetItem(f"{ak:.4f}")) # Format to 4 decimal places
-                self.fourier_table.setItem(i, 2, QTableWidgetItem(f"{bk:.4f}"))
-                self.fourier_table.setItem(i, 3, QTableWidgetItem(f"{Ak:.4f}"))
-
-                # Get corresponding log transformed values for the current k
-                # These are only available for k > 0 and are stored in _log10_k_values and _log10_A_k_values
-                log10_k_str = "N/A"
-                log10_Ak_str = "N/A"
-                x_str = "N/A"
-                y_str = "N/A"
-                xy_str = "N/A"
-
-                try:
-                    # Find the index of the current k in the list of displayed k values (which starts from 1)
-                    log_index = self._k_values.index(k)
-                    # Check if this index is valid for log transformed values
-                    if log_index < len(self._log10_k_values):
-                        log10_k = self._log10_k_values[log_index]
-                        log10_Ak = self._log10_A_k_values[log_index]
-
-                        log10_k_str = f"{log10_k:.4f}"
-                        log10_Ak_str = f"{log10_Ak:.4f}" if log10_Ak != float('-inf') else "-inf"
-                        x_str = log10_k_str
-                        y_str = log10_Ak_str
-
-                        # Calculate xy using the numeric log values before formatting
-                        numeric_x = log10_k
-                        numeric_y = log10_Ak if log10_Ak != float('-inf') else 0 # Treat log(-inf) as 0 for xy calculation
-                        xy_str = f"{numeric_x * numeric_y:.4f}"
-
-                except ValueError: # Should not happen if k is in _k_values
-                    pass
-                except IndexError: # Should not happen if logic is correct
-                    pass
-
-
-                self.fourier_table.setItem(i, 4, QTableWidgetItem(log10_k_str))
-                self.fourier_table.setItem(i, 5, QTableWidgetItem(log10_Ak_str))
-                self.fourier_table.setItem(i, 6, QTableWidgetItem(x_str))
-                self.fourier_table.setItem(i, 7, QTableWidgetItem(y_str))
-                self.fourier_table.setItem(i, 8, QTableWidgetItem(xy_str))
+            with PROFILER.stage('fourier.populate'):
+                self._populate_fourier_table()
 
         except Exception as e:
             QMessageBox.critical(self, "Error", f"An error occurred during Fourier analysis: {e}")
 
+    def _populate_fourier_table(self):
+        """Fills the Fourier table from the stored coefficients and log values."""
+        self.fourier_table.setRowCount(len(self._k_values))
+        for i in range(len(self._k_values)):
+            k = self._k_values[i]
+            ak = self._a_k_values[i]
+            bk = self._b_k_values[i]
+            Ak = self._A_k_values[i]
+
+            self.fourier_table.setItem(i, 0, QTableWidgetItem(str(k)))
+            self.fourier_table.setItem(i, 1, QTableWidgetItem(f"{ak:.4f}")) # Format to 4 decimal places
+            self.fourier_table.setItem(i, 2, QTableWidgetItem(f"{bk:.4f}"))
+            self.fourier_table.setItem(i, 3, QTableWidgetItem(f"{Ak:.4f}"))
+
+            # Get corresponding log transformed values for the current k
+            # These are only available for k > 0 and are stored in _log10_k_values and _log10_A_k_values
+            log10_k_str = "N/A"
+            log10_Ak_str = "N/A"
+            x_str = "N/A"
+            y_str = "N/A"
+            xy_str = "N/A"
+
+            try:
+                # Find the index of the current k in the list of displayed k values (which starts from 1)
+                log_index = self._k_values.index(k)
+                # Check if this index is valid for log transformed values
+                if log_index < len(self._log10_k_values):
+                    log10_k = self._log10_k_values[log_index]
+                    log10_Ak = self._log10_A_k_values[log_index]
+
+                    log10_k_str = f"{log10_k:.4f}"
+                    log10_Ak_str = f"{log10_Ak:.4f}" if log10_Ak != float('-inf') else "-inf"
+                    x_str = log10_k_str
+                    y_str = log10_Ak_str
+
+                    # Calculate xy using the numeric log values before formatting
+                    numeric_x = log10_k
+                    numeric_y = log10_Ak if log10_Ak != float('-inf') else 0 # Treat log(-inf) as 0 for xy calculation
+                    xy_str = f"{numeric_x * numeric_y:.4f}"
+
+            except ValueError: # Should not happen if k is in _k_values
+                pass
+            except IndexError: # Should not happen if logic is correct
+                pass
+
+
+            self.fourier_table.setItem(i, 4, QTableWidgetItem(log10_k_str))
+            self.fourier_table.setItem(i, 5, QTableWidgetItem(log10_Ak_str))
+            self.fourier_table.setItem(i, 6, QTableWidgetItem(x_str))
+            self.fourier_table.setItem(i, 7, QTableWidgetItem(y_str))
+            self.fourier_table.setItem(i, 8, QTableWidgetItem(xy_str))
+
     def _perform_statistical_analysis(self):
         """Performs statistical analysis on log-transformed Fourier coefficients and displays results."""
         # Use the stored log-transformed values from _perform_fourier_analysis
@@ -553,6 +727,8 @@ QPushButton#exportButton:pressed {
             self.alpha_value.setText("")
             self.c_value.setText("")
             self.r_value.setText("")
+            self.theil_sen_value.setText("")
+            self.siegel_value.setText("")
             self.mean_x_value.setText("")
             self.mean_y_value.setText("")
             self.std_dev_x_value.setText("")
@@ -560,31 +736,39 @@ QPushButton#exportButton:pressed {
             self._regression_alpha = 0.0
             self._regression_c = 0.0
             self._correlation_r = 0.0
+            self._has_regression = False
             return
 
         try:
             # Calculate statistical measures
-            mean_x = calculate_mean(x_values)
-            mean_y = calculate_mean(y_values)
-            std_dev_x = calculate_std_dev(x_values, mean_x)
-            std_dev_y = calculate_std_dev(y_values, mean_y)
-            alpha = calculate_regression_slope(x_values, y_values, N)
-            c = calculate_regression_intercept(x_values, y_values, alpha, N)
-            r = calculate_correlation_coefficient(x_values, y_values, N)
+            with PROFILER.stage('stats.compute'):
+                mean_x = calculate_mean(x_values)
+                mean_y = calculate_mean(y_values)
+                std_dev_x = calculate_std_dev(x_values, mean_x)
+                std_dev_y = calculate_std_dev(y_values, mean_y)
+                alpha = calculate_regression_slope(x_values, y_values, N)
+                c = calculate_regression_intercept(x_values, y_values, alpha, N)
+                r = calculate_correlation_coefficient(x_values, y_values, N)
+                theil_sen = calculate_theil_sen_slope(x_values, y_values)
+                siegel = calculate_siegel_slope(x_values, y_values)
 
             # Store regression values for plotting
             self._regression_alpha = alpha
             self._regression_c = c
             self._correlation_r = r
+            self._has_regression = True
 
             # Display results
-            self.alpha_value.setText(f"{alpha:.4f}") # Format to 4 decimal places
-            self.c_value.setText(f"{c:.4f}")
-            self.r_value.setText(f"{r:.4f}")
-            self.mean_x_value.setText(f"{mean_x:.4f}")
-            self.mean_y_value.setText(f"{mean_y:.4f}")
-            self.std_dev_x_value.setText(f"{std_dev_x:.4f}")
-            self.std_dev_y_value.setText(f"{std_dev_y:.4f}")
+            with PROFILER.stage('stats.populate'):
+                self.alpha_value.setText(f"{alpha:.4f}") # Format to 4 decimal places
+                self.c_value.setText(f"{c:.4f}")
+                self.r_value.setText(f"{r:.4f}")
+                self.theil_sen_value.setText(f"{theil_sen:.4f}")
+                self.siegel_value.setText(f"{siegel:.4f}")
+                self.mean_x_value.setText(f"{mean_x:.4f}")
+                self.mean_y_value.setText(f"{mean_y:.4f}")
+                self.std_dev_x_value.setText(f"{std_dev_x:.4f}")
+                self.std_dev_y_value.setText(f"{std_dev_y:.4f}")
 
         except ValueError as e:
             QMessageBox.warning(self, "Statistical Analysis Error", str(e))
@@ -592,6 +776,8 @@ QPushButton#exportButton:pressed {
             self.alpha_value.setText("")
             self.c_value.setText("")
             self.r_value.setText("")
+            self.theil_sen_value.setText("")
+            self.siegel_value.setText("")
             self.mean_x_value.setText("")
             self.mean_y_value.setText("")
             self.std_dev_x_value.setText("")
@@ -599,12 +785,15 @@ QPushButton#exportButton:pressed {
             self._regression_alpha = 0.0
             self._regression_c = 0.0
             self._correlation_r = 0.0
+            self._has_regression = False
         except ZeroDivisionError as e:
              QMessageBox.warning(self, "Statistical Analysis Error", str(e))
              # Clear results and stored regression values on error
              self.alpha_value.setText("")
              self.c_value.setText("")
              self.r_value.setText("")
+             self.theil_sen_value.setText("")
+             self.siegel_value.setText("")
              self.mean_x_value.setText("")
              self.mean_y_value.setText("")
              self.std_dev_x_value.setText("")
@@ -612,12 +801,15 @@ QPushButton#exportButton:pressed {
              self._regression_alpha = 0.0
              self._regression_c = 0.0
              self._correlation_r = 0.0
+             self._has_regression = False
         except Exception as e:
             QMessageBox.critical(self, "Error", f"An unexpected error occurred during statistical analysis: {e}")
             # Clear results and stored regression values on error
             self.alpha_value.setText("")
             self.c_value.setText("")
             self.r_value.setText("")
+            self.theil_sen_value.setText("")
+            self.siegel_value.setText("")
             self.mean_x_value.setText("")
             self.mean_y_value.setText("")
             self.std_dev_x_value.setText("")
@@ -625,35 +817,36 @@ QPushButton#exportButton:pressed {
             self._regression_alpha = 0.0
             self._regression_c = 0.0
             self._correlation_r = 0.0
+            self._has_regression = False
 
-    def _generate_plot(self):
-        """Generates and displays the scatter plot with the regression line."""
-        x_values = self._log10_k_values
-        y_values = self._log10_A_k_values
+    def _update_plots(self):
+        """Updates the embedded GB, spectrum and log-log plots with the current results."""
+        try:
+            with PROFILER.stage('plot.spectrum'):
+                key = person_fingerprint('amplitudes', *self._person_inputs)
+                amplitudes = self._leases.get('amplitudes', key,
+                                              lambda: calculate_amplitude_spectrum(self._daily_gb_values))
+            with PROFILER.stage('plot.update'):
+                self.analysis_canvas.set_series(self._daily_gb_values)
+                self.analysis_canvas.set_spectrum(amplitudes)
+                if self._has_regression:
+                    self.analysis_canvas.set_regression(self._log10_k_values, self._log10_A_k_values,
+                                                        self._regression_alpha, self._regression_c)
+                else:
+                    self.analysis_canvas.set_regression(self._log10_k_values, self._log10_A_k_values)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"An unexpected error occurred during plotting: {e}")
 
-        if not x_values or not y_values or len(x_values) < 2:
-            QMessageBox.warning(self, "Plotting Error", "Not enough data points (k > 0) to generate a plot with a regression line.")
+    def _load_population_bands(self):
+        """Loads population bands (CSV with k and P<level> columns) and overlays them on the spectrum."""
+        fileName, _ = QFileDialog.getOpenFileName(self, "Open File", "", "CSV Files (*.csv)")
+        if not fileName:
             return
-
         try:
-            plt.figure()
-            plt.scatter(x_values, y_values, label='Data Points')
-
-            # Plot the regression line: y = alpha * x + C
-            # Generate x values for the line based on the range of x_values
-            x_line = [min(x_values), max(x_values)]
-            y_line = [self._regression_alpha * x + self._regression_c for x in x_line]
-            plt.plot(x_line, y_line, color='red', label=f'Regression Line (y = {self._regression_alpha:.4f}x + {self._regression_c:.4f})')
-
-            plt.xlabel('log10(k)')
-            plt.ylabel('log10(A_k)')
-            plt.title('Análisis de Fourier: log10(A_k) vs log10(k)')
-            plt.legend()
-            plt.grid(True)
-            plt.show()
-
+            k, lower, upper, median = read_spectrum_bands(fileName)
+            self.analysis_canvas.set_bands(k, lower, upper, median)
         except Exception as e:
-            QMessageBox.critical(self, "Error", f"An unexpected error occurred during plotting: {e}")
+            QMessageBox.critical(self, "Error", f"Could not load the population bands: {e}")
 
     def _export_results(self, table_widget: QTableWidget, base_filename: str):
         """Exports the data from a QTableWidget to a CSV or Excel file."""
@@ -0,0 +1,202 @@
+"""Embedded matplotlib canvas for the analysis plots.
+
+The figure and its artists are created once. New data replace the artists'
+contents in place and are drawn with blitting: the static parts of each axes
+(frame, ticks, labels) are cached as a bitmap after every full draw and only
+the data artists are repainted on top. A full redraw is only needed when the
+axis limits have to change.
+"""
+
+import numpy as np
+from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg
+from matplotlib.figure import Figure
+
+from src.utils.downsampling import log_minmax_indices, lttb_indices
+
+# Points drawn per series; enough for a full-width plot on a large screen
+MAX_POINTS = 2000
+
+
+def _limits(low: float, high: float, log: bool = False):
+    """Returns axis limits with a small margin around [low, high]."""
+    if log:
+        low, high = np.log10(low), np.log10(high)
+    margin = 0.05 * (high - low) if high > low else max(abs(high) * 0.05, 0.5)
+    low, high = low - margin, high + margin
+    if log:
+        return 10.0 ** low, 10.0 ** high
+    return low, high
+
+
+class AnalysisCanvas(FigureCanvasQTAgg):
+    """Daily GB series, amplitude spectrum and log-log regression in one figure.
+
+    Args:
+        parent: Parent widget.
+        max_points: Points drawn per series after downsampling.
+    """
+
+    def __init__(self, parent=None, max_points: int = MAX_POINTS):
+        figure = Figure(figsize=(6, 7), tight_layout=True)
+        super().__init__(figure)
+        self.setParent(parent)
+        self.setMinimumHeight(480)
+        self.max_points = max_points
+
+        self._series_ax, self._spectrum_ax, self._loglog_ax = figure.subplots(3, 1)
+        self._series_ax.set_title('GB diario')
+        self._series_ax.set_xlabel('Día (n)')
+        self._series_ax.set_ylabel('GB (kcal)')
+        self._spectrum_ax.set_title('Espectro de amplitudes')
+        self._spectrum_ax.set_xlabel('k')
+        self._spectrum_ax.set_ylabel('A_k')
+        self._spectrum_ax.set_xscale('log')
+        self._spectrum_ax.set_yscale('log')
+        self._loglog_ax.set_title('Análisis de Fourier: log10(A_k) vs log10(k)')
+        self._loglog_ax.set_xlabel('log10(k)')
+        self._loglog_ax.set_ylabel('log10(A_k)')
+        for ax in (self._series_ax, self._spectrum_ax, self._loglog_ax):
+            ax.grid(True)
+
+        # Animated artists are skipped by full draws and painted by _on_draw/_refresh
+        self._series_line, = self._series_ax.plot([], [], linewidth=0.8, animated=True)
+        self._spectrum_line, = self._spectrum_ax.plot([], [], linewidth=0.8, animated=True)
+        # Population bands (see set_bands), drawn under the member's spectrum
+        self._band = self._spectrum_ax.fill_between([], [], [], color='gray', alpha=0.25, linewidth=0,
+                                                    animated=True, label='Población')
+        self._band_median, = self._spectrum_ax.plot([], [], color='gray', linestyle='--', linewidth=0.8,
+                                                    animated=True)
+        self._band_limits = None
+        self._spectrum_limits = None
+        self._scatter = self._loglog_ax.scatter([], [], s=16, animated=True)
+        self._regression_line, = self._loglog_ax.plot([], [], color='red', animated=True)
+        self._equation = self._loglog_ax.text(0.98, 0.95, '', transform=self._loglog_ax.transAxes,
+                                              ha='right', va='top', animated=True)
+        self._artists = {
+            self._series_ax: (self._series_line,),
+            self._spectrum_ax: (self._band, self._band_median, self._spectrum_line),
+            self._loglog_ax: (self._scatter, self._regression_line, self._equation),
+        }
+        self._backgrounds = {}
+        self.mpl_connect('draw_event', self._on_draw)
+
+    def _on_draw(self, event):
+        """Caches the static background of each axes and paints the data on top."""
+        self._backgrounds = {ax: self.copy_from_bbox(ax.bbox) for ax in self._artists}
+        for ax, artists in self._artists.items():
+            for artist in artists:
+                ax.draw_artist(artist)
+
+    def _refresh(self, ax, x_limits, y_limits):
+        """Repaints the artists of ``ax``, redrawing everything only if its limits change.
+
+        The current limits are kept while the new data fit inside them and fill
+        at least half of each range, so consecutive updates usually blit.
+        """
+        if x_limits is not None and y_limits is not None:
+            if not (self._fits(ax.get_xlim(), x_limits, ax.get_xscale() == 'log') and
+                    self._fits(ax.get_ylim(), y_limits, ax.get_yscale() == 'log')):
+                ax.set_xlim(*x_limits)
+                ax.set_ylim(*y_limits)
+                self._backgrounds = {}
+        if ax not in self._backgrounds:
+            self.draw_idle()
+            return
+        self.restore_region(self._backgrounds[ax])
+        for artist in self._artists[ax]:
+            ax.draw_artist(artist)
+        self.blit(ax.bbox)
+
+    @staticmethod
+    def _fits(current, wanted, log: bool) -> bool:
+        if log:
+            current, wanted = np.log10(current), np.log10(wanted)
+        span = current[1] - current[0]
+        wanted_span = wanted[1] - wanted[0]
+        return current[0] <= wanted[0] and wanted[1] <= current[1] and wanted_span >= 0.5 * span
+
+    def set_series(self, values) -> None:
+        """Shows the daily GB series (n = 1..N), downsampled with LTTB."""
+        y = np.asarray(values, dtype=np.float64)
+        x = np.arange(1, y.shape[0] + 1, dtype=np.float64)
+        keep = lttb_indices(x, y, self.max_points)
+        self._series_line.set_data(x[keep], y[keep])
+        limits = (_limits(1, max(len(y), 1)), _limits(y.min(), y.max())) if len(y) else (None, None)
+        self._refresh(self._series_ax, *limits)
+
+    def set_spectrum(self, amplitudes) -> None:
+        """Shows A_k for k = 1..K on log axes, downsampled to its min-max envelope in log k."""
+        A = np.asarray(amplitudes, dtype=np.float64)
+        k = np.arange(1, A.shape[0] + 1, dtype=np.float64)
+        # Zero amplitudes cannot be shown on a log axis
+        positive = A > 0
+        k, A = k[positive], A[positive]
+        keep = log_minmax_indices(k, A, self.max_points // 2)
+        self._spectrum_line.set_data(k[keep], A[keep])
+        self._spectrum_limits = (k[0], k[-1], A.min(), A.max()) if len(A) else None
+        self._refresh_spectrum()
+
+    def _refresh_spectrum(self):
+        """Repaints the spectrum axes with limits that cover the member and the bands."""
+        extents = [e for e in (self._spectrum_limits, self._band_limits) if e is not None]
+        limits = (None, None)
+        if extents:
+            k_low, k_high = min(e[0] for e in extents), max(e[1] for e in extents)
+            a_low, a_high = min(e[2] for e in extents), max(e[3] for e in extents)
+            limits = (_limits(k_low, max(k_high, k_low * 10), log=True), _limits(a_low, a_high, log=True))
+        self._refresh(self._spectrum_ax, *limits)
+
+    def set_bands(self, k, lower, upper, median=None) -> None:
+        """Shows a population band (for example P5-P95 of A_k) under the spectrum.
+
+        Args:
+            k: Frequencies of the band.
+            lower: Lower amplitude of the band at each k.
+            upper: Upper amplitude of the band at each k.
+            median: Optional typical amplitude, drawn as a dashed line.
+        """
+        has_median = median is not None
+        k = np.asarray(k, dtype=np.float64)
+        lower = np.asarray(lower, dtype=np.float64)
+        upper = np.asarray(upper, dtype=np.float64)
+        median = upper if median is None else np.asarray(median, dtype=np.float64)
+        # Only positive amplitudes can be shown on the log axes
+        keep = np.flatnonzero((k > 0) & (lower > 0) & (upper > 0) & (median > 0))
+        # Log-spaced subset: a smooth band needs few points per decade
+        if len(keep) > self.max_points:
+            keep = keep[np.unique(np.geomspace(1, len(keep), self.max_points).astype(np.intp) - 1)]
+        k, lower, upper, median = k[keep], lower[keep], upper[keep], median[keep]
+        if len(k):
+            self._band.set_verts([np.column_stack([np.concatenate([k, k[::-1]]),
+                                                   np.concatenate([lower, upper[::-1]])])])
+            self._band_limits = (k[0], k[-1], lower.min(), upper.max())
+        else:
+            self._band.set_verts([])
+            self._band_limits = None
+        if has_median and len(k):
+            self._band_median.set_data(k, median)
+        else:
+            self._band_median.set_data([], [])
+        self._refresh_spectrum()
+
+    def set_regression(self, x_values, y_values, alpha: float = None, c: float = None) -> None:
+        """Shows the log-log points and, if given, the line y = alpha * x + c."""
+        x = np.asarray(x_values, dtype=np.float64)
+        y = np.asarray(y_values, dtype=np.float64)
+        self._scatter.set_offsets(np.column_stack([x, y]) if len(x) else np.empty((0, 2)))
+        if alpha is not None and c is not None and len(x):
+            x_line = np.array([x.min(), x.max()])
+            self._regression_line.set_data(x_line, alpha * x_line + c)
+            self._equation.set_text(f'y = {alpha:.4f}x + {c:.4f}')
+        else:
+            self._regression_line.set_data([], [])
+            self._equation.set_text('')
+        limits = (_limits(x.min(), x.max()), _limits(y.min(), y.max())) if len(x) else (None, None)
+        self._refresh(self._loglog_ax, *limits)
+
+    def clear(self) -> None:
+        """Removes all data from the plots, including the population bands."""
+        self.set_bands([], [], [])
+        self.set_series([])
+        self.set_spectrum([])
+        self.set_regression([], [])
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+from src import core
+from models.batch import PersonBatch
+from models.person import CompactPerson, Person
+from utils.math_tools import calculate_activity_factor, calculate_daily_expenditure, calculate_fourier_spectrum
+
+@pytest.fixture
+def minutes():
+    return np.random.default_rng(23).integers(0, 120, (4, 50)).astype(np.float64)
+
+def _buffer(shape):
+    """A buffer whose stale contents would show through if it were not overwritten."""
+    return np.full(shape, np.nan)
+
+@pytest.mark.parametrize('backend', core.available_backends())
+def test_out_matches_allocating_call(backend, minutes):
+    """Each function writes into out, returns it and gives the allocating result."""
+    bmr = np.array([1500.0, 1650.0, 1420.0, 1800.0])
+    with core.use_backend(backend):
+        cases = [
+            (lambda out=None: calculate_activity_factor(minutes, out=out), minutes.shape),
+            (lambda out=None: calculate_daily_expenditure(bmr, minutes, out=out), minutes.shape),
+            (lambda out=None: calculate_daily_expenditure(1650.0, minutes[0], out=out), minutes.shape[1:]),
+            (lambda out=None: calculate_fourier_spectrum(minutes, 25, out=out), (4, 4, 25)),
+            (lambda out=None: calculate_fourier_spectrum(minutes[1], 25, out=out), (4, 25)),
+        ]
+        for function, shape in cases:
+            expected = function()
+            out = _buffer(shape)
+            result = function(out)
+            assert result is out
+            np.testing.assert_array_equal(out, expected)
+
+@pytest.mark.parametrize('backend', core.available_backends())
+def test_reused_buffer_holds_the_latest_result(backend, minutes):
+    """One buffer reused across members always holds the member just computed."""
+    out = _buffer((4, 25))
+    with core.use_backend(backend):
+        for row in minutes:
+            calculate_fourier_spectrum(row, 25, out=out)
+            np.testing.assert_array_equal(out, calculate_fourier_spectrum(row, 25))
+
+def test_model_methods_write_in_place(minutes):
+    """Person, CompactPerson and PersonBatch pass out through to the calculation."""
+    person = Person('M', 72.0, 180.0, 35, minutes[0].tolist())
+    compact = CompactPerson.from_person(person)
+    batch = PersonBatch(sex=np.array(['M', 'F', 'F', 'M']), weight=np.array([72.0, 60.0, 55.0, 90.0]),
+                        height=np.array([180.0, 165.0, 160.0, 185.0]), age=np.array([35, 40, 28, 60]),
+                        exercise_minutes=minutes)
+    for model, days in ((person, (50,)), (compact, (50,)), (batch, (4, 50))):
+        for method, shape in (('calculate_activity_factors', days), ('calculate_daily_expenditure', days),
+                              ('calculate_fourier_spectrum', (4,) + days[:-1] + (50,))):
+            expected = getattr(model, method)()
+            out = _buffer(shape)
+            assert getattr(model, method)(out=out) is out
+            np.testing.assert_array_equal(out, expected)
+
+def test_out_with_wrong_shape_raises(minutes):
+    """A spectrum buffer of the wrong shape is rejected instead of partly written."""
+    with pytest.raises(ValueError, match='out must have shape'):
+        calculate_fourier_spectrum(minutes[0], 25, out=_buffer((4, 24)))
@@ -0,0 +1,136 @@
+import numpy as np
+import pytest
+from multiprocessing import shared_memory
+from models.batch import PersonBatch
+from models.person import Person
+from utils import cohort_runner
+from utils.cohort_runner import attach_arrays, run_cohort, share_arrays
+
+FIELDS = ('bmr', 'mean_gb', 'alpha', 'intercept', 'r', 'correlation')
+
+@pytest.fixture
+def batch():
+    rng = np.random.default_rng(3)
+    m = 23
+    return PersonBatch(
+        sex=rng.choice(['M', 'F'], m),
+        weight=rng.uniform(50.0, 110.0, m),
+        height=rng.uniform(150.0, 200.0, m),
+        age=rng.integers(18, 80, m),
+        exercise_minutes=rng.integers(0, 120, (m, 30)).astype(np.float64)
+    )
+
+def _assert_same(results, expected):
+    for name in FIELDS:
+        np.testing.assert_allclose(getattr(results, name), getattr(expected, name), rtol=1e-12, equal_nan=True)
+
+def test_pool_matches_single_process(batch):
+    """Blocks spread over the pool come back in cohort order."""
+    single = run_cohort(batch, workers=1, with_amplitudes=True)
+    pooled = run_cohort(batch, workers=2, chunk_size=4, with_amplitudes=True)
+    _assert_same(pooled, single)
+    np.testing.assert_allclose(pooled.amplitudes, single.amplitudes, rtol=1e-12)
+    assert pooled.errors == single.errors == {}
+    assert pooled.ok.all()
+
+def test_matches_person(batch):
+    """The BMR and mean GB of every row match those of Person."""
+    results = run_cohort(batch, workers=2, chunk_size=5)
+    for i in range(len(batch)):
+        person = batch.person(i)
+        assert results.bmr[i] == pytest.approx(person.calculate_bmr(), rel=1e-12)
+        assert results.mean_gb[i] == pytest.approx(person.get_statistical_analysis().mean_y, rel=1e-12)
+
+def test_person_rows_match_from_people(batch):
+    """A cohort rebuilt from its Person rows gives the same results."""
+    people = [batch.person(i) for i in range(len(batch))]
+    assert isinstance(people[0], Person)
+    _assert_same(run_cohort(PersonBatch.from_people(people), workers=1), run_cohort(batch, workers=1))
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_bad_rows_are_reported(batch, workers):
+    """Invalid rows are left as nan with their message and do not affect the rest."""
+    batch.exercise_minutes[2, 5] = -1.0
+    batch.exercise_minutes[17, 0] = np.nan
+    batch.weight[11] = 0.0
+    results = run_cohort(batch, workers=workers, chunk_size=4)
+    assert list(results.errors) == [2, 11, 17]
+    assert 'Minutos' in results.errors[2] and 'Minutos' in results.errors[17]
+    assert 'Datos personales' in results.errors[11]
+    assert np.flatnonzero(~results.ok).tolist() == [2, 11, 17]
+    assert np.isnan(results.bmr[[2, 11, 17]]).all()
+    assert np.isfinite(results.bmr[results.ok]).all()
+    assert results.bmr[0] == pytest.approx(batch.person(0).calculate_bmr())
+
+def test_failed_block_is_retried_by_row(batch, monkeypatch):
+    """A failing block is retried row by row, so only the culprit fails."""
+    expected = run_cohort(batch, workers=1)
+    culprit = batch.weight[6]
+    analyze_block = cohort_runner._analyze_block
+    calls = []
+
+    def failing_block(attrs, *args):
+        calls.append(attrs.shape[1])
+        if culprit in attrs[1]:
+            raise ZeroDivisionError('fila rota')
+        return analyze_block(attrs, *args)
+
+    monkeypatch.setattr(cohort_runner, '_analyze_block', failing_block)
+    results = run_cohort(batch, workers=1, chunk_size=8)
+    assert results.errors == {6: 'ZeroDivisionError: fila rota'}
+    # Blocks of 8, 8 and 7 rows; the first is repeated one row at a time
+    assert calls == [8] + [1] * 8 + [8, 7]
+    expected.errors[6] = results.errors[6]
+    for name in FIELDS:
+        value = getattr(expected, name)
+        value[6] = np.nan
+        np.testing.assert_allclose(getattr(results, name), value, rtol=1e-12, equal_nan=True)
+
+def test_shared_arrays_round_trip():
+    """Each array keeps its type and contents and starts at a multiple of 8 bytes."""
+    arrays = {
+        'odd': np.arange(5, dtype=np.uint16),
+        'attrs': np.arange(12.0).reshape(3, 4),
+        'single': np.linspace(0.0, 1.0, 3, dtype=np.float32)
+    }
+    shm, layout = share_arrays(arrays)
+    try:
+        offsets, total = cohort_runner._offsets(layout)
+        assert all(offset % 8 == 0 for offset in offsets)
+        assert shm.size >= total
+        peer, views = attach_arrays(shm.name, layout)
+        try:
+            for key, array in arrays.items():
+                assert views[key].dtype == array.dtype
+                np.testing.assert_array_equal(views[key], array)
+            views['attrs'][0, 0] = -1.0  # views share the block, no copy
+            assert np.ndarray((3, 4), buffer=shm.buf, offset=offsets[1])[0, 0] == -1.0
+            del views
+        finally:
+            peer.close()
+    finally:
+        shm.close()
+        shm.unlink()
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=shm.name)
+
+def test_pool_releases_shared_block(batch, monkeypatch):
+    """run_cohort releases the shared block when it finishes."""
+    names = []
+
+    def recording_share(arrays):
+        shm, layout = share_arrays(arrays)
+        names.append(shm.name)
+        return shm, layout
+
+    monkeypatch.setattr(cohort_runner, 'share_arrays', recording_share)
+    run_cohort(batch, workers=2, chunk_size=6)
+    assert len(names) == 1
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=names[0])
+
+def test_single_chunk_runs_in_process(batch, monkeypatch):
+    """A single chunk is analysed in this process, without shared memory."""
+    monkeypatch.setattr(cohort_runner, 'share_arrays', None)
+    results = run_cohort(batch, workers=4, chunk_size=len(batch))
+    assert results.ok.all()
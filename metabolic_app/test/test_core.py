@@ -0,0 +1,186 @@
+import math
+import numpy as np
+import pytest
+from src import core
+from src.core import backends
+
+@pytest.fixture
+def series():
+    rng = np.random.default_rng(7)
+    return rng.uniform(1400.0, 3200.0, 45)
+
+def _others():
+    return [name for name in core.available_backends() if name != 'python']
+
+def test_python_and_numpy_are_always_available():
+    assert {'python', 'numpy'} <= set(core.available_backends())
+    assert core.get_backend('auto').name in core.available_backends()
+
+def test_backends_agree_with_reference(series):
+    """Every available backend matches the pure-Python kernels."""
+    minutes = series / 100.0
+    with core.use_backend('python'):
+        spectrum = core.fourier_spectrum(series)
+        zero_based = core.fourier_spectrum(series, 22, k_min=0, origin=0)
+        sums = core.fourier_coefficients(series, [1, 7, 45])
+        gb = core.daily_expenditure(1650.0, minutes)
+        fit = core.linear_fit(series, 2.0 * series + minutes)
+    for name in _others():
+        with core.use_backend(name):
+            np.testing.assert_allclose(core.fourier_spectrum(series)[:3], spectrum[:3], atol=1e-9)
+            np.testing.assert_allclose(core.fourier_spectrum(series, 22, k_min=0, origin=0)[:3],
+                                       zero_based[:3], atol=1e-9)
+            np.testing.assert_allclose(core.fourier_coefficients(series, [1, 7, 45]), sums, atol=1e-9)
+            np.testing.assert_allclose(core.daily_expenditure(1650.0, minutes), gb)
+            np.testing.assert_allclose(core.linear_fit(series, 2.0 * series + minutes), fit, atol=1e-8)
+
+def test_phase_origins_share_amplitudes(series):
+    """n = 1..N and n = 0..N-1 differ by a rotation of 2πk/N, not in A_k."""
+    one = core.fourier_spectrum(series, 10)
+    zero = core.fourier_spectrum(series, 10, origin=0)
+    np.testing.assert_allclose(one[2], zero[2])
+    angle = 2 * math.pi * 3 / series.size
+    a0, b0 = zero[0, 2], zero[1, 2]
+    assert one[0, 2] == pytest.approx(a0 * math.cos(angle) - b0 * math.sin(angle))
+    assert one[1, 2] == pytest.approx(a0 * math.sin(angle) + b0 * math.cos(angle))
+
+def test_rows_and_empty_series(series):
+    """A matrix gives one spectrum per row and an empty series gives zeros."""
+    rows = np.vstack([series, series[::-1]])
+    for name in core.available_backends():
+        with core.use_backend(name):
+            spectrum = core.fourier_spectrum(rows, 5)
+            assert spectrum.shape == (4, 2, 5)
+            np.testing.assert_allclose(spectrum[:, 0], core.fourier_spectrum(series, 5), atol=1e-9)
+            assert not core.fourier_spectrum([], 3).any()
+            alpha, _, r = core.linear_fit(np.arange(3.0), [[1.0, 2.0, 3.0], [5.0, 5.0, 5.0]])
+            assert alpha[0] == pytest.approx(1.0) and alpha[1] == pytest.approx(0.0)
+            assert math.isnan(r[1])
+
+def test_use_backend_restores_selection():
+    before = core.get_backend()
+    with core.use_backend('python') as backend:
+        assert core.get_backend() is backend
+        assert core.requested_backend() == 'python'
+    assert core.get_backend() is before
+
+def test_unknown_backend_raises():
+    with pytest.raises(ValueError, match='Unknown backend'):
+        core.set_backend('fortran')
+    unavailable = [name for name, status, _ in core.backend_rows()[0] if status == 'unavailable']
+    for name in unavailable:
+        with pytest.raises(ValueError, match='not available'):
+            core.get_backend(name)
+
+def test_invalid_environment_falls_back_to_auto(monkeypatch):
+    """A bad METABOLIC_BACKEND selects auto and says why in the report."""
+    monkeypatch.setenv('METABOLIC_BACKEND', 'fortran')
+    with core.use_backend('auto'):
+        monkeypatch.setattr(backends, '_active', None)
+        assert core.get_backend() is core.get_backend('auto')
+        assert 'METABOLIC_BACKEND=fortran' in core.backend_report()
+
+def test_fallback_kernels_and_report():
+    """Kernels a backend lacks come from its fallback, and the report lists them."""
+    numpy_backend = core.get_backend('numpy')
+    assert numpy_backend.provider('bmr') is numpy_backend
+    partial = backends.Backend('partial', 'Only mean', {'mean': lambda x: -1.0}, fallback='numpy')
+    assert partial.provider('mean') is partial
+    assert partial.provider('variance') is numpy_backend
+    with pytest.raises(ValueError, match='Unknown kernels'):
+        backends.Backend('bad', '', {'fft2': len})
+    with core.use_backend('numpy'):
+        report = core.backend_report()
+    assert 'Active backend: numpy' in report
+    assert all(kernel in report for kernel in core.KERNELS)
+
+def test_resolved_kernels_follow_registration(monkeypatch):
+    """Kernels are resolved once, and again after a fallback is replaced."""
+    monkeypatch.setattr(backends, '_backends', dict(backends._registry()))
+    core.register_backend(backends.Backend('base', '', {'mean': lambda x: 1.0}, fallback='numpy'))
+    top = backends.Backend('top', '', {}, fallback='base')
+    core.register_backend(top)
+    assert top.mean(None) == 1.0
+    assert 'mean' in vars(top)
+    core.register_backend(backends.Backend('base', '', {'mean': lambda x: 2.0}, fallback='numpy'))
+    assert top.mean(None) == 2.0
+
+def test_formulas_match_models():
+    """The shared BMR reads both sex label styles, for one person or arrays."""
+    assert core.bmr('M', 70, 175, 30) == pytest.approx(core.bmr('Masculino', 70, 175, 30))
+    assert core.bmr('F', 60, 165, 40) == pytest.approx(447.593 + 9.247 * 60 + 3.098 * 165 - 4.333 * 40)
+    np.testing.assert_allclose(core.bmr(['M', 'Femenino'], [70, 60], [175, 165], [30, 40]),
+                               [core.bmr('M', 70, 175, 30), core.bmr('F', 60, 165, 40)])
+    assert core.activity_factor(30) == pytest.approx(1.5)
+
+def test_loop_kernels_agree_with_reference(series):
+    """Sliding DFT, window median/MAD and column moments match on every backend."""
+    rows = np.vstack([series, series[::-1] / 3])
+    rows[0, 4:9] = np.nan
+    rows[1, :] = np.nan
+    k = np.arange(1, 11)
+    rotation = np.exp(-2j * np.pi * k / 20)
+
+    def run():
+        window = series[:20].copy()
+        sums = np.zeros(10, dtype=np.complex128)
+        start = core.sliding_dft_update(sums, rotation, window, 0, series[20:23])
+        return (sums, window, start, core.window_median_mad(rows, 7),
+                core.column_moments(np.nan_to_num(rows), ~np.isnan(rows)))
+
+    with core.use_backend('python'):
+        expected = run()
+    for name in _others():
+        with core.use_backend(name):
+            sums, window, start, (median, mad), moments = run()
+        np.testing.assert_allclose(sums, expected[0])
+        np.testing.assert_array_equal(window, expected[1])
+        assert start == expected[2] == 3
+        np.testing.assert_array_equal(median, expected[3][0])
+        np.testing.assert_array_equal(mad, expected[3][1])
+        for value, reference in zip(moments, expected[4]):
+            np.testing.assert_allclose(value, reference)
+
+def test_sliding_dft_tracks_the_window(series):
+    """After the update the sums are those of the last N samples (n = 1..N)."""
+    N = 16
+    sums = core.fourier_spectrum(series[:N], N // 2)
+    sums = (sums[0] + 1j * sums[1]) * (N / 2)
+    window = series[:N].copy()
+    start = core.sliding_dft_update(sums, np.exp(-2j * np.pi * np.arange(1, N // 2 + 1) / N), window, 0, series[N:N + 5])
+    expected = core.fourier_spectrum(series[5:N + 5], N // 2)
+    np.testing.assert_allclose(sums * (2 / N), expected[0] + 1j * expected[1], atol=1e-9)
+    np.testing.assert_array_equal(np.roll(window, -start), series[5:N + 5])
+
+def test_window_median_mad_edges():
+    """Windows are cut at the ends and ignore nan; an all-nan window gives nan."""
+    median, mad = core.window_median_mad([1.0, 5.0, np.nan, 2.0, np.nan, np.nan, np.nan], 3)
+    np.testing.assert_array_equal(median[:4], [3.0, 3.0, 3.5, 2.0])
+    np.testing.assert_array_equal(mad[:4], [2.0, 2.0, 1.5, 0.0])
+    assert np.isnan(median[5]) and np.isnan(mad[5])
+
+def test_compiled_goertzel_matches_fft(series):
+    """The Goertzel sums of the numba backend (plain Python without numba) match the FFT."""
+    from src.core import compiled
+    k = np.array([1, 2, 22, 23, 44, 45])
+    for origin in (0, 1):
+        out = np.empty((4, k.size))
+        compiled.fourier_sums(series, k, origin, out)
+        spectrum = core.fourier_spectrum(series, origin=origin)
+        np.testing.assert_allclose(out, spectrum[:, k - 1], atol=1e-9)
+
+def test_single_precision_spectrum(series):
+    """float32 spectra keep the mean exact and round relative to the deviations."""
+    rows = np.vstack([series, np.full(series.size, 2345.678)])
+    expected = core.fourier_spectrum(rows)
+    for name in core.available_backends():
+        with core.use_backend(name):
+            single = core.fourier_spectrum(rows, dtype=np.float32)
+        assert single.dtype == np.float32
+        deviation = 2 / series.size * np.abs(series - series.mean()).sum()
+        np.testing.assert_allclose(single[:3, 0, :-1], expected[:3, 0, :-1],
+                                   atol=series.size * np.finfo(np.float32).eps * deviation)
+        np.testing.assert_allclose(single[[0, 2, 3], :, -1], expected[[0, 2, 3], :, -1], rtol=1e-6)
+        assert not single[2, 1, :-1].any()
+    with pytest.raises(ValueError, match='float64 or float32'):
+        core.fourier_spectrum(series, dtype=np.float16)
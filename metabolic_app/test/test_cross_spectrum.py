@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+from models.batch import PersonBatch
+from utils.math_tools import calculate_cross_spectrum, calculate_fourier_spectrum
+
+@pytest.fixture
+def batch():
+    rng = np.random.default_rng(8)
+    m = 6
+    return PersonBatch(
+        sex=rng.choice(['M', 'F'], m),
+        weight=rng.uniform(50.0, 110.0, m),
+        height=rng.uniform(150.0, 200.0, m),
+        age=rng.integers(18, 80, m),
+        exercise_minutes=rng.integers(0, 120, (m, 90)).astype(np.float64)
+    )
+
+def test_sxx_is_squared_amplitude():
+    """With one segment and no window, sxx and syy are A_k² of each series."""
+    rng = np.random.default_rng(1)
+    x, y = rng.normal(2000.0, 150.0, 64), rng.normal(30.0, 10.0, 64)
+
+    spectrum = calculate_cross_spectrum(x, y, window=None)
+
+    assert spectrum.segments == 1
+    assert list(spectrum.k) == list(range(1, 33))
+    np.testing.assert_allclose(spectrum.period, 64 / spectrum.k)
+    np.testing.assert_allclose(spectrum.sxx, calculate_fourier_spectrum(x, 32)[2] ** 2, rtol=1e-10)
+    np.testing.assert_allclose(spectrum.syy, calculate_fourier_spectrum(y, 32)[2] ** 2, rtol=1e-10)
+    np.testing.assert_allclose(np.abs(spectrum.sxy) ** 2, spectrum.sxx * spectrum.syy, rtol=1e-10)
+
+def test_identical_series_are_coherent():
+    """A series is fully coherent with itself, in phase, across many segments."""
+    x = np.random.default_rng(2).normal(size=256)
+
+    spectrum = calculate_cross_spectrum(x, x, segment_length=32, overlap=0.5)
+
+    assert spectrum.segments == 15
+    np.testing.assert_allclose(spectrum.coherence, 1.0)
+    np.testing.assert_allclose(spectrum.phase, 0.0, atol=1e-12)
+    np.testing.assert_allclose(spectrum.sxy.real, spectrum.sxx)
+
+def test_independent_series_lose_coherence():
+    """Unrelated noise averaged over many segments has low coherence."""
+    rng = np.random.default_rng(3)
+
+    spectrum = calculate_cross_spectrum(rng.normal(size=4096), rng.normal(size=4096), segment_length=64)
+
+    assert spectrum.coherence.mean() < 0.1
+
+def test_phase_of_a_lagged_series():
+    """y lagging x by d days has phase -2πkd/L at the planted frequency."""
+    L, k0, d = 64, 4, 3
+    n = np.arange(L)
+    x = np.cos(2 * np.pi * k0 * n / L)
+    y = np.roll(x, d)  # y[n] = x[n - d]
+
+    spectrum = calculate_cross_spectrum(x, y, window=None)
+
+    assert spectrum.phase[k0 - 1] == pytest.approx(-2 * np.pi * k0 * d / L)
+    assert spectrum.coherence[k0 - 1] == pytest.approx(1.0)
+    # Swapping the series flips the sign
+    assert calculate_cross_spectrum(y, x, window=None).phase[k0 - 1] == pytest.approx(2 * np.pi * k0 * d / L)
+
+def test_batch_rows_match_single_series(batch):
+    """Each row of the cohort result is the cross spectrum of that member alone."""
+    spectrum = batch.get_cross_spectrum(segment_length=30)
+    gb = batch.calculate_daily_expenditure()
+
+    assert spectrum.sxx.shape == (len(batch), 15)
+    for i in range(len(batch)):
+        single = calculate_cross_spectrum(batch.exercise_minutes[i], gb[i], segment_length=30)
+        np.testing.assert_allclose(spectrum.sxy[i], single.sxy, rtol=1e-10)
+        np.testing.assert_allclose(spectrum.coherence[i], single.coherence, rtol=1e-10)
+
+def test_across_members_averages_rows(batch):
+    """across_members averages the per-member spectra before forming coherence and phase."""
+    rows = batch.get_cross_spectrum(segment_length=30)
+
+    cohort = batch.get_cross_spectrum(segment_length=30, across_members=True)
+
+    assert cohort.sxx.shape == (15,)
+    np.testing.assert_allclose(cohort.sxx, rows.sxx.mean(axis=0), rtol=1e-10)
+    np.testing.assert_allclose(cohort.syy, rows.syy.mean(axis=0), rtol=1e-10)
+    np.testing.assert_allclose(cohort.sxy, rows.sxy.mean(axis=0), rtol=1e-10)
+    expected = np.abs(cohort.sxy) ** 2 / (cohort.sxx * cohort.syy)
+    np.testing.assert_allclose(cohort.coherence, expected, rtol=1e-10)
+    np.testing.assert_allclose(cohort.phase, np.angle(cohort.sxy))
+
+def test_invalid_arguments():
+    """Mismatched shapes and out-of-range parameters raise ValueError."""
+    x = np.zeros(10)
+    with pytest.raises(ValueError):
+        calculate_cross_spectrum(x, np.zeros(11))
+    with pytest.raises(ValueError):
+        calculate_cross_spectrum(x, x, segment_length=11)
+    with pytest.raises(ValueError):
+        calculate_cross_spectrum(x, x, overlap=1.0)
+    with pytest.raises(ValueError):
+        calculate_cross_spectrum(x, x, window='hamming')
@@ -0,0 +1,66 @@
+import numpy as np
+from src.utils.downsampling import log_minmax_indices, lttb_indices, minmax_indices
+
+def test_lttb_keeps_short_series():
+    """Tests that a series within the budget is returned whole."""
+    x = np.arange(10)
+    assert list(lttb_indices(x, x ** 2, 10)) == list(range(10))
+    assert list(lttb_indices(x, x ** 2, 50)) == list(range(10))
+
+def test_lttb_selects_one_point_per_bucket():
+    """Tests the size, order and end points of an LTTB selection."""
+    x = np.arange(10_000)
+    y = np.sin(x / 100.0)
+    y[4321] = 50.0  # a spike has the largest triangle in its bucket
+
+    indices = lttb_indices(x, y, 200)
+
+    assert len(indices) == 200
+    assert indices[0] == 0 and indices[-1] == len(x) - 1
+    assert np.all(np.diff(indices) > 0)
+    assert 4321 in indices
+
+def test_minmax_keeps_extremes():
+    """Tests that the min-max envelope keeps the global extremes of the series."""
+    y = np.random.default_rng(3).normal(size=100_001)
+
+    indices = minmax_indices(y, 500)
+
+    assert len(indices) <= 1000
+    assert np.all(np.diff(indices) > 0)
+    assert y[indices].max() == y.max()
+    assert y[indices].min() == y.min()
+    assert indices[-1] < len(y)
+
+def test_minmax_keeps_short_series():
+    """Tests that a series within the budget is returned whole."""
+    assert list(minmax_indices([3.0, 1.0, 2.0], 5)) == [0, 1, 2]
+
+def test_log_minmax_keeps_every_decade():
+    """Tests that binning in log k keeps the low-k points and each bin's extremes."""
+    k = np.arange(1, 100_001, dtype=np.float64)
+    A = np.random.default_rng(5).lognormal(size=k.shape[0]) / k
+
+    indices = log_minmax_indices(k, A, 500)
+
+    assert len(indices) <= 1000
+    assert np.all(np.diff(indices) > 0)
+    # Bins narrower than one point: the first decades are kept whole
+    assert list(indices[:10]) == list(range(10))
+    decades = np.floor(np.log10(k[indices]))
+    assert set(decades) >= {0.0, 1.0, 2.0, 3.0, 4.0}
+    assert A[indices].max() == A.max()
+    assert A[indices].min() == A.min()
+    # Equal-width bins in k lose the first decades to one bin
+    assert np.count_nonzero(minmax_indices(A, 500) < 100) < 10
+
+    edges = np.geomspace(k[0], k[-1], 501)
+    bins = np.clip(np.searchsorted(edges, k, side='right') - 1, 0, 499)
+    for b in np.unique(bins)[::37]:
+        members = np.flatnonzero(bins == b)
+        assert members[np.argmin(A[members])] in indices
+        assert members[np.argmax(A[members])] in indices
+
+def test_log_minmax_keeps_short_series():
+    """Tests that a series within the budget is returned whole."""
+    assert list(log_minmax_indices([1.0, 2.0, 3.0], [3.0, 1.0, 2.0], 5)) == [0, 1, 2]
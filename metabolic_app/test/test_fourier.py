@@ -1,6 +1,6 @@
 import pytest
 import math
-from src.models.fourier import calculate_angular_frequency, calculate_fourier_coefficients, calculate_log_transformations
+from src.models.fourier import calculate_angular_frequency, calculate_fourier_coefficients, calculate_log_transformations, calculate_specific_fourier_coefficients, calculate_amplitude_spectrum
 
 def test_calculate_angular_frequency():
     """Tests the calculate_angular_frequency function."""
@@ -57,6 +57,18 @@ def test_calculate_fourier_coefficients():
     assert b_k == pytest.approx(expected_b_k)
     assert A_k == pytest.approx(expected_A_k)
 
+def test_fourier_coefficients_reject_short_data():
+    """Tests that a series shorter than N raises instead of computing a shorter transform."""
+    data = [2100.0, 2350.5, 1980.2]
+
+    with pytest.raises(ValueError):
+        calculate_fourier_coefficients(data, 7)
+    with pytest.raises(ValueError):
+        calculate_specific_fourier_coefficients(data, 7, 3)
+
+    # Extra points beyond N are still ignored
+    assert calculate_fourier_coefficients(data + [0.0], 3) == calculate_fourier_coefficients(data, 3)
+
 def test_calculate_log_transformations():
     """Tests the calculate_log_transformations function."""
     k_values = [1, 2, 3]
@@ -82,4 +94,15 @@ def test_calculate_log_transformations_with_zero():
     log10_k, log10_A_k = calculate_log_transformations(k_values, A_k_values)
 
     assert log10_k == pytest.approx(expected_log10_k)
-    assert log10_A_k == pytest.approx(expected_log10_A_k) 
\ No newline at end of file
+    assert log10_A_k == pytest.approx(expected_log10_A_k) 
+
+def test_calculate_amplitude_spectrum_matches_direct_sums():
+    """Tests that the FFT amplitudes match calculate_specific_fourier_coefficients."""
+    data = [2100.0, 2350.5, 1980.2, 2600.0, 2200.7, 2450.1, 2050.3]
+    N = len(data)
+
+    _, _, _, expected_A_k = calculate_specific_fourier_coefficients(data, N, N)
+    A_k = calculate_amplitude_spectrum(data, N)
+
+    assert list(A_k) == pytest.approx(expected_A_k)
+    assert len(calculate_amplitude_spectrum(data)) == N // 2
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+from src.utils.helpers import parse_numeric_column, read_spectrum_bands, split_pasted_column
+
+def test_parse_numeric_column():
+    """Tests vectorized parsing with both decimal separators and surrounding spaces."""
+    values = parse_numeric_column(["30", " 12.5 ", "7,25", "0"], "Minutos", maximum=1440)
+    assert values.dtype == np.float64
+    assert values.tolist() == [30.0, 12.5, 7.25, 0.0]
+
+def test_parse_numeric_column_reports_every_invalid_cell():
+    """Tests that empty, non-numeric and out-of-range cells are reported together."""
+    values = ["10", "", "abc", "-1", "2000", None, "nan", "5"]
+    with pytest.raises(ValueError) as error:
+        parse_numeric_column(values, "Minutos", maximum=1440, first_row=11)
+    message = str(error.value)
+    assert "empty: rows 12, 16" in message
+    assert "not a number: rows 13, 17" in message
+    assert "out of range [0, 1440]: rows 14, 15" in message
+
+def test_split_pasted_column():
+    """Tests splitting spreadsheet clipboard text, keeping the last copied column."""
+    assert split_pasted_column("1\t30\r\n2\t45,5\r\n3\t\r\n") == ["30", "45,5", ""]
+    assert split_pasted_column("10\n20") == ["10", "20"]
+    assert split_pasted_column("\n") == []
+
+def test_read_spectrum_bands(tmp_path):
+    """Tests that the outer percentiles form the band and P50 is the median."""
+    path = tmp_path / "bands.csv"
+    path.write_text("k,Personas,Media log10(A_k),Desv. log10(A_k),P5,P50,P95\n"
+                    "1,10,1.0,0.1,5,10,20\n"
+                    "2,10,0.5,0.1,1,3,6\n")
+
+    k, lower, upper, median = read_spectrum_bands(str(path))
+
+    assert k.tolist() == [1.0, 2.0]
+    assert lower.tolist() == [5.0, 1.0]
+    assert upper.tolist() == [20.0, 6.0]
+    assert median.tolist() == [10.0, 3.0]
@@ -0,0 +1,92 @@
+import json
+import tracemalloc
+import pytest
+from src.utils.instrumentation import Instrumentation
+
+def test_disabled_profiler_records_nothing():
+    """Stages run normally but nothing is recorded while disabled."""
+    profiler = Instrumentation()
+
+    @profiler.instrument('decorated')
+    def work():
+        return 42
+
+    with profiler.stage('block'):
+        pass
+    assert work() == 42
+    assert profiler.stats() == {}
+
+def test_stage_counts_calls_and_time():
+    """Each execution of a stage adds one call and its wall time."""
+    profiler = Instrumentation(enabled=True)
+
+    @profiler.instrument('decorated')
+    def work(x):
+        return x * 2
+
+    for _ in range(3):
+        with profiler.stage('block'):
+            assert work(2) == 4
+
+    stats = profiler.stats()
+    assert list(stats) == ['decorated', 'block']
+    assert stats['block'].calls == 3
+    assert stats['decorated'].calls == 3
+    assert stats['block'].total_s >= stats['decorated'].total_s
+    assert stats['block'].min_s <= stats['block'].mean_s <= stats['block'].max_s
+
+def test_stage_records_exceptions():
+    """A stage that raises is still recorded and the exception propagates."""
+    profiler = Instrumentation(enabled=True)
+    with pytest.raises(ValueError):
+        with profiler.stage('failing'):
+            raise ValueError("boom")
+    assert profiler.stats()['failing'].calls == 1
+
+def test_memory_tracing_nested_stages():
+    """Allocations are attributed to the stage and propagated to its parent's peak."""
+    was_tracing = tracemalloc.is_tracing()
+    profiler = Instrumentation(enabled=True, trace_memory=True)
+    try:
+        with profiler.stage('outer'):
+            with profiler.stage('inner'):
+                data = bytearray(1_000_000)
+            del data
+        stats = profiler.stats()
+        assert stats['inner'].allocated_bytes >= 1_000_000
+        assert stats['inner'].peak_bytes >= 1_000_000
+        assert stats['outer'].peak_bytes >= 1_000_000
+        assert stats['outer'].allocated_bytes < 1_000_000
+    finally:
+        profiler.configure(False)
+    assert tracemalloc.is_tracing() == was_tracing
+
+def test_reset_and_summary_rows():
+    """summary_rows formats one row per stage and reset clears them."""
+    profiler = Instrumentation(enabled=True)
+    with profiler.stage('block'):
+        pass
+    rows = profiler.summary_rows()
+    assert len(rows) == 1 and rows[0][0] == 'block' and rows[0][1] == '1'
+    profiler.reset()
+    assert profiler.summary_rows() == []
+
+def test_dump_json_and_chrome_trace(tmp_path):
+    """Statistics and stage executions can be written to disk."""
+    profiler = Instrumentation(enabled=True)
+    with profiler.stage('fourier.spectrum'):
+        with profiler.stage('fourier.populate'):
+            pass
+
+    json_path = tmp_path / "stats.json"
+    profiler.dump_json(str(json_path))
+    data = json.loads(json_path.read_text())
+    assert data['stages']['fourier.spectrum']['calls'] == 1
+
+    trace_path = tmp_path / "trace.json"
+    profiler.dump_chrome_trace(str(trace_path))
+    events = json.loads(trace_path.read_text())['traceEvents']
+    assert [e['name'] for e in events] == ['fourier.populate', 'fourier.spectrum']
+    assert all(e['ph'] == 'X' and e['dur'] >= 0 for e in events)
+    assert events[0]['args']['depth'] == 1
+    assert events[0]['cat'] == 'fourier'
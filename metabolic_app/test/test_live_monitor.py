@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from src import core
+from utils.live_monitor import SlidingSpectrum
+from utils.math_tools import calculate_fourier_spectrum
+
+WINDOW = 64
+
+@pytest.fixture
+def samples():
+    return np.random.default_rng(13).normal(2200.0, 250.0, 3 * WINDOW)
+
+def _fresh(spectrum):
+    """Spectrum of the current window computed from scratch."""
+    return calculate_fourier_spectrum(spectrum.values(), spectrum.k_max)
+
+@pytest.mark.parametrize('backend', core.available_backends())
+def test_sliding_update_matches_fresh_fft(backend, samples):
+    """Every day slid into a full window gives the spectrum of that window."""
+    with core.use_backend(backend):
+        spectrum = SlidingSpectrum(WINDOW)
+        spectrum.extend(samples[:WINDOW])
+        for day, value in enumerate(samples[WINDOW:], WINDOW + 1):
+            spectrum.append(value)
+            # Between resynchronisations the result comes from the O(K) update
+            assert spectrum._since_sync == (day - WINDOW) % WINDOW
+            np.testing.assert_array_equal(spectrum.values(), samples[day - WINDOW:day])
+            np.testing.assert_allclose(spectrum.coefficients(), _fresh(spectrum), rtol=1e-9, atol=1e-9)
+
+@pytest.mark.parametrize('backend', core.available_backends())
+def test_short_blocks_match_fresh_fft(backend, samples):
+    """Blocks short enough for the sliding update match the window's FFT."""
+    with core.use_backend(backend):
+        spectrum = SlidingSpectrum(WINDOW, k_max=10)
+        spectrum.extend(samples[:WINDOW])
+        for start in range(WINDOW, 2 * WINDOW, 3):
+            spectrum.extend(samples[start:start + 3])
+            assert spectrum.coefficients().shape == (4, 10)
+            np.testing.assert_allclose(spectrum.coefficients(), _fresh(spectrum), rtol=1e-9, atol=1e-9)
+
+def test_filling_and_long_blocks(samples):
+    """A partial window and a block longer than the window use the FFT directly."""
+    spectrum = SlidingSpectrum(WINDOW)
+    spectrum.extend(samples[:10])
+    assert len(spectrum) == 10
+    np.testing.assert_array_equal(spectrum.coefficients(), calculate_fourier_spectrum(samples[:10], 5))
+
+    spectrum.extend(samples[10:2 * WINDOW + 5])
+
+    assert len(spectrum) == WINDOW
+    np.testing.assert_array_equal(spectrum.values(), samples[WINDOW + 5:2 * WINDOW + 5])
+    np.testing.assert_allclose(spectrum.coefficients(), _fresh(spectrum), rtol=1e-12)
+    spectrum.reset()
+    assert len(spectrum) == 0
+    with pytest.raises(ValueError):
+        SlidingSpectrum(1)
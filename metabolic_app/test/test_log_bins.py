@@ -0,0 +1,87 @@
+import math
+import numpy as np
+import pytest
+from utils.math_tools import calculate_log_binned_spectrum, calculate_loglog_fit, log_bin_edges
+
+def _manual_bins(A_k, edges):
+    """Count, mean log10(k), mean and variance of log10(A_k) per bin with plain loops."""
+    rows = []
+    for start, stop in zip(edges[:-1], edges[1:]):
+        points = [(math.log10(k), math.log10(A_k[k - 1])) for k in range(start, stop) if A_k[k - 1] > 0]
+        if not points:
+            rows.append((0, math.nan, math.nan, math.nan))
+            continue
+        mean = sum(y for _, y in points) / len(points)
+        rows.append((len(points), sum(x for x, _ in points) / len(points), mean,
+                     sum((y - mean) ** 2 for _, y in points) / len(points)))
+    return [np.array(column) for column in zip(*rows)]
+
+@pytest.mark.parametrize('K, bins', [(1, 32), (20, 32), (32, 32), (182, 32), (5000, 16)])
+def test_edges_cover_every_k_once(K, bins):
+    """Edges start at 1, end at K + 1, increase strictly and give at most ``bins`` bins."""
+    edges = log_bin_edges(K, bins)
+
+    assert edges[0] == 1 and edges[-1] == K + 1
+    assert np.all(np.diff(edges) > 0)
+    assert len(edges) - 1 <= min(K, bins)
+    if K <= bins:
+        assert list(edges) == list(range(1, K + 2))
+
+def test_edges_are_geometric():
+    """Wide spectra get bins whose width grows with k."""
+    widths = np.diff(log_bin_edges(10_000, 32))
+
+    assert np.all(np.diff(widths) >= 0)
+    assert widths[-1] > 100 * widths[0]
+
+@pytest.mark.parametrize('K, bins', [(20, 32), (182, 32), (5000, 16)])
+def test_binned_statistics_match_manual_loop(K, bins):
+    """Count, mean and variance per bin equal an explicit loop, skipping A_k <= 0."""
+    A_k = np.random.default_rng(K).lognormal(size=K) / np.arange(1, K + 1)
+    A_k[::7] = 0.0
+    edges = log_bin_edges(K, bins)
+    count, log_k, mean, variance = _manual_bins(A_k.tolist(), edges.tolist())
+
+    binned = calculate_log_binned_spectrum(A_k, bins)
+
+    np.testing.assert_array_equal(binned.k_start, edges[:-1])
+    np.testing.assert_array_equal(binned.k_stop, edges[1:])
+    np.testing.assert_array_equal(binned.count, count)
+    np.testing.assert_allclose(binned.log_k, log_k, rtol=1e-12, equal_nan=True)
+    np.testing.assert_allclose(binned.mean, mean, rtol=1e-12, equal_nan=True)
+    np.testing.assert_allclose(binned.variance, variance, rtol=1e-9, atol=1e-15, equal_nan=True)
+
+def test_rows_are_binned_independently():
+    """With a matrix, each row gets the bins of that row alone."""
+    rows = np.random.default_rng(6).lognormal(size=(3, 300))
+
+    binned = calculate_log_binned_spectrum(rows)
+
+    for i, row in enumerate(rows):
+        single = calculate_log_binned_spectrum(row)
+        np.testing.assert_allclose(binned.mean[i], single.mean, rtol=1e-12)
+        np.testing.assert_allclose(binned.variance[i], single.variance, rtol=1e-9, atol=1e-15)
+
+def test_empty_and_zero_spectra_give_nan():
+    """No amplitudes, or only zero amplitudes, leave every bin without data."""
+    empty = calculate_log_binned_spectrum(np.array([]))
+    assert empty.count.shape == (0,)
+    assert empty.k_start.shape == (0,)
+
+    zeros = calculate_log_binned_spectrum(np.zeros(100))
+    assert np.all(zeros.count == 0)
+    assert np.isnan(zeros.mean).all()
+    assert np.isnan(zeros.variance).all()
+    assert all(math.isnan(value) for value in calculate_loglog_fit(np.zeros(100)))
+
+def test_binned_fit_recovers_power_law():
+    """A pure power law gives the same slope with and without binning."""
+    k = np.arange(1, 2001, dtype=np.float64)
+    A_k = 50.0 * k ** -0.8
+
+    alpha, intercept, r = calculate_loglog_fit(A_k)
+
+    assert float(alpha) == pytest.approx(-0.8)
+    assert float(intercept) == pytest.approx(math.log10(50.0))
+    assert float(r) == pytest.approx(-1.0)
+    np.testing.assert_allclose(calculate_loglog_fit(A_k, bins=None), (alpha, intercept, r))
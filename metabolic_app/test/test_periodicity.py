@@ -0,0 +1,68 @@
+import math
+import numpy as np
+import pytest
+from models.person import Person
+from utils.math_tools import calculate_autocorrelation, calculate_periodicity
+
+def _direct_acf(x, max_lag):
+    """Biased autocorrelation with an explicit loop over lags."""
+    centred = [value - sum(x) / len(x) for value in x]
+    c0 = sum(value * value for value in centred) / len(x)
+    return [sum(centred[n] * centred[n + lag] for n in range(len(x) - lag)) / len(x) / c0
+            for lag in range(max_lag + 1)]
+
+@pytest.mark.parametrize('n, max_lag', [(2, None), (7, None), (50, 10), (129, None)])
+def test_autocorrelation_matches_lag_loop(n, max_lag):
+    """The FFT autocorrelation equals the direct sum at every lag."""
+    x = np.random.default_rng(n).normal(2000.0, 200.0, n)
+    expected = _direct_acf(x.tolist(), n - 1 if max_lag is None else max_lag)
+
+    acf = calculate_autocorrelation(x, max_lag)
+
+    assert acf[0] == 1.0
+    np.testing.assert_allclose(acf, expected, rtol=1e-9, atol=1e-12)
+
+def test_autocorrelation_rows_and_constant_series():
+    """Each row is handled on its own; a constant row gives nan."""
+    rng = np.random.default_rng(4)
+    rows = np.vstack([rng.normal(size=40), np.full(40, 1680.0), rng.normal(size=40)])
+
+    acf = calculate_autocorrelation(rows, 12)
+
+    assert acf.shape == (3, 13)
+    assert np.isnan(acf[1]).all()
+    for i in (0, 2):
+        np.testing.assert_allclose(acf[i], _direct_acf(rows[i].tolist(), 12), rtol=1e-9, atol=1e-12)
+
+def test_planted_weekly_period_is_detected():
+    """A weekly exercise routine gives a dominant period of 7 days."""
+    rng = np.random.default_rng(7)
+    weekly = np.tile([60.0, 0.0, 45.0, 0.0, 90.0, 0.0, 0.0], 52)
+    minutes = np.clip(weekly + rng.normal(0.0, 10.0, weekly.size), 0.0, None)
+    person = Person('M', 75.0, 178.0, 40, minutes.tolist())
+
+    analysis = person.get_periodicity_analysis()
+
+    assert analysis.dominant_period == pytest.approx(7.0, abs=0.2)
+    assert analysis.strength > analysis.threshold
+    assert analysis.autocorrelation.shape == (len(weekly) // 2 + 1,)
+
+def test_white_noise_has_no_period():
+    """White noise stays under the threshold, so no period is reported."""
+    analysis = calculate_periodicity(np.random.default_rng(12).normal(size=365))
+
+    assert math.isnan(analysis.dominant_period)
+    assert math.isnan(analysis.strength)
+    assert np.all(analysis.autocorrelation[1:] < analysis.threshold)
+
+def test_periodicity_per_row():
+    """With a matrix, each row gets its own period."""
+    n = np.arange(364)
+    rows = np.vstack([np.cos(2 * np.pi * n / 7), np.random.default_rng(9).normal(size=364),
+                      np.cos(2 * np.pi * n / 30)])
+
+    analysis = calculate_periodicity(rows)
+
+    assert analysis.dominant_period[0] == pytest.approx(7.0, abs=0.05)
+    assert np.isnan(analysis.dominant_period[1])
+    assert analysis.dominant_period[2] == pytest.approx(30.0, abs=0.5)
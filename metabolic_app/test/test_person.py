@@ -0,0 +1,67 @@
+import pickle
+import sys
+import numpy as np
+import pytest
+from models.person import CompactPerson, Person
+
+def _person_bytes(person):
+    """Bytes held by a list-based Person: instance, attributes, list and its floats."""
+    minutes = person.exercise_minutes
+    return (sys.getsizeof(person) + sys.getsizeof(person.__dict__) + sys.getsizeof(minutes)
+            + sum(sys.getsizeof(value) for value in minutes)
+            + sum(sys.getsizeof(value) for value in (person.weight, person.height, person.age)))
+
+def _compact_bytes(person):
+    """Bytes held by a CompactPerson: instance and its packed arrays."""
+    return sys.getsizeof(person) + sys.getsizeof(person._data) + sys.getsizeof(person._minutes)
+
+@pytest.fixture
+def person():
+    rng = np.random.default_rng(5)
+    return Person('F', 61.5, 166.0, 37, [float(m) for m in rng.integers(0, 120, 365)])
+
+@pytest.mark.parametrize('precision, fraction', [('double', 0.35), ('single', 0.12)])
+def test_compact_footprint_stays_small(person, precision, fraction):
+    """The packed variant is a small fraction of Person, before and after calculating."""
+    compact = CompactPerson.from_person(person, precision)
+    before = _compact_bytes(compact)
+    assert before < fraction * _person_bytes(person)
+    compact.calculate_daily_expenditure()
+    compact.get_daily_data()
+    compact.calculate_fourier_spectrum()
+    assert _compact_bytes(compact) == before
+    assert not hasattr(compact, '__dict__')
+
+@pytest.mark.parametrize('precision', ['double', 'single'])
+def test_compact_matches_person(person, precision):
+    """Integer minutes give the same series and coefficients in both variants."""
+    compact = CompactPerson.from_person(person, precision)
+    assert compact.calculate_bmr() == person.calculate_bmr()
+    np.testing.assert_array_equal(compact.calculate_activity_factors(), person.calculate_activity_factors())
+    np.testing.assert_array_equal(compact.calculate_daily_expenditure(), person.calculate_daily_expenditure())
+    assert compact.get_daily_data() == person.get_daily_data()
+    for k in (1, 7, 52, 365):
+        assert compact.calculate_fourier_coefficients(k) == person.calculate_fourier_coefficients(k)
+    assert compact.get_fourier_table(7) == person.get_fourier_table(7)
+    assert compact.get_statistical_analysis() == person.get_statistical_analysis()
+
+def test_compact_results_are_fresh(person):
+    """Each call returns its own array; out= writes into the given buffer."""
+    compact = CompactPerson.from_person(person)
+    gb = compact.calculate_daily_expenditure()
+    gb[0] = -1.0
+    assert compact.calculate_daily_expenditure()[0] == person.calculate_daily_expenditure()[0]
+    out = np.empty(len(compact))
+    assert compact.calculate_daily_expenditure(out=out) is out
+    np.testing.assert_array_equal(out, person.calculate_daily_expenditure())
+    with pytest.raises(ValueError):
+        compact.exercise_minutes[0] = 1.0
+
+def test_compact_round_trips(person):
+    compact = CompactPerson.from_person(person, 'single')
+    restored = pickle.loads(pickle.dumps(compact))
+    assert restored.precision is compact.precision
+    np.testing.assert_array_equal(restored.exercise_minutes, compact.exercise_minutes)
+    back = compact.to_person()
+    assert (back.sex, back.weight, back.height, back.age) == ('F', 61.5, 166.0, 37)
+    assert back.exercise_minutes == person.exercise_minutes
@@ -0,0 +1,96 @@
+from collections import Counter
+import pytest
+from utils.pipeline import Pipeline
+
+@pytest.fixture
+def runs():
+    return Counter()
+
+@pytest.fixture
+def pipeline(runs):
+    """x -> doubled -> total <- y, y -> shifted (independent branch)."""
+    def node(name, function):
+        def wrapped(*args):
+            runs[name] += 1
+            return function(*args)
+        return wrapped
+
+    p = Pipeline()
+    p.add_input('x', 2)
+    p.add_input('y', 10)
+    p.add_node('doubled', node('doubled', lambda x: 2 * x), ['x'])
+    p.add_node('total', node('total', lambda d, y: d + y), ['doubled', 'y'])
+    p.add_node('shifted', node('shifted', lambda y: y - 1), ['y'])
+    return p
+
+def test_nothing_runs_until_requested(pipeline, runs):
+    assert not runs
+    assert not pipeline.is_current('total')
+    assert pipeline.get('doubled') == 4
+    assert runs == {'doubled': 1}
+    assert pipeline.get('total') == 14
+    assert pipeline.get('total') == 14
+    assert runs == {'doubled': 1, 'total': 1}
+    assert pipeline.is_current('total') and not pipeline.is_current('shifted')
+
+def test_set_input_recomputes_only_dependents(pipeline, runs):
+    pipeline.get('total'), pipeline.get('shifted')
+    pipeline.set_input('y', 20)
+    assert pipeline.is_current('doubled')
+    assert not pipeline.is_current('total') and not pipeline.is_current('shifted')
+    assert runs == {'doubled': 1, 'total': 1, 'shifted': 1}  # invalidating does not recompute
+    assert pipeline.get('total') == 24
+    assert runs == {'doubled': 1, 'total': 2, 'shifted': 1}
+
+def test_invalidate_cascades(pipeline, runs):
+    pipeline.get('total'), pipeline.get('shifted')
+    pipeline.invalidate('doubled')
+    assert not pipeline.is_current('doubled') and not pipeline.is_current('total')
+    assert pipeline.is_current('shifted')
+    assert pipeline.get('total') == 14
+    assert runs == {'doubled': 2, 'total': 2, 'shifted': 1}
+
+def test_seed_skips_the_stage(pipeline, runs):
+    pipeline.seed('doubled', 100)
+    assert pipeline.get('total') == 110
+    assert runs == {'total': 1}
+    # Seeding invalidates the dependents but keeps the seeded value
+    pipeline.get('total')
+    pipeline.seed('doubled', 50)
+    assert pipeline.is_current('doubled') and not pipeline.is_current('total')
+    assert pipeline.get('total') == 60
+    assert runs == {'total': 2}
+    # A changed input drops the seeded value and the stage runs again
+    pipeline.set_input('x', 3)
+    assert pipeline.get('total') == 16
+    assert runs == {'doubled': 1, 'total': 3}
+
+def test_failed_stage_is_not_cached(runs):
+    p = Pipeline()
+    p.add_input('x', 0)
+
+    def inverse(x):
+        runs['inverse'] += 1
+        return 1 / x
+
+    p.add_node('inverse', inverse, ['x'])
+    with pytest.raises(ZeroDivisionError):
+        p.get('inverse')
+    assert not p.is_current('inverse')
+    p.set_input('x', 4)
+    assert p.get('inverse') == 0.25
+    assert runs == {'inverse': 2}
+
+def test_graph_errors():
+    p = Pipeline()
+    p.add_input('x')
+    with pytest.raises(ValueError):
+        p.get('x')
+    with pytest.raises(ValueError):
+        p.add_node('y', lambda z: z, ['z'])
+    with pytest.raises(ValueError):
+        p.add_input('x')
+    with pytest.raises(KeyError):
+        p.set_input('missing', 1)
+    with pytest.raises(KeyError):
+        p.seed('x', 1)
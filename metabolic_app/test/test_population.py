@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+from models.batch import PersonBatch
+from utils.population import PopulationSpectrum
+
+N_DAYS = 60
+
+@pytest.fixture
+def batch():
+    rng = np.random.default_rng(21)
+    m = 40
+    return PersonBatch(
+        sex=rng.choice(['M', 'F'], m),
+        weight=rng.uniform(50.0, 110.0, m),
+        height=rng.uniform(150.0, 200.0, m),
+        age=rng.integers(18, 80, m),
+        exercise_minutes=rng.integers(0, 120, (m, N_DAYS)).astype(np.float64)
+    )
+
+def _log_amplitudes(batch):
+    """log10(A_k) of every member, one Person at a time."""
+    return np.array([batch.person(i).calculate_fourier_spectrum(N_DAYS // 2)[3] for i in range(len(batch))])
+
+def test_mean_and_std_match_per_person_loop(batch):
+    """Block-wise moments equal the mean and std of the per-person spectra."""
+    expected = _log_amplitudes(batch)
+    population = PopulationSpectrum(N_DAYS)
+
+    population.add_batch(batch, chunk_size=7)
+
+    assert population.members == len(batch)
+    assert list(population.count) == [len(batch)] * (N_DAYS // 2)
+    np.testing.assert_allclose(population.mean, expected.mean(axis=0), rtol=1e-12)
+    np.testing.assert_allclose(population.std, expected.std(axis=0, ddof=1), rtol=1e-10)
+    np.testing.assert_array_equal(population.minimum, expected.min(axis=0))
+    np.testing.assert_array_equal(population.maximum, expected.max(axis=0))
+
+def test_percentiles_within_one_bin_of_per_person_loop(batch):
+    """Histogram percentiles stay within one bin width of the exact order statistics."""
+    expected = _log_amplitudes(batch)
+    population = PopulationSpectrum(N_DAYS, bins=512)
+    population.add_batch(batch, chunk_size=9)
+    width = population._edges[1] - population._edges[0]
+
+    estimated = population.percentiles((5, 50, 95))
+
+    exact = np.percentile(expected, (5, 50, 95), axis=0, method='inverted_cdf')
+    assert estimated.shape == (3, N_DAYS // 2)
+    assert np.all(np.abs(estimated - exact) <= width + 1e-12)
+    bands = population.bands((5, 50, 95))
+    np.testing.assert_array_equal(bands.values, estimated)
+    np.testing.assert_array_equal(bands.k, np.arange(1, N_DAYS // 2 + 1))
+
+def test_merge_equals_single_pass(batch):
+    """Two aggregators merged give the moments and histogram of one pass."""
+    whole = PopulationSpectrum(N_DAYS, log_range=(-2.0, 4.0))
+    whole.add_batch(batch)
+    first, second = PopulationSpectrum(N_DAYS, log_range=(-2.0, 4.0)), PopulationSpectrum(N_DAYS, log_range=(-2.0, 4.0))
+    half = len(batch) // 2
+    first.add(batch.calculate_daily_expenditure()[:half])
+    second.add(batch.calculate_daily_expenditure()[half:])
+
+    first.merge(second)
+
+    assert first.members == whole.members
+    np.testing.assert_allclose(first.mean, whole.mean, rtol=1e-12)
+    np.testing.assert_allclose(first.std, whole.std, rtol=1e-10)
+    np.testing.assert_array_equal(first._histogram, whole._histogram)
+
+def test_rank_orders_members_like_their_amplitudes(batch):
+    """Ranks follow the order of A_k and stay near the exact share of members below."""
+    spectra = np.array([batch.person(i).calculate_fourier_spectrum(N_DAYS // 2)[2] for i in range(len(batch))])
+    population = PopulationSpectrum(N_DAYS, bins=4096)
+    population.add_batch(batch)
+
+    ranks = population.rank(spectra)
+
+    order = np.argsort(spectra, axis=0)
+    assert np.all(np.diff(np.take_along_axis(ranks, order, axis=0), axis=0) >= 0)
+    below = 100.0 * (spectra[:, np.newaxis, :] < spectra[np.newaxis, :, :]).sum(axis=0) / len(batch)
+    # A member is interpolated inside its histogram bin, which may hold a neighbour
+    assert np.all(np.abs(ranks - below) <= 2 * 100.0 / len(batch))
+    with pytest.raises(ValueError):
+        population.rank(spectra[:, :-1])
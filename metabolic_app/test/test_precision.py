@@ -0,0 +1,105 @@
+import numpy as np
+import pytest
+from models.batch import PersonBatch
+from models.person import CompactPerson, Person
+from utils.math_tools import DOUBLE, SINGLE, get_precision, minutes_dtype, store_minutes
+
+EPS32 = np.finfo(np.float32).eps
+
+@pytest.fixture
+def minutes():
+    return np.random.default_rng(29).integers(0, 600, (5, 365)).astype(np.float64)
+
+def _batch(minutes, precision):
+    return PersonBatch(sex=np.array(['M', 'F', 'F', 'M', 'F']),
+                       weight=np.array([72.0, 60.0, 55.0, 90.0, 81.5]),
+                       height=np.array([180.0, 165.0, 160.0, 185.0, 172.0]),
+                       age=np.array([35, 40, 28, 60, 47]), exercise_minutes=minutes, precision=precision)
+
+def _spectrum_tolerance(gb):
+    """A few ε₃₂ of the largest deviation from the mean (the level is removed in float64).
+
+    Much tighter than the worst-case N·ε₃₂ in benchmarks/accuracy.py; every
+    backend stays two orders of magnitude below it.
+    """
+    deviation = np.abs(gb - gb.mean(axis=-1, keepdims=True)).max(axis=-1, keepdims=True)
+    return 16 * EPS32 * deviation
+
+@pytest.mark.parametrize('values, dtype', [
+    ([0.0, 45.0, 1440.0, 65535.0], np.uint16),
+    ([0.0, 45.5, 30.0], np.float32),
+    ([-1.0, 30.0], np.float32),
+    ([65536.0, 30.0], np.float32),
+    ([], np.uint16),
+])
+def test_single_storage_type(values, dtype):
+    """Whole minutes in the uint16 range are stored as uint16, anything else as float32."""
+    stored = store_minutes(np.array(values), SINGLE)
+
+    assert stored.dtype == dtype
+    assert minutes_dtype(values, 'single') == dtype
+    np.testing.assert_array_equal(stored.astype(np.float64), np.array(values, dtype=dtype))
+    assert store_minutes(np.array(values), DOUBLE).dtype == np.float64
+
+def test_integer_minutes_round_trip(minutes):
+    """uint16 storage keeps every integer minute exactly, in batches and in CompactPerson."""
+    batch = _batch(minutes, 'single')
+    assert batch.exercise_minutes.dtype == np.uint16
+    np.testing.assert_array_equal(batch.exercise_minutes.astype(np.float64), minutes)
+
+    people = [batch.person(i) for i in range(len(batch))]
+    rebuilt = PersonBatch.from_people(people, precision='single')
+    assert rebuilt.exercise_minutes.dtype == np.uint16
+    np.testing.assert_array_equal(rebuilt.exercise_minutes, batch.exercise_minutes)
+
+    compact = CompactPerson.from_person(Person('M', 72.0, 180.0, 35, minutes[0].tolist()), 'single')
+    assert compact.precision is SINGLE
+    assert compact.exercise_minutes.dtype == np.uint16
+    assert compact.to_person().exercise_minutes == minutes[0].tolist()
+
+def test_fractional_minutes_round_trip_in_float32():
+    """Minutes that are not whole fall back to float32, exact for float32 values."""
+    values = np.random.default_rng(31).uniform(0.0, 180.0, 365).astype(np.float32).astype(np.float64)
+
+    compact = CompactPerson('F', 60.0, 165.0, 40, values.tolist(), precision='single')
+
+    assert compact.exercise_minutes.dtype == np.float32
+    np.testing.assert_array_equal(compact.exercise_minutes.astype(np.float64), values)
+
+def test_batch_single_spectrum_within_float32_tolerance(minutes):
+    """The single-precision spectrum of a cohort stays within the float32 bound of double."""
+    double, single = _batch(minutes, 'double'), _batch(minutes, 'single')
+    gb = double.calculate_daily_expenditure()
+
+    expected = double.calculate_fourier_spectrum()
+    result = single.calculate_fourier_spectrum()
+
+    assert result.dtype == np.float32 and expected.dtype == np.float64
+    np.testing.assert_array_equal(single.calculate_daily_expenditure(), gb)
+    tolerance = _spectrum_tolerance(gb)
+    for row in range(3):
+        assert np.all(np.abs(result[row] - expected[row]) <= tolerance)
+
+def test_compact_single_spectrum_within_float32_tolerance(minutes):
+    """CompactPerson in single precision matches the double spectrum of Person."""
+    person = Person('F', 61.5, 166.0, 37, minutes[1].tolist())
+    compact = CompactPerson.from_person(person, 'single')
+    gb = np.asarray(person.calculate_daily_expenditure())
+
+    expected = person.calculate_fourier_spectrum(182)
+    result = compact.calculate_fourier_spectrum(182)
+
+    assert result.dtype == np.float32
+    tolerance = _spectrum_tolerance(gb)
+    for row in range(3):
+        assert np.all(np.abs(result[row] - expected[row]) <= tolerance)
+    # An explicit float64 buffer gives the double result
+    out = np.empty((4, 182))
+    np.testing.assert_allclose(compact.calculate_fourier_spectrum(182, out=out), expected, rtol=1e-12)
+
+def test_unknown_precision():
+    """Precisions are looked up by name; unknown names raise."""
+    assert get_precision(None) is DOUBLE
+    assert get_precision('single') is SINGLE
+    with pytest.raises(ValueError):
+        get_precision('half')
@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+from models.batch import PersonBatch
+from utils.prefilter import FilterConfig, filter_minutes
+
+SPIKES = (10, 50)
+GLITCHES = {80: 1440.0, 90: np.nan, 100: -5.0}
+
+@pytest.fixture
+def clean():
+    """A slowly changing routine: no day is far from its neighbours."""
+    return 40.0 + 10.0 * np.sin(2 * np.pi * np.arange(120) / 60)
+
+@pytest.fixture
+def spiked(clean):
+    x = clean.copy()
+    x[list(SPIKES)] = 600.0
+    for day, value in GLITCHES.items():
+        x[day] = value
+    return x
+
+def _planted():
+    return sorted(SPIKES + tuple(GLITCHES))
+
+@pytest.mark.parametrize('mode', ['clip', 'interpolate'])
+def test_clean_data_is_left_alone(clean, mode):
+    """A series without outliers comes back unchanged and unflagged."""
+    result = filter_minutes(clean, FilterConfig(mode=mode))
+
+    np.testing.assert_array_equal(result.values, clean)
+    assert not result.flagged.any()
+    assert result.counts == 0
+
+def test_clip_replaces_planted_spikes(clean, spiked):
+    """Spikes are clipped to the window band and glitches take the window median."""
+    result = filter_minutes(spiked)
+
+    assert list(np.flatnonzero(result.flagged)) == _planted()
+    assert list(np.flatnonzero(result.changed)) == _planted()
+    assert result.counts == len(_planted())
+    others = np.setdiff1d(np.arange(clean.size), _planted())
+    np.testing.assert_array_equal(result.values[others], clean[others])
+    for day in SPIKES:
+        assert 30.0 <= result.values[day] < 60.0
+    for day in GLITCHES:
+        window = np.delete(spiked[day - 3:day + 4], 3)
+        assert result.values[day] == np.median(window)
+
+def test_interpolate_replaces_planted_spikes(clean, spiked):
+    """Flagged points are interpolated between their unflagged neighbours."""
+    result = filter_minutes(spiked, FilterConfig(mode='interpolate'))
+
+    assert list(np.flatnonzero(result.changed)) == _planted()
+    for day in _planted():
+        assert result.values[day] == pytest.approx((clean[day - 1] + clean[day + 1]) / 2)
+    assert np.isfinite(result.values).all()
+
+def test_zeros_are_glitches_only_when_asked():
+    """Rest days within the band are kept unless flag_zeros marks every zero."""
+    x = np.tile([0.0, 45.0, 50.0], 20)
+    config = FilterConfig(threshold=10.0)
+
+    assert filter_minutes(x, config).counts == 0
+    result = filter_minutes(x, FilterConfig(threshold=10.0, flag_zeros=True))
+    assert list(np.flatnonzero(result.changed)) == list(range(0, 60, 3))
+    assert (result.values > 0).all()
+
+def test_batch_filters_each_member(clean, spiked):
+    """PersonBatch.filter_outliers filters every row and leaves the original cohort alone."""
+    minutes = np.vstack([clean, spiked, spiked[::-1]])
+    batch = PersonBatch(sex=np.array(['M', 'F', 'F']), weight=np.array([70.0, 60.0, 65.0]),
+                        height=np.array([175.0, 165.0, 170.0]), age=np.array([30, 40, 50]),
+                        exercise_minutes=minutes.copy())
+
+    filtered, result = batch.filter_outliers()
+
+    assert list(result.counts) == [0, len(_planted()), len(_planted())]
+    np.testing.assert_array_equal(batch.exercise_minutes, minutes)
+    np.testing.assert_array_equal(filtered.exercise_minutes[0], clean)
+    for i in (1, 2):
+        np.testing.assert_array_equal(filtered.exercise_minutes[i], filter_minutes(minutes[i]).values)
+    np.testing.assert_array_equal(filtered.weight, batch.weight)
+
+def test_invalid_config():
+    """Even windows and unknown modes are rejected."""
+    with pytest.raises(ValueError):
+        FilterConfig(window=6)
+    with pytest.raises(ValueError):
+        FilterConfig(mode='median')
@@ -0,0 +1,71 @@
+import csv
+import os
+import numpy as np
+import pytest
+from models.batch import PersonBatch
+from utils.cohort_runner import run_cohort
+from utils.reports import ReportData, _ReportFigure, generate_reports
+
+@pytest.fixture
+def batch():
+    rng = np.random.default_rng(11)
+    m = 5
+    return PersonBatch(
+        sex=rng.choice(['M', 'F'], m),
+        weight=rng.uniform(50.0, 110.0, m),
+        height=rng.uniform(150.0, 200.0, m),
+        age=rng.integers(18, 80, m),
+        exercise_minutes=rng.integers(0, 120, (m, 60)).astype(np.float64)
+    )
+
+def _index(directory):
+    with open(os.path.join(directory, 'index.csv'), newline='', encoding='utf-8') as f:
+        return list(csv.reader(f))
+
+@pytest.mark.parametrize('fmt, magic', [('html', b'<html>'), ('pdf', b'%PDF')])
+def test_reports_for_a_cohort(batch, tmp_path, fmt, magic):
+    """Writes one report per person and lists each file in index.csv."""
+    summary = generate_reports(batch, str(tmp_path), fmt=fmt, workers=1, chunk_size=2)
+
+    assert summary.written == len(batch)
+    assert summary.errors == {}
+    assert summary.manifest == os.path.join(str(tmp_path), 'index.csv')
+    rows = _index(tmp_path)
+    assert rows[0] == ['persona', 'archivo', 'error']
+    assert [row[0] for row in rows[1:]] == [str(i + 1) for i in range(len(batch))]
+    for _, name, error in rows[1:]:
+        assert error == ''
+        assert name.endswith('.' + fmt)
+        with open(os.path.join(str(tmp_path), name), 'rb') as f:
+            assert f.read(8).startswith(magic)
+
+def test_reports_list_failed_members(batch, tmp_path):
+    """A member whose analysis failed gets an error row and no report."""
+    results = run_cohort(batch, workers=1, with_amplitudes=True)
+    results.errors[2] = 'ValueError: prueba'
+
+    summary = generate_reports(batch, str(tmp_path), results=results, fmt='html', workers=1)
+
+    assert summary.written == len(batch) - 1
+    assert summary.errors == {2: 'ValueError: prueba'}
+    rows = {row[0]: row[1:] for row in _index(tmp_path)[1:]}
+    assert rows['3'] == ['', 'ValueError: prueba']
+    assert len(os.listdir(str(tmp_path))) == len(batch)
+
+def test_spectrum_keeps_low_k():
+    """The log-log scatter of a long spectrum keeps every point of the first decades."""
+    n = 100_000
+    data = ReportData(
+        sex='F', weight=60.0, height=165.0, age=30.0,
+        exercise_minutes=np.zeros(n), bmr=1400.0, activity_factors=np.full(n, 1.2),
+        daily_expenditure=np.full(n, 1680.0),
+        amplitudes=np.random.default_rng(2).lognormal(size=n // 2),
+        alpha=-0.5, intercept=1.0, r=-0.9, correlation=0.0
+    )
+    figure = _ReportFigure()
+
+    figure.update(data)
+
+    x, _ = figure.points.get_data()
+    assert len(x) <= 2000
+    np.testing.assert_allclose(x[:100], np.log10(np.arange(1, 101)))
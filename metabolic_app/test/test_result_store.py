@@ -0,0 +1,83 @@
+import threading
+import numpy as np
+import pytest
+from src.utils.result_store import Leases, ResultStore, person_fingerprint
+
+def test_fingerprint_matches_across_front_ends():
+    """Both sex labels and list or array minutes give the same key."""
+    assert (person_fingerprint('gb', 'M', 70, 175, 30, [10, 20]) ==
+            person_fingerprint('gb', 'Masculino', 70.0, 175.0, 30, np.array([10.0, 20.0])))
+    assert person_fingerprint('gb', 'M', 70, 175, 30, [10, 20]) != person_fingerprint('gb', 'M', 70, 175, 30, [10, 21])
+    assert person_fingerprint('gb', 'M', 70, 175, 30, [10]) != person_fingerprint('amplitudes', 'M', 70, 175, 30, [10])
+
+def test_acquire_computes_once_and_shares():
+    """A second lease on the same key reuses the stored, read-only result."""
+    store = ResultStore()
+    calls = []
+    first = store.acquire('key', lambda: calls.append(1) or np.arange(3.0))
+    second = store.acquire('key', lambda: calls.append(1) or np.arange(3.0))
+    assert first is second
+    assert len(calls) == 1
+    assert not first.flags.writeable
+    assert store.stats()['hits'] == 1
+
+def test_leased_entries_are_not_evicted():
+    """Only entries without leases are evicted when the budget is exceeded."""
+    store = ResultStore(budget_bytes=100)
+    store.acquire('a', lambda: np.zeros(10))  # 80 bytes
+    store.acquire('b', lambda: np.zeros(10))
+    assert 'a' in store and 'b' in store
+    store.release('a')
+    assert 'a' not in store and 'b' in store
+    store.release('b')
+    assert 'b' in store  # within budget again, kept as cache
+    store.set_budget(0)
+    assert len(store) == 0
+
+def test_release_without_lease_raises():
+    store = ResultStore()
+    store.acquire('a', lambda: 1)
+    store.release('a')
+    with pytest.raises(KeyError):
+        store.release('a')
+
+def test_leases_move_with_each_slot():
+    """Recalculating a slot releases the previous result of that slot."""
+    store = ResultStore(budget_bytes=0)
+    leases = Leases(store)
+    leases.get('gb', 'old', lambda: np.zeros(4))
+    leases.get('gb', 'new', lambda: np.ones(4))
+    assert 'old' not in store and 'new' in store
+    leases.release_all()
+    assert len(store) == 0
+
+def test_concurrent_requests_compute_once():
+    """Threads asking for the same missing key wait for a single computation."""
+    store = ResultStore()
+    started = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        started.wait(1.0)
+        return np.ones(2)
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(store.acquire('key', compute))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    started.set()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+
+def test_failed_computation_is_not_stored():
+    store = ResultStore()
+
+    def fail():
+        raise ValueError('bad input')
+
+    with pytest.raises(ValueError):
+        store.acquire('key', fail)
+    assert store.acquire('key', lambda: 5) == 5
@@ -0,0 +1,107 @@
+import dataclasses
+import numpy as np
+import pytest
+from models.person import Person
+from utils import session as sessions
+from utils.math_tools import calculate_binned_loglog_fit, calculate_log_binned_spectrum
+from utils.session import SECTION_VERSIONS, Session, load_session, save_session
+
+@pytest.fixture
+def session():
+    rng = np.random.default_rng(11)
+    person = Person('F', 62.5, 168.0, 41, rng.integers(0, 90, 60).astype(np.float64))
+    spectrum = person.calculate_fourier_spectrum()
+    log_bins = calculate_log_binned_spectrum(spectrum[2])
+    results = {
+        'expenditure': person.calculate_daily_expenditure(),
+        'spectrum': spectrum,
+        'log_bins': log_bins,
+        'regression': tuple(float(v) for v in calculate_binned_loglog_fit(log_bins)),
+    }
+    return Session(person, k=7, filtered=True, results=results)
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'sesion.npz')
+
+def _assert_same_results(loaded, expected):
+    assert list(loaded) == list(expected)
+    for name, value in expected.items():
+        if name == 'log_bins':
+            for f in dataclasses.fields(value):
+                np.testing.assert_array_equal(getattr(loaded[name], f.name), getattr(value, f.name))
+        else:
+            np.testing.assert_array_equal(loaded[name], value)
+
+@pytest.mark.parametrize('mmap', [True, False])
+def test_round_trip(session, path, mmap):
+    save_session(path, session)
+    loaded = load_session(path, mmap=mmap)
+    person = loaded.person
+    assert (person.sex, person.weight, person.height, person.age) == ('F', 62.5, 168.0, 41)
+    np.testing.assert_array_equal(person.exercise_minutes, session.person.exercise_minutes)
+    assert (loaded.k, loaded.filtered, loaded.stale) == (7, True, ())
+    _assert_same_results(loaded.results, session.results)
+    assert isinstance(loaded.results['regression'], tuple)
+
+def test_mmap_maps_and_read_copies(session, path):
+    """With mmap the arrays are mapped read-only; without it they are read into memory."""
+    save_session(path, session)
+    mapped = load_session(path)
+    read = load_session(path, mmap=False)
+    for name in ('expenditure', 'spectrum'):
+        assert isinstance(mapped.results[name], np.memmap)
+        assert not isinstance(read.results[name], np.memmap)
+        assert read.results[name].flags.writeable
+        with pytest.raises(ValueError):
+            mapped.results[name][0] = 0.0
+        np.testing.assert_array_equal(mapped.results[name], read.results[name])
+    assert isinstance(mapped.person.exercise_minutes, np.memmap)
+
+def test_save_over_mapped_session(session, path):
+    """Saving over the mapped file does not break the open session."""
+    save_session(path, session)
+    mapped = load_session(path)
+    expected = np.array(mapped.results['spectrum'])
+    mapped.k = 3
+    save_session(path, mapped)  # reads from the mapping while writing the same file
+    reloaded = load_session(path)
+    assert reloaded.k == 3
+    _assert_same_results(reloaded.results, session.results)
+    reloaded.results['spectrum'] = expected * 2.0
+    save_session(path, reloaded)
+    np.testing.assert_array_equal(mapped.results['spectrum'], expected)
+    np.testing.assert_array_equal(load_session(path).results['spectrum'], expected * 2.0)
+
+@pytest.mark.parametrize('bumped, stale', [
+    ('expenditure', ('expenditure', 'spectrum', 'log_bins', 'regression')),
+    ('spectrum', ('spectrum', 'log_bins', 'regression')),
+    ('log_bins', ('log_bins', 'regression')),
+    ('regression', ('regression',)),
+])
+def test_version_bump_drops_dependents(session, path, monkeypatch, bumped, stale):
+    """Bumping a section version drops that section and the ones derived from it."""
+    save_session(path, session)
+    monkeypatch.setitem(SECTION_VERSIONS, bumped, SECTION_VERSIONS[bumped] + 1)
+    loaded = load_session(path)
+    assert loaded.stale == stale
+    assert list(loaded.results) == [name for name in SECTION_VERSIONS if name not in stale]
+
+def test_missing_sections_are_not_stale(session, path):
+    del session.results['log_bins'], session.results['regression']
+    save_session(path, session)
+    loaded = load_session(path)
+    assert list(loaded.results) == ['expenditure', 'spectrum']
+    assert loaded.stale == ()
+
+def test_rejects_other_files(path):
+    np.savez(path, values=np.arange(3))
+    with pytest.raises(ValueError):
+        load_session(path)
+
+def test_rejects_other_formats(session, path, monkeypatch):
+    monkeypatch.setattr(sessions, 'SESSION_FORMAT', sessions.SESSION_FORMAT + 1)
+    save_session(path, session)
+    monkeypatch.undo()
+    with pytest.raises(ValueError, match='Formato'):
+        load_session(path)
@@ -1,6 +1,7 @@
 import pytest
 import math
-from src.models.statistics import calculate_mean, calculate_std_dev, calculate_regression_slope, calculate_regression_intercept, calculate_correlation_coefficient
+import numpy as np
+from src.models.statistics import calculate_mean, calculate_std_dev, calculate_regression_slope, calculate_regression_intercept, calculate_correlation_coefficient, calculate_theil_sen_slope, calculate_siegel_slope, calculate_robust_intercept
 
 def test_calculate_mean():
     """Tests the calculate_mean function."""
@@ -79,4 +80,69 @@ def test_calculate_correlation_coefficient_zero_std_dev():
     y_values = [1, 2, 3, 4]
     N = len(x_values)
     with pytest.raises(ZeroDivisionError):
-        calculate_correlation_coefficient(x_values, y_values, N) 
\ No newline at end of file
+        calculate_correlation_coefficient(x_values, y_values, N) 
+
+def _pairwise_slopes(x_values, y_values):
+    """All pair slopes, listed directly (the O(n²) definition)."""
+    return [(y_values[j] - y_values[i]) / (x_values[j] - x_values[i])
+            for i in range(len(x_values)) for j in range(i + 1, len(x_values)) if x_values[i] != x_values[j]]
+
+def _median(values):
+    values = sorted(values)
+    middle = len(values) // 2
+    return values[middle] if len(values) % 2 else (values[middle - 1] + values[middle]) / 2
+
+@pytest.mark.parametrize('n', [5, 128, 129, 1000])
+def test_lists_and_arrays_agree(n):
+    """Short lists are reduced in plain Python, longer ones and arrays by the core."""
+    rng = np.random.default_rng(n)
+    x = rng.uniform(0.0, 3.0, n)
+    y = 2.0 * x + rng.normal(0.0, 0.5, n)
+    xs, ys = x.tolist(), y.tolist()
+    assert calculate_mean(ys) == pytest.approx(float(np.mean(y)), rel=1e-12)
+    assert calculate_std_dev(ys, 1.0) == pytest.approx(float(np.sqrt(np.mean((y - 1.0) ** 2))), rel=1e-12)
+    alpha = calculate_regression_slope(xs, ys, n)
+    assert alpha == pytest.approx(calculate_regression_slope(x, y, n), rel=1e-9)
+    assert alpha == pytest.approx(np.polyfit(x, y, 1)[0], rel=1e-9)
+    assert calculate_correlation_coefficient(xs, ys, n) == pytest.approx(np.corrcoef(x, y)[0, 1], rel=1e-9)
+    assert calculate_correlation_coefficient(x, y, n) == pytest.approx(np.corrcoef(x, y)[0, 1], rel=1e-9)
+
+def test_calculate_theil_sen_slope_matches_pairwise_median():
+    """Tests calculate_theil_sen_slope against the median of all pair slopes, with ties in x."""
+    rng = np.random.default_rng(3)
+    for n in (2, 3, 10, 57, 400):
+        x_values = rng.integers(0, n, n).astype(float).tolist()
+        y_values = (0.5 * np.array(x_values) + rng.standard_cauchy(n)).tolist()
+        if len(set(x_values)) < 2:
+            continue
+        expected = _median(_pairwise_slopes(x_values, y_values))
+        assert calculate_theil_sen_slope(x_values, y_values) == pytest.approx(expected)
+
+def test_calculate_siegel_slope_matches_repeated_median():
+    """Tests calculate_siegel_slope against the median of each point's median slope."""
+    rng = np.random.default_rng(4)
+    for n in (3, 10, 101, 400):
+        x_values = rng.normal(size=n).tolist()
+        y_values = (-1.5 * np.array(x_values) + rng.normal(size=n)).tolist()
+        inner = [_median([(y_values[j] - y_values[i]) / (x_values[j] - x_values[i]) for j in range(n) if j != i])
+                 for i in range(n)]
+        assert calculate_siegel_slope(x_values, y_values) == pytest.approx(_median(inner))
+
+def test_robust_slopes_ignore_outliers():
+    """Tests that a near-zero amplitude in a log-log fit does not move the robust slopes."""
+    x_values = [math.log10(k) for k in range(1, 21)]
+    y_values = [2.0 - 1.2 * x for x in x_values]
+    y_values[3] = -12.0  # log10 of an almost vanishing A_k
+    ols = calculate_regression_slope(x_values, y_values, len(x_values))
+    assert ols != pytest.approx(-1.2, abs=0.1)
+    assert calculate_theil_sen_slope(x_values, y_values) == pytest.approx(-1.2)
+    assert calculate_siegel_slope(x_values, y_values) == pytest.approx(-1.2)
+    alpha = calculate_siegel_slope(x_values, y_values)
+    assert calculate_robust_intercept(x_values, y_values, alpha) == pytest.approx(2.0)
+
+def test_robust_slopes_vertical_line():
+    """Tests the robust slopes with all x values equal."""
+    with pytest.raises(ZeroDivisionError):
+        calculate_theil_sen_slope([1, 1, 1], [1, 2, 3])
+    with pytest.raises(ZeroDivisionError):
+        calculate_siegel_slope([1, 1, 1], [1, 2, 3])
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+from models.batch import PersonBatch
+from utils.math_tools import calculate_bmr, calculate_fourier_spectrum, calculate_loglog_fit
+from utils.sweep import BMR_COEFFICIENT_SETS, sweep_parameters
+
+BASES = (1.1, 1.2, 1.375)
+SLOPES = (0.005, 0.01)
+
+@pytest.fixture
+def batch():
+    rng = np.random.default_rng(17)
+    m = 12
+    return PersonBatch(
+        sex=rng.choice(['M', 'F'], m),
+        weight=rng.uniform(50.0, 110.0, m),
+        height=rng.uniform(150.0, 200.0, m),
+        age=rng.integers(18, 80, m),
+        exercise_minutes=rng.integers(0, 120, (m, 56)).astype(np.float64)
+    )
+
+def _direct(batch, coefficients, base, slope):
+    """GB, alpha and C of every member computed from the GB series of that grid point."""
+    bmr = calculate_bmr(batch.sex, batch.weight, batch.height, batch.age, coefficients)
+    gb = bmr[:, np.newaxis] * (base + slope * batch.exercise_minutes)
+    alpha, intercept, _ = calculate_loglog_fit(calculate_fourier_spectrum(gb, gb.shape[1] // 2)[2])
+    return gb.mean(axis=1), alpha, intercept
+
+def test_grid_shape_and_rows(batch):
+    """Every field has shape (formulas, bases, slopes) and rows() lists them in order."""
+    names = ('harris_benedict', 'mifflin_st_jeor')
+
+    result = sweep_parameters(batch, BASES, SLOPES, coefficient_sets=names)
+
+    assert result.coefficient_sets == names
+    for field in ('mean_gb', 'std_gb', 'alpha', 'std_alpha', 'intercept'):
+        assert getattr(result, field).shape == (2, 3, 2)
+    assert (result.members, result.skipped) == (len(batch), 0)
+    rows = result.rows()
+    assert len(rows) == 12
+    assert [(row['Fórmula TMB'], row['Base AF'], row['Pendiente AF']) for row in rows[:3]] == \
+        [('harris_benedict', 1.1, 0.005), ('harris_benedict', 1.1, 0.01), ('harris_benedict', 1.2, 0.005)]
+    assert rows[-1]['GB medio'] == result.mean_gb[1, 2, 1]
+
+def test_grid_values_match_direct_calculation(batch):
+    """Each grid point equals the cohort mean of GB, alpha and C computed per point."""
+    result = sweep_parameters(batch, BASES, SLOPES, chunk_size=5)
+
+    assert result.coefficient_sets == tuple(BMR_COEFFICIENT_SETS)
+    for c, name in enumerate(result.coefficient_sets):
+        for b, base in enumerate(BASES):
+            for s, slope in enumerate(SLOPES):
+                gb, alpha, intercept = _direct(batch, BMR_COEFFICIENT_SETS[name], base, slope)
+                assert result.mean_gb[c, b, s] == pytest.approx(gb.mean(), rel=1e-12)
+                assert result.std_gb[c, b, s] == pytest.approx(gb.std(ddof=1), rel=1e-9)
+                assert result.alpha[c, b, s] == pytest.approx(alpha.mean(), rel=1e-9)
+                assert result.std_alpha[c, b, s] == pytest.approx(alpha.std(ddof=1), rel=1e-7)
+                assert result.intercept[c, b, s] == pytest.approx(intercept.mean(), rel=1e-9)
+
+def test_custom_sets_and_invalid_members(batch):
+    """Custom formulas join the grid, invalid members are skipped and unknown names raise."""
+    custom = {'constante': {'M': (1500.0, 0.0, 0.0, 0.0), 'F': (1500.0, 0.0, 0.0, 0.0)}}
+    batch.exercise_minutes[3, 5] = np.nan
+
+    result = sweep_parameters(batch, 1.2, 0.01, coefficient_sets=['constante'], custom_sets=custom)
+
+    assert (result.members, result.skipped) == (len(batch) - 1, 1)
+    expected = 1500.0 * (1.2 + 0.01 * np.delete(batch.exercise_minutes, 3, axis=0).mean(axis=1))
+    assert result.mean_gb[0, 0, 0] == pytest.approx(expected.mean(), rel=1e-12)
+    with pytest.raises(ValueError):
+        sweep_parameters(batch, coefficient_sets=['desconocida'])
+
+def test_zero_slope_has_no_spectrum(batch):
+    """Without a slope the GB is flat: the mean is TMB·base and alpha is nan."""
+    result = sweep_parameters(batch, BASES, (0.0,), coefficient_sets=['harris_benedict'])
+
+    bmr = calculate_bmr(batch.sex, batch.weight, batch.height, batch.age)
+    np.testing.assert_allclose(result.mean_gb[0, :, 0], bmr.mean() * np.array(BASES), rtol=1e-12)
+    assert np.isnan(result.alpha).all()
+    assert np.isnan(result.intercept).all()
@@ -8,12 +8,41 @@ Aplicación principal para el cálculo de criticalidad del gasto metabólico.
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                             QLabel, QLineEdit, QComboBox, QPushButton, QTableWidget,
                             QTableWidgetItem, QSpinBox, QMessageBox, QTabWidget,
-                            QFileDialog, QTextEdit)
-from PyQt5.QtCore import Qt
+                            QFileDialog, QTextEdit, QCheckBox)
+from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtWebEngineWidgets import QWebEngineView
 import numpy as np
 import pandas as pd
 from models.person import Person
+from utils.live_monitor import LiveMonitor
+from utils.fourier_html import spectrum_rows, build_fourier_html, build_log_bin_rows
+from utils.math_tools import (
+    calculate_fourier_spectrum,
+    calculate_fourier_table,
+    calculate_cross_spectrum,
+    calculate_binned_loglog_fit,
+    calculate_log_binned_spectrum,
+    calculate_periodicity,
+    calculate_statistics
+)
+from utils.pipeline import Pipeline
+from utils.reports import ReportData, write_report
+from utils.session import SECTION_VERSIONS, Session, load_session, save_session
+import utils.shared  # noqa: F401  (metabolic_app en sys.path)
+from src.core import available_backends, backend_report, backend_rows, requested_backend, set_backend
+from src.utils.instrumentation import PROFILER
+from src.utils.result_store import RESULT_STORE, Leases, person_fingerprint
+
+# Espera tras el último cambio de K antes de refrescar la vista de detalle
+K_DEBOUNCE_MS = 150
+# Máximo del selector de K para series cortas
+K_SPIN_MAX = 100
+# Segmentos de Welch para la coherencia: cuatro semanas (k = 4 es el ritmo semanal)
+COHERENCE_SEGMENT_DAYS = 28
+# Vigilancia de un archivo de registro: lecturas, refresco de la vista y ventana del espectro
+WATCH_POLL_MS = 1000
+WATCH_REFRESH_S = 2.0
+WATCH_WINDOW_DAYS = 365
 
 class MetabolicApp(QMainWindow):
     """Ventana principal de la aplicación."""
@@ -21,7 +50,84 @@ class MetabolicApp(QMainWindow):
     def __init__(self):
         super().__init__()
         self.person = None
+        self.monitor = None
+        # Resultados compartidos con las demás ventanas (también las de metabolic_app)
+        self.leases = Leases(RESULT_STORE)
+        self.pipeline = self._build_pipeline()
         self.init_ui()
+
+    def _shared(self, kind, person, compute):
+        """Obtiene un resultado de la persona del almacén compartido (o lo calcula)."""
+        key = person_fingerprint(kind, person.sex, person.weight, person.height, person.age, person.exercise_minutes)
+        return self.leases.get(kind, key, compute)
+
+    def closeEvent(self, event):
+        """Suelta los resultados compartidos al cerrar la ventana."""
+        self.leases.release_all()
+        super().closeEvent(event)
+        
+    def _build_pipeline(self):
+        """
+        Construye el grafo perezoso de etapas del análisis.
+
+        persona -> GB diario -> espectro -> log-log -> regresión -> vistas. Cada
+        vista llena los widgets de una pestaña y solo se ejecuta cuando esa
+        pestaña está visible y alguna de sus entradas cambió.
+        """
+        pipeline = Pipeline()
+        pipeline.add_input('person')
+        pipeline.add_input('k', 1)  # valor inicial del selector de K
+        # Cálculo
+        pipeline.add_node('daily_data', PROFILER.instrument('metabolic.compute')(
+            lambda person: person.get_daily_data()), ['person'])
+        pipeline.add_node('expenditure', PROFILER.instrument('metabolic.expenditure')(
+            lambda person: self._shared('gb', person, person.calculate_daily_expenditure)), ['person'])
+        pipeline.add_node('spectrum', PROFILER.instrument('fourier.spectrum')(
+            lambda person, gb: self._shared('spectrum', person, lambda: calculate_fourier_spectrum(gb))),
+            ['person', 'expenditure'])
+        # A_k no depende de la fase, así que metabolic_app comparte esta entrada
+        pipeline.add_node('amplitudes', PROFILER.instrument('fourier.amplitudes')(
+            lambda person, spectrum: self._shared('amplitudes', person,
+                                                  lambda: spectrum[2, :spectrum.shape[1] // 2].copy())),
+            ['person', 'spectrum'])
+        pipeline.add_node('loglog', PROFILER.instrument('fourier.log_transform')(
+            spectrum_rows), ['spectrum'])
+        # Frecuencias no redundantes k = 1..N//2 reducidas a intervalos geométricos:
+        # el ajuste y la tabla log-log tienen tamaño fijo sea cual sea N
+        pipeline.add_node('log_bins', PROFILER.instrument('fourier.log_bins')(
+            calculate_log_binned_spectrum), ['amplitudes'])
+        pipeline.add_node('regression', PROFILER.instrument('stats.regression')(
+            calculate_binned_loglog_fit), ['log_bins'])
+        # Lo único que depende de K: la tabla por día y la columna de K en el
+        # espectro ya calculado (los coeficientes de k y k + N coinciden)
+        pipeline.add_node('fourier_detail', PROFILER.instrument('fourier.detail')(
+            lambda gb, spectrum, k: (calculate_fourier_table(gb, k),
+                                     tuple(spectrum[:, (k - 1) % spectrum.shape[1]].tolist()))),
+            ['expenditure', 'spectrum', 'k'])
+        pipeline.add_node('statistics', PROFILER.instrument('stats.compute')(
+            lambda person, gb: calculate_statistics(person.exercise_minutes, gb)), ['person', 'expenditure'])
+        pipeline.add_node('periodicity', PROFILER.instrument('stats.periodicity')(
+            lambda person, gb: self._shared('periodicity', person, lambda: calculate_periodicity(gb))),
+            ['person', 'expenditure'])
+        pipeline.add_node('cross_spectrum', PROFILER.instrument('stats.coherence')(
+            lambda person, gb: calculate_cross_spectrum(
+                person.exercise_minutes, gb, min(COHERENCE_SEGMENT_DAYS, len(gb)))), ['person', 'expenditure'])
+        # Vistas
+        pipeline.add_node('view.daily', PROFILER.instrument('daily.populate')(
+            lambda daily_data: self._fill_daily_table(daily_data)), ['daily_data'])
+        pipeline.add_node('view.fourier_detail', PROFILER.instrument('fourier.populate')(
+            lambda k, detail: self._fill_fourier_detail(k, *detail)), ['k', 'fourier_detail'])
+        pipeline.add_node('view.fourier_html', PROFILER.instrument('fourier.html')(
+            lambda rows: self.fourier_formula_view.setHtml(build_fourier_html(rows))), ['loglog'])
+        pipeline.add_node('view.log_table', PROFILER.instrument('fourier.log_table')(
+            lambda binned: self._fill_log_table(build_log_bin_rows(binned))), ['log_bins'])
+        pipeline.add_node('view.stats', PROFILER.instrument('stats.populate')(
+            lambda stats, fit: self._fill_stats_table(stats, fit)), ['statistics', 'regression'])
+        pipeline.add_node('view.periodicity', PROFILER.instrument('stats.periodicity_populate')(
+            lambda periodicity: self._fill_periodicity_table(periodicity)), ['periodicity'])
+        pipeline.add_node('view.coherence', PROFILER.instrument('stats.coherence_populate')(
+            lambda cross: self._fill_coherence_table(cross)), ['cross_spectrum'])
+        return pipeline
         
     def init_ui(self):
         """Inicializa la interfaz de usuario."""
@@ -36,6 +142,7 @@ class MetabolicApp(QMainWindow):
         # Pestañas
         tabs = QTabWidget()
         layout.addWidget(tabs)
+        self.tabs = tabs
         
         # Pestaña de entrada de datos
         input_tab = QWidget()
@@ -74,11 +181,27 @@ class MetabolicApp(QMainWindow):
         remove_day_btn.clicked.connect(self.remove_exercise_day)
         input_layout.addWidget(remove_day_btn)
         
+        # Filtro de fallos y valores atípicos antes del cálculo
+        self.filter_check = QCheckBox('Filtrar valores atípicos (mediana móvil)')
+        input_layout.addWidget(self.filter_check)
+        self.filter_label = QLabel('')
+        input_layout.addWidget(self.filter_label)
+        
         # Botón calcular
         calculate_btn = QPushButton('Calcular')
         calculate_btn.clicked.connect(self.calculate)
         input_layout.addWidget(calculate_btn)
         
+        # Vigilancia de un archivo con un día de ejercicio por línea
+        self.watch_btn = QPushButton('Vigilar archivo...')
+        self.watch_btn.clicked.connect(self.toggle_watch)
+        input_layout.addWidget(self.watch_btn)
+        self.watch_label = QLabel('')
+        input_layout.addWidget(self.watch_label)
+        self.watch_timer = QTimer(self)
+        self.watch_timer.setInterval(WATCH_POLL_MS)
+        self.watch_timer.timeout.connect(self.poll_watch)
+        
         tabs.addTab(input_tab, "Datos de Entrada")
         
         # Pestaña de resultados diarios
@@ -97,8 +220,15 @@ class MetabolicApp(QMainWindow):
         k_layout.addWidget(QLabel('Frecuencia K:'))
         self.k_spin = QSpinBox()
         self.k_spin.setMinimum(1)
-        self.k_spin.setMaximum(100)
-        self.k_spin.valueChanged.connect(self.update_fourier_table)
+        self.k_spin.setMaximum(K_SPIN_MAX)
+        # Al teclear "365" no se refresca con 3 ni con 36
+        self.k_spin.setKeyboardTracking(False)
+        # Los cambios seguidos (rueda, flechas) se agrupan en un solo refresco
+        self.k_timer = QTimer(self)
+        self.k_timer.setSingleShot(True)
+        self.k_timer.setInterval(K_DEBOUNCE_MS)
+        self.k_timer.timeout.connect(lambda: self.set_fourier_k(self.k_spin.value()))
+        self.k_spin.valueChanged.connect(lambda _: self.k_timer.start())
         k_layout.addWidget(self.k_spin)
         fourier_layout.addLayout(k_layout)
         
@@ -133,12 +263,89 @@ class MetabolicApp(QMainWindow):
         stats_layout = QVBoxLayout(stats_tab)
         self.stats_table = QTableWidget()
         stats_layout.addWidget(self.stats_table)
+        # Ritmos del GB: autocorrelación y periodo dominante
+        stats_layout.addWidget(QLabel('Periodicidad del GB (autocorrelación):'))
+        self.periodicity_table = QTableWidget()
+        self.periodicity_table.setMaximumHeight(80)
+        stats_layout.addWidget(self.periodicity_table)
+        # Coherencia y fase por frecuencia entre ejercicio y GB
+        stats_layout.addWidget(QLabel('Coherencia ejercicio-GB por frecuencia (Welch):'))
+        self.coherence_table = QTableWidget()
+        stats_layout.addWidget(self.coherence_table)
         tabs.addTab(stats_tab, "Análisis Estadístico")
         
+        # Pestaña de rendimiento (instrumentación opcional por etapa)
+        perf_tab = QWidget()
+        perf_layout = QVBoxLayout(perf_tab)
+        perf_options = QHBoxLayout()
+        self.profiling_check = QCheckBox('Medir etapas')
+        self.profiling_check.setChecked(PROFILER.enabled)
+        self.profiling_check.toggled.connect(self.toggle_profiling)
+        perf_options.addWidget(self.profiling_check)
+        self.memory_check = QCheckBox('Medir memoria (tracemalloc)')
+        self.memory_check.setChecked(PROFILER.trace_memory)
+        self.memory_check.toggled.connect(self.toggle_profiling)
+        perf_options.addWidget(self.memory_check)
+        perf_options.addWidget(QLabel('Motor de cálculo:'))
+        self.backend_combo = QComboBox()
+        self.backend_combo.addItems(['auto'] + available_backends())
+        self.backend_combo.setCurrentText(requested_backend())
+        self.backend_combo.currentTextChanged.connect(self.select_backend)
+        perf_options.addWidget(self.backend_combo)
+        perf_layout.addLayout(perf_options)
+        # Motor que ejecuta cada núcleo de cálculo
+        self.backend_label = QLabel()
+        perf_layout.addWidget(self.backend_label)
+        self.backend_table = QTableWidget()
+        self.backend_table.setColumnCount(2)
+        self.backend_table.setHorizontalHeaderLabels(['Núcleo', 'Motor'])
+        self.backend_table.setMaximumHeight(160)
+        perf_layout.addWidget(self.backend_table)
+        self.update_backend_panel()
+        self.perf_table = QTableWidget()
+        self.perf_table.setColumnCount(7)
+        self.perf_table.setHorizontalHeaderLabels([
+            'Etapa', 'Llamadas', 'Total (ms)', 'Media (ms)', 'Máx (ms)', 'Neto (KiB)', 'Pico (KiB)'
+        ])
+        perf_layout.addWidget(self.perf_table)
+        perf_buttons = QHBoxLayout()
+        reset_perf_btn = QPushButton('Reiniciar')
+        reset_perf_btn.clicked.connect(self.reset_profiling)
+        perf_buttons.addWidget(reset_perf_btn)
+        json_perf_btn = QPushButton('Exportar JSON')
+        json_perf_btn.clicked.connect(lambda: self.export_profile('perfil_etapas.json', PROFILER.dump_json))
+        perf_buttons.addWidget(json_perf_btn)
+        trace_perf_btn = QPushButton('Exportar Chrome Trace')
+        trace_perf_btn.clicked.connect(lambda: self.export_profile('perfil_trace.json', PROFILER.dump_chrome_trace))
+        perf_buttons.addWidget(trace_perf_btn)
+        perf_layout.addLayout(perf_buttons)
+        tabs.addTab(perf_tab, "Rendimiento")
+        
+        # Vistas que se actualizan al mostrar cada pestaña
+        self._tab_views = {
+            daily_tab: ('view.daily',),
+            fourier_tab: ('view.fourier_detail', 'view.fourier_html', 'view.log_table'),
+            stats_tab: ('view.stats', 'view.periodicity', 'view.coherence'),
+        }
+        tabs.currentChanged.connect(self.refresh_visible_views)
+        
         # Botón exportar
         export_btn = QPushButton('Exportar a Excel')
         export_btn.clicked.connect(self.export_to_excel)
         layout.addWidget(export_btn)
+        report_btn = QPushButton('Exportar informe')
+        report_btn.clicked.connect(self.export_report)
+        layout.addWidget(report_btn)
+        
+        # Sesión: entradas y resultados calculados en un archivo binario
+        session_layout = QHBoxLayout()
+        save_session_btn = QPushButton('Guardar sesión')
+        save_session_btn.clicked.connect(self.save_session)
+        session_layout.addWidget(save_session_btn)
+        open_session_btn = QPushButton('Abrir sesión')
+        open_session_btn.clicked.connect(self.open_session)
+        session_layout.addWidget(open_session_btn)
+        layout.addLayout(session_layout)
         
     def add_exercise_day(self):
         current_row = self.exercise_table.rowCount()
@@ -153,32 +360,101 @@ class MetabolicApp(QMainWindow):
     def calculate(self):
         """Realiza los cálculos y actualiza las tablas."""
         try:
-            sexo = self.input_table.item(0, 1).text().strip()
-            peso = float(self.input_table.item(1, 1).text())
-            altura = float(self.input_table.item(2, 1).text())
-            edad = int(self.input_table.item(3, 1).text())
-            minutos = []
-            for row in range(self.exercise_table.rowCount()):
-                item = self.exercise_table.item(row, 0)
-                if item and item.text().strip():
-                    minutos.append(float(item.text().strip()))
-            if not minutos:
-                raise ValueError('Debes ingresar al menos un día de ejercicio.')
-            self.person = Person(sexo, peso, altura, edad, minutos)
-            self.update_daily_table()
-            self.update_fourier_table()
-            self.update_stats_table()
+            with PROFILER.stage('calculate'):
+                with PROFILER.stage('input.parse'):
+                    sexo = self.input_table.item(0, 1).text().strip()
+                    peso = float(self.input_table.item(1, 1).text())
+                    altura = float(self.input_table.item(2, 1).text())
+                    edad = int(self.input_table.item(3, 1).text())
+                    minutos = []
+                    for row in range(self.exercise_table.rowCount()):
+                        item = self.exercise_table.item(row, 0)
+                        if item and item.text().strip():
+                            minutos.append(float(item.text().strip()))
+                    if not minutos:
+                        raise ValueError('Debes ingresar al menos un día de ejercicio.')
+                    self.person = Person(sexo, peso, altura, edad, minutos)
+                if self.filter_check.isChecked():
+                    with PROFILER.stage('input.filter'):
+                        self.person, filtered = self.person.filter_outliers()
+                    self.filter_label.setText(f'Días corregidos por el filtro: {filtered.counts}')
+                else:
+                    self.filter_label.setText('')
+                self.k_spin.setMaximum(max(K_SPIN_MAX, len(minutos)))
+                # Las etapas se recalculan al mostrar la pestaña que las usa
+                self.pipeline.set_input('person', self.person)
+                self.refresh_visible_views()
         except Exception as e:
             QMessageBox.warning(self, 'Error', f'Error en los datos: {e}')
+        finally:
+            if PROFILER.enabled:
+                self.update_perf_table()
             
-    def update_daily_table(self):
-        """Actualiza la tabla de datos diarios."""
+    def toggle_watch(self):
+        """Empieza o detiene la vigilancia de un archivo de registro diario."""
+        if self.monitor is not None:
+            self.watch_timer.stop()
+            self.monitor = None
+            self.watch_btn.setText('Vigilar archivo...')
+            self.watch_label.setText('Vigilancia detenida.')
+            return
+        file_name, _ = QFileDialog.getOpenFileName(
+            self, "Vigilar registro diario", "", "Registros (*.txt *.csv *.log);;Todos (*)")
+        if not file_name:
+            return
+        try:
+            monitor = LiveMonitor(window=WATCH_WINDOW_DAYS, refresh_interval=WATCH_REFRESH_S)
+            monitor.add(file_name, file_name,
+                        self.input_table.item(0, 1).text().strip(),
+                        float(self.input_table.item(1, 1).text()),
+                        float(self.input_table.item(2, 1).text()),
+                        int(self.input_table.item(3, 1).text()))
+        except Exception as e:
+            QMessageBox.warning(self, 'Error', f'Error en los datos: {e}')
+            return
+        self.monitor = monitor
+        self.watch_btn.setText('Detener vigilancia')
+        self.poll_watch()
+        self.watch_timer.start()
+
+    def poll_watch(self):
+        """Lee los días nuevos; la etiqueta se refresca como mucho cada WATCH_REFRESH_S segundos."""
+        if self.monitor is None:
+            return
+        with PROFILER.stage('watch.poll'):
+            results = self.monitor.update()
+        for result in results.values():
+            text = (f'En vivo: {result.days} días (ventana de {result.window_days}), '
+                    f'GB medio {result.mean_gb:.1f}, alpha = {result.alpha:.4f}, '
+                    f'C = {result.intercept:.4f}, r = {result.r:.4f}')
+            if result.error:
+                text += f' — {result.error}'
+            self.watch_label.setText(text)
+
+    def refresh_visible_views(self):
+        """Calcula y muestra solo las vistas desactualizadas de la pestaña visible."""
         if not self.person:
             return
+        try:
+            for name in self._tab_views.get(self.tabs.currentWidget(), ()):
+                self.pipeline.get(name)
+        except Exception as e:
+            QMessageBox.warning(self, 'Error', f'Error en los datos: {e}')
+        if PROFILER.enabled:
+            self.update_perf_table()
             
-        daily_data = self.person.get_daily_data()
-        
-        # Configurar tabla
+    def set_fourier_k(self, k):
+        """Cambia la frecuencia K; solo se invalidan las etapas que dependen de ella."""
+        self.pipeline.set_input('k', k)
+        self.refresh_visible_views()
+            
+    def update_daily_table(self):
+        """Actualiza la tabla de datos diarios."""
+        if self.person:
+            self.pipeline.get('view.daily')
+            
+    def _fill_daily_table(self, daily_data):
+        """Llena la tabla de datos diarios."""
         self.daily_table.setRowCount(len(daily_data))
         self.daily_table.setColumnCount(5)
         self.daily_table.setHorizontalHeaderLabels([
@@ -197,8 +473,20 @@ class MetabolicApp(QMainWindow):
         """Actualiza la tabla de coeficientes de Fourier."""
         if not self.person:
             return
-        k = self.k_spin.value()
-        fourier_data = self.person.get_fourier_table(k)
+        for name in ('view.fourier_detail', 'view.fourier_html', 'view.log_table'):
+            self.pipeline.get(name)
+            
+    def _fill_log_table(self, log_rows):
+        """Llena la tabla de log10(K) vs log10(Ak) por intervalos geométricos de K."""
+        self.log_table.setRowCount(len(log_rows))
+        self.log_table.setColumnCount(5)
+        self.log_table.setHorizontalHeaderLabels(['K', 'log10(K)', 'log10(Ak)', 'Var log10(Ak)', 'Puntos'])
+        for i, cells in enumerate(log_rows):
+            for j, text in enumerate(cells):
+                self.log_table.setItem(i, j, QTableWidgetItem(text))
+            
+    def _fill_fourier_detail(self, k, fourier_data, coefficients):
+        """Llena la tabla de Fourier para k y su resumen."""
         # Configurar tabla
         self.fourier_table.setRowCount(len(fourier_data))
         self.fourier_table.setColumnCount(6)
@@ -214,7 +502,7 @@ class MetabolicApp(QMainWindow):
             self.fourier_table.setItem(i, 4, QTableWidgetItem(f"{data['x_cos']:.2f}"))
             self.fourier_table.setItem(i, 5, QTableWidgetItem(f"{data['x_sin']:.2f}"))
         # Actualizar resumen
-        a_k, b_k, Ak, log10_Ak = self.person.calculate_fourier_coefficients(k)
+        a_k, b_k, Ak, log10_Ak = coefficients
         self.fourier_summary.setRowCount(1)
         self.fourier_summary.setColumnCount(5)
         self.fourier_summary.setHorizontalHeaderLabels([
@@ -225,63 +513,21 @@ class MetabolicApp(QMainWindow):
         self.fourier_summary.setItem(0, 2, QTableWidgetItem(f"{b_k:.4f}"))
         self.fourier_summary.setItem(0, 3, QTableWidgetItem(f"{Ak:.4f}"))
         self.fourier_summary.setItem(0, 4, QTableWidgetItem(f"{log10_Ak:.4f}"))
-        # Proceso completo para todos los K (tabla resumen en HTML con MathJax)
-        N = len(self.person.calculate_daily_expenditure())
-        table_rows = []
-        for k_val in range(1, N+1):
-            a_k_val, b_k_val, Ak_val, log10_Ak_val = self.person.calculate_fourier_coefficients(k_val)
-            row = f"""
-<tr>
-<td> {k_val} </td>
-<td> $${{a_{{{k_val}}} = {a_k_val:.4f}}}$$ </td>
-<td> $${{b_{{{k_val}}} = {b_k_val:.4f}}}$$ </td>
-<td> $${{A_{{{k_val}}} = {Ak_val:.4f}}}$$ </td>
-<td> $${{\log_{{10}}({k_val}) = {np.log10(k_val):.4f}}}$$ </td>
-<td> $${{\log_{{10}}(A_{{{k_val}}}) = {log10_Ak_val:.4f}}}$$ </td>
-</tr>
-"""
-            table_rows.append(row)
-        table_html = f"""
-<table border='1' cellpadding='6' style='border-collapse:collapse;'>
-<tr>
-<th>K</th><th>a_k</th><th>b_k</th><th>A_k</th><th>log10(K)</th><th>log10(Ak)</th>
-</tr>
-{''.join(table_rows)}
-</table>
-"""
-        html = f"""
-<html><head>
-<script src='https://polyfill.io/v3/polyfill.min.js?features=es6'></script>
-<script src='https://cdn.jsdelivr.net/npm/mathjax@3/es5/tex-mml-chtml.js'></script>
-<style>body {{ font-family: Arial; font-size: 16px; }}</style>
-</head><body>
-{table_html}
-</body></html>
-"""
-        self.fourier_formula_view.setHtml(html)
-        # Tabla de log10(K) vs log10(Ak) para K=1..N
-        self.log_table.setRowCount(N)
-        self.log_table.setColumnCount(3)
-        self.log_table.setHorizontalHeaderLabels(['K', 'log10(K)', 'log10(Ak)'])
-        for k_val in range(1, N+1):
-            _, _, Ak_k, log10_Ak_k = self.person.calculate_fourier_coefficients(k_val)
-            self.log_table.setItem(k_val-1, 0, QTableWidgetItem(str(k_val)))
-            self.log_table.setItem(k_val-1, 1, QTableWidgetItem(f"{np.log10(k_val):.4f}"))
-            self.log_table.setItem(k_val-1, 2, QTableWidgetItem(f"{log10_Ak_k:.4f}"))
             
     def update_stats_table(self):
         """Actualiza la tabla de análisis estadístico."""
-        if not self.person:
-            return
+        if self.person:
+            self.pipeline.get('view.stats')
             
-        stats = self.person.get_statistical_analysis()
-        
-        # Configurar tabla
+    def _fill_stats_table(self, stats, fit):
+        """Llena la tabla de análisis estadístico y del ajuste log-log."""
+        alpha, intercept, r = fit
         self.stats_table.setRowCount(1)
-        self.stats_table.setColumnCount(8)
+        self.stats_table.setColumnCount(11)
         self.stats_table.setHorizontalHeaderLabels([
             'Media X', 'Media Y', 'Var X', 'Var Y',
-            'Correlación', 'Σxy', 'Σx²', 'Σy²'
+            'Correlación', 'Σxy', 'Σx²', 'Σy²',
+            'α (log-log)', 'C (log-log)', 'r (log-log)'
         ])
         
         # Llenar datos
@@ -293,7 +539,86 @@ class MetabolicApp(QMainWindow):
         self.stats_table.setItem(0, 5, QTableWidgetItem(f"{stats.xy_sum:.2f}"))
         self.stats_table.setItem(0, 6, QTableWidgetItem(f"{stats.x2_sum:.2f}"))
         self.stats_table.setItem(0, 7, QTableWidgetItem(f"{stats.y2_sum:.2f}"))
+        self.stats_table.setItem(0, 8, QTableWidgetItem(f"{alpha:.4f}"))
+        self.stats_table.setItem(0, 9, QTableWidgetItem(f"{intercept:.4f}"))
+        self.stats_table.setItem(0, 10, QTableWidgetItem(f"{r:.4f}"))
         
+    def _fill_periodicity_table(self, periodicity):
+        """Llena la tabla del periodo dominante y la autocorrelación semanal y mensual."""
+        acf = periodicity.autocorrelation
+        values = [
+            periodicity.dominant_period,
+            periodicity.strength,
+            periodicity.threshold,
+            acf[7] if len(acf) > 7 else np.nan,
+            acf[30] if len(acf) > 30 else np.nan,
+        ]
+        self.periodicity_table.setRowCount(1)
+        self.periodicity_table.setColumnCount(len(values))
+        self.periodicity_table.setHorizontalHeaderLabels([
+            'Periodo dominante (días)', 'r en el periodo', 'Umbral (95 %)', 'r(7)', 'r(30)'
+        ])
+        for j, value in enumerate(values):
+            text = 'Sin periodo' if j == 0 and np.isnan(value) else f"{value:.4f}"
+            self.periodicity_table.setItem(0, j, QTableWidgetItem(text))
+
+    def _fill_coherence_table(self, cross):
+        """Llena la tabla de coherencia y fase, una fila por frecuencia."""
+        columns = cross.columns()
+        self.coherence_table.setRowCount(len(cross.k))
+        self.coherence_table.setColumnCount(len(columns))
+        self.coherence_table.setHorizontalHeaderLabels(list(columns))
+        formats = ('{:.0f}', '{:.2f}', '{:.4g}', '{:.4g}', '{:.4g}', '{:.4f}', '{:.4f}')
+        for j, (fmt, values) in enumerate(zip(formats, columns.values())):
+            for i, value in enumerate(values.tolist()):
+                self.coherence_table.setItem(i, j, QTableWidgetItem(fmt.format(value)))
+
+    def toggle_profiling(self):
+        """Aplica las casillas de instrumentación al perfilador compartido."""
+        PROFILER.configure(self.profiling_check.isChecked(), self.memory_check.isChecked())
+
+    def reset_profiling(self):
+        """Descarta las mediciones acumuladas."""
+        PROFILER.reset()
+        self.update_perf_table()
+
+    def select_backend(self, name):
+        """Activa el motor de cálculo elegido (para todas las ventanas)."""
+        try:
+            set_backend(name)
+        except ValueError as e:
+            QMessageBox.warning(self, 'Motor de cálculo', str(e))
+        self.update_backend_panel()
+
+    def update_backend_panel(self):
+        """Muestra el estado de los motores y el que ejecuta cada núcleo."""
+        backends, kernels = backend_rows()
+        self.backend_label.setText(' · '.join(f'{name}: {status}' for name, status, _ in backends))
+        self.backend_label.setToolTip(backend_report())
+        self.backend_table.setRowCount(len(kernels))
+        for i, row in enumerate(kernels):
+            for j, text in enumerate(row):
+                self.backend_table.setItem(i, j, QTableWidgetItem(text))
+
+    def update_perf_table(self):
+        """Actualiza la tabla de rendimiento por etapa."""
+        rows = PROFILER.summary_rows()
+        self.perf_table.setRowCount(len(rows))
+        for i, row in enumerate(rows):
+            for j, text in enumerate(row):
+                self.perf_table.setItem(i, j, QTableWidgetItem(text))
+        self.update_backend_panel()
+
+    def export_profile(self, default_name, dump):
+        """Guarda las mediciones con la función de volcado indicada."""
+        file_name, _ = QFileDialog.getSaveFileName(self, "Guardar perfil", default_name, "JSON Files (*.json)")
+        if file_name:
+            try:
+                dump(file_name)
+                QMessageBox.information(self, 'Éxito', 'Perfil exportado correctamente.')
+            except OSError as e:
+                QMessageBox.critical(self, 'Error', f'Error al exportar: {str(e)}')
+
     def export_to_excel(self):
         """Exporta los datos a un archivo Excel."""
         if not self.person:
@@ -310,16 +635,16 @@ class MetabolicApp(QMainWindow):
             
             if file_name:
                 # Crear DataFrame para datos diarios
-                daily_data = self.person.get_daily_data()
+                daily_data = self.pipeline.get('daily_data')
                 daily_df = pd.DataFrame(daily_data)
                 
                 # Crear DataFrame para Fourier
-                k = self.k_spin.value()
-                fourier_data = self.person.get_fourier_table(k)
+                fourier_data, _ = self.pipeline.get('fourier_detail')
                 fourier_df = pd.DataFrame(fourier_data)
                 
                 # Crear DataFrame para estadísticas
-                stats = self.person.get_statistical_analysis()
+                stats = self.pipeline.get('statistics')
+                alpha, intercept, r = self.pipeline.get('regression')
                 stats_df = pd.DataFrame([{
                     'Media X': stats.mean_x,
                     'Media Y': stats.mean_y,
@@ -328,7 +653,12 @@ class MetabolicApp(QMainWindow):
                     'Correlación': stats.correlation,
                     'Σxy': stats.xy_sum,
                     'Σx²': stats.x2_sum,
-                    'Σy²': stats.y2_sum
+                    'Σy²': stats.y2_sum,
+                    'α (log-log)': alpha,
+                    'C (log-log)': intercept,
+                    'r (log-log)': r,
+                    'Periodo dominante (días)': self.pipeline.get('periodicity').dominant_period,
+                    'r en el periodo': self.pipeline.get('periodicity').strength
                 }])
                 
                 # Crear Excel writer
@@ -336,8 +666,123 @@ class MetabolicApp(QMainWindow):
                     daily_df.to_excel(writer, sheet_name='Datos Diarios', index=False)
                     fourier_df.to_excel(writer, sheet_name='Fourier', index=False)
                     stats_df.to_excel(writer, sheet_name='Estadísticas', index=False)
+                    pd.DataFrame(self.pipeline.get('cross_spectrum').columns()).to_excel(
+                        writer, sheet_name='Coherencia', index=False)
+                    acf = self.pipeline.get('periodicity').autocorrelation
+                    pd.DataFrame({'Desfase (días)': np.arange(len(acf)), 'r': acf}).to_excel(
+                        writer, sheet_name='Autocorrelación', index=False)
                     
                 QMessageBox.information(self, 'Éxito', 'Datos exportados correctamente.')
                 
         except Exception as e:
-            QMessageBox.critical(self, 'Error', f'Error al exportar: {str(e)}') 
\ No newline at end of file
+            QMessageBox.critical(self, 'Error', f'Error al exportar: {str(e)}') 
+
+    def export_report(self):
+        """Exporta el informe de la persona actual (HTML o PDF) con los resultados ya calculados."""
+        if not self.person:
+            QMessageBox.warning(self, 'Error', 'No hay datos para exportar.')
+            return
+
+        try:
+            file_name, selected = QFileDialog.getSaveFileName(
+                self,
+                "Guardar informe",
+                "",
+                "HTML Files (*.html);;PDF Files (*.pdf)"
+            )
+
+            if file_name:
+                fmt = 'pdf' if file_name.lower().endswith('.pdf') or 'PDF' in selected else 'html'
+                # Reutiliza las etapas del grafo: solo se calcula lo que falte
+                person = self.pipeline.get('person')
+                gb = self.pipeline.get('expenditure')
+                spectrum = self.pipeline.get('spectrum')
+                alpha, intercept, r = self.pipeline.get('regression')
+                stats = self.pipeline.get('statistics')
+                data = ReportData(
+                    sex=person.sex,
+                    weight=person.weight,
+                    height=person.height,
+                    age=person.age,
+                    exercise_minutes=np.asarray(person.exercise_minutes, dtype=np.float64),
+                    bmr=person.calculate_bmr(),
+                    activity_factors=person.calculate_activity_factors(),
+                    daily_expenditure=gb,
+                    amplitudes=spectrum[2, :spectrum.shape[1] // 2],
+                    alpha=alpha,
+                    intercept=intercept,
+                    r=r,
+                    correlation=stats.correlation
+                )
+                with PROFILER.stage('report.write'):
+                    write_report(file_name, data, fmt)
+                QMessageBox.information(self, 'Éxito', 'Informe exportado correctamente.')
+
+        except Exception as e:
+            QMessageBox.critical(self, 'Error', f'Error al exportar: {str(e)}')
+
+    def save_session(self):
+        """Guarda las entradas y los resultados calculados de la persona actual."""
+        if not self.person:
+            QMessageBox.warning(self, 'Error', 'No hay datos para guardar.')
+            return
+        file_name, _ = QFileDialog.getSaveFileName(self, "Guardar sesión", "", "Sesiones (*.npz)")
+        if not file_name:
+            return
+        try:
+            with PROFILER.stage('session.save'):
+                # Se calcula lo que falte para que la sesión se abra sin recalcular
+                results = {name: self.pipeline.get(name) for name in SECTION_VERSIONS}
+                save_session(file_name, Session(self.person, self.pipeline.get('k'),
+                                                self.filter_check.isChecked(), results))
+            QMessageBox.information(self, 'Éxito', 'Sesión guardada correctamente.')
+        except Exception as e:
+            QMessageBox.critical(self, 'Error', f'Error al guardar la sesión: {str(e)}')
+
+    def open_session(self):
+        """Restaura una sesión: los resultados guardados se muestran sin recalcularlos."""
+        file_name, _ = QFileDialog.getOpenFileName(self, "Abrir sesión", "", "Sesiones (*.npz)")
+        if not file_name:
+            return
+        try:
+            with PROFILER.stage('session.load'):
+                session = load_session(file_name)
+                self._fill_inputs(session)
+                person = self.person = session.person
+                self.pipeline.set_input('person', person)
+                self.pipeline.set_input('k', session.k)
+                # En orden de dependencias: sembrar un nodo invalida los que dependen de él
+                results = session.results
+                if 'expenditure' in results:
+                    self.pipeline.seed('expenditure', self._shared('gb', person, lambda: results['expenditure']))
+                if 'spectrum' in results:
+                    self.pipeline.seed('spectrum', self._shared('spectrum', person, lambda: results['spectrum']))
+                for name in ('log_bins', 'regression'):
+                    if name in results:
+                        self.pipeline.seed(name, results[name])
+            if session.stale:
+                QMessageBox.information(self, 'Sesión', 'Se recalcularán las secciones guardadas con otra '
+                                        f"versión: {', '.join(session.stale)}.")
+            self.refresh_visible_views()
+        except Exception as e:
+            QMessageBox.critical(self, 'Error', f'Error al abrir la sesión: {str(e)}')
+        finally:
+            if PROFILER.enabled:
+                self.update_perf_table()
+
+    def _fill_inputs(self, session):
+        """Copia las entradas de una sesión a las tablas de la pestaña de datos."""
+        person = session.person
+        for row, value in enumerate((person.sex, f'{person.weight:g}', f'{person.height:g}', str(person.age))):
+            self.input_table.setItem(row, 1, QTableWidgetItem(value))
+        minutes = np.asarray(person.exercise_minutes).tolist()
+        self.exercise_table.setRowCount(len(minutes))
+        for row, value in enumerate(minutes):
+            self.exercise_table.setItem(row, 0, QTableWidgetItem(f'{value:g}'))
+        # Los minutos guardados ya están filtrados: volver a calcular no debe filtrarlos otra vez
+        self.filter_check.setChecked(False)
+        self.filter_label.setText('Minutos filtrados al guardar la sesión.' if session.filtered else '')
+        self.k_spin.setMaximum(max(K_SPIN_MAX, len(minutes)))
+        self.k_spin.blockSignals(True)
+        self.k_spin.setValue(session.k)
+        self.k_spin.blockSignals(False)
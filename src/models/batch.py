@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Modelo columnar para analizar cohortes de personas de una sola vez.
+"""
+
+from dataclasses import dataclass, replace
+from typing import Iterable, Optional, Tuple, Union
+import numpy as np
+from models.person import Person
+from utils.prefilter import FilterConfig, FilterResult, filter_minutes
+from utils.math_tools import (
+    calculate_activity_factor,
+    calculate_bmr,
+    calculate_daily_expenditure,
+    calculate_fourier_spectrum,
+    calculate_statistics,
+    calculate_cross_spectrum,
+    calculate_periodicity,
+    get_precision,
+    store_minutes,
+    CrossSpectrum,
+    PeriodicityAnalysis,
+    Precision,
+    StatisticalAnalysis
+)
+
+@dataclass(eq=False)
+class PersonBatch:
+    """
+    Cohorte de personas con el mismo número de días, guardada por columnas.
+
+    Cada atributo es un arreglo con un valor por persona y los minutos de
+    ejercicio forman una matriz (personas, días), de modo que los cálculos de
+    toda la cohorte se hacen con operaciones vectorizadas.
+
+    Con ``precision='single'`` los minutos se guardan en uint16 (o float32 si
+    no son enteros) y el espectro se calcula en float32; los datos
+    personales, el GB y la estadística siguen en float64.
+    """
+
+    sex: np.ndarray  # (m,) 'M' o 'F'
+    weight: np.ndarray  # (m,) en kg
+    height: np.ndarray  # (m,) en cm
+    age: np.ndarray  # (m,) en años
+    exercise_minutes: np.ndarray  # (m, N) minutos de ejercicio por día
+    precision: Union[str, Precision] = 'double'  # política de tipos (DOUBLE o SINGLE)
+
+    def __post_init__(self):
+        self.precision = get_precision(self.precision)
+        self.sex = np.asarray(self.sex, dtype='U1')
+        self.weight = np.asarray(self.weight, dtype=np.float64)
+        self.height = np.asarray(self.height, dtype=np.float64)
+        self.age = np.asarray(self.age, dtype=np.float64)
+        self.exercise_minutes = store_minutes(self.exercise_minutes, self.precision)
+        if self.exercise_minutes.ndim != 2:
+            raise ValueError('exercise_minutes debe ser una matriz (personas, días).')
+        m = self.exercise_minutes.shape[0]
+        for name in ('sex', 'weight', 'height', 'age'):
+            if getattr(self, name).shape != (m,):
+                raise ValueError(f'{name} debe tener un valor por persona ({m}).')
+
+    @classmethod
+    def from_people(cls, people: Iterable[Person],
+                    precision: Union[str, Precision] = 'double') -> 'PersonBatch':
+        """
+        Construye la cohorte a partir de instancias de Person (o CompactPerson).
+
+        Args:
+            people (iterable): Personas con el mismo número de días
+            precision (str | Precision): Política de tipos de la cohorte
+
+        Raises:
+            ValueError: Si las personas no tienen el mismo número de días
+        """
+        people = list(people)
+        precision = get_precision(precision)
+        lengths = {len(p.exercise_minutes) for p in people}
+        if len(lengths) > 1:
+            raise ValueError('Todas las personas deben tener el mismo número de días.')
+        n_days = lengths.pop() if lengths else 0
+        # Con minutos compactos la matriz intermedia ya es float32 (exacta para enteros)
+        minutes = np.empty((len(people), n_days),
+                           dtype=np.float32 if precision.compact_minutes else np.float64)
+        for row, p in zip(minutes, people):
+            row[:] = p.exercise_minutes
+        return cls(
+            sex=[p.sex for p in people],
+            weight=[p.weight for p in people],
+            height=[p.height for p in people],
+            age=[p.age for p in people],
+            exercise_minutes=minutes,
+            precision=precision
+        )
+
+    def __len__(self) -> int:
+        return self.exercise_minutes.shape[0]
+
+    @property
+    def n_days(self) -> int:
+        """Número de días de cada serie."""
+        return self.exercise_minutes.shape[1]
+
+    def person(self, i: int) -> Person:
+        """Devuelve la persona i de la cohorte como instancia de Person."""
+        return Person(str(self.sex[i]), float(self.weight[i]), float(self.height[i]),
+                      int(self.age[i]), self.exercise_minutes[i].astype(np.float64, copy=False))
+
+    def filter_outliers(self, config: Optional[FilterConfig] = None) -> Tuple['PersonBatch', FilterResult]:
+        """
+        Corrige fallos y valores atípicos de los minutos de cada persona.
+
+        Args:
+            config (FilterConfig, opcional): Parámetros del filtro
+
+        Returns:
+            tuple: (cohorte con los minutos filtrados, FilterResult con los
+            puntos cambiados por persona)
+        """
+        result = filter_minutes(self.exercise_minutes, config)
+        return replace(self, exercise_minutes=result.values), result
+
+    def calculate_bmr(self) -> np.ndarray:
+        """
+        Calcula el TMB de cada persona.
+
+        Returns:
+            np.ndarray: TMB en kcal/día, forma (m,)
+        """
+        return calculate_bmr(self.sex, self.weight, self.height, self.age)
+
+    def calculate_activity_factors(self, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Calcula los factores de actividad física de cada persona y día.
+
+        Returns:
+            np.ndarray: Matriz (m, N) de factores de actividad física
+        """
+        return calculate_activity_factor(self.exercise_minutes, out=out)
+
+    def calculate_daily_expenditure(self, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Calcula el gasto bruto diario (GB) de cada persona y día.
+
+        Returns:
+            np.ndarray: Matriz (m, N) de gastos brutos diarios
+        """
+        return calculate_daily_expenditure(self.calculate_bmr(), self.exercise_minutes, out=out)
+
+    def calculate_fourier_spectrum(self, k_max: Optional[int] = None,
+                                   out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Calcula el espectro de Fourier del GB de cada persona.
+
+        Returns:
+            np.ndarray: Arreglo (4, m, k_max) con a_k, b_k, Ak y log10(Ak), en
+            el tipo de espectro de la política de la cohorte
+        """
+        return calculate_fourier_spectrum(self.calculate_daily_expenditure(), k_max, out=out,
+                                          precision=self.precision)
+
+    def get_statistical_analysis(self) -> StatisticalAnalysis:
+        """
+        Realiza el análisis estadístico entre ejercicio y gasto bruto por persona.
+
+        Returns:
+            StatisticalAnalysis: Cada campo es un arreglo con un valor por persona
+        """
+        return calculate_statistics(self.exercise_minutes, self.calculate_daily_expenditure())
+
+    def get_periodicity_analysis(self, max_lag: Optional[int] = None) -> PeriodicityAnalysis:
+        """
+        Calcula la autocorrelación del gasto bruto y el periodo dominante de cada persona.
+
+        Las FFT de toda la cohorte se calculan en una sola llamada.
+
+        Returns:
+            PeriodicityAnalysis: Campos con un valor (o una fila) por persona
+        """
+        return calculate_periodicity(self.calculate_daily_expenditure(), max_lag)
+
+    def get_cross_spectrum(self, segment_length: Optional[int] = None, overlap: float = 0.5,
+                           window: Optional[str] = 'hann', across_members: bool = False) -> CrossSpectrum:
+        """
+        Calcula coherencia y fase por frecuencia entre ejercicio y gasto bruto.
+
+        Las FFT de ambas series se calculan de una vez para toda la cohorte.
+        Con across_members=True los espectros se promedian también entre
+        personas y el resultado describe a la cohorte entera.
+
+        Args:
+            segment_length (int, opcional): Días por segmento de Welch (por defecto la serie entera)
+            overlap (float): Fracción de solapamiento entre segmentos
+            window (str, opcional): 'hann' o None
+            across_members (bool): Promediar entre personas
+
+        Returns:
+            CrossSpectrum: Campos (m, K) por persona, o (K,) con across_members
+        """
+        return calculate_cross_spectrum(self.exercise_minutes, self.calculate_daily_expenditure(),
+                                        segment_length, overlap, window, across_rows=across_members)
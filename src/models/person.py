@@ -5,16 +5,31 @@
 Modelo para almacenar y calcular datos personales relacionados con el gasto metabólico.
 """
 
-from dataclasses import dataclass
-from typing import List, Dict, Tuple
+import sys
+from array import array
+from dataclasses import dataclass, replace
+from typing import List, Dict, Tuple, Optional, Union
 import numpy as np
 from utils.math_tools import (
+    ArrayLike,
+    DOUBLE,
+    SINGLE,
+    Precision,
+    store_minutes,
     calculate_activity_factor,
+    calculate_bmr,
+    calculate_daily_expenditure,
     calculate_fourier_coefficients,
+    calculate_fourier_spectrum,
     calculate_statistics,
     calculate_fourier_table,
+    calculate_cross_spectrum,
+    calculate_periodicity,
+    CrossSpectrum,
+    PeriodicityAnalysis,
     StatisticalAnalysis
 )
+from utils.prefilter import FilterConfig, FilterResult, filter_minutes
 
 @dataclass
 class Person:
@@ -24,7 +39,7 @@ class Person:
     weight: float  # en kg
     height: float  # en cm
     age: int  # en años
-    exercise_minutes: List[float]  # lista de minutos de ejercicio por día
+    exercise_minutes: ArrayLike  # minutos de ejercicio por día (lista o ndarray)
     
     def calculate_bmr(self) -> float:
         """
@@ -33,30 +48,44 @@ class Person:
         Returns:
             float: Valor del TMB en kcal/día
         """
-        if self.sex.upper() == 'M':
-            return 88.362 + (13.397 * self.weight) + (4.799 * self.height) - (5.677 * self.age)
-        else:
-            return 447.593 + (9.247 * self.weight) + (3.098 * self.height) - (4.333 * self.age)
+        return calculate_bmr(self.sex, self.weight, self.height, self.age)
     
-    def calculate_activity_factors(self) -> List[float]:
+    def filter_outliers(self, config: Optional[FilterConfig] = None) -> Tuple['Person', FilterResult]:
+        """
+        Corrige fallos y valores atípicos de los minutos de ejercicio.
+
+        Args:
+            config (FilterConfig, opcional): Parámetros del filtro
+
+        Returns:
+            tuple: (persona con los minutos filtrados, FilterResult)
+        """
+        result = filter_minutes(self.exercise_minutes, config)
+        return replace(self, exercise_minutes=result.values.tolist()), result
+
+    def calculate_activity_factors(self, out: Optional[np.ndarray] = None) -> np.ndarray:
         """
         Calcula los factores de actividad física para cada día.
         
+        Args:
+            out (np.ndarray, opcional): Buffer donde escribir el resultado
+            
         Returns:
-            List[float]: Lista de factores de actividad física
+            np.ndarray: Factores de actividad física
         """
-        return [calculate_activity_factor(minutes) for minutes in self.exercise_minutes]
+        return calculate_activity_factor(self.exercise_minutes, out=out)
     
-    def calculate_daily_expenditure(self) -> List[float]:
+    def calculate_daily_expenditure(self, out: Optional[np.ndarray] = None) -> np.ndarray:
         """
         Calcula el gasto bruto diario (GB) para cada día.
         
+        Args:
+            out (np.ndarray, opcional): Buffer donde escribir el resultado
+            
         Returns:
-            List[float]: Lista de gastos brutos diarios
+            np.ndarray: Gastos brutos diarios
         """
-        bmr = self.calculate_bmr()
-        activity_factors = self.calculate_activity_factors()
-        return [bmr * af for af in activity_factors]
+        return calculate_daily_expenditure(self.calculate_bmr(), self.exercise_minutes, out=out)
     
     def calculate_fourier_coefficients(self, k: int) -> Tuple[float, float, float, float]:
         """
@@ -68,6 +97,22 @@ class Person:
         """
         return calculate_fourier_coefficients(self.calculate_daily_expenditure(), k)
     
+    def calculate_fourier_spectrum(self, k_max: Optional[int] = None,
+                                   out: Optional[np.ndarray] = None,
+                                   precision: Union[str, Precision, None] = None) -> np.ndarray:
+        """
+        Calcula los coeficientes de Fourier para k = 1..k_max en una sola pasada.
+        Args:
+            k_max (int, opcional): Última frecuencia (por defecto el número de días)
+            out (np.ndarray, opcional): Buffer de forma (4, k_max) a reutilizar
+            precision (str | Precision, opcional): Política de tipos del espectro
+                (por defecto la de ``out``, o DOUBLE)
+        Returns:
+            np.ndarray: Filas a_k, b_k, Ak y log10(Ak)
+        """
+        return calculate_fourier_spectrum(self.calculate_daily_expenditure(), k_max, out=out,
+                                          precision=precision)
+    
     def get_daily_data(self) -> List[Dict[str, float]]:
         """
         Obtiene los datos diarios en formato de diccionario.
@@ -77,7 +122,7 @@ class Person:
         """
         bmr = self.calculate_bmr()
         activity_factors = self.calculate_activity_factors()
-        daily_expenditure = self.calculate_daily_expenditure()
+        daily_expenditure = activity_factors * bmr
         
         return [
             {
@@ -89,8 +134,8 @@ class Person:
             }
             for i, (minutes, af, gb) in enumerate(zip(
                 self.exercise_minutes,
-                activity_factors,
-                daily_expenditure
+                activity_factors.tolist(),
+                daily_expenditure.tolist()
             ))
         ]
     
@@ -113,4 +158,260 @@ class Person:
         Returns:
             StatisticalAnalysis: Resultados del análisis estadístico
         """
-        return calculate_statistics(self.exercise_minutes, self.calculate_daily_expenditure()) 
\ No newline at end of file
+        return calculate_statistics(self.exercise_minutes, self.calculate_daily_expenditure())
+
+    def get_periodicity_analysis(self, max_lag: Optional[int] = None) -> PeriodicityAnalysis:
+        """
+        Calcula la autocorrelación del gasto bruto y su periodo dominante.
+
+        Args:
+            max_lag (int, opcional): Último desfase en días (por defecto N // 2)
+
+        Returns:
+            PeriodicityAnalysis: Autocorrelación y periodo dominante
+        """
+        return calculate_periodicity(self.calculate_daily_expenditure(), max_lag)
+
+    def get_cross_spectrum(self, segment_length: Optional[int] = None, overlap: float = 0.5,
+                           window: Optional[str] = 'hann') -> CrossSpectrum:
+        """
+        Calcula coherencia y fase por frecuencia entre ejercicio y gasto bruto.
+
+        Con el modelo actual el GB es una función afín de los minutos, así que
+        para una sola persona la coherencia es 1 y la fase 0 en toda frecuencia
+        con energía; la coherencia entre personas se obtiene con PersonBatch.
+
+        Args:
+            segment_length (int, opcional): Días por segmento de Welch (por defecto la serie entera)
+            overlap (float): Fracción de solapamiento entre segmentos
+            window (str, opcional): 'hann' o None
+
+        Returns:
+            CrossSpectrum: Resultados por frecuencia
+        """
+        return calculate_cross_spectrum(self.exercise_minutes, self.calculate_daily_expenditure(),
+                                        segment_length, overlap, window)
+
+
+def _readonly_view(buffer: array, offset: int = 0) -> np.ndarray:
+    """Vista numpy sin copia y de solo lectura sobre un ``array`` ('d', 'f' o 'H')."""
+    view = np.frombuffer(buffer, dtype=np.dtype(buffer.typecode), offset=offset * buffer.itemsize)
+    view.setflags(write=False)
+    return view
+
+
+class CompactPerson:
+    """
+    Variante compacta de Person para trabajos por lotes.
+
+    Usa ``__slots__`` (sin ``__dict__`` por instancia) y empaqueta peso, altura
+    y edad en un ``array('d')`` y los minutos de ejercicio en otro ``array``
+    contiguo, en lugar de una lista de floats individuales. Los minutos se
+    exponen como una vista numpy de solo lectura. Las series derivadas (AF y
+    GB) no se guardan: cada llamada las calcula en un arreglo nuevo, así que la
+    instancia ocupa lo mismo antes y después de cualquier cálculo. Los valores
+    devueltos por los métodos públicos son los mismos que los de Person.
+
+    Con ``precision='single'`` los minutos ocupan 2 bytes por día (uint16) si
+    son enteros, o 4 (float32) si no, y el espectro se calcula en float32. El
+    AF y el GB siguen en float64.
+    """
+
+    __slots__ = ('sex', '_data', '_minutes')
+
+    def __init__(self, sex: str, weight: float, height: float, age: int,
+                 exercise_minutes, precision: Union[str, Precision, None] = None) -> None:
+        self.sex = sys.intern(sex)
+        # [peso, altura, edad]
+        self._data = array('d', (weight, height, age))
+        minutes = store_minutes(exercise_minutes, precision)
+        self._minutes = array(minutes.dtype.char, minutes.tobytes())
+
+    @classmethod
+    def from_person(cls, person: Person, precision: Union[str, Precision, None] = None) -> 'CompactPerson':
+        """Crea la variante compacta a partir de una instancia de Person."""
+        return cls(person.sex, person.weight, person.height, person.age,
+                   person.exercise_minutes, precision)
+
+    def to_person(self) -> Person:
+        """Devuelve una instancia de Person equivalente (con listas de floats)."""
+        return Person(self.sex, self.weight, self.height, self.age, self._minutes_list())
+
+    def __repr__(self) -> str:
+        return (f"CompactPerson(sex={self.sex!r}, weight={self.weight!r}, "
+                f"height={self.height!r}, age={self.age!r}, days={len(self)})")
+
+    def __len__(self) -> int:
+        return len(self._minutes)
+
+    def __getstate__(self):
+        return self.sex, self._data, self._minutes
+
+    def __setstate__(self, state) -> None:
+        self.sex, self._data, self._minutes = state
+
+    def _minutes_list(self) -> List[float]:
+        """Minutos como lista de floats (uint16 y float32 se convierten sin pérdida)."""
+        if self._minutes.typecode == 'd':
+            return self._minutes.tolist()
+        return self.exercise_minutes.astype(np.float64).tolist()
+
+    @property
+    def weight(self) -> float:
+        """Peso en kg."""
+        return self._data[0]
+
+    @property
+    def height(self) -> float:
+        """Altura en cm."""
+        return self._data[1]
+
+    @property
+    def age(self) -> int:
+        """Edad en años."""
+        return int(self._data[2])
+
+    @property
+    def exercise_minutes(self) -> np.ndarray:
+        """Minutos de ejercicio por día (vista de solo lectura, en el tipo guardado)."""
+        return _readonly_view(self._minutes)
+
+    @property
+    def precision(self) -> Precision:
+        """Política de tipos, deducida del tipo con el que se guardan los minutos."""
+        return DOUBLE if self._minutes.typecode == 'd' else SINGLE
+
+    def calculate_bmr(self) -> float:
+        """
+        Calcula el Gasto Metabólico Basal (TMB) usando la fórmula de Harris-Benedict.
+
+        Returns:
+            float: Valor del TMB en kcal/día
+        """
+        return calculate_bmr(self.sex, self.weight, self.height, self.age)
+
+    def calculate_activity_factors(self, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Calcula los factores de actividad física para cada día.
+
+        Args:
+            out (np.ndarray, opcional): Buffer donde escribir el resultado
+
+        Returns:
+            np.ndarray: Factores de actividad física
+        """
+        return calculate_activity_factor(self.exercise_minutes, out=out)
+
+    def calculate_daily_expenditure(self, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Calcula el gasto bruto diario (GB) para cada día.
+
+        Args:
+            out (np.ndarray, opcional): Buffer donde escribir el resultado
+
+        Returns:
+            np.ndarray: Gastos brutos diarios
+        """
+        return calculate_daily_expenditure(self.calculate_bmr(), self.exercise_minutes, out=out)
+
+    def calculate_fourier_coefficients(self, k: int) -> Tuple[float, float, float, float]:
+        """
+        Calcula los coeficientes de Fourier para una frecuencia k dada.
+        Args:
+            k (int): Frecuencia para el cálculo
+        Returns:
+            tuple: (a_k, b_k, Ak, log10_Ak) coeficientes de Fourier
+        """
+        return calculate_fourier_coefficients(self.calculate_daily_expenditure(), k)
+
+    def calculate_fourier_spectrum(self, k_max: Optional[int] = None,
+                                   out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Calcula los coeficientes de Fourier para k = 1..k_max en una sola pasada.
+        Args:
+            k_max (int, opcional): Última frecuencia (por defecto el número de días)
+            out (np.ndarray, opcional): Buffer de forma (4, k_max) a reutilizar
+        Returns:
+            np.ndarray: Filas a_k, b_k, Ak y log10(Ak), en el tipo de espectro
+            de la política (el de ``out`` si se da)
+        """
+        precision = None if out is not None else self.precision
+        return calculate_fourier_spectrum(self.calculate_daily_expenditure(), k_max, out=out,
+                                          precision=precision)
+
+    def get_daily_data(self) -> List[Dict[str, float]]:
+        """
+        Obtiene los datos diarios en formato de diccionario.
+
+        Returns:
+            List[Dict[str, float]]: Lista de diccionarios con datos diarios
+        """
+        bmr = self.calculate_bmr()
+        af = self.calculate_activity_factors()
+        return [
+            {
+                'day': i + 1,
+                'exercise': minutes,
+                'tmb': bmr,
+                'af': af,
+                'gb': gb
+            }
+            for i, (minutes, af, gb) in enumerate(zip(
+                self._minutes_list(),
+                af.tolist(),
+                (af * bmr).tolist()
+            ))
+        ]
+
+    def get_fourier_table(self, k: int) -> List[Dict[str, float]]:
+        """
+        Genera la tabla de cálculos de Fourier.
+
+        Args:
+            k (int): Frecuencia para el cálculo
+
+        Returns:
+            List[Dict[str, float]]: Tabla de cálculos de Fourier
+        """
+        return calculate_fourier_table(self.calculate_daily_expenditure(), k)
+
+    def get_statistical_analysis(self) -> StatisticalAnalysis:
+        """
+        Realiza el análisis estadístico entre ejercicio y gasto bruto.
+
+        Returns:
+            StatisticalAnalysis: Resultados del análisis estadístico
+        """
+        return calculate_statistics(self.exercise_minutes, self.calculate_daily_expenditure())
+
+    def get_periodicity_analysis(self, max_lag: Optional[int] = None) -> PeriodicityAnalysis:
+        """
+        Calcula la autocorrelación del gasto bruto y su periodo dominante.
+
+        Args:
+            max_lag (int, opcional): Último desfase en días (por defecto N // 2)
+
+        Returns:
+            PeriodicityAnalysis: Autocorrelación y periodo dominante
+        """
+        return calculate_periodicity(self.calculate_daily_expenditure(), max_lag)
+
+    def get_cross_spectrum(self, segment_length: Optional[int] = None, overlap: float = 0.5,
+                           window: Optional[str] = 'hann') -> CrossSpectrum:
+        """
+        Calcula coherencia y fase por frecuencia entre ejercicio y gasto bruto.
+
+        Con el modelo actual el GB es una función afín de los minutos, así que
+        para una sola persona la coherencia es 1 y la fase 0 en toda frecuencia
+        con energía; la coherencia entre personas se obtiene con PersonBatch.
+
+        Args:
+            segment_length (int, opcional): Días por segmento de Welch (por defecto la serie entera)
+            overlap (float): Fracción de solapamiento entre segmentos
+            window (str, opcional): 'hann' o None
+
+        Returns:
+            CrossSpectrum: Resultados por frecuencia
+        """
+        return calculate_cross_spectrum(self.exercise_minutes, self.calculate_daily_expenditure(),
+                                        segment_length, overlap, window)
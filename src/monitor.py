@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Vigila los registros diarios de una cohorte y muestra el espectro al día.
+
+    python src/monitor.py miembros.csv --window 365 --refresh 5
+
+miembros.csv tiene las columnas persona, archivo, sexo, peso, altura y edad.
+Cada refresco imprime una línea por persona con días nuevos: días leídos, GB
+medio y ajuste log-log de la ventana.
+"""
+
+import argparse
+import sys
+import time
+
+from utils.live_monitor import DEFAULT_WINDOW, LiveMonitor
+
+
+def _print_results(results) -> None:
+    stamp = time.strftime('%H:%M:%S')
+    for result in results.values():
+        line = (f'{stamp}\t{result.name}\tdías={result.days}\tGB medio={result.mean_gb:.1f}\t'
+                f'alpha={result.alpha:.4f}\tC={result.intercept:.4f}\tr={result.r:.4f}')
+        if result.error:
+            line += f'\t{result.error}'
+        print(line, flush=True)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Seguimiento en vivo del espectro del GB')
+    parser.add_argument('members', help='CSV con persona, archivo, sexo, peso, altura y edad')
+    parser.add_argument('--window', type=int, default=DEFAULT_WINDOW, help='días de la ventana del espectro')
+    parser.add_argument('--poll', type=float, default=1.0, help='segundos entre lecturas de los archivos')
+    parser.add_argument('--refresh', type=float, default=5.0, help='segundos mínimos entre refrescos')
+    parser.add_argument('--once', action='store_true', help='lee los archivos una vez, imprime y termina')
+    args = parser.parse_args(argv)
+
+    monitor = LiveMonitor.from_csv(args.members, window=args.window, refresh_interval=args.refresh)
+    if args.once:
+        _print_results(monitor.update())
+        return 0
+    try:
+        monitor.run(_print_results, poll_interval=args.poll)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
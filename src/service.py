@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Servicio HTTP local (JSON) con los cálculos metabólicos y de criticalidad.
+
+Solo usa la biblioteca estándar: un servidor asyncio con HTTP/1.1 y
+conexiones persistentes. El bucle de eventos solo hace E/S. La lectura del
+JSON, el análisis y la serialización de la respuesta se hacen en un pool de
+procesos, de modo que una cohorte grande no bloquea a las demás peticiones.
+
+    POST /person   {"sex": "M", "weight": 70, "height": 175, "age": 30,
+                    "exercise_minutes": [...], "series": false}
+    POST /batch    {"sex": [...], "weight": [...], "height": [...], "age": [...],
+                    "exercise_minutes": [[...], ...]}
+    GET  /health   estado del pool, de la cola y de la caché
+
+Contrapresión: como mucho ``max_pending`` cálculos en curso o en cola. Por
+encima de ese límite se responde 503 con Retry-After en lugar de acumular
+trabajo sin límite. Las respuestas se guardan en una caché LRU por contenido
+de la petición. Las peticiones idénticas que llegan mientras la primera se
+calcula esperan ese mismo resultado en vez de repetirlo.
+
+Los procesos del pool se crean con ``forkserver`` (``spawn`` donde no existe),
+así que no heredan el socket de escucha. SIGTERM y SIGINT cierran el servidor y
+el pool antes de salir.
+
+Uso: ``python src/service.py [--host H] [--port P] [--workers W]``
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import multiprocessing
+import os
+import signal
+import sys
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http import HTTPStatus
+from typing import Dict, Optional, Tuple
+import numpy as np
+
+from models.batch import PersonBatch
+from utils.cohort_runner import CohortResults, run_cohort
+from utils.math_tools import calculate_periodicity
+
+DEFAULT_PORT = 8765
+# Tamaño máximo del cuerpo de una petición
+MAX_BODY_BYTES = 64 << 20
+# Memoria máxima de las respuestas guardadas en la caché
+CACHE_BYTES = 64 << 20
+
+_RESULT_FIELDS = ('bmr', 'mean_gb', 'alpha', 'intercept', 'r', 'correlation')
+
+
+def _column(values) -> list:
+    """Convierte un arreglo en lista JSON (nan e inf pasan a null)."""
+    return [v if math.isfinite(v) else None for v in np.asarray(values, dtype=np.float64).ravel().tolist()]
+
+
+def _number(value) -> Optional[float]:
+    value = float(value)
+    return value if math.isfinite(value) else None
+
+
+def _load(body: bytes) -> dict:
+    try:
+        data = json.loads(body)
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError(f'JSON no válido: {e}')
+    if not isinstance(data, dict):
+        raise ValueError('El cuerpo debe ser un objeto JSON.')
+    missing = [key for key in ('sex', 'weight', 'height', 'age', 'exercise_minutes') if key not in data]
+    if missing:
+        raise ValueError(f"Faltan campos: {', '.join(missing)}")
+    return data
+
+
+def _check_sex(values) -> None:
+    bad = sorted({str(s) for s in values} - {'M', 'F', 'm', 'f'})
+    if bad:
+        raise ValueError(f"Sexo no válido: {', '.join(bad)} (use 'M' o 'F')")
+
+
+def _dump(result: dict) -> bytes:
+    return json.dumps(result, allow_nan=False, separators=(',', ':')).encode('utf-8')
+
+
+def person_response(body: bytes) -> bytes:
+    """
+    Analiza a una persona (tarea del pool).
+
+    Args:
+        body (bytes): JSON con sex, weight, height, age y exercise_minutes;
+            con "series": true se incluyen el GB diario y las amplitudes A_k y con
+            "filter": true los minutos pasan antes por el filtro de atípicos
+
+    Returns:
+        bytes: JSON con TMB, GB medio, ajuste log-log, correlación y periodo dominante
+
+    Raises:
+        ValueError: Si la petición no es válida
+    """
+    data = _load(body)
+    _check_sex([data['sex']])
+    minutes = np.asarray(data['exercise_minutes'], dtype=np.float64)
+    if minutes.ndim != 1 or minutes.size == 0:
+        raise ValueError('exercise_minutes debe ser una lista no vacía de números.')
+    batch = PersonBatch([data['sex']], [data['weight']], [data['height']], [data['age']], minutes[np.newaxis])
+    filtered = None
+    if data.get('filter'):
+        batch, filtered = batch.filter_outliers()
+    results = run_cohort(batch, workers=1, with_amplitudes=bool(data.get('series')))
+    if results.errors:
+        raise ValueError(results.errors[0])
+    gb = batch.calculate_daily_expenditure()[0]
+    periodicity = calculate_periodicity(gb)
+    response = {name: _number(getattr(results, name)[0]) for name in _RESULT_FIELDS}
+    response['dominant_period'] = _number(periodicity.dominant_period)
+    response['periodicity_strength'] = _number(periodicity.strength)
+    if filtered is not None:
+        response['filtered_days'] = int(filtered.counts[0])
+    if data.get('series'):
+        response['daily_expenditure'] = _column(gb)
+        response['amplitudes'] = _column(results.amplitudes[0])
+    return _dump(response)
+
+
+def batch_response(body: bytes) -> bytes:
+    """
+    Analiza una cohorte (tarea del pool) y devuelve columnas por persona.
+
+    Las personas con datos no válidos no invalidan la petición: sus valores
+    son null y el motivo aparece en "errors" (índice -> mensaje).
+
+    Args:
+        body (bytes): JSON con una lista por campo y exercise_minutes como matriz;
+            con "filter": true los minutos pasan antes por el filtro de atípicos
+
+    Returns:
+        bytes: JSON con una columna por resultado y los errores por persona
+
+    Raises:
+        ValueError: Si la petición no es válida
+    """
+    data = _load(body)
+    _check_sex(data['sex'])
+    batch = PersonBatch(data['sex'], data['weight'], data['height'], data['age'], data['exercise_minutes'])
+    filtered = None
+    if data.get('filter'):
+        batch, filtered = batch.filter_outliers()
+    results: CohortResults = run_cohort(batch, workers=1)
+    periodicity = batch.get_periodicity_analysis()
+    ok = results.ok
+    response = {name: _column(getattr(results, name)) for name in _RESULT_FIELDS}
+    response['dominant_period'] = _column(np.where(ok, periodicity.dominant_period, np.nan))
+    response['periodicity_strength'] = _column(np.where(ok, periodicity.strength, np.nan))
+    if filtered is not None:
+        response['filtered_days'] = filtered.counts.tolist()
+    response['errors'] = {str(i): message for i, message in results.errors.items()}
+    return _dump(response)
+
+
+ROUTES = {
+    '/person': person_response,
+    '/batch': batch_response,
+}
+
+
+class ResponseCache:
+    """Caché LRU de respuestas por contenido de la petición, limitada en bytes."""
+
+    def __init__(self, max_bytes: int = CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[str, bytes]' = OrderedDict()
+
+    def get(self, key: str) -> Optional[bytes]:
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: str, value: bytes) -> None:
+        if len(value) > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.bytes -= len(previous)
+        self._entries[key] = value
+        self.bytes += len(value)
+        while self.bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.bytes -= len(evicted)
+
+    def stats(self) -> Dict[str, int]:
+        return {'entries': len(self._entries), 'bytes': self.bytes, 'hits': self.hits, 'misses': self.misses}
+
+
+class AnalysisService:
+    """
+    Servidor HTTP asyncio que reparte los cálculos en un pool de procesos.
+
+    Args:
+        host (str): Dirección de escucha (por defecto solo local)
+        port (int): Puerto (0 elige uno libre)
+        workers (int, opcional): Procesos del pool (por defecto os.cpu_count())
+        max_pending (int, opcional): Cálculos en curso o en cola antes de
+            responder 503 (por defecto 4 por proceso)
+        cache_bytes (int): Memoria máxima de la caché de respuestas
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = DEFAULT_PORT, workers: Optional[int] = None,
+                 max_pending: Optional[int] = None, cache_bytes: int = CACHE_BYTES):
+        self.host = host
+        self.port = port
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or 4 * self.workers
+        self.cache = ResponseCache(cache_bytes)
+        self.pending = 0
+        self.rejected = 0
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        # Con fork, los procesos creados después de abrir el socket lo heredarían
+        # y, si el servicio muere, seguirían aceptando conexiones sin responderlas
+        method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context(method))
+
+    async def start(self) -> None:
+        self._pool = self._new_pool()
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        """Atiende peticiones hasta recibir SIGTERM o SIGINT y después cierra servidor y pool."""
+        await self.start()
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.add_signal_handler(signum, stop.set)
+            except (NotImplementedError, RuntimeError):
+                pass  # Windows: Ctrl+C llega como KeyboardInterrupt y cancela la espera
+        print(f'Escuchando en http://{self.host}:{self.port}', flush=True)
+        try:
+            await stop.wait()
+        finally:
+            await self.close()
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    def health(self) -> dict:
+        return {
+            'status': 'ok',
+            'workers': self.workers,
+            'pending': self.pending,
+            'max_pending': self.max_pending,
+            'rejected': self.rejected,
+            'cache': self.cache.stats(),
+        }
+
+    async def _compute(self, path: str, body: bytes) -> Tuple[int, bytes]:
+        key = path + ':' + hashlib.sha256(body).hexdigest()
+        cached = self.cache.get(key)
+        if cached is not None:
+            return HTTPStatus.OK, cached
+        if key in self._inflight:
+            return await asyncio.shield(self._inflight[key])
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            return HTTPStatus.SERVICE_UNAVAILABLE, _dump({'error': 'Servicio saturado, reintente más tarde.'})
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        self.pending += 1
+        try:
+            try:
+                body_out = await asyncio.get_running_loop().run_in_executor(self._pool, ROUTES[path], body)
+                result = (HTTPStatus.OK, body_out)
+                self.cache.put(key, body_out)
+            except (ValueError, TypeError) as e:
+                result = (HTTPStatus.BAD_REQUEST, _dump({'error': str(e)}))
+            except BrokenProcessPool:
+                # Un proceso murió (p. ej. por memoria): se rehace el pool para las siguientes
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = self._new_pool()
+                result = (HTTPStatus.INTERNAL_SERVER_ERROR, _dump({'error': 'Falló un proceso de cálculo.'}))
+            except Exception as e:
+                result = (HTTPStatus.INTERNAL_SERVER_ERROR, _dump({'error': f'{type(e).__name__}: {e}'}))
+            future.set_result(result)
+            return result
+        finally:
+            self.pending -= 1
+            del self._inflight[key]
+
+    async def _dispatch(self, method: str, path: str, body: bytes) -> Tuple[int, bytes]:
+        if path == '/health':
+            if method != 'GET':
+                return HTTPStatus.METHOD_NOT_ALLOWED, _dump({'error': 'Use GET.'})
+            return HTTPStatus.OK, _dump(self.health())
+        if path in ROUTES:
+            if method != 'POST':
+                return HTTPStatus.METHOD_NOT_ALLOWED, _dump({'error': 'Use POST.'})
+            return await self._compute(path, body)
+        return HTTPStatus.NOT_FOUND, _dump({'error': f'Ruta desconocida: {path}'})
+
+    @staticmethod
+    def _response(status: int, body: bytes, keep_alive: bool) -> bytes:
+        status = HTTPStatus(status)
+        headers = [
+            f'HTTP/1.1 {status.value} {status.phrase}',
+            'Content-Type: application/json; charset=utf-8',
+            f'Content-Length: {len(body)}',
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        if status == HTTPStatus.SERVICE_UNAVAILABLE:
+            headers.append('Retry-After: 1')
+        return ('\r\n'.join(headers) + '\r\n\r\n').encode('latin-1') + body
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Atiende una conexión; con HTTP/1.1 se reutiliza para varias peticiones."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    writer.write(self._response(HTTPStatus.BAD_REQUEST, _dump({'error': 'Petición mal formada.'}), False))
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                try:
+                    length = int(headers.get('content-length', 0))
+                except ValueError:
+                    length = -1
+                if not 0 <= length <= MAX_BODY_BYTES:
+                    status = HTTPStatus.REQUEST_ENTITY_TOO_LARGE if length > 0 else HTTPStatus.BAD_REQUEST
+                    writer.write(self._response(status, _dump({'error': 'Content-Length no válido.'}), False))
+                    break
+                body = await reader.readexactly(length) if length else b''
+                status, payload = await self._dispatch(method.upper(), target.split('?', 1)[0], body)
+                writer.write(self._response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Servicio HTTP local de análisis metabólico')
+    parser.add_argument('--host', default='127.0.0.1', help='dirección de escucha')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='puerto (0 elige uno libre)')
+    parser.add_argument('--workers', type=int, default=None, help='procesos de cálculo')
+    parser.add_argument('--max-pending', type=int, default=None,
+                        help='cálculos en curso o en cola antes de responder 503')
+    parser.add_argument('--cache-mb', type=int, default=CACHE_BYTES >> 20, help='memoria de la caché de respuestas')
+    args = parser.parse_args(argv)
+    service = AnalysisService(args.host, args.port, args.workers, args.max_pending, args.cache_mb << 20)
+    try:
+        asyncio.run(service.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Ejecución en paralelo del análisis metabólico de una cohorte.
+
+La matriz de minutos y los datos personales se copian una sola vez a un bloque
+de ``multiprocessing.shared_memory``; los procesos del pool lo leen sin copia y
+solo reciben rangos de filas. Cada proceso devuelve arreglos compactos con el
+TMB, el GB medio, el ajuste log-log del espectro y la correlación entre
+ejercicio y GB de cada persona.
+
+Con la precisión 'single' (math_tools.SINGLE) los minutos se comparten en
+uint16 o float32 y los espectros se calculan en float32; el GB, la
+estadística y el ajuste log-log se acumulan en float64.
+"""
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple, Union
+import numpy as np
+from models.batch import PersonBatch
+from utils.prefilter import FilterConfig, filter_minutes
+from utils.math_tools import (
+    calculate_bmr,
+    calculate_daily_expenditure,
+    calculate_fourier_spectrum,
+    calculate_loglog_fit,
+    calculate_statistics,
+    get_precision,
+    Precision
+)
+
+# Tamaño aproximado de los temporales que puede usar un bloque de filas
+_CHUNK_BYTES = 64 << 20
+# Filas por bloque por debajo de las cuales no compensa repartir trabajo
+_MIN_CHUNK = 16
+
+# Campos escalares devueltos por persona, en el orden de CohortResults
+_RESULT_FIELDS = ('bmr', 'mean_gb', 'alpha', 'intercept', 'r', 'correlation')
+
+# Bloque compartido al que se conecta cada proceso del pool
+_shared = {}
+
+
+@dataclass(eq=False)
+class CohortResults:
+    """Resultados por persona del análisis de una cohorte, en orden de entrada."""
+
+    bmr: np.ndarray  # TMB en kcal/día
+    mean_gb: np.ndarray  # GB medio del periodo
+    alpha: np.ndarray  # pendiente de log10(A_k) frente a log10(k)
+    intercept: np.ndarray  # intercepto C del ajuste log-log
+    r: np.ndarray  # coeficiente de correlación del ajuste log-log
+    correlation: np.ndarray  # correlación entre minutos de ejercicio y GB
+    amplitudes: Optional[np.ndarray] = None  # (m, N//2) A_k para k = 1..N//2 (float32 con SINGLE)
+    filtered: Optional[np.ndarray] = None  # (m,) días corregidos por el filtro de atípicos
+    errors: Dict[int, str] = field(default_factory=dict)  # índice -> mensaje
+
+    @property
+    def ok(self) -> np.ndarray:
+        """Máscara de las personas analizadas sin errores."""
+        mask = np.ones(self.bmr.shape[0], dtype=bool)
+        mask[list(self.errors)] = False
+        return mask
+
+
+def _validate_rows(attrs: np.ndarray, minutes: np.ndarray) -> Dict[int, str]:
+    """Detecta las filas con datos que no se pueden analizar."""
+    errors = {}
+    bad_minutes = ~np.isfinite(minutes).all(axis=1) | (minutes < 0).any(axis=1)
+    bad_body = ~np.isfinite(attrs[1:]).all(axis=0) | (attrs[1:3] <= 0).any(axis=0) | (attrs[3] < 0)
+    for i in np.flatnonzero(bad_minutes):
+        errors[int(i)] = 'Minutos de ejercicio no válidos (negativos o no numéricos).'
+    for i in np.flatnonzero(bad_body & ~bad_minutes):
+        errors[int(i)] = 'Datos personales no válidos (peso, altura o edad).'
+    return errors
+
+
+def _analyze_block(attrs: np.ndarray, minutes: np.ndarray, with_amplitudes: bool,
+                   precision: Precision) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """Analiza un bloque de filas válidas de forma vectorizada."""
+    sex = np.where(attrs[0] > 0, 'M', 'F')
+    bmr = calculate_bmr(sex, attrs[1], attrs[2], attrs[3])
+    gb = calculate_daily_expenditure(bmr, minutes)
+    amplitudes = calculate_fourier_spectrum(gb, minutes.shape[1] // 2, precision=precision)[2]
+    alpha, intercept, r = calculate_loglog_fit(amplitudes)
+    stats = calculate_statistics(minutes, gb)
+    values = np.stack([bmr, stats.mean_y, alpha, intercept, r, stats.correlation])
+    return values, (amplitudes if with_amplitudes else None)
+
+
+def _analyze_rows(attrs: np.ndarray, minutes: np.ndarray, with_amplitudes: bool,
+                  prefilter: Optional[FilterConfig] = None, precision: Optional[Precision] = None):
+    """
+    Analiza un rango de filas y aísla los fallos de cada persona.
+
+    Returns:
+        tuple: (valores (campos, filas), amplitudes o None, errores por fila
+        local, días corregidos por el filtro o None)
+    """
+    rows, n_days = minutes.shape
+    precision = get_precision(precision)
+    changed = None
+    if prefilter is not None:
+        # El filtro va antes de la validación: corrige los fallos que la harían fallar
+        result = filter_minutes(minutes, prefilter)
+        minutes, changed = result.values, result.counts
+    values = np.full((len(_RESULT_FIELDS), rows), np.nan)
+    amplitudes = np.full((rows, n_days // 2), np.nan, dtype=precision.spectrum) if with_amplitudes else None
+    errors = _validate_rows(attrs, minutes)
+    valid = np.ones(rows, dtype=bool)
+    valid[list(errors)] = False
+    try:
+        block_values, block_amplitudes = _analyze_block(attrs[:, valid], minutes[valid], with_amplitudes, precision)
+        values[:, valid] = block_values
+        if with_amplitudes:
+            amplitudes[valid] = block_amplitudes
+    except Exception:
+        # Si el bloque falla se repite fila a fila para localizar a los culpables
+        for i in np.flatnonzero(valid):
+            try:
+                row_values, row_amplitudes = _analyze_block(attrs[:, i:i + 1], minutes[i:i + 1], with_amplitudes,
+                                                            precision)
+                values[:, i] = row_values[:, 0]
+                if with_amplitudes:
+                    amplitudes[i] = row_amplitudes[0]
+            except Exception as e:
+                errors[int(i)] = f'{type(e).__name__}: {e}'
+    return values, amplitudes, errors, changed
+
+
+def _offsets(layout: List[Tuple[str, tuple, str]]) -> Tuple[List[int], int]:
+    """Posición en bytes de cada arreglo de la disposición (alineada a 8) y tamaño total."""
+    offsets, total = [], 0
+    for _, shape, dtype in layout:
+        offsets.append(total)
+        size = math.prod(shape) * np.dtype(dtype).itemsize
+        total += (size + 7) // 8 * 8
+    return offsets, total
+
+
+def share_arrays(arrays: Dict[str, np.ndarray]) -> Tuple[shared_memory.SharedMemory, List[Tuple[str, tuple, str]]]:
+    """
+    Copia varios arreglos a un único bloque de memoria compartida.
+
+    Cada arreglo conserva su tipo (float64, float32, uint16...) y empieza en
+    un múltiplo de 8 bytes. Quien llama debe cerrar y liberar el bloque
+    (close() y unlink()).
+
+    Returns:
+        tuple: (bloque, disposición [(nombre, forma, tipo), ...] para attach_arrays)
+    """
+    arrays = {key: np.asarray(array) for key, array in arrays.items()}
+    layout = [(key, array.shape, array.dtype.str) for key, array in arrays.items()]
+    offsets, total = _offsets(layout)
+    shm = shared_memory.SharedMemory(create=True, size=max(8, total))
+    for (key, shape, dtype), offset in zip(layout, offsets):
+        np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)[...] = arrays[key]
+    return shm, layout
+
+
+def attach_arrays(name: str, layout: List[Tuple[str, tuple, str]]) -> Tuple[shared_memory.SharedMemory, Dict[str, np.ndarray]]:
+    """Se conecta a un bloque creado con share_arrays y devuelve vistas sin copia."""
+    shm = shared_memory.SharedMemory(name=name)
+    offsets, _ = _offsets(layout)
+    views = {key: np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+             for (key, shape, dtype), offset in zip(layout, offsets)}
+    return shm, views
+
+
+def _attach_shared(name: str, layout: List[Tuple[str, tuple, str]]) -> None:
+    """Inicializador de cada proceso: se conecta al bloque de memoria compartida."""
+    shm, views = attach_arrays(name, layout)
+    _shared['shm'] = shm
+    _shared.update(views)
+
+
+def _worker(start: int, stop: int, with_amplitudes: bool, prefilter: Optional[FilterConfig],
+            precision: Precision):
+    """Tarea del pool: analiza las filas [start, stop) del bloque compartido."""
+    return _analyze_rows(_shared['attrs'][:, start:stop], _shared['minutes'][start:stop], with_amplitudes, prefilter,
+                         precision)
+
+
+def default_chunk_size(members: int, n_days: int, workers: int) -> int:
+    """
+    Elige cuántas personas enviar en cada tarea.
+
+    Apunta a unas cuatro tareas por proceso para repartir bien la carga, sin
+    bajar de un mínimo que amortice el envío ni superar el tamaño de bloque
+    cuyos temporales caben en _CHUNK_BYTES.
+    """
+    target = math.ceil(members / (max(workers, 1) * 4))
+    max_rows = max(1, _CHUNK_BYTES // (max(n_days, 1) * 8 * 8))
+    return max(1, min(max(target, _MIN_CHUNK), max_rows, members))
+
+
+def run_cohort(batch: PersonBatch, workers: Optional[int] = None,
+               chunk_size: Optional[int] = None,
+               with_amplitudes: bool = False,
+               prefilter: Optional[FilterConfig] = None,
+               precision: Union[str, Precision, None] = None) -> CohortResults:
+    """
+    Analiza todas las personas de una cohorte repartiendo el trabajo en procesos.
+
+    Los errores de una persona (datos no válidos o fallos de cálculo) no
+    detienen el análisis: su fila queda en nan y el mensaje se guarda en
+    CohortResults.errors. Si un proceso del pool muere, se marcan como fallidas
+    las personas de las tareas que no terminaron.
+
+    Args:
+        batch (PersonBatch): Cohorte a analizar
+        workers (int, opcional): Procesos del pool (por defecto os.cpu_count());
+            con 1 el análisis se hace en el proceso actual
+        chunk_size (int, opcional): Personas por tarea (por defecto automático)
+        with_amplitudes (bool): Si se devuelven también las amplitudes A_k
+        prefilter (FilterConfig, opcional): Si se da, los minutos de cada
+            bloque pasan por filter_minutes antes del análisis y
+            CohortResults.filtered cuenta los días corregidos por persona
+        precision (str | Precision, opcional): Política de tipos de los
+            espectros y de las amplitudes devueltas (por defecto la de la
+            cohorte). Los minutos se comparten en el tipo en que los guarda
+            la cohorte.
+
+    Returns:
+        CohortResults: Resultados en el mismo orden que la cohorte
+    """
+    members, n_days = batch.exercise_minutes.shape
+    workers = workers or os.cpu_count() or 1
+    chunk_size = chunk_size or default_chunk_size(members, n_days, workers)
+    precision = get_precision(precision or batch.precision)
+
+    values = np.full((len(_RESULT_FIELDS), members), np.nan)
+    amplitudes = np.full((members, n_days // 2), np.nan, dtype=precision.spectrum) if with_amplitudes else None
+    filtered = np.zeros(members, dtype=np.int64) if prefilter is not None else None
+    errors = {}
+
+    def store(start, result):
+        block_values, block_amplitudes, block_errors, block_changed = result
+        stop = start + block_values.shape[1]
+        values[:, start:stop] = block_values
+        if with_amplitudes:
+            amplitudes[start:stop] = block_amplitudes
+        if prefilter is not None:
+            filtered[start:stop] = block_changed
+        errors.update({start + i: message for i, message in block_errors.items()})
+
+    attrs = np.stack([np.char.upper(batch.sex) == 'M', batch.weight, batch.height, batch.age]).astype(np.float64)
+    ranges = [(start, min(start + chunk_size, members)) for start in range(0, members, chunk_size)]
+
+    if workers == 1 or len(ranges) <= 1:
+        for start, stop in ranges:
+            store(start, _analyze_rows(attrs[:, start:stop], batch.exercise_minutes[start:stop], with_amplitudes,
+                                       prefilter, precision))
+    else:
+        shm, layout = share_arrays({'attrs': attrs, 'minutes': batch.exercise_minutes})
+        try:
+            with ProcessPoolExecutor(max_workers=min(workers, len(ranges)),
+                                     initializer=_attach_shared,
+                                     initargs=(shm.name, layout)) as pool:
+                futures = {pool.submit(_worker, start, stop, with_amplitudes, prefilter, precision): (start, stop)
+                           for start, stop in ranges}
+                for future in as_completed(futures):
+                    start, stop = futures[future]
+                    try:
+                        store(start, future.result())
+                    except Exception as e:
+                        message = f'{type(e).__name__}: {e}'
+                        errors.update({i: message for i in range(start, stop)})
+        finally:
+            shm.close()
+            shm.unlink()
+
+    return CohortResults(*values, amplitudes=amplitudes, filtered=filtered, errors=dict(sorted(errors.items())))
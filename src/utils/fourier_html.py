@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Construcción (sin dependencias de Qt) de las vistas del espectro de Fourier.
+"""
+
+from typing import List, Tuple
+import numpy as np
+
+SpectrumRow = Tuple[int, float, float, float, float, float]
+
+def spectrum_rows(spectrum: np.ndarray) -> List[SpectrumRow]:
+    """
+    Convierte un espectro (4, K) en filas (k, a_k, b_k, Ak, log10(k), log10(Ak)).
+    Args:
+        spectrum (np.ndarray): Salida de calculate_fourier_spectrum para k = 1..K
+    Returns:
+        List[SpectrumRow]: Una fila de floats por cada k
+    """
+    a_all, b_all, A_all, log10_A_all = spectrum
+    k_all = np.arange(1, a_all.size + 1)
+    return list(zip(k_all.tolist(), a_all.tolist(), b_all.tolist(), A_all.tolist(),
+                    np.log10(k_all).tolist(), log10_A_all.tolist()))
+
+def build_fourier_html(rows: List[SpectrumRow]) -> str:
+    """
+    Genera la página HTML con MathJax de la tabla resumen para todos los K.
+    Args:
+        rows (List[SpectrumRow]): Filas devueltas por spectrum_rows
+    Returns:
+        str: Documento HTML completo
+    """
+    table_rows = []
+    for k_val, a_k_val, b_k_val, Ak_val, log10_k_val, log10_Ak_val in rows:
+        row = f"""
+<tr>
+<td> {k_val} </td>
+<td> $${{a_{{{k_val}}} = {a_k_val:.4f}}}$$ </td>
+<td> $${{b_{{{k_val}}} = {b_k_val:.4f}}}$$ </td>
+<td> $${{A_{{{k_val}}} = {Ak_val:.4f}}}$$ </td>
+<td> $${{\\log_{{10}}({k_val}) = {log10_k_val:.4f}}}$$ </td>
+<td> $${{\\log_{{10}}(A_{{{k_val}}}) = {log10_Ak_val:.4f}}}$$ </td>
+</tr>
+"""
+        table_rows.append(row)
+    table_html = f"""
+<table border='1' cellpadding='6' style='border-collapse:collapse;'>
+<tr>
+<th>K</th><th>a_k</th><th>b_k</th><th>A_k</th><th>log10(K)</th><th>log10(Ak)</th>
+</tr>
+{''.join(table_rows)}
+</table>
+"""
+    return f"""
+<html><head>
+<script src='https://polyfill.io/v3/polyfill.min.js?features=es6'></script>
+<script src='https://cdn.jsdelivr.net/npm/mathjax@3/es5/tex-mml-chtml.js'></script>
+<style>body {{ font-family: Arial; font-size: 16px; }}</style>
+</head><body>
+{table_html}
+</body></html>
+"""
+
+def build_log_table_rows(rows: List[SpectrumRow]) -> List[Tuple[str, str, str]]:
+    """
+    Formatea las celdas de la tabla log10(K) vs log10(Ak).
+    Args:
+        rows (List[SpectrumRow]): Filas devueltas por spectrum_rows
+    Returns:
+        List[Tuple[str, str, str]]: Textos (K, log10(K), log10(Ak)) por fila
+    """
+    return [
+        (str(k_val), f"{log10_k_val:.4f}", f"{log10_Ak_val:.4f}")
+        for k_val, _, _, _, log10_k_val, log10_Ak_val in rows
+    ]
+
+def build_log_bin_rows(binned) -> List[Tuple[str, str, str, str, str]]:
+    """
+    Formatea las celdas de la tabla log10(K) vs log10(Ak) por intervalos.
+    Args:
+        binned (LogBinnedSpectrum): Salida de calculate_log_binned_spectrum para una persona
+    Returns:
+        List[Tuple[str, str, str, str, str]]: Textos (K, log10(K), media de
+        log10(Ak), varianza, puntos) por intervalo
+    """
+    rows = []
+    for start, stop, count, log_k, mean, variance in zip(
+            binned.k_start.tolist(), binned.k_stop.tolist(), binned.count.tolist(),
+            binned.log_k.tolist(), binned.mean.tolist(), binned.variance.tolist()):
+        k_text = str(start) if stop - start == 1 else f"{start}-{stop - 1}"
+        rows.append((k_text, f"{log_k:.4f}", f"{mean:.4f}", f"{variance:.4f}", str(count)))
+    return rows
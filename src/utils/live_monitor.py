@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Seguimiento en vivo de archivos de registro diario por persona.
+
+Cada archivo recibe una línea por día con los minutos de ejercicio (el último
+campo de la línea, así que "fecha,minutos" también sirve). El monitor lee solo
+lo añadido desde la última lectura y mantiene el espectro del GB de los
+últimos ``window`` días con una DFT deslizante. Cada día nuevo cuesta O(K)
+operaciones, sin una FFT nueva. El ajuste log-log solo se recalcula al
+refrescar, como mucho una vez cada ``refresh_interval`` segundos, y solo para
+las personas con días nuevos.
+"""
+
+import csv
+import math
+import os
+import re
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+import numpy as np
+from utils.math_tools import calculate_bmr, calculate_daily_expenditure, calculate_fourier_spectrum, calculate_loglog_fit
+from utils.shared import core
+
+DEFAULT_WINDOW = 365
+# Separadores de campo admitidos en una línea del registro
+_FIELD_SEPARATOR = re.compile(r'[\t;, ]+')
+
+
+class SlidingSpectrum:
+    """
+    Espectro de Fourier de las últimas ``window`` muestras.
+
+    Usa la convención de calculate_fourier_spectrum (n de 1 a N, con n = 1 el
+    día más antiguo de la ventana). Al añadir x_nuevo con la ventana llena, las
+    sumas S_k = sum_n x_n e^{i 2 pi k n / N} cumplen
+    S_k' = S_k e^{-i 2 pi k / N} + x_nuevo - x_antiguo, así que cada muestra
+    cuesta O(K) (sliding_dft_update, compilado con el motor numba). Mientras la ventana se llena, o con bloques largos de
+    muestras, el espectro se recalcula con la FFT. La FFT también se repite
+    cada ``window`` muestras para que no se acumule el error de redondeo.
+
+    Args:
+        window (int): Días de la ventana (N)
+        k_max (int, opcional): Última frecuencia (por defecto N//2, como en run_cohort)
+    """
+
+    def __init__(self, window: int = DEFAULT_WINDOW, k_max: Optional[int] = None):
+        if window < 2:
+            raise ValueError('La ventana debe tener al menos 2 días.')
+        self.window = window
+        self.k_max = k_max or window // 2
+        self._values = np.zeros(window)
+        self._start = 0  # posición del día más antiguo en el buffer circular
+        self._count = 0
+        self._sums = np.zeros(self.k_max, dtype=np.complex128)
+        self._rotation = np.exp(-2j * np.pi * np.arange(1, self.k_max + 1) / window)
+        self._since_sync = 0
+        # Con más muestras que esto de golpe sale más barato repetir la FFT
+        self._batch_limit = max(1, int(math.log2(window)))
+
+    def __len__(self) -> int:
+        return self._count
+
+    def values(self) -> np.ndarray:
+        """Devuelve las muestras de la ventana, de la más antigua a la más reciente."""
+        return np.roll(self._values, -self._start)[:self._count]
+
+    def reset(self) -> None:
+        self._start = 0
+        self._count = 0
+        self._since_sync = 0
+        self._sums.fill(0.0)
+
+    def _sync(self) -> None:
+        spectrum = calculate_fourier_spectrum(self.values(), self.k_max)
+        self._sums = (spectrum[0] + 1j * spectrum[1]) * (self.window / 2)
+        self._since_sync = 0
+
+    def extend(self, values) -> None:
+        """
+        Añade muestras al final de la ventana.
+
+        Args:
+            values (array_like): Muestras nuevas, de la más antigua a la más reciente
+        """
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if values.size == 0:
+            return
+        full = self._count == self.window
+        if not full or values.size > self._batch_limit:
+            tail = values[-self.window:]
+            ordered = np.concatenate([self.values(), tail])[-self.window:]
+            self._values[:ordered.size] = ordered
+            self._start = 0
+            self._count = ordered.size
+            if self._count == self.window:
+                self._sync()
+            return
+        self._start = core.sliding_dft_update(self._sums, self._rotation, self._values, self._start, values)
+        self._since_sync += values.size
+        if self._since_sync >= self.window:
+            self._sync()
+
+    def append(self, value: float) -> None:
+        """Añade una muestra (un día) al final de la ventana."""
+        self.extend([value])
+
+    def coefficients(self) -> np.ndarray:
+        """
+        Devuelve el espectro actual.
+
+        Returns:
+            np.ndarray: Arreglo (4, K) con a_k, b_k, Ak y log10(Ak) de la ventana,
+            igual que calculate_fourier_spectrum(values(), K). Con la ventana
+            aún incompleta, K = len(self)//2.
+        """
+        if self._count < self.window:
+            return calculate_fourier_spectrum(self.values(), self._count // 2)
+        out = np.empty((4, self.k_max))
+        np.multiply(self._sums.real, 2 / self.window, out=out[0])
+        np.multiply(self._sums.imag, 2 / self.window, out=out[1])
+        np.hypot(out[0], out[1], out=out[2])
+        out[3].fill(0.0)
+        np.log10(out[2], out=out[3], where=out[2] > 0)
+        return out
+
+
+class _FileTail:
+    """Lee las líneas completas añadidas a un archivo desde la última lectura."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._offset = 0
+        self._inode = None
+        self._partial = b''
+
+    def read_lines(self):
+        """
+        Returns:
+            tuple: (reiniciado, líneas nuevas). ``reiniciado`` es True si el
+            archivo se truncó o se reemplazó y se volvió a leer desde el principio.
+        """
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return False, []
+        restarted = False
+        if stat.st_ino != self._inode or stat.st_size < self._offset:
+            restarted = self._inode is not None
+            self._inode = stat.st_ino
+            self._offset = 0
+            self._partial = b''
+        if stat.st_size == self._offset:
+            return restarted, []
+        with open(self.path, 'rb') as f:
+            f.seek(self._offset)
+            data = f.read()
+        self._offset += len(data)
+        lines = (self._partial + data).split(b'\n')
+        # La última línea puede estar a medio escribir
+        self._partial = lines.pop()
+        return restarted, lines
+
+
+@dataclass
+class LiveResult:
+    """Estado de una persona vigilada tras el último refresco."""
+    name: str
+    days: int  # días leídos del archivo
+    window_days: int  # días dentro de la ventana del espectro
+    mean_gb: float  # GB medio de la ventana
+    alpha: float
+    intercept: float
+    r: float
+    error: Optional[str] = None  # última línea que no se pudo leer
+
+
+class _Member:
+    def __init__(self, name: str, path: str, bmr: float, window: int):
+        self.name = name
+        self.tail = _FileTail(path)
+        self.bmr = bmr
+        self.spectrum = SlidingSpectrum(window)
+        self.days = 0
+        self.error = None
+
+
+def _parse_minutes(line: bytes) -> float:
+    text = line.decode('utf-8', errors='replace').strip()
+    value = float(_FIELD_SEPARATOR.split(text)[-1])
+    if not math.isfinite(value) or value < 0:
+        raise ValueError(text)
+    return value
+
+
+class LiveMonitor:
+    """
+    Vigila los archivos de registro de varias personas.
+
+    Args:
+        window (int): Días de la ventana del espectro
+        refresh_interval (float): Segundos mínimos entre dos refrescos
+    """
+
+    def __init__(self, window: int = DEFAULT_WINDOW, refresh_interval: float = 1.0):
+        self.window = window
+        self.refresh_interval = refresh_interval
+        self._members: Dict[str, _Member] = {}
+        self._dirty = set()
+        self._last_refresh = -math.inf
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    def add(self, name: str, path: str, sex: str, weight: float, height: float, age: float) -> None:
+        """Empieza a vigilar el archivo de una persona (se lee desde el principio)."""
+        bmr = float(calculate_bmr(sex, float(weight), float(height), float(age)))
+        if not (math.isfinite(bmr) and float(weight) > 0 and float(height) > 0 and float(age) >= 0):
+            raise ValueError(f'Datos personales no válidos para {name}.')
+        self._members[name] = _Member(name, path, bmr, self.window)
+        self._dirty.add(name)
+
+    @classmethod
+    def from_csv(cls, path: str, **kwargs) -> 'LiveMonitor':
+        """
+        Crea un monitor a partir de un CSV con columnas persona, archivo, sexo,
+        peso, altura y edad. Las rutas relativas se toman desde la carpeta del CSV.
+        """
+        monitor = cls(**kwargs)
+        base = os.path.dirname(os.path.abspath(path))
+        with open(path, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                monitor.add(row['persona'], os.path.join(base, row['archivo']),
+                            row['sexo'].strip(), row['peso'], row['altura'], row['edad'])
+        return monitor
+
+    def poll(self) -> List[str]:
+        """
+        Lee lo añadido a cada archivo y actualiza el espectro deslizante.
+
+        Returns:
+            List[str]: Personas con días nuevos (o con el archivo reiniciado)
+        """
+        changed = []
+        for member in self._members.values():
+            restarted, lines = member.tail.read_lines()
+            if restarted:
+                member.spectrum.reset()
+                member.days = 0
+            minutes = []
+            for line in lines:
+                if not line.strip():
+                    continue
+                try:
+                    minutes.append(_parse_minutes(line))
+                except ValueError:
+                    member.error = f'Línea no válida: {line.decode("utf-8", errors="replace").strip()}'
+            if minutes:
+                member.spectrum.extend(calculate_daily_expenditure(member.bmr, minutes))
+                member.days += len(minutes)
+            if minutes or restarted:
+                changed.append(member.name)
+        self._dirty.update(changed)
+        return changed
+
+    def result(self, name: str) -> LiveResult:
+        """Calcula el ajuste log-log y el GB medio de la ventana de una persona."""
+        member = self._members[name]
+        values = member.spectrum.values()
+        amplitudes = member.spectrum.coefficients()[2]
+        alpha, intercept, r = calculate_loglog_fit(amplitudes) if amplitudes.size else (math.nan,) * 3
+        return LiveResult(name, member.days, len(values), float(values.mean()) if values.size else math.nan,
+                          alpha, intercept, r, member.error)
+
+    def update(self, now: Optional[float] = None) -> Dict[str, LiveResult]:
+        """
+        Lee los archivos y, si ya pasó ``refresh_interval`` desde el último
+        refresco, devuelve los resultados de las personas que cambiaron.
+
+        Returns:
+            Dict[str, LiveResult]: Resultados nuevos (vacío si no toca refrescar)
+        """
+        self.poll()
+        now = time.monotonic() if now is None else now
+        if not self._dirty or now - self._last_refresh < self.refresh_interval:
+            return {}
+        self._last_refresh = now
+        results = {name: self.result(name) for name in sorted(self._dirty)}
+        self._dirty.clear()
+        return results
+
+    def run(self, callback: Callable[[Dict[str, LiveResult]], None], poll_interval: float = 1.0,
+            stop: Optional[Callable[[], bool]] = None) -> None:
+        """
+        Vigila los archivos hasta que ``stop()`` devuelva True (o indefinidamente).
+
+        Args:
+            callback (Callable): Recibe los resultados de cada refresco
+            poll_interval (float): Segundos entre dos lecturas de los archivos
+            stop (Callable, opcional): Condición de parada
+        """
+        while not (stop and stop()):
+            results = self.update()
+            if results:
+                callback(results)
+            time.sleep(poll_interval)
@@ -5,9 +5,14 @@
 Herramientas matemáticas para el cálculo de criticalidad metabólica.
 """
 
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Optional, Sequence, Union
 import numpy as np
 from dataclasses import dataclass
+from statistics import NormalDist
+from utils.shared import core
+from src.core import AF_BASE, AF_SLOPE, HARRIS_BENEDICT
+
+ArrayLike = Union[Sequence[float], np.ndarray]
 
 @dataclass
 class StatisticalAnalysis:
@@ -21,63 +26,308 @@ class StatisticalAnalysis:
     x2_sum: float
     y2_sum: float
 
-def calculate_activity_factor(minutes: float) -> float:
+# Las fórmulas del modelo, las sumas de Fourier y la regresión están en el
+# núcleo compartido con metabolic_app (src.core, que elige el motor de cálculo):
+# HARRIS_BENEDICT = (base, peso, altura, edad) por sexo; AF = AF_BASE + AF_SLOPE * minutos
+# Intervalos geométricos de k del ajuste log-log
+LOG_BINS = 32
+# Mayor número de minutos que se guarda en uint16
+_UINT16_MAX = np.iinfo(np.uint16).max
+
+@dataclass(frozen=True)
+class Precision:
+    """
+    Política de tipos para guardar y analizar cohortes.
+
+    Con ``compact_minutes`` los minutos se guardan en uint16 si son enteros
+    entre 0 y 65535, y si no en float32. ``spectrum`` es el tipo en el que se
+    calcula y se devuelve el espectro. El GB, las sumas, las medias y las
+    regresiones se calculan siempre en float64, sea cual sea la política.
+    """
+    name: str
+    compact_minutes: bool  # minutos en uint16/float32 en lugar de float64
+    spectrum: type  # np.float64 o np.float32
+
+DOUBLE = Precision('double', False, np.float64)
+# Minutos compactos y espectro en float32: la mitad de memoria o menos y
+# diferencias con DOUBLE documentadas en benchmarks/accuracy.py
+SINGLE = Precision('single', True, np.float32)
+PRECISIONS = {precision.name: precision for precision in (DOUBLE, SINGLE)}
+
+def get_precision(precision: Union[str, Precision, None] = None) -> Precision:
+    """
+    Devuelve la política de tipos indicada por nombre ('double' o 'single').
+    Args:
+        precision (str | Precision, opcional): Nombre o política (por defecto DOUBLE)
+    Returns:
+        Precision: La política
+    Raises:
+        ValueError: Si el nombre no corresponde a ninguna política
+    """
+    if precision is None:
+        return DOUBLE
+    if isinstance(precision, Precision):
+        return precision
+    if precision not in PRECISIONS:
+        raise ValueError(f"Precisión desconocida: {precision} (use {', '.join(PRECISIONS)}).")
+    return PRECISIONS[precision]
+
+def minutes_dtype(minutes: ArrayLike, precision: Union[str, Precision, None] = None) -> np.dtype:
+    """
+    Elige el tipo con el que se guardan unos minutos de ejercicio.
+    Args:
+        minutes (array_like): Minutos de una persona o de una cohorte
+        precision (str | Precision, opcional): Política de tipos (por defecto DOUBLE)
+    Returns:
+        np.dtype: float64 con DOUBLE; con SINGLE, uint16 si todos los valores
+        son enteros entre 0 y 65535 (se guardan sin pérdida) y float32 si no
+    """
+    if not get_precision(precision).compact_minutes:
+        return np.dtype(np.float64)
+    values = np.asarray(minutes)
+    if values.dtype in (np.uint8, np.uint16):
+        return np.dtype(np.uint16)
+    with np.errstate(invalid='ignore'):
+        whole = values.size == 0 or bool(((values >= 0) & (values <= _UINT16_MAX)
+                                          & (np.floor(values) == values)).all())
+    return np.dtype(np.uint16 if whole else np.float32)
+
+def store_minutes(minutes: ArrayLike, precision: Union[str, Precision, None] = None) -> np.ndarray:
+    """
+    Convierte unos minutos de ejercicio al tipo de almacenamiento de la política.
+    Args:
+        minutes (array_like): Minutos de una persona o de una cohorte
+        precision (str | Precision, opcional): Política de tipos (por defecto DOUBLE)
+    Returns:
+        np.ndarray: Los minutos en el tipo de minutes_dtype (sin copia si ya lo tienen)
+    """
+    values = np.asarray(minutes)
+    return values.astype(minutes_dtype(values, precision), copy=False)
+
+def calculate_bmr(sex, weight, height, age, coefficients: Dict[str, Tuple[float, float, float, float]] = HARRIS_BENEDICT):
+    """
+    Calcula el Gasto Metabólico Basal (TMB) usando la fórmula de Harris-Benedict.
+    Acepta los datos de una persona o arreglos con los de toda una cohorte.
+    Args:
+        sex (str | array_like): 'M'/'Masculino' o 'F' (cualquier otro valor se trata como 'F')
+        weight (float | array_like): Peso en kg
+        height (float | array_like): Altura en cm
+        age (float | array_like): Edad en años
+        coefficients (dict): (base, peso, altura, edad) por sexo; por defecto
+            HARRIS_BENEDICT (otras fórmulas en utils.sweep.BMR_COEFFICIENT_SETS)
+    Returns:
+        float | np.ndarray: Valor del TMB en kcal/día
+    """
+    return core.bmr(sex, weight, height, age, coefficients)
+
+def calculate_activity_factor(minutes, out: Optional[np.ndarray] = None,
+                              base: float = AF_BASE, slope: float = AF_SLOPE):
     """
     Calcula el factor de actividad física basado en minutos de ejercicio.
     Args:
-        minutes (float): Minutos de ejercicio
+        minutes (float | array_like): Minutos de ejercicio (un día o una serie)
+        out (np.ndarray, opcional): Buffer donde escribir el resultado de una serie
+        base (float): AF sin ejercicio
+        slope (float): Aumento del AF por minuto de ejercicio
+    Returns:
+        float | np.ndarray: Factor de actividad física
+    """
+    return core.activity_factor(minutes, out=out, base=base, slope=slope)
+
+def calculate_daily_expenditure(bmr, minutes: ArrayLike,
+                                out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Calcula el gasto bruto diario (GB = TMB * AF) de toda una serie.
+    Con una matriz (personas, días) de minutos, ``bmr`` puede ser un arreglo
+    con el TMB de cada persona.
+    Args:
+        bmr (float | np.ndarray): Gasto Metabólico Basal en kcal/día
+        minutes (array_like): Minutos de ejercicio por día
+        out (np.ndarray, opcional): Buffer donde escribir el resultado
     Returns:
-        float: Factor de actividad física
+        np.ndarray: Gasto bruto diario por día
     """
-    return 1.2 + 0.01 * minutes
+    return core.daily_expenditure(bmr, minutes, out=out)
 
-def calculate_fourier_coefficients(x_n: List[float], k: int) -> Tuple[float, float, float, float]:
+def calculate_fourier_coefficients(x_n: ArrayLike, k: int) -> Tuple[float, float, float, float]:
     """
     Calcula los coeficientes de Fourier para una serie de datos.
     Args:
-        x_n (List[float]): Serie de datos
+        x_n (array_like): Serie de datos
         k (int): Frecuencia
     Returns:
         Tuple[float, float, float, float]: Coeficientes (a_k, b_k, Ak, log10(Ak))
     """
-    n = len(x_n)
-    if n == 0:
-        return 0.0, 0.0, 0.0, 0.0
-    x_array = np.array(x_n)
-    N = n
-    n_array = np.arange(1, N + 1)
-    a_k = (2/N) * np.sum(x_array * np.cos(2 * np.pi * k * n_array / N))
-    b_k = (2/N) * np.sum(x_array * np.sin(2 * np.pi * k * n_array / N))
-    Ak = np.sqrt(a_k**2 + b_k**2)
-    log10_Ak = np.log10(Ak) if Ak > 0 else 0.0
-    return a_k, b_k, Ak, log10_Ak
+    # Suma directa (sin FFT): O(N) para una sola k
+    return tuple(float(value) for value in core.fourier_coefficients(x_n, k)[:, 0])
+
+def calculate_fourier_spectrum(x_n: ArrayLike, k_max: Optional[int] = None,
+                               out: Optional[np.ndarray] = None,
+                               precision: Union[str, Precision, None] = None) -> np.ndarray:
+    """
+    Calcula los coeficientes de Fourier para k = 1..k_max de una sola vez.
+
+    Con el motor NumPy usa la FFT de la serie, con la misma convención que
+    calculate_fourier_coefficients (n de 1 a N, suma de x_n·cos y x_n·sin),
+    así que la fila k-1 coincide con calculate_fourier_coefficients(x_n, k).
+    Con una matriz (personas, días) se calcula el espectro de cada fila.
+    Con SINGLE la media de cada serie se resta en float64 y la FFT de las
+    desviaciones se hace en float32.
+    Args:
+        x_n (array_like): Serie de datos (o una serie por fila)
+        k_max (int, opcional): Última frecuencia a calcular (por defecto N)
+        out (np.ndarray, opcional): Buffer de forma (4, ..., k_max) a reutilizar
+        precision (str | Precision, opcional): Política de tipos (por defecto
+            la del buffer ``out``, o DOUBLE)
+    Returns:
+        np.ndarray: Arreglo (4, ..., k_max) con a_k, b_k, Ak y log10(Ak)
+    """
+    dtype = None if precision is None else get_precision(precision).spectrum
+    return core.fourier_spectrum(x_n, k_max, out=out, dtype=dtype)
+
+@dataclass
+class LogBinnedSpectrum:
+    """
+    Espectro reducido a intervalos de k espaciados geométricamente.
+
+    El intervalo j agrupa k = k_start[j]..k_stop[j] - 1. Las estadísticas son
+    de log10(A_k) y solo cuentan las amplitudes A_k > 0. Con una matriz
+    (personas, K) los campos por intervalo tienen una fila por persona.
+    """
+    k_start: np.ndarray  # (B,) primera k de cada intervalo
+    k_stop: np.ndarray  # (B,) k siguiente a la última del intervalo
+    count: np.ndarray  # (..., B) amplitudes positivas en el intervalo
+    log_k: np.ndarray  # (..., B) media de log10(k) de esas amplitudes
+    mean: np.ndarray  # (..., B) media de log10(A_k)
+    variance: np.ndarray  # (..., B) varianza de log10(A_k) (dividida entre count)
+
+def log_bin_edges(K: int, bins: int = LOG_BINS) -> np.ndarray:
+    """
+    Calcula los límites de los intervalos geométricos de k = 1..K.
+    Args:
+        K (int): Última frecuencia
+        bins (int): Intervalos como máximo
+    Returns:
+        np.ndarray: Primeras k de cada intervalo seguidas de K + 1. Los
+        intervalos que no contendrían ninguna k entera se omiten, así que con
+        K <= bins cada k tiene su propio intervalo.
+    """
+    if K <= bins:
+        return np.arange(1, K + 2)
+    edges = np.unique(np.floor(np.geomspace(1, K + 1, bins + 1)).astype(np.int64))
+    edges[-1] = K + 1
+    return edges
 
-def calculate_statistics(x: List[float], y: List[float]) -> StatisticalAnalysis:
+def calculate_log_binned_spectrum(A_k: ArrayLike, bins: int = LOG_BINS) -> LogBinnedSpectrum:
+    """
+    Reduce las amplitudes k = 1..K a ``bins`` intervalos geométricos.
+
+    Las sumas por intervalo se hacen con np.add.reduceat sobre el último eje,
+    así que el coste es O(K) por persona y el resultado tiene tamaño fijo.
+    Args:
+        A_k (array_like): Amplitudes para k = 1..K (o una fila por persona)
+        bins (int): Intervalos como máximo
+    Returns:
+        LogBinnedSpectrum: Recuento, media y varianza de log10(A_k) por
+        intervalo; nan en los intervalos sin amplitudes positivas
+    """
+    A_array = np.asarray(A_k, dtype=np.float64)
+    edges = log_bin_edges(A_array.shape[-1], bins)
+    starts = edges[:-1] - 1
+    valid = A_array > 0
+    log_a = np.log10(np.where(valid, A_array, 1.0))
+    log_k = np.log10(np.arange(1, A_array.shape[-1] + 1, dtype=np.float64))
+    if starts.size == 0:
+        empty = np.empty(A_array.shape[:-1] + (0,))
+        return LogBinnedSpectrum(starts + 1, edges[1:], empty.astype(np.int64), empty, empty, empty)
+    count = np.add.reduceat(valid, starts, axis=-1, dtype=np.int64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean_k = np.add.reduceat(np.where(valid, log_k, 0.0), starts, axis=-1) / count
+        mean = np.add.reduceat(np.where(valid, log_a, 0.0), starts, axis=-1) / count
+        # Desviaciones respecto a la media de su propio intervalo
+        deviation = np.where(valid, log_a - np.repeat(mean, np.diff(edges), axis=-1), 0.0)
+        variance = np.add.reduceat(deviation * deviation, starts, axis=-1) / count
+    return LogBinnedSpectrum(starts + 1, edges[1:], count, mean_k, mean, variance)
+
+def _fit_lines(x: np.ndarray, y: np.ndarray, valid: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Ajusta y = alpha * x + C por mínimos cuadrados con los puntos válidos de cada fila."""
+    # Sumas centradas: evitan la cancelación de n*sum(y^2) - sum(y)^2
+    # cuando las amplitudes son casi constantes
+    return core.linear_fit(x, y, valid)
+
+def calculate_binned_loglog_fit(binned: LogBinnedSpectrum) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Ajusta log10(A_k) = alpha * log10(k) + C sobre un espectro reducido.
+
+    Cada intervalo con amplitudes positivas aporta un punto (media de log10(k),
+    media de log10(A_k)) con el mismo peso, de modo que las k altas, mucho más
+    numerosas, no dominan el ajuste.
+    Args:
+        binned (LogBinnedSpectrum): Salida de calculate_log_binned_spectrum
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: (alpha, C, r)
+    """
+    valid = binned.count > 0
+    return _fit_lines(np.where(valid, binned.log_k, 0.0), binned.mean, valid)
+
+def calculate_loglog_fit(A_k: ArrayLike, bins: Optional[int] = LOG_BINS) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Ajusta por mínimos cuadrados log10(A_k) = alpha * log10(k) + C.
+
+    La fila de amplitudes corresponde a k = 1..K; los puntos con A_k <= 0 se
+    descartan, igual que en la transformación logarítmica de la vista de
+    estadística. Con una matriz (personas, K) se ajusta cada fila; las filas
+    con menos de dos puntos válidos o con varianza nula dan nan.
+    Args:
+        A_k (array_like): Amplitudes para k = 1..K (o una fila por persona)
+        bins (int, opcional): Si se da, el espectro se reduce antes a ``bins``
+            intervalos geométricos (calculate_binned_loglog_fit); con K <= bins
+            el resultado es el mismo. None ajusta todas las k por igual.
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: (alpha, C, r)
+    """
+    A_array = np.asarray(A_k, dtype=np.float64)
+    if bins is not None:
+        return calculate_binned_loglog_fit(calculate_log_binned_spectrum(A_array, bins))
+    valid = A_array > 0
+    x = np.log10(np.arange(1, A_array.shape[-1] + 1, dtype=np.float64))
+    return _fit_lines(x, np.log10(np.where(valid, A_array, 1.0)), valid)
+
+def calculate_statistics(x: ArrayLike, y: ArrayLike) -> StatisticalAnalysis:
     """
     Calcula estadísticas básicas para dos series de datos.
+    Con matrices (personas, días) cada campo del resultado es un arreglo
+    con el valor de cada fila.
     
     Args:
-        x (List[float]): Primera serie de datos
-        y (List[float]): Segunda serie de datos
+        x (array_like): Primera serie de datos
+        y (array_like): Segunda serie de datos
         
     Returns:
         StatisticalAnalysis: Objeto con los resultados estadísticos
     """
-    x_array = np.array(x)
-    y_array = np.array(y)
+    x_array = np.asarray(x, dtype=np.float64)
+    y_array = np.asarray(y, dtype=np.float64)
+    n = x_array.shape[-1]
     
-    mean_x = np.mean(x_array)
-    mean_y = np.mean(y_array)
+    mean_x = np.mean(x_array, axis=-1)
+    mean_y = np.mean(y_array, axis=-1)
     
-    variance_x = np.var(x_array)
-    variance_y = np.var(y_array)
+    xy_sum = np.einsum('...i,...i->...', x_array, y_array)
+    x2_sum = np.einsum('...i,...i->...', x_array, x_array)
+    y2_sum = np.einsum('...i,...i->...', y_array, y_array)
     
-    xy_sum = np.sum(x_array * y_array)
-    x2_sum = np.sum(x_array ** 2)
-    y2_sum = np.sum(y_array ** 2)
+    # Desviaciones respecto a la media, reutilizadas para varianza y correlación
+    dx = x_array - mean_x[..., np.newaxis]
+    dy = y_array - mean_y[..., np.newaxis]
+    sxx = np.einsum('...i,...i->...', dx, dx)
+    syy = np.einsum('...i,...i->...', dy, dy)
+    variance_x = sxx / n
+    variance_y = syy / n
     
-    # Correlación de Pearson
-    correlation = np.corrcoef(x_array, y_array)[0, 1]
+    # Correlación de Pearson (nan si alguna serie es constante, como np.corrcoef)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        correlation = np.einsum('...i,...i->...', dx, dy) / (np.sqrt(sxx) * np.sqrt(syy))
     
     return StatisticalAnalysis(
         mean_x=mean_x,
@@ -90,11 +340,213 @@ def calculate_statistics(x: List[float], y: List[float]) -> StatisticalAnalysis:
         y2_sum=y2_sum
     )
 
-def calculate_fourier_table(x_n: List[float], k: int) -> List[Dict[str, float]]:
+@dataclass
+class PeriodicityAnalysis:
+    """
+    Autocorrelación y periodo dominante de una serie.
+
+    Con una matriz (personas, días) cada campo tiene un valor (o una fila de
+    autocorrelación) por persona.
+    """
+    autocorrelation: np.ndarray  # (..., L+1) r(τ) para τ = 0..L
+    dominant_period: float  # periodo en días (interpolado); nan si no hay pico significativo
+    strength: float  # autocorrelación en el periodo dominante
+    threshold: float  # umbral de significación (95 %) para ruido blanco
+
+def calculate_autocorrelation(x: ArrayLike, max_lag: Optional[int] = None) -> np.ndarray:
+    """
+    Calcula la autocorrelación r(τ) = c(τ)/c(0) para τ = 0..max_lag.
+
+    Usa el teorema de Wiener-Khinchin: la autocovarianza es la transformada
+    inversa del espectro de potencia de la serie centrada. La serie se rellena
+    con ceros hasta una potencia de 2 >= 2N - 1, de modo que la correlación
+    circular de la FFT coincide con la lineal: O(N log N) en vez de O(N²).
+    c(τ) es el estimador sesgado (se divide siempre por N), como en el análisis
+    clásico de series temporales. Con una matriz se calcula cada fila.
+    Args:
+        x (array_like): Serie de datos (o una serie por fila)
+        max_lag (int, opcional): Último desfase (por defecto N - 1)
+    Returns:
+        np.ndarray: Arreglo (..., max_lag + 1); nan en las filas constantes
+    """
+    x_array = np.asarray(x, dtype=np.float64)
+    N = x_array.shape[-1]
+    max_lag = N - 1 if max_lag is None else min(int(max_lag), N - 1)
+    if N == 0:
+        return np.empty(x_array.shape[:-1] + (0,))
+    centred = x_array - x_array.mean(axis=-1, keepdims=True)
+    size = 1 << (2 * N - 1).bit_length()
+    spectrum = np.fft.rfft(centred, n=size, axis=-1)
+    power = np.add(spectrum.real ** 2, spectrum.imag ** 2)
+    acov = np.fft.irfft(power, n=size, axis=-1)[..., :max_lag + 1]
+    # Una serie constante deja solo el redondeo de la media: se trata como varianza nula
+    noise = N * (16 * np.finfo(np.float64).eps * np.abs(x_array).max(axis=-1, initial=0.0)) ** 2
+    variance = acov[..., :1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(variance > noise[..., np.newaxis], acov / variance, np.nan)
+
+def calculate_periodicity(x: ArrayLike, max_lag: Optional[int] = None) -> PeriodicityAnalysis:
+    """
+    Detecta el periodo dominante de una serie a partir de su autocorrelación.
+
+    El periodo dominante es el desfase del máximo local más alto de r(τ) que
+    supera el umbral de ruido blanco z/sqrt(N). z corresponde a un 95 %
+    corregido por el número de desfases examinados (Bonferroni); con 1.96 en
+    cada desfase, el ruido daría un pico falso casi siempre. Como el estimador sesgado
+    decae con τ, un ritmo semanal da su pico más alto en 7 y no en 14 o 21. La
+    posición se refina con una parábola por los tres puntos del pico, así que
+    un ritmo mensual puede dar, por ejemplo, 30.4 días. Con una matriz se
+    analiza cada fila de una sola vez.
+    Args:
+        x (array_like): Serie de datos (o una serie por fila)
+        max_lag (int, opcional): Último desfase a considerar (por defecto N // 2)
+    Returns:
+        PeriodicityAnalysis: Autocorrelación hasta max_lag y periodo dominante
+    """
+    x_array = np.asarray(x, dtype=np.float64)
+    N = x_array.shape[-1]
+    max_lag = N // 2 if max_lag is None else min(int(max_lag), N - 1)
+    # Un desfase más para poder decidir si max_lag es un máximo local
+    acf = calculate_autocorrelation(x_array, max_lag + 1)
+    z = NormalDist().inv_cdf(1 - 0.05 / (2 * max(max_lag, 1)))
+    threshold = z / np.sqrt(N) if N else np.nan
+    inner = acf[..., 1:-1]
+    if inner.shape[-1] == 0:
+        dominant_period = np.full(x_array.shape[:-1], np.nan)
+        strength = dominant_period.copy()
+    else:
+        with np.errstate(invalid='ignore'):
+            peaks = (inner > acf[..., :-2]) & (inner >= acf[..., 2:]) & (inner > threshold)
+        lag = np.argmax(np.where(peaks, inner, -np.inf), axis=-1) + 1
+        found = np.take_along_axis(peaks, lag[..., np.newaxis] - 1, axis=-1)[..., 0]
+        around = np.take_along_axis(acf, lag[..., np.newaxis] + np.array([-1, 0, 1]), axis=-1)
+        previous, peak, following = around[..., 0], around[..., 1], around[..., 2]
+        curvature = previous - 2 * peak + following
+        with np.errstate(divide='ignore', invalid='ignore'):
+            offset = np.where(found & (curvature < 0), 0.5 * (previous - following) / curvature, 0.0)
+        dominant_period = np.where(found, lag + offset, np.nan)
+        strength = np.where(found, peak, np.nan)
+    autocorrelation = acf[..., :max_lag + 1]
+    if x_array.ndim == 1:
+        return PeriodicityAnalysis(autocorrelation, float(dominant_period), float(strength), float(threshold))
+    return PeriodicityAnalysis(autocorrelation, dominant_period, strength, threshold)
+
+@dataclass
+class CrossSpectrum:
+    """
+    Espectro cruzado entre dos series por frecuencia k, en formato columnar.
+
+    Las frecuencias k = 1..L//2 se cuentan en ciclos por segmento de L días,
+    así que el periodo de cada una es L/k días. La escala es la de
+    calculate_fourier_spectrum: con un solo segmento y sin ventana, sxx es
+    A_k² de x. Con una matriz (personas, días) los campos por frecuencia
+    tienen forma (personas, K), salvo que se promedie también entre personas.
+    """
+    k: np.ndarray  # (K,) frecuencias
+    period: np.ndarray  # (K,) periodo en días
+    sxx: np.ndarray  # (..., K) autoespectro de x
+    syy: np.ndarray  # (..., K) autoespectro de y
+    sxy: np.ndarray  # (..., K) espectro cruzado (complejo)
+    coherence: np.ndarray  # (..., K) |sxy|²/(sxx·syy) en [0, 1]; nan si sxx o syy es 0
+    phase: np.ndarray  # (..., K) fase de x menos la de y, en radianes
+    segments: int  # segmentos promediados por serie
+
+    def columns(self, row: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """
+        Devuelve las columnas de la tabla por frecuencia (para la vista o un DataFrame).
+        Args:
+            row (int, opcional): Persona a extraer cuando hay una fila por persona
+        Returns:
+            Dict[str, np.ndarray]: Encabezado -> columna
+        """
+        pick = (lambda a: a) if row is None else (lambda a: a[row])
+        return {
+            'k': self.k,
+            'Periodo (días)': self.period,
+            'Sxx': pick(self.sxx),
+            'Syy': pick(self.syy),
+            '|Sxy|': np.abs(pick(self.sxy)),
+            'Coherencia': pick(self.coherence),
+            'Fase (rad)': pick(self.phase),
+        }
+
+def calculate_cross_spectrum(x: ArrayLike, y: ArrayLike, segment_length: Optional[int] = None,
+                             overlap: float = 0.5, window: Optional[str] = 'hann',
+                             across_rows: bool = False) -> CrossSpectrum:
+    """
+    Calcula autoespectros, espectro cruzado, coherencia y fase entre dos series.
+
+    Método de Welch: cada serie se divide en segmentos de segment_length días
+    que se solapan en la fracción overlap; a cada segmento se le resta su media
+    y se le aplica la ventana. Las FFT de x y de y de todos los segmentos se
+    calculan en una sola llamada y los espectros se promedian entre segmentos
+    (y entre filas con across_rows=True). Con un solo segmento y una sola fila
+    la coherencia es 1 en toda frecuencia con energía: para estimarla hacen
+    falta varios segmentos o varias personas.
+    Args:
+        x (array_like): Primera serie (o una serie por fila)
+        y (array_like): Segunda serie, con la misma forma que x
+        segment_length (int, opcional): Días por segmento (por defecto la serie entera)
+        overlap (float): Fracción de solapamiento entre segmentos, en [0, 1)
+        window (str, opcional): 'hann' o None (sin ventana)
+        across_rows (bool): Promediar también entre filas (toda la cohorte)
+    Returns:
+        CrossSpectrum: Resultados por frecuencia
+    Raises:
+        ValueError: Si las formas no coinciden, las series están vacías o los
+            parámetros están fuera de rango
+    """
+    x_array = np.asarray(x, dtype=np.float64)
+    y_array = np.asarray(y, dtype=np.float64)
+    if x_array.shape != y_array.shape:
+        raise ValueError(f"x e y deben tener la misma forma ({x_array.shape} != {y_array.shape})")
+    N = x_array.shape[-1]
+    L = N if segment_length is None else int(segment_length)
+    if not 1 <= L <= N:
+        raise ValueError(f"segment_length debe estar entre 1 y el número de días ({N})")
+    if not 0 <= overlap < 1:
+        raise ValueError("overlap debe estar en [0, 1)")
+    if window not in ('hann', None):
+        raise ValueError(f"Ventana no soportada: {window}")
+    step = max(1, int(round(L * (1 - overlap))))
+    # (2, ..., S, L): vista sin copia de los segmentos de x y de y
+    segments = np.lib.stride_tricks.sliding_window_view(np.stack([x_array, y_array]), L, axis=-1)[..., ::step, :]
+    data = segments - segments.mean(axis=-1, keepdims=True)
+    w = np.hanning(L + 2)[1:-1] if window == 'hann' else np.ones(L)
+    data *= w
+    K = L // 2
+    spectra = np.fft.rfft(data, axis=-1)[..., 1:K + 1]
+    # (2/Σw)·conj(X_k) es el coeficiente a_k + i·b_k de la convención n = 1..N
+    # salvo un factor de fase común que se cancela en los productos
+    scale = (2.0 / w.sum()) ** 2
+    X, Y = spectra[0], spectra[1]
+    # Promedio entre segmentos y, si se pide, entre todas las filas
+    average_axes = tuple(range(X.ndim - 1)) if across_rows else (-2,)
+    sxx = np.mean(X.real ** 2 + X.imag ** 2, axis=average_axes) * scale
+    syy = np.mean(Y.real ** 2 + Y.imag ** 2, axis=average_axes) * scale
+    sxy = np.mean(np.conj(X) * Y, axis=average_axes) * scale
+    # sqrt(sxx)·sqrt(syy) en lugar de sxx·syy, como en calculate_statistics:
+    # el producto directo desborda con series de magnitud extrema
+    with np.errstate(divide='ignore', invalid='ignore'):
+        norm = np.sqrt(sxx) * np.sqrt(syy)
+        coherence = np.where(norm > 0, np.minimum((np.abs(sxy) / norm) ** 2, 1.0), np.nan)
+    k = np.arange(1, K + 1)
+    return CrossSpectrum(
+        k=k,
+        period=L / k,
+        sxx=sxx,
+        syy=syy,
+        sxy=sxy,
+        coherence=coherence,
+        phase=np.angle(sxy),
+        segments=segments.shape[-2]
+    )
+
+def calculate_fourier_table(x_n: ArrayLike, k: int) -> List[Dict[str, float]]:
     """
     Genera una tabla con los cálculos de Fourier para cada punto.
     Args:
-        x_n (List[float]): Serie de datos
+        x_n (array_like): Serie de datos
         k (int): Frecuencia
     Returns:
         List[Dict[str, float]]: Lista de diccionarios con los cálculos
@@ -103,16 +555,20 @@ def calculate_fourier_table(x_n: List[float], k: int) -> List[Dict[str, float]]:
     if n == 0:
         return []
     N = n
-    table = []
-    for i, x in enumerate(x_n, 1):
-        cos_term = np.cos(2 * np.pi * k * i / N)
-        sin_term = np.sin(2 * np.pi * k * i / N)
-        table.append({
+    x_array = np.asarray(x_n, dtype=np.float64)
+    angles = 2 * np.pi * k * np.arange(1, N + 1) / N
+    cos_terms = np.cos(angles)
+    sin_terms = np.sin(angles)
+    return [
+        {
             'n': i,
             'x': x,
             'cos': cos_term,
             'sin': sin_term,
             'x_cos': x * cos_term,
             'x_sin': x * sin_term
-        })
-    return table 
\ No newline at end of file
+        }
+        for i, (x, cos_term, sin_term) in enumerate(zip(
+            x_array.tolist(), cos_terms.tolist(), sin_terms.tolist()
+        ), 1)
+    ]
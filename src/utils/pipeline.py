@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Evaluación perezosa de las etapas del análisis como un grafo de dependencias.
+
+Cada nodo se calcula solo cuando se pide su valor y el resultado se conserva
+hasta que cambia alguna de sus entradas. Al asignar una entrada se invalidan
+en cascada los nodos que dependen de ella, sin recalcular nada: el trabajo se
+hace en el siguiente ``get``.
+"""
+
+from typing import Any, Callable, Dict, List, Sequence
+
+_MISSING = object()
+
+
+class Pipeline:
+    """Grafo acíclico de etapas con caché por nodo."""
+
+    def __init__(self):
+        self._inputs: Dict[str, Any] = {}
+        self._functions: Dict[str, Callable] = {}
+        self._dependencies: Dict[str, tuple] = {}
+        self._dependents: Dict[str, List[str]] = {}
+        self._cache: Dict[str, Any] = {}
+
+    def _register(self, name: str, dependencies: Sequence[str]) -> None:
+        if name in self._dependents:
+            raise ValueError(f"El nodo '{name}' ya existe")
+        missing = [dep for dep in dependencies if dep not in self._dependents]
+        if missing:
+            # Exigir dependencias ya definidas garantiza que el grafo no tenga ciclos
+            raise ValueError(f"El nodo '{name}' depende de nodos inexistentes: {', '.join(missing)}")
+        self._dependents[name] = []
+        for dep in dependencies:
+            self._dependents[dep].append(name)
+
+    def add_input(self, name: str, value: Any = _MISSING) -> None:
+        """
+        Declara una entrada del grafo.
+
+        Args:
+            name (str): Nombre de la entrada
+            value (opcional): Valor inicial; sin él, pedir la entrada es un error
+        """
+        self._register(name, ())
+        self._inputs[name] = value
+
+    def add_node(self, name: str, function: Callable, dependencies: Sequence[str] = ()) -> None:
+        """
+        Declara una etapa calculada.
+
+        Args:
+            name (str): Nombre del nodo
+            function (callable): Recibe los valores de las dependencias, en orden
+            dependencies (sequence): Nombres de entradas o nodos ya declarados
+        """
+        self._register(name, dependencies)
+        self._functions[name] = function
+        self._dependencies[name] = tuple(dependencies)
+
+    def set_input(self, name: str, value: Any) -> None:
+        """Asigna una entrada e invalida todos los nodos que dependen de ella."""
+        if name not in self._inputs:
+            raise KeyError(name)
+        self._inputs[name] = value
+        self.invalidate(name)
+
+    def seed(self, name: str, value: Any) -> None:
+        """
+        Guarda el valor de un nodo calculado sin ejecutar su etapa.
+
+        Sirve para restaurar resultados guardados (por ejemplo, de una sesión).
+        Se invalidan los dependientes, así que los nodos se siembran en orden
+        de dependencias.
+        """
+        if name not in self._functions:
+            raise KeyError(name)
+        self.invalidate(name)
+        self._cache[name] = value
+
+    def invalidate(self, name: str) -> None:
+        """Descarta el valor guardado de ``name`` y de todos sus dependientes."""
+        pending = [name]
+        while pending:
+            node = pending.pop()
+            self._cache.pop(node, None)
+            pending.extend(self._dependents[node])
+
+    def is_current(self, name: str) -> bool:
+        """Indica si el nodo tiene un valor guardado válido."""
+        if name in self._inputs:
+            return self._inputs[name] is not _MISSING
+        return name in self._cache
+
+    def get(self, name: str) -> Any:
+        """
+        Devuelve el valor de un nodo, calculando antes las dependencias que falten.
+
+        Si una etapa lanza una excepción no se guarda nada y el error se propaga.
+        """
+        if name in self._inputs:
+            value = self._inputs[name]
+            if value is _MISSING:
+                raise ValueError(f"La entrada '{name}' no tiene valor")
+            return value
+        if name in self._cache:
+            return self._cache[name]
+        if name not in self._functions:
+            raise KeyError(name)
+        args = [self.get(dep) for dep in self._dependencies[name]]
+        value = self._functions[name](*args)
+        self._cache[name] = value
+        return value
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Espectro típico de una población calculado por bloques.
+
+Las personas pasan por la FFT en bloques (calculate_fourier_spectrum, con la
+misma convención que calculate_fourier_coefficients). De cada bloque solo se
+guardan acumulados por frecuencia de log10(A_k): recuento, media y suma de
+cuadrados centrados (combinadas con la fórmula de Chan), mínimo, máximo y un
+histograma de anchura fija. La memoria es O(K · bins) sea cual sea el tamaño
+de la cohorte. Los percentiles se interpolan dentro del intervalo del
+histograma, así que su error es como mucho la anchura de un intervalo.
+"""
+
+import math
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence, Tuple
+import numpy as np
+from utils.math_tools import ArrayLike, calculate_daily_expenditure, calculate_fourier_spectrum
+from utils.shared import core
+
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+DEFAULT_BINS = 256
+# Tamaño aproximado de los temporales de un bloque de personas
+_CHUNK_BYTES = 64 << 20
+
+
+@dataclass
+class SpectrumBands:
+    """
+    Bandas del espectro de una población por frecuencia k = 1..K.
+
+    Las estadísticas son de log10(A_k); las amplitudes A_k = 0 no tienen
+    logaritmo y no se cuentan.
+    """
+    k: np.ndarray  # (K,) frecuencias
+    count: np.ndarray  # (K,) personas con A_k > 0
+    mean: np.ndarray  # (K,) media de log10(A_k)
+    std: np.ndarray  # (K,) desviación típica de log10(A_k)
+    percentiles: Tuple[float, ...]  # niveles en %
+    values: np.ndarray  # (P, K) percentiles de log10(A_k)
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """
+        Devuelve las columnas de la tabla por frecuencia (para la vista, un DataFrame o un CSV).
+
+        Los percentiles se dan como amplitudes A_k para dibujarlos sobre el
+        espectro de una persona.
+        Returns:
+            Dict[str, np.ndarray]: Encabezado -> columna
+        """
+        columns = {
+            'k': self.k,
+            'Personas': self.count,
+            'Media log10(A_k)': self.mean,
+            'Desv. log10(A_k)': self.std,
+        }
+        for level, row in zip(self.percentiles, self.values):
+            columns[f'P{level:g}'] = 10.0 ** row
+        return columns
+
+    def to_csv(self, path: str) -> None:
+        """Guarda columns() como CSV (una fila por frecuencia)."""
+        columns = self.columns()
+        table = np.column_stack([np.asarray(c, dtype=np.float64) for c in columns.values()])
+        np.savetxt(path, table, delimiter=',', header=','.join(columns), comments='', fmt='%.10g')
+
+
+class PopulationSpectrum:
+    """
+    Acumula log10(A_k) de muchas personas en memoria acotada.
+
+    Args:
+        n_days (int): Días de cada serie (N); todas las series deben tenerlo
+        k_max (int, opcional): Última frecuencia (por defecto N//2, como en run_cohort)
+        bins (int): Intervalos del histograma de cada frecuencia
+        log_range (Tuple[float, float], opcional): Rango de log10(A_k) del
+            histograma. Por defecto se toma del primer bloque con una década de
+            margen a cada lado. Los valores fuera del rango caen en los
+            intervalos extremos y sus percentiles se acotan con el mínimo y el
+            máximo exactos.
+    """
+
+    def __init__(self, n_days: int, k_max: Optional[int] = None, bins: int = DEFAULT_BINS,
+                 log_range: Optional[Tuple[float, float]] = None):
+        if n_days < 2:
+            raise ValueError('Las series deben tener al menos 2 días.')
+        self.n_days = n_days
+        self.k_max = k_max or n_days // 2
+        self.bins = bins
+        self.members = 0
+        self.count = np.zeros(self.k_max, dtype=np.int64)
+        self.mean = np.zeros(self.k_max)
+        self._m2 = np.zeros(self.k_max)
+        self.minimum = np.full(self.k_max, np.inf)
+        self.maximum = np.full(self.k_max, -np.inf)
+        self._histogram = np.zeros((self.k_max, bins), dtype=np.int64)
+        self._edges = None if log_range is None else np.linspace(log_range[0], log_range[1], bins + 1)
+
+    def _log_amplitudes(self, gb: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        amplitudes = calculate_fourier_spectrum(gb, self.k_max)[2]
+        valid = amplitudes > 0
+        return np.log10(np.where(valid, amplitudes, 1.0)), valid
+
+    def _bin(self, log_a: np.ndarray) -> np.ndarray:
+        width = self._edges[1] - self._edges[0]
+        index = np.floor((log_a - self._edges[0]) / width)
+        return np.clip(index, 0, self.bins - 1).astype(np.intp)
+
+    def add(self, gb: ArrayLike) -> None:
+        """
+        Añade un bloque de personas.
+
+        Args:
+            gb (array_like): GB diario de una persona (N,) o de un bloque (m, N)
+        """
+        gb = np.atleast_2d(np.asarray(gb, dtype=np.float64))
+        if gb.shape[1] != self.n_days:
+            raise ValueError(f'Las series deben tener {self.n_days} días, no {gb.shape[1]}.')
+        if gb.shape[0] == 0:
+            return
+        log_a, valid = self._log_amplitudes(gb)
+        self._combine(*core.column_moments(log_a, valid))
+
+        if self._edges is None:
+            if not valid.any():
+                # Sin amplitudes positivas no hay rango; se espera al siguiente bloque
+                self.members += gb.shape[0]
+                return
+            low, high = log_a[valid].min(), log_a[valid].max()
+            self._edges = np.linspace(math.floor(low) - 1, math.ceil(high) + 1, self.bins + 1)
+        flat = (np.arange(self.k_max) * self.bins + self._bin(log_a))[valid]
+        self._histogram += np.bincount(flat, minlength=self.k_max * self.bins).reshape(self.k_max, self.bins)
+        self.members += gb.shape[0]
+
+    def _combine(self, n, mean, m2, minimum, maximum) -> None:
+        total = self.count + n
+        with np.errstate(invalid='ignore', divide='ignore'):
+            delta = mean - self.mean
+            self.mean = np.where(total > 0, self.mean + delta * (n / total), 0.0)
+            self._m2 = self._m2 + m2 + np.where(total > 0, delta ** 2 * (self.count * n / total), 0.0)
+        self.count = total
+        np.minimum(self.minimum, minimum, out=self.minimum)
+        np.maximum(self.maximum, maximum, out=self.maximum)
+
+    def add_batch(self, batch, chunk_size: Optional[int] = None) -> None:
+        """
+        Añade todas las personas de una cohorte por bloques de filas.
+
+        Args:
+            batch (PersonBatch): Cohorte con n_days días por persona
+            chunk_size (int, opcional): Personas por bloque (por defecto ~64 MiB de temporales)
+        """
+        chunk_size = chunk_size or max(1, _CHUNK_BYTES // (self.n_days * 8 * 8))
+        bmr = batch.calculate_bmr()
+        for start in range(0, len(batch), chunk_size):
+            stop = start + chunk_size
+            self.add(calculate_daily_expenditure(bmr[start:stop], batch.exercise_minutes[start:stop]))
+
+    def merge(self, other: 'PopulationSpectrum') -> None:
+        """
+        Añade los acumulados de otro agregador (por ejemplo, de otro proceso).
+
+        Raises:
+            ValueError: Si los agregadores no tienen las mismas frecuencias e intervalos
+        """
+        if (other.k_max, other.bins) != (self.k_max, self.bins):
+            raise ValueError('Los agregadores deben tener las mismas frecuencias e intervalos.')
+        if other._edges is not None:
+            if self._edges is None:
+                self._edges = other._edges.copy()
+            elif not np.array_equal(self._edges, other._edges):
+                raise ValueError('Los agregadores deben usar el mismo rango de log10(A_k).')
+        self._combine(other.count, other.mean, other._m2, other.minimum, other.maximum)
+        self._histogram += other._histogram
+        self.members += other.members
+
+    @property
+    def std(self) -> np.ndarray:
+        """Desviación típica de log10(A_k) por frecuencia (nan con menos de dos personas)."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.count > 1, np.sqrt(self._m2 / (self.count - 1)), np.nan)
+
+    def percentiles(self, levels: Sequence[float] = DEFAULT_PERCENTILES) -> np.ndarray:
+        """
+        Estima percentiles de log10(A_k) con el histograma.
+
+        Args:
+            levels (Sequence[float]): Niveles en % (0..100)
+
+        Returns:
+            np.ndarray: Arreglo (P, K); nan en las frecuencias sin datos
+        """
+        levels = np.asarray(levels, dtype=np.float64)
+        out = np.full((levels.size, self.k_max), np.nan)
+        if self._edges is None:
+            return out
+        cumulative = np.cumsum(self._histogram, axis=1)
+        width = self._edges[1] - self._edges[0]
+        for row, level in zip(out, levels):
+            target = level / 100.0 * self.count
+            # Primer intervalo cuyo acumulado alcanza el objetivo
+            index = np.minimum((cumulative < target[:, np.newaxis]).sum(axis=1), self.bins - 1)
+            before = np.take_along_axis(cumulative, index[:, np.newaxis], axis=1)[:, 0] - \
+                np.take_along_axis(self._histogram, index[:, np.newaxis], axis=1)[:, 0]
+            inside = np.take_along_axis(self._histogram, index[:, np.newaxis], axis=1)[:, 0]
+            with np.errstate(invalid='ignore', divide='ignore'):
+                fraction = np.where(inside > 0, (target - before) / inside, 0.0)
+            row[:] = np.clip(self._edges[index] + fraction * width, self.minimum, self.maximum)
+        out[:, self.count == 0] = np.nan
+        return out
+
+    def rank(self, amplitudes: ArrayLike) -> np.ndarray:
+        """
+        Sitúa el espectro de una persona dentro de la población.
+
+        Args:
+            amplitudes (array_like): A_k de la persona para k = 1..K (o una fila por persona)
+
+        Returns:
+            np.ndarray: Percentil (0..100) de cada A_k en la población; nan si
+            A_k <= 0 o si la frecuencia no tiene datos
+        """
+        amplitudes = np.asarray(amplitudes, dtype=np.float64)
+        if amplitudes.shape[-1] != self.k_max:
+            raise ValueError(f'Se esperaban {self.k_max} amplitudes, no {amplitudes.shape[-1]}.')
+        out = np.full(amplitudes.shape, np.nan)
+        if self._edges is None:
+            return out
+        valid = (amplitudes > 0) & (self.count > 0)
+        log_a = np.log10(np.where(valid, amplitudes, 1.0))
+        index = self._bin(log_a)
+        k = np.broadcast_to(np.arange(self.k_max), index.shape)
+        cumulative = np.cumsum(self._histogram, axis=1)
+        below = cumulative[k, index] - self._histogram[k, index]
+        width = self._edges[1] - self._edges[0]
+        fraction = np.clip((log_a - self._edges[index]) / width, 0.0, 1.0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            ranked = 100.0 * (below + fraction * self._histogram[k, index]) / self.count
+        out[valid] = ranked[valid]
+        return out
+
+    def bands(self, levels: Sequence[float] = DEFAULT_PERCENTILES) -> SpectrumBands:
+        """
+        Devuelve media, desviación y percentiles por frecuencia.
+
+        Returns:
+            SpectrumBands: Bandas de la población
+        """
+        return SpectrumBands(np.arange(1, self.k_max + 1), self.count.copy(), np.where(self.count > 0, self.mean, np.nan),
+                             self.std, tuple(float(level) for level in levels), self.percentiles(levels))
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Filtro de valores atípicos de los minutos de ejercicio antes del análisis.
+
+Los registros de pulseras y relojes tienen fallos que el espectro convierte en
+artefactos: días de 1440 minutos (el dispositivo no se apagó), valores
+negativos o no numéricos, o ceros sueltos en medio de una racha activa. El
+filtro marca dos tipos de puntos:
+
+- fallos: no finitos, negativos o >= ``max_minutes`` (y los ceros si
+  ``flag_zeros``);
+- atípicos: puntos a más de ``threshold`` desviaciones robustas de la mediana
+  de su ventana (filtro de Hampel). La desviación robusta es
+  1.4826·MAD, con MAD la mediana de |x - mediana| en la ventana, y no baja de
+  ``min_scale`` minutos para que una racha de valores iguales no marque
+  cualquier cambio.
+
+Los puntos marcados se recortan a la banda mediana ± threshold·desviación (los
+fallos toman la mediana de la ventana) o se interpolan linealmente entre los
+vecinos no marcados. La mediana y la MAD de cada ventana vienen del núcleo
+de cálculo (window_median_mad, un bucle compilado con el motor numba); el
+resto son operaciones vectorizadas sobre una serie (N,) o una matriz
+(personas, N), por bloques de filas.
+"""
+
+from dataclasses import dataclass
+from typing import Optional, Tuple
+import numpy as np
+from utils.math_tools import ArrayLike
+from utils.shared import core
+
+# Factor que convierte la MAD en desviación típica para datos normales
+MAD_TO_STD = 1.4826
+FILTER_MODES = ('clip', 'interpolate')
+# Tamaño aproximado de los temporales de un bloque de personas
+_CHUNK_BYTES = 64 << 20
+
+
+@dataclass(frozen=True)
+class FilterConfig:
+    """Parámetros del filtro de valores atípicos."""
+    window: int = 7  # días de la ventana móvil (impar, centrada en cada día)
+    threshold: float = 3.5  # desviaciones robustas a partir de las que un punto es atípico
+    min_scale: float = 1.0  # desviación robusta mínima, en minutos
+    max_minutes: float = 1440.0  # minutos a partir de los que el día es un fallo
+    flag_zeros: bool = False  # trata todos los ceros como fallos (días sin registro)
+    mode: str = 'clip'  # 'clip' o 'interpolate'
+
+    def __post_init__(self):
+        if self.window < 1 or self.window % 2 == 0:
+            raise ValueError('La ventana del filtro debe ser un número impar de días.')
+        if self.mode not in FILTER_MODES:
+            raise ValueError(f"Modo de filtro desconocido: {self.mode} (use {', '.join(FILTER_MODES)}).")
+
+
+@dataclass
+class FilterResult:
+    """Serie filtrada y puntos que cambiaron."""
+    values: np.ndarray  # minutos filtrados, con la forma de la entrada
+    flagged: np.ndarray  # (bool) puntos marcados como fallos o atípicos
+    changed: np.ndarray  # (bool) puntos cuyo valor cambió
+    counts: np.ndarray  # puntos cambiados por persona (un entero con una sola serie)
+
+
+def _interpolate(values: np.ndarray, missing: np.ndarray) -> np.ndarray:
+    """Interpola linealmente cada fila en los puntos ``missing`` (los extremos toman el vecino más cercano)."""
+    rows, n = values.shape
+    position = np.arange(n)
+    previous = np.maximum.accumulate(np.where(missing, -1, position), axis=1)
+    following = np.minimum.accumulate(np.where(missing, n, position)[:, ::-1], axis=1)[:, ::-1]
+    has_previous, has_following = previous >= 0, following < n
+    previous = np.where(has_previous, previous, following)
+    following = np.where(has_following, following, previous)
+    # Filas sin ningún punto válido: se dejan como están
+    keep = ~(has_previous | has_following)
+    previous = np.where(keep, position, previous)
+    following = np.where(keep, position, following)
+    left = np.take_along_axis(values, previous, axis=1)
+    right = np.take_along_axis(values, following, axis=1)
+    span = following - previous
+    weight = np.divide(position - previous, span, out=np.zeros(values.shape), where=span > 0)
+    return np.where(missing & ~keep, left + weight * (right - left), values)
+
+
+def _filter_block(x: np.ndarray, config: FilterConfig) -> Tuple[np.ndarray, np.ndarray]:
+    with np.errstate(invalid='ignore'):
+        glitch = ~np.isfinite(x) | (x < 0) | (x >= config.max_minutes)
+        if config.flag_zeros:
+            glitch |= x == 0
+    clean = np.where(glitch, np.nan, x)
+    median, mad = core.window_median_mad(clean, config.window)
+    with np.errstate(invalid='ignore'):
+        scale = np.maximum(MAD_TO_STD * mad, config.min_scale)
+        band = config.threshold * scale
+        outlier = ~glitch & (np.abs(clean - median) > band)
+    flagged = glitch | outlier
+    if config.mode == 'interpolate':
+        filtered = _interpolate(np.where(flagged, 0.0, x), flagged)
+        # Filas sin puntos válidos: se conservan los valores originales
+        filtered = np.where(flagged & flagged.all(axis=1, keepdims=True), x, filtered)
+    else:
+        clipped = np.clip(clean, median - band, median + band)
+        filtered = np.where(glitch, median, np.where(outlier, clipped, x))
+        # Sin vecinos válidos no hay mediana: el punto se queda como estaba
+        filtered = np.where(np.isnan(filtered), x, filtered)
+    return filtered, flagged
+
+
+def filter_minutes(minutes: ArrayLike, config: Optional[FilterConfig] = None,
+                   chunk_size: Optional[int] = None) -> FilterResult:
+    """
+    Detecta y corrige fallos y valores atípicos en los minutos de ejercicio.
+
+    Args:
+        minutes (array_like): Minutos de una persona (N,) o de una cohorte (m, N)
+        config (FilterConfig, opcional): Parámetros (por defecto FilterConfig())
+        chunk_size (int, opcional): Personas por bloque (por defecto ~64 MiB de temporales)
+
+    Returns:
+        FilterResult: Minutos filtrados y puntos cambiados por persona. Los
+        puntos sin ningún vecino válido en la ventana (o, al interpolar, en
+        toda la serie) conservan su valor.
+    """
+    config = config or FilterConfig()
+    x = np.asarray(minutes, dtype=np.float64)
+    matrix = np.atleast_2d(x)
+    members, n_days = matrix.shape
+    values = matrix.copy()
+    flagged = np.zeros(matrix.shape, dtype=bool)
+    chunk_size = chunk_size or max(1, _CHUNK_BYTES // (max(n_days, 1) * (config.window + 4) * 8))
+    for start in range(0, members if n_days else 0, chunk_size):
+        stop = start + chunk_size
+        values[start:stop], flagged[start:stop] = _filter_block(matrix[start:stop], config)
+    same = (values == matrix) | (np.isnan(values) & np.isnan(matrix))
+    changed = flagged & ~same
+    counts = changed.sum(axis=1)
+    if x.ndim == 1:
+        return FilterResult(values[0], flagged[0], changed[0], int(counts[0]))
+    return FilterResult(values, flagged, changed, counts)
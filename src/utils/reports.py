@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Informes por persona (HTML o PDF) generados sin interfaz gráfica.
+
+Los gráficos se dibujan con el backend Agg de matplotlib, sin pyplot: cada
+proceso crea una sola figura y en cada informe solo reemplaza los datos de sus
+líneas. Para una cohorte, los datos de entrada y los resultados ya calculados
+por run_cohort se comparten con los procesos del pool en un bloque de memoria
+compartida. Cada proceso escribe sus informes directamente en disco y solo
+devuelve las rutas; el índice (index.csv) se escribe a medida que terminan las
+tareas.
+"""
+
+import base64
+import csv
+import html
+import io
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import matplotlib
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.backends.backend_pdf import PdfPages
+from matplotlib.figure import Figure
+from models.batch import PersonBatch
+from utils.cohort_runner import (
+    CohortResults,
+    attach_arrays,
+    default_chunk_size,
+    run_cohort,
+    share_arrays
+)
+from utils.math_tools import calculate_activity_factor
+import utils.shared  # noqa: F401  (metabolic_app en sys.path)
+from src.utils.downsampling import log_minmax_indices, lttb_indices
+
+FORMATS = ('html', 'pdf')
+# Filas de la tabla diaria por página del PDF
+_PDF_ROWS_PER_PAGE = 60
+_DAILY_HEADERS = ['Día', 'Ejercicio (min)', 'TMB', 'AF', 'GB']
+# Puntos dibujados por serie; las series más largas se reducen
+_MAX_POINTS = 2000
+
+# Figuras y datos compartidos de cada proceso del pool
+_worker_state = {}
+
+
+@dataclass
+class ReportData:
+    """Datos y resultados de una persona necesarios para su informe."""
+
+    sex: str  # 'M' o 'F'
+    weight: float  # en kg
+    height: float  # en cm
+    age: float  # en años
+    exercise_minutes: np.ndarray  # (N,) minutos por día
+    bmr: float  # TMB en kcal/día
+    activity_factors: np.ndarray  # (N,) AF por día
+    daily_expenditure: np.ndarray  # (N,) GB por día
+    amplitudes: np.ndarray  # A_k para k = 1..K
+    alpha: float  # pendiente del ajuste log-log
+    intercept: float  # intercepto C del ajuste log-log
+    r: float  # correlación del ajuste log-log
+    correlation: float  # correlación entre minutos de ejercicio y GB
+
+
+@dataclass
+class ReportSummary:
+    """Resultado de generar los informes de una cohorte."""
+
+    manifest: str  # ruta de index.csv
+    written: int  # informes escritos
+    errors: Dict[int, str] = field(default_factory=dict)  # índice -> mensaje
+
+
+class _ReportFigure:
+    """Figura Agg reutilizable con la serie de GB y el espectro en escala log-log."""
+
+    def __init__(self):
+        self.figure = Figure(figsize=(8, 6), dpi=100)
+        FigureCanvasAgg(self.figure)
+        self.series_ax, self.loglog_ax = self.figure.subplots(2, 1)
+        # Márgenes fijos: tight_layout costaría un dibujado extra por informe
+        self.figure.subplots_adjust(left=0.11, right=0.97, bottom=0.08, top=0.88, hspace=0.45)
+        self.series_ax.set_title('GB diario')
+        self.series_ax.set_xlabel('Día (n)')
+        self.series_ax.set_ylabel('GB (kcal)')
+        self.series_ax.grid(True)
+        self.loglog_ax.set_xlabel('log10(k)')
+        self.loglog_ax.set_ylabel('log10(A_k)')
+        self.loglog_ax.grid(True)
+        self.series_line, = self.series_ax.plot([], [], linewidth=0.8)
+        self.points, = self.loglog_ax.plot([], [], 'o', markersize=3)
+        self.fit_line, = self.loglog_ax.plot([], [], color='red')
+
+    def update(self, data: ReportData) -> None:
+        """Reemplaza los datos de las líneas con los de una persona."""
+        gb = np.asarray(data.daily_expenditure, dtype=np.float64)
+        days = np.arange(1, gb.size + 1, dtype=np.float64)
+        keep = lttb_indices(days, gb, _MAX_POINTS)
+        self.series_line.set_data(days[keep], gb[keep])
+        A = np.asarray(data.amplitudes, dtype=np.float64)
+        k = np.arange(1, A.size + 1)
+        valid = A > 0
+        x, y = np.log10(k[valid]), np.log10(A[valid])
+        # Bins de igual ancho en log10(k), como el eje: se conservan las primeras décadas
+        keep = log_minmax_indices(k[valid], A[valid], _MAX_POINTS // 2)
+        self.points.set_data(x[keep], y[keep])
+        if x.size and math.isfinite(data.alpha):
+            x_line = np.array([x.min(), x.max()])
+            self.fit_line.set_data(x_line, data.alpha * x_line + data.intercept)
+            self.loglog_ax.set_title(f'log10(A_k) = {data.alpha:.4f} log10(k) + {data.intercept:.4f}')
+        else:
+            self.fit_line.set_data([], [])
+            self.loglog_ax.set_title('log10(A_k) vs log10(k)')
+        for ax in (self.series_ax, self.loglog_ax):
+            ax.relim()
+            ax.autoscale_view()
+
+    def png(self) -> bytes:
+        buffer = io.BytesIO()
+        self.figure.savefig(buffer, format='png')
+        return buffer.getvalue()
+
+
+def _report_figure() -> _ReportFigure:
+    """Figura del proceso actual (se crea una sola vez)."""
+    figure = _worker_state.get('figure')
+    if figure is None:
+        figure = _worker_state['figure'] = _ReportFigure()
+    return figure
+
+
+def _summary_rows(data: ReportData) -> List[Tuple[str, str]]:
+    return [
+        ('Sexo', data.sex),
+        ('Peso (kg)', f'{data.weight:.1f}'),
+        ('Altura (cm)', f'{data.height:.1f}'),
+        ('Edad (años)', f'{data.age:.0f}'),
+        ('TMB (kcal/día)', f'{data.bmr:.3f}'),
+        ('GB medio (kcal/día)', f'{np.mean(data.daily_expenditure):.2f}'),
+        ('α (log-log)', f'{data.alpha:.4f}'),
+        ('C (log-log)', f'{data.intercept:.4f}'),
+        ('r (log-log)', f'{data.r:.4f}'),
+        ('Correlación ejercicio-GB', f'{data.correlation:.4f}'),
+    ]
+
+
+def _daily_rows(data: ReportData):
+    """Celdas de la tabla diaria, con el mismo formato que la vista de la aplicación."""
+    tmb = f'{data.bmr:.3f}'
+    for i, (minutes, af, gb) in enumerate(zip(data.exercise_minutes.tolist(),
+                                              data.activity_factors.tolist(),
+                                              data.daily_expenditure.tolist()), 1):
+        yield (str(i), f'{minutes:.0f}', tmb, f'{af:.2f}', f'{gb:.2f}')
+
+
+def _write_html(path: str, data: ReportData, title: str) -> None:
+    figure = _report_figure()
+    figure.update(data)
+    image = base64.b64encode(figure.png()).decode('ascii')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(f"""<html><head><meta charset='utf-8'><title>{html.escape(title)}</title>
+<style>body {{ font-family: Arial; font-size: 14px; }} td, th {{ padding: 4px 8px; }}</style>
+</head><body>
+<h1>{html.escape(title)}</h1>
+<table border='1' style='border-collapse:collapse;'>
+""")
+        for label, value in _summary_rows(data):
+            f.write(f'<tr><th>{html.escape(label)}</th><td>{html.escape(value)}</td></tr>\n')
+        f.write(f"""</table>
+<p><img src='data:image/png;base64,{image}'></p>
+<h2>Datos diarios</h2>
+<table border='1' style='border-collapse:collapse;'>
+<tr>{''.join(f'<th>{h}</th>' for h in _DAILY_HEADERS)}</tr>
+""")
+        # Las filas se escriben una a una, sin construir la tabla en memoria
+        for cells in _daily_rows(data):
+            f.write('<tr>' + ''.join(f'<td>{c}</td>' for c in cells) + '</tr>\n')
+        f.write('</table>\n</body></html>\n')
+
+
+def _table_page() -> Tuple[Figure, object]:
+    """Página A4 del proceso actual para la tabla diaria: un solo texto monoespaciado."""
+    page = _worker_state.get('page')
+    if page is None:
+        figure = Figure(figsize=(8.27, 11.69))
+        FigureCanvasAgg(figure)
+        text = figure.text(0.08, 0.95, '', family='Courier', weight='medium', fontsize=9, va='top')
+        page = _worker_state['page'] = (figure, text)
+    return page
+
+
+def _save_table_page(pdf: PdfPages, page: Figure, text, lines: List[str]) -> None:
+    text.set_text('\n'.join(lines))
+    # Las 14 fuentes base del PDF no se incrustan ni se maquetan glifo a glifo:
+    # con ellas una página de la tabla tarda milisegundos en vez de décimas
+    with matplotlib.rc_context({'pdf.use14corefonts': True}):
+        pdf.savefig(page)
+
+
+def _write_pdf(path: str, data: ReportData, title: str) -> None:
+    figure = _report_figure()
+    figure.update(data)
+    summary = '   '.join(f'{label}: {value}' for label, value in _summary_rows(data)[:6])
+    header = ''.join(h.rjust(16) for h in _DAILY_HEADERS)
+    page, text = _table_page()
+    with PdfPages(path) as pdf:
+        figure.figure.suptitle(f'{title}\n{summary}', fontsize=8)
+        pdf.savefig(figure.figure)
+        figure.figure.suptitle('')
+        # Cada página reemplaza el texto de la anterior; las filas no se acumulan en memoria
+        lines = [header]
+        for cells in _daily_rows(data):
+            lines.append(''.join(c.rjust(16) for c in cells))
+            if len(lines) > _PDF_ROWS_PER_PAGE:
+                _save_table_page(pdf, page, text, lines)
+                lines = [header]
+        if len(lines) > 1:
+            _save_table_page(pdf, page, text, lines)
+
+
+def write_report(path: str, data: ReportData, fmt: str = 'html', title: str = 'Informe metabólico') -> None:
+    """
+    Escribe el informe de una persona: resumen, tabla diaria, serie de GB,
+    espectro log-log y recta de regresión.
+
+    Args:
+        path (str): Archivo de salida
+        data (ReportData): Datos y resultados de la persona
+        fmt (str): 'html' (autocontenido, con la imagen incrustada) o 'pdf'
+        title (str): Título del informe
+    """
+    if fmt == 'html':
+        _write_html(path, data, title)
+    elif fmt == 'pdf':
+        _write_pdf(path, data, title)
+    else:
+        raise ValueError(f"Formato no soportado: {fmt} (use {', '.join(FORMATS)})")
+
+
+def _report_data(arrays: Dict[str, np.ndarray], i: int) -> ReportData:
+    """Construye los datos del informe de la fila i a partir de los resultados de la cohorte."""
+    is_male, weight, height, age = arrays['attrs'][:, i].tolist()
+    bmr, _, alpha, intercept, r, correlation = arrays['values'][:, i].tolist()
+    minutes = arrays['minutes'][i]
+    activity = calculate_activity_factor(minutes)
+    return ReportData(
+        sex='M' if is_male > 0 else 'F',
+        weight=weight, height=height, age=age,
+        exercise_minutes=minutes,
+        bmr=bmr,
+        activity_factors=activity,
+        daily_expenditure=activity * bmr,
+        amplitudes=arrays['amplitudes'][i],
+        alpha=alpha, intercept=intercept, r=r, correlation=correlation
+    )
+
+
+def _write_range(arrays: Dict[str, np.ndarray], directory: str, fmt: str,
+                 start: int, stop: int, skip: Tuple[int, ...]) -> List[Tuple[int, Optional[str], Optional[str]]]:
+    """Escribe los informes de las filas [start, stop); devuelve (índice, archivo, error)."""
+    width = len(str(arrays['minutes'].shape[0]))
+    skipped = set(skip)
+    written = []
+    for i in range(start, stop):
+        if i in skipped:
+            continue
+        name = f'persona_{i + 1:0{width}d}.{fmt}'
+        try:
+            write_report(os.path.join(directory, name), _report_data(arrays, i), fmt,
+                         title=f'Informe metabólico: persona {i + 1}')
+            written.append((i, name, None))
+        except Exception as e:
+            written.append((i, None, f'{type(e).__name__}: {e}'))
+    return written
+
+
+def _attach_report_data(name: str, layout, directory: str, fmt: str) -> None:
+    """Inicializador de cada proceso: se conecta a los datos y resultados compartidos."""
+    shm, views = attach_arrays(name, layout)
+    _worker_state.update(shm=shm, arrays=views, directory=directory, fmt=fmt)
+
+
+def _report_worker(start: int, stop: int, skip: Tuple[int, ...]):
+    """Tarea del pool: escribe los informes de las filas [start, stop)."""
+    return _write_range(_worker_state['arrays'], _worker_state['directory'], _worker_state['fmt'],
+                        start, stop, skip)
+
+
+def generate_reports(batch: PersonBatch, directory: str, results: Optional[CohortResults] = None,
+                     fmt: str = 'html', workers: Optional[int] = None,
+                     chunk_size: Optional[int] = None) -> ReportSummary:
+    """
+    Genera un informe por persona de la cohorte en ``directory``.
+
+    Los resultados de run_cohort (con amplitudes) se reutilizan si se pasan;
+    si no, se calculan una vez. Las personas con errores en el análisis no
+    tienen informe. index.csv lista, por persona, el archivo o el error.
+
+    Args:
+        batch (PersonBatch): Cohorte
+        directory (str): Carpeta de salida (se crea si no existe)
+        results (CohortResults, opcional): Resultados ya calculados con with_amplitudes=True
+        fmt (str): 'html' o 'pdf'
+        workers (int, opcional): Procesos del pool (por defecto os.cpu_count());
+            con 1 los informes se escriben en el proceso actual
+        chunk_size (int, opcional): Personas por tarea (por defecto automático)
+
+    Returns:
+        ReportSummary: Ruta del índice, informes escritos y errores por persona
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Formato no soportado: {fmt} (use {', '.join(FORMATS)})")
+    members, n_days = batch.exercise_minutes.shape
+    workers = workers or os.cpu_count() or 1
+    if results is None or results.amplitudes is None:
+        results = run_cohort(batch, workers=workers, with_amplitudes=True)
+    # Los informes pesan más que el análisis: tareas más pequeñas reparten mejor la carga
+    chunk_size = chunk_size or max(1, default_chunk_size(members, n_days, workers) // 4)
+    os.makedirs(directory, exist_ok=True)
+
+    arrays = {
+        'attrs': np.stack([np.char.upper(batch.sex) == 'M', batch.weight, batch.height,
+                           batch.age]).astype(np.float64),
+        'minutes': batch.exercise_minutes,
+        'values': np.stack([results.bmr, results.mean_gb, results.alpha, results.intercept,
+                            results.r, results.correlation]),
+        'amplitudes': results.amplitudes,
+    }
+    errors = dict(results.errors)
+    ranges = [(start, min(start + chunk_size, members)) for start in range(0, members, chunk_size)]
+
+    def skipped(start, stop):
+        return tuple(i for i in errors if start <= i < stop)
+
+    manifest = os.path.join(directory, 'index.csv')
+    written = 0
+    with open(manifest, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['persona', 'archivo', 'error'])
+        for i, message in sorted(errors.items()):
+            writer.writerow([i + 1, '', message])
+
+        def store(rows):
+            nonlocal written
+            for i, name, message in rows:
+                if message is None:
+                    written += 1
+                else:
+                    errors[i] = message
+                writer.writerow([i + 1, name or '', message or ''])
+            f.flush()
+
+        if workers == 1 or len(ranges) <= 1:
+            for start, stop in ranges:
+                store(_write_range(arrays, directory, fmt, start, stop, skipped(start, stop)))
+        else:
+            shm, layout = share_arrays(arrays)
+            try:
+                with ProcessPoolExecutor(max_workers=min(workers, len(ranges)),
+                                         initializer=_attach_report_data,
+                                         initargs=(shm.name, layout, directory, fmt)) as pool:
+                    futures = {pool.submit(_report_worker, start, stop, skipped(start, stop)): (start, stop)
+                               for start, stop in ranges}
+                    for future in as_completed(futures):
+                        start, stop = futures[future]
+                        try:
+                            store(future.result())
+                        except Exception as e:
+                            message = f'{type(e).__name__}: {e}'
+                            store([(i, None, message) for i in range(start, stop) if i not in errors])
+            finally:
+                shm.close()
+                shm.unlink()
+
+    return ReportSummary(manifest=manifest, written=written, errors=dict(sorted(errors.items())))
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Sesiones de la aplicación guardadas en un archivo binario.
+
+Una sesión guarda las entradas (datos personales, minutos por día, K y si se
+aplicó el filtro) y los resultados ya calculados: GB diario, espectro,
+intervalos log-log y regresión. El archivo es un ``.npz`` sin comprimir: cada
+arreglo se guarda como un ``.npy`` contiguo dentro del zip, así que al cargar
+se proyecta en memoria con ``np.memmap`` sin copiarlo ni recalcularlo.
+
+Cada sección calculada lleva su versión (``SECTION_VERSIONS``). Al cambiar el
+cálculo de una sección se sube su versión: las sesiones antiguas descartan esa
+sección y las que dependen de ella (``SECTION_DEPENDENCIES``) y la aplicación
+las recalcula cuando se necesitan. Un cambio de ``SESSION_FORMAT`` indica que
+el archivo ya no se puede leer.
+"""
+
+import json
+import os
+import struct
+import tempfile
+import zipfile
+from dataclasses import dataclass, field, fields
+from typing import Any, Dict, Tuple
+import numpy as np
+from models.person import Person
+from utils.math_tools import LogBinnedSpectrum
+
+# Versión del contenedor: sube si cambia la forma de guardar las secciones
+SESSION_FORMAT = 1
+# Versión de cada sección calculada: sube si cambia el cálculo que la produce
+SECTION_VERSIONS = {
+    'expenditure': 1,
+    'spectrum': 1,
+    'log_bins': 1,
+    'regression': 1,
+}
+# Sección de la que se deriva cada una (si se descarta, también se descartan las demás)
+SECTION_DEPENDENCIES = {
+    'spectrum': 'expenditure',
+    'log_bins': 'spectrum',
+    'regression': 'log_bins',
+}
+
+_META = 'meta'
+_MINUTES = 'input.exercise_minutes'
+# Cabecera local de un miembro del zip: firma y longitudes del nombre y del campo extra
+_LOCAL_HEADER = struct.Struct('<4s22xHH')
+_NPY_HEADERS = {(1, 0): np.lib.format.read_array_header_1_0, (2, 0): np.lib.format.read_array_header_2_0}
+
+
+@dataclass
+class Session:
+    """Entradas y resultados de una sesión guardada."""
+    person: Person  # persona analizada (con los minutos ya filtrados si filtered)
+    k: int = 1  # frecuencia K seleccionada
+    filtered: bool = False  # si se aplicó el filtro de valores atípicos
+    results: Dict[str, Any] = field(default_factory=dict)  # secciones vigentes, por nombre
+    stale: Tuple[str, ...] = ()  # secciones descartadas por versión
+
+
+def _section_arrays(name: str, value: Any) -> Dict[str, np.ndarray]:
+    if name == 'log_bins':
+        return {f'log_bins.{f.name}': np.asarray(getattr(value, f.name)) for f in fields(LogBinnedSpectrum)}
+    if name == 'regression':
+        return {name: np.asarray(value, dtype=np.float64).reshape(3)}
+    return {name: np.asarray(value)}
+
+
+def _section_value(name: str, arrays: Dict[str, np.ndarray]) -> Any:
+    if name == 'log_bins':
+        return LogBinnedSpectrum(**{f.name: arrays[f'log_bins.{f.name}'] for f in fields(LogBinnedSpectrum)})
+    if name == 'regression':
+        return tuple(float(value) for value in arrays[name])
+    return arrays[name]
+
+
+def save_session(path: str, session: Session) -> None:
+    """
+    Guarda una sesión en un archivo ``.npz`` sin comprimir.
+
+    Se escribe en un archivo temporal que luego reemplaza al destino, así que
+    se puede guardar sobre la sesión que está proyectada en memoria.
+
+    Args:
+        path (str): Archivo de salida
+        session (Session): Entradas y resultados a guardar; las secciones de
+            ``results`` desconocidas se ignoran
+    """
+    person = session.person
+    sections = {name: SECTION_VERSIONS[name] for name in SECTION_VERSIONS if name in session.results}
+    meta = {
+        'format': SESSION_FORMAT,
+        'sections': sections,
+        'sex': person.sex,
+        'weight': float(person.weight),
+        'height': float(person.height),
+        'age': int(person.age),
+        'k': int(session.k),
+        'filtered': bool(session.filtered),
+    }
+    arrays = {_META: np.array(json.dumps(meta)),
+              _MINUTES: np.asarray(person.exercise_minutes, dtype=np.float64)}
+    for name in sections:
+        arrays.update(_section_arrays(name, session.results[name]))
+    directory = os.path.dirname(os.path.abspath(path))
+    handle, temporary = tempfile.mkstemp(suffix='.npz', dir=directory)
+    try:
+        with os.fdopen(handle, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+def _map_member(path: str, archive: zipfile.ZipFile, info: zipfile.ZipInfo) -> np.ndarray:
+    """Proyecta en memoria un ``.npy`` guardado sin comprimir dentro del zip (lo lee si no se puede)."""
+    if info.compress_type == zipfile.ZIP_STORED:
+        with open(path, 'rb') as f:
+            f.seek(info.header_offset)
+            signature, name_length, extra_length = _LOCAL_HEADER.unpack(f.read(_LOCAL_HEADER.size))
+            if signature == b'PK\x03\x04':
+                f.seek(name_length + extra_length, 1)
+                read_header = _NPY_HEADERS.get(np.lib.format.read_magic(f))
+                shape, fortran_order, dtype = read_header(f) if read_header else ((), False, np.dtype(object))
+                # Los escalares y los arreglos vacíos se leen (np.memmap no admite tamaño 0)
+                if not dtype.hasobject and len(shape) > 0 and int(np.prod(shape)) > 0:
+                    return np.memmap(path, dtype=dtype, mode='r', offset=f.tell(), shape=shape,
+                                     order='F' if fortran_order else 'C')
+    with archive.open(info) as member:
+        return np.lib.format.read_array(member, allow_pickle=False)
+
+
+def load_session(path: str, mmap: bool = True) -> Session:
+    """
+    Carga una sesión sin recalcular nada.
+
+    Args:
+        path (str): Archivo guardado con save_session
+        mmap (bool): Proyecta los arreglos en memoria en lugar de leerlos (solo lectura)
+
+    Returns:
+        Session: Entradas y secciones vigentes; ``stale`` lista las descartadas
+        por versión, que hay que recalcular
+
+    Raises:
+        ValueError: Si el archivo no es una sesión o su formato no se puede leer
+    """
+    arrays = {}
+    with zipfile.ZipFile(path) as archive:
+        for info in archive.infolist():
+            name = info.filename[:-4] if info.filename.endswith('.npy') else info.filename
+            if mmap:
+                arrays[name] = _map_member(path, archive, info)
+            else:
+                with archive.open(info) as member:
+                    arrays[name] = np.lib.format.read_array(member, allow_pickle=False)
+    if _META not in arrays or _MINUTES not in arrays:
+        raise ValueError(f'{path} no es un archivo de sesión.')
+    meta = json.loads(str(arrays[_META]))
+    if meta.get('format') != SESSION_FORMAT:
+        raise ValueError(f"Formato de sesión {meta.get('format')} no compatible (se espera {SESSION_FORMAT}).")
+
+    saved = meta.get('sections', {})
+    stale = []
+    for name, version in SECTION_VERSIONS.items():
+        if name not in saved:
+            continue
+        if saved[name] != version or SECTION_DEPENDENCIES.get(name) in stale:
+            stale.append(name)
+    current = [name for name in SECTION_VERSIONS if name in saved and name not in stale]
+    person = Person(meta['sex'], meta['weight'], meta['height'], meta['age'], arrays[_MINUTES])
+    return Session(person, meta['k'], meta['filtered'],
+                   {name: _section_value(name, arrays) for name in current}, tuple(stale))
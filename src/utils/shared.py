@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Acceso a los módulos compartidos con metabolic_app.
+
+El núcleo de cálculo (``src.core``) y algunas utilidades comunes
+(``src.utils``) viven en metabolic_app, que se importa como el paquete
+``src``. Este módulo es el único que añade metabolic_app a ``sys.path``: los
+módulos de la aplicación de escritorio que usan esas piezas lo importan
+primero, así que basta con tener src/ en ``sys.path`` para importar cualquiera
+de ellos (``import models.person`` funciona sin más preparación, también en los
+procesos de un pool).
+"""
+
+import os
+import sys
+
+METABOLIC_APP = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'metabolic_app'))
+
+if METABOLIC_APP not in sys.path:
+    sys.path.append(METABOLIC_APP)
+
+from src import core  # noqa: E402
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Barrido de las constantes del modelo metabólico sobre una cohorte.
+
+Evalúa una rejilla de (fórmula del TMB, base del AF, pendiente del AF) para
+todas las personas y resume cómo responden el GB diario y el ajuste log-log
+del espectro. El modelo es lineal en los parámetros: GB_n = TMB·(base +
+pendiente·minutos_n). Para k = 1..N//2 la base solo aporta a k = 0, así que
+A_k(GB) = TMB·|pendiente|·A_k(minutos). Por eso la FFT se calcula una sola vez
+por persona, sobre los minutos, y la rejilla se resuelve con broadcasting:
+
+- el GB medio es TMB·(base + pendiente·media de los minutos);
+- el exponente alpha y r no cambian con la base, la pendiente (si no es 0) ni
+  la fórmula del TMB;
+- el intercepto C se desplaza en log10(TMB·|pendiente|).
+
+Las personas se procesan por bloques de filas para acotar la memoria.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+import numpy as np
+from models.batch import PersonBatch
+from utils.math_tools import (
+    AF_BASE,
+    AF_SLOPE,
+    HARRIS_BENEDICT,
+    ArrayLike,
+    calculate_bmr,
+    calculate_fourier_spectrum,
+    calculate_loglog_fit
+)
+
+# Coeficientes (base, peso, altura, edad) por sexo: TMB = base + a·peso + b·altura - c·edad
+BMR_COEFFICIENT_SETS = {
+    # Revisión de Roza y Shizgal (1984), la que usa la aplicación
+    'harris_benedict': HARRIS_BENEDICT,
+    # Harris y Benedict (1919)
+    'harris_benedict_1919': {
+        'M': (66.473, 13.7516, 5.0033, 6.755),
+        'F': (655.0955, 9.5634, 1.8496, 4.6756),
+    },
+    # Mifflin y St Jeor (1990)
+    'mifflin_st_jeor': {
+        'M': (5.0, 10.0, 6.25, 5.0),
+        'F': (-161.0, 10.0, 6.25, 5.0),
+    },
+}
+
+# Tamaño aproximado de los temporales de un bloque de personas
+_CHUNK_BYTES = 64 << 20
+
+
+class _RunningStats:
+    """Media y varianza por celda de la rejilla, combinadas bloque a bloque (fórmula de Chan); ignora nan."""
+
+    def __init__(self, shape: Tuple[int, ...]):
+        self.count = np.zeros(shape, dtype=np.int64)
+        self.mean = np.zeros(shape)
+        self._m2 = np.zeros(shape)
+
+    def add(self, values: np.ndarray) -> None:
+        """Añade un bloque con las personas en el último eje."""
+        valid = np.isfinite(values)
+        n = valid.sum(axis=-1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(n > 0, np.where(valid, values, 0.0).sum(axis=-1) / n, 0.0)
+            m2 = np.where(valid, (values - mean[..., np.newaxis]) ** 2, 0.0).sum(axis=-1)
+            total = self.count + n
+            delta = mean - self.mean
+            self.mean = np.where(total > 0, self.mean + delta * (n / total), 0.0)
+            self._m2 = self._m2 + m2 + np.where(total > 0, delta ** 2 * (self.count * n / total), 0.0)
+        self.count = total
+
+    def result(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Devuelve (media, desviación típica); nan sin datos (o sin dos datos para la desviación)."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return (np.where(self.count > 0, self.mean, np.nan),
+                    np.where(self.count > 1, np.sqrt(self._m2 / (self.count - 1)), np.nan))
+
+
+@dataclass
+class SweepResult:
+    """
+    Resumen de la cohorte en cada punto de la rejilla (fórmula, base, pendiente).
+
+    Los campos de la rejilla tienen forma (C, B, S): fórmulas del TMB, bases y
+    pendientes del AF, en el orden en que se pidieron.
+    """
+    coefficient_sets: Tuple[str, ...]  # (C,) nombres de las fórmulas del TMB
+    bases: np.ndarray  # (B,) AF sin ejercicio
+    slopes: np.ndarray  # (S,) aumento del AF por minuto
+    members: int  # personas analizadas
+    skipped: int  # personas con datos no válidos (no se cuentan)
+    mean_gb: np.ndarray  # (C, B, S) GB diario medio de la cohorte
+    std_gb: np.ndarray  # (C, B, S) desviación entre personas del GB medio
+    alpha: np.ndarray  # (C, B, S) exponente espectral medio
+    std_alpha: np.ndarray  # (C, B, S) desviación entre personas de alpha
+    intercept: np.ndarray  # (C, B, S) intercepto C medio del ajuste log-log
+
+    def rows(self) -> List[Dict[str, object]]:
+        """
+        Devuelve una fila por punto de la rejilla (para una tabla o un DataFrame).
+        Returns:
+            List[Dict[str, object]]: Encabezado -> valor
+        """
+        rows = []
+        for c, name in enumerate(self.coefficient_sets):
+            for b, base in enumerate(self.bases):
+                for s, slope in enumerate(self.slopes):
+                    rows.append({
+                        'Fórmula TMB': name,
+                        'Base AF': float(base),
+                        'Pendiente AF': float(slope),
+                        'GB medio': float(self.mean_gb[c, b, s]),
+                        'Desv. GB medio': float(self.std_gb[c, b, s]),
+                        'alpha medio': float(self.alpha[c, b, s]),
+                        'Desv. alpha': float(self.std_alpha[c, b, s]),
+                        'C medio': float(self.intercept[c, b, s]),
+                    })
+        return rows
+
+
+def _valid_rows(batch: PersonBatch, start: int, stop: int) -> np.ndarray:
+    minutes = batch.exercise_minutes[start:stop]
+    return (np.isfinite(minutes).all(axis=1) & (minutes >= 0).all(axis=1)
+            & (batch.weight[start:stop] > 0) & (batch.height[start:stop] > 0) & (batch.age[start:stop] >= 0)
+            & np.isfinite(batch.weight[start:stop]) & np.isfinite(batch.height[start:stop])
+            & np.isfinite(batch.age[start:stop]))
+
+
+def sweep_parameters(batch: PersonBatch, bases: ArrayLike = (AF_BASE,), slopes: ArrayLike = (AF_SLOPE,),
+                     coefficient_sets: Optional[Sequence[str]] = None,
+                     custom_sets: Optional[Mapping[str, Mapping[str, Tuple[float, float, float, float]]]] = None,
+                     chunk_size: Optional[int] = None) -> SweepResult:
+    """
+    Evalúa una rejilla de constantes del modelo sobre toda una cohorte.
+
+    Args:
+        batch (PersonBatch): Cohorte a analizar
+        bases (array_like): Valores de la base del AF (1.2 en el modelo actual)
+        slopes (array_like): Valores de la pendiente del AF por minuto (0.01 en el modelo actual)
+        coefficient_sets (Sequence[str], opcional): Fórmulas del TMB a comparar,
+            por nombre (por defecto todas las de BMR_COEFFICIENT_SETS y custom_sets)
+        custom_sets (Mapping, opcional): Fórmulas adicionales {nombre: {'M': (...), 'F': (...)}}
+        chunk_size (int, opcional): Personas por bloque (por defecto ~64 MiB de temporales)
+
+    Returns:
+        SweepResult: Resumen de la cohorte en cada punto de la rejilla
+
+    Raises:
+        ValueError: Si se pide una fórmula desconocida
+    """
+    available = dict(BMR_COEFFICIENT_SETS)
+    available.update(custom_sets or {})
+    names = tuple(coefficient_sets) if coefficient_sets is not None else tuple(available)
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        raise ValueError(f"Fórmulas del TMB desconocidas: {', '.join(unknown)}")
+    bases = np.atleast_1d(np.asarray(bases, dtype=np.float64))
+    slopes = np.atleast_1d(np.asarray(slopes, dtype=np.float64))
+    grid = (len(names), bases.size, slopes.size)
+
+    members, n_days = batch.exercise_minutes.shape
+    cells = int(np.prod(grid))
+    chunk_size = chunk_size or max(1, _CHUNK_BYTES // (max(n_days, cells) * 8 * 8))
+    gb_stats, alpha_stats, intercept_stats = _RunningStats(grid), _RunningStats(grid), _RunningStats(grid)
+    analyzed = 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_slopes = np.where(slopes != 0, np.log10(np.abs(slopes)), np.nan)
+    for start in range(0, members, chunk_size):
+        stop = min(start + chunk_size, members)
+        valid = _valid_rows(batch, start, stop)
+        if not valid.any():
+            continue
+        analyzed += int(valid.sum())
+        minutes = batch.exercise_minutes[start:stop][valid]
+        sex, weight = batch.sex[start:stop][valid], batch.weight[start:stop][valid]
+        height, age = batch.height[start:stop][valid], batch.age[start:stop][valid]
+        # (C, m): TMB de cada persona con cada fórmula
+        bmr = np.stack([calculate_bmr(sex, weight, height, age, available[name]) for name in names])
+        mean_minutes = minutes.mean(axis=1, dtype=np.float64)
+        # Una sola FFT por persona: la rejilla solo escala el espectro de los minutos
+        alpha, intercept, _ = calculate_loglog_fit(calculate_fourier_spectrum(minutes, n_days // 2)[2])
+
+        gb_stats.add(bmr[:, np.newaxis, np.newaxis, :]
+                     * (bases[np.newaxis, :, np.newaxis, np.newaxis]
+                        + slopes[np.newaxis, np.newaxis, :, np.newaxis] * mean_minutes))
+        alpha_stats.add(np.broadcast_to(np.where(slopes[:, np.newaxis] != 0, alpha, np.nan), grid + (alpha.size,)))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            log_bmr = np.where(bmr > 0, np.log10(np.abs(bmr)), np.nan)
+        intercept_stats.add(np.broadcast_to(
+            intercept + log_bmr[:, np.newaxis, np.newaxis, :] + log_slopes[np.newaxis, np.newaxis, :, np.newaxis],
+            grid + (intercept.size,)))
+
+    mean_gb, std_gb = gb_stats.result()
+    mean_alpha, std_alpha = alpha_stats.result()
+    mean_intercept, _ = intercept_stats.result()
+    return SweepResult(names, bases, slopes, analyzed, members - analyzed,
+                       mean_gb, std_gb, mean_alpha, std_alpha, mean_intercept)